@@ -1,7 +1,6 @@
 # Initialisierungsdatei für das Modul
 # from app.services.enhanced_data_service import EnhancedDataService
 from app.services.prediction_service import PredictionService
-# from app.services.background_sync import background_scheduler
 
 # Services erstellen - nutze Enhanced DataService für bessere Performance
 # data_service = EnhancedDataService()
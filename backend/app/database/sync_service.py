@@ -2,6 +2,7 @@
 Synchronisation Service zwischen OpenLigaDB API und lokaler SQLite Database
 """
 import asyncio
+import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
@@ -14,9 +15,10 @@ from app.services.prediction_service import PredictionService
 logger = logging.getLogger(__name__)
 
 class SyncService:
-    def __init__(self):
-        self.league = "bl1"
-        self.season = "2025"
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        # Liga und Saison wie DataService (Standard: KICK_DEFAULT_LEAGUE, KICK_CURRENT_SEASON)
+        self.league = league or os.getenv("KICK_DEFAULT_LEAGUE", "bl1")
+        self.season = str(season or os.getenv("KICK_CURRENT_SEASON", "2025"))
         self.prediction_service = PredictionService()
     
     async def sync_all_data(self, force_full_sync: bool = False) -> Dict[str, Any]:
@@ -210,6 +212,7 @@ class SyncService:
         
         return sync_results
 import asyncio
+import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
@@ -222,9 +225,10 @@ from app.services.prediction_service import PredictionService
 logger = logging.getLogger(__name__)
 
 class SyncService:
-    def __init__(self):
-        self.league = "bl1"
-        self.season = "2025"
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        # Liga und Saison wie DataService (Standard: KICK_DEFAULT_LEAGUE, KICK_CURRENT_SEASON)
+        self.league = league or os.getenv("KICK_DEFAULT_LEAGUE", "bl1")
+        self.season = str(season or os.getenv("KICK_CURRENT_SEASON", "2025"))
         self.prediction_service = PredictionService()
     
     async def sync_all_data(self, force_full_sync: bool = False) -> Dict[str, Any]:
@@ -3,6 +3,7 @@ from typing import List, Optional
 from datetime import datetime
 from app.models.schemas import Match, Prediction, MatchResult, TableEntry, MatchdayInfo, PredictionQualityEntry, PredictionQualityStats
 from app.database.database_service import DatabaseService
+from leader_lease import NotLeaderError
 import logging
 
 router = APIRouter(tags=["Bundesliga"])
@@ -25,12 +26,14 @@ async def test_connection():
 async def trigger_full_sync():
     """Trigger full data synchronization"""
     try:
-        from app.services.sync_service import SyncService
-        sync_service = SyncService()
+        from app.services.scheduler_service import scheduler_service
         
-        result = await sync_service.sync_all_data()
+        # Same lock as the scheduled jobs: waits while another sync is running
+        result = await scheduler_service.run("full")
         return result
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error in full sync: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -39,12 +42,14 @@ async def trigger_full_sync():
 async def trigger_teams_sync():
     """Trigger teams synchronization"""
     try:
-        from app.services.sync_service import SyncService
-        sync_service = SyncService()
+        from app.services.scheduler_service import scheduler_service
         
-        result = await sync_service.sync_teams()
+        # Same lock as the scheduled jobs: waits while another sync is running
+        result = await scheduler_service.run("teams")
         return result
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error in teams sync: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,12 +58,14 @@ async def trigger_teams_sync():
 async def trigger_matches_sync():
     """Trigger matches synchronization"""
     try:
-        from app.services.sync_service import SyncService
-        sync_service = SyncService()
+        from app.services.scheduler_service import scheduler_service
         
-        result = await sync_service.sync_matches()
+        # Same lock as the scheduled jobs: waits while another sync is running
+        result = await scheduler_service.run("matches")
         return result
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error in matches sync: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,12 +74,14 @@ async def trigger_matches_sync():
 async def trigger_predictions_sync():
     """Trigger predictions synchronization"""
     try:
-        from app.services.sync_service import SyncService
-        sync_service = SyncService()
+        from app.services.scheduler_service import scheduler_service
         
-        result = await sync_service.sync_current_predictions()
+        # Same lock as the scheduled jobs: waits while another sync is running
+        result = await scheduler_service.run("predictions")
         return result
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error in predictions sync: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -81,12 +90,14 @@ async def trigger_predictions_sync():
 async def trigger_quality_sync():
     """Trigger prediction quality synchronization"""
     try:
-        from app.services.sync_service import SyncService
-        sync_service = SyncService()
+        from app.services.scheduler_service import scheduler_service
         
-        result = await sync_service.sync_prediction_quality()
+        # Same lock as the scheduled jobs: waits while another sync is running
+        result = await scheduler_service.run("quality")
         return result
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error in quality sync: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -111,6 +122,13 @@ async def get_sync_status():
         logger.error(f"Error getting sync status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/sync/runs")
+async def get_sync_runs(limit: int = Query(50, ge=1, le=200), job: Optional[str] = None):
+    """Recent sync runs of this instance with per-stage timing, bytes, rows and retries"""
+    from sync_telemetry import telemetry
+
+    return telemetry.runs(limit, job)
+
 @router.post("/sync/scheduler/start")
 async def start_scheduler():
     """Start the background scheduler"""
@@ -3,12 +3,15 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from app.models.schemas import Match, MatchResult, Prediction, FormFactor, Team, TableEntry, MatchdayInfo, PredictionQualityEntry, PredictionQualityStats, HitType
+import httpx
 from app.services.openliga_client import OpenLigaDBClient
+from app.services.season_index import SeasonIndex
 from app.services.data_converter import DataConverter
 from app.interfaces.data_interface import DataServiceInterface
 import logging
 import json
 import hashlib
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +20,10 @@ class DataService(DataServiceInterface):
     Service zum Laden und Verarbeiten der Bundesliga-Daten
     """
     
-    def __init__(self):
-        # Initialisierung des OpenLigaDB-Clients
-        self.league = "bl1"  # 1. Bundesliga
-        self.season = "2025"  # Saison 2025/2026
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        # Liga und Saison (Standard wie main_cloud: KICK_DEFAULT_LEAGUE, KICK_CURRENT_SEASON)
+        self.league = league or os.getenv("KICK_DEFAULT_LEAGUE", "bl1")  # 1. Bundesliga
+        self.season = str(season or os.getenv("KICK_CURRENT_SEASON", "2025"))  # Saison 2025/2026
         # Cache für Vorhersagen (in-memory)
         self._predictions_cache: Dict[str, Dict] = {}
         self._cache_expiry: Dict[str, datetime] = {}
@@ -28,6 +31,14 @@ class DataService(DataServiceInterface):
         self._quality_cache: Optional[Dict] = None
         self._quality_cache_expiry: Optional[datetime] = None
     
+    async def _season_index(self, client: OpenLigaDBClient) -> SeasonIndex:
+        """Index der aktuellen Saison (bei Netzwerkfehlern leer, wie zuvor die leere Spielliste)"""
+        try:
+            return await client.get_season_index(self.league, self.season)
+        except httpx.HTTPError as e:
+            logger.error(f"Fehler beim Abrufen der Spiele: {str(e)}")
+            return SeasonIndex([])
+    
     async def get_team_matches(self, team_id: int) -> List[MatchResult]:
         """
         Holt alle vergangenen Spiele eines Teams
@@ -83,7 +94,7 @@ class DataService(DataServiceInterface):
                     n=n, 
                     league=self.league, 
                     current_season=self.season, 
-                    previous_season="2024"  # Vorherige Saison 2024/2025
+                    previous_season=str(int(self.season) - 1)  # Vorherige Saison
                 )
                 
                 # Konvertiere die Daten in unser Modell
@@ -133,7 +144,7 @@ class DataService(DataServiceInterface):
                     away_team=dortmund,
                     date=today + timedelta(days=2),
                     matchday=next_matchday,
-                    season="2025/2026"
+                    season=f"{self.season}/{int(self.season)+1}"
                 ),
                 Match(
                     id=1002,
@@ -141,7 +152,7 @@ class DataService(DataServiceInterface):
                     away_team=leverkusen,
                     date=today + timedelta(days=2, hours=3),
                     matchday=next_matchday,
-                    season="2025/2026"
+                    season=f"{self.season}/{int(self.season)+1}"
                 ),
             ]
             
@@ -192,18 +203,15 @@ class DataService(DataServiceInterface):
         """
         try:
             async with OpenLigaDBClient() as client:
-                # Hole alle Spiele der aktuellen Saison
-                all_matches = await client.get_matches_by_league_season(self.league, self.season)
+                # Index der aktuellen Saison (einmal geparst und gecacht)
+                index = await self._season_index(client)
                 
                 # Dictionary für Team-Statistiken
                 team_stats = {}
                 teams_dict = {}
                 
-                # Verarbeite alle beendeten Spiele
-                for match_data in all_matches:
-                    if not match_data.get('matchIsFinished', False):
-                        continue
-                    
+                # Verarbeite alle beendeten Spiele (Bitmap im Index)
+                for match_data in index.finished_matches():
                     home_team_data = match_data.get('team1', {})
                     away_team_data = match_data.get('team2', {})
                     
@@ -303,11 +311,8 @@ class DataService(DataServiceInterface):
         """
         try:
             async with OpenLigaDBClient() as client:
-                # Hole alle Spiele der aktuellen Saison
-                all_matches = await client.get_matches_by_league_season(self.league, self.season)
-                
-                # Sortiere Spiele nach Spieltag und Datum
-                sorted_matches = sorted(all_matches, key=lambda x: (x.get('matchday', 1), x.get('matchDateTime', '')))
+                # Index der aktuellen Saison, Anstoßzeiten sind bereits geparst
+                index = await self._season_index(client)
                 
                 now = datetime.now()
                 completed_matchdays = set()
@@ -315,16 +320,11 @@ class DataService(DataServiceInterface):
                 
                 # Analysiere alle Spiele um abgeschlossene Spieltage zu finden
                 matchday_status = {}
-                for match_data in sorted_matches:
+                for record in index.records:
                     try:
-                        match_date_str = match_data.get('matchDateTime', '')
-                        if match_date_str:
-                            match_date = datetime.fromisoformat(match_date_str.replace('Z', '+00:00'))
-                        else:
-                            continue
-                            
-                        matchday = match_data.get('matchday', 1)
-                        is_finished = match_data.get('matchIsFinished', False)
+                        match_date = record.kickoff
+                        matchday = record.data.get('matchday', 1)
+                        is_finished = record.is_finished
                         
                         if matchday not in matchday_status:
                             matchday_status[matchday] = {'total': 0, 'finished': 0, 'latest_date': match_date}
@@ -477,19 +477,18 @@ class DataService(DataServiceInterface):
         try:
             logger.info("Lade neue Qualitätsdaten von der API...")
             async with OpenLigaDBClient() as client:
-                # Hole alle Spiele der aktuellen Saison
-                all_matches = await client.get_matches_by_league_season(self.league, self.season)
+                # Index der aktuellen Saison (einmal geparst und gecacht)
+                index = await self._season_index(client)
                 
                 quality_entries = []
                 processed_matches = 0
                 
                 # Analysiere nur abgeschlossene Spiele der ersten 3 Spieltage
-                for match_data in all_matches:
+                for match_data in index.finished_matches():
                     matchday = match_data.get('matchday', 1)
-                    is_finished = match_data.get('matchIsFinished', False)
                     
                     # Nur abgeschlossene Spiele der ersten 3 Spieltage analysieren
-                    if not is_finished or matchday > 3:
+                    if matchday > 3:
                         continue
                     
                     # Konvertiere Match-Daten
@@ -1,24 +1,51 @@
 import httpx
 from typing import Dict, List, Optional, Any
 import logging
+import os
 from datetime import datetime, timedelta
 
+from app.services.openliga_pool import PayloadCache, get_shared_client, payload_cache
+from app.services.season_index import SeasonIndex
+
 logger = logging.getLogger(__name__)
 
 class OpenLigaDBClient:
     """
     Client für die OpenLigaDB API, um Bundesliga-Daten abzurufen
+    
+    Nutzt standardmäßig den prozessweiten Verbindungspool und Payload-Cache
+    (siehe openliga_pool.py): Saison- und Spieltagsdaten werden pro TTL nur
+    einmal geladen, auch wenn viele Instanzen gleichzeitig danach fragen.
     """
-    BASE_URL = "https://api.openligadb.de/getmatchdata"
+    # OPENLIGADB_BASE_URL lenkt alle Abrufe um (z.B. auf openligadb_stub.py für Offline-Tests)
+    BASE_URL = os.getenv("OPENLIGADB_BASE_URL", "https://api.openligadb.de").rstrip("/") + "/getmatchdata"
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[PayloadCache] = payload_cache):
+        self._client = client
+        self.cache = cache
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0)
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else get_shared_client()
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self.client.aclose()
+        # Der gemeinsame Client bleibt für die nächsten Aufrufe offen
+        pass
+    
+    async def _get_json(self, url: str) -> Any:
+        """GET mit Cache und Single-Flight (cache=None: immer direkt laden)"""
+        async def fetch():
+            response = await self.client.get(url)
+            response.raise_for_status()
+            return response.json()
+        
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.get(url, fetch)
     
     async def get_matches_by_league_season(self, league: str = "bl1", season: str = "2025") -> List[Dict[str, Any]]:
         """
@@ -33,9 +60,8 @@ class OpenLigaDBClient:
         """
         url = f"{self.BASE_URL}/{league}/{season}"
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.json()
+            # Kopie, damit Aufrufer die gecachte Liste nicht verändern
+            return list(await self._get_json(url))
         except httpx.HTTPError as e:
             logger.error(f"Fehler beim Abrufen der Spiele: {str(e)}")
             return []
@@ -54,9 +80,8 @@ class OpenLigaDBClient:
         """
         url = f"{self.BASE_URL}/{league}/{season}/{matchday}"
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.json()
+            # Kopie, damit Aufrufer die gecachte Liste nicht verändern
+            return list(await self._get_json(url))
         except httpx.HTTPError as e:
             logger.error(f"Fehler beim Abrufen der Spiele für Spieltag {matchday}: {str(e)}")
             return []
@@ -77,6 +102,29 @@ class OpenLigaDBClient:
         logger.info(f"Abrufen des Spieltags {next_matchday} für die Saison {season}")
         return await self.get_matches_by_matchday(league, season, next_matchday)
     
+    async def get_season_index(self, league: str = "bl1", season: str = "2025") -> SeasonIndex:
+        """
+        Index über alle Spiele einer Saison (siehe season_index.py)
+        
+        Wird wie der Payload gecacht, also pro TTL nur einmal geparst.
+        Netzwerkfehler werden an den Aufrufer weitergegeben.
+        """
+        url = f"{self.BASE_URL}/{league}/{season}"
+        
+        async def build():
+            return SeasonIndex(await self._get_json(url))
+        
+        if self.cache is None:
+            return await build()
+        return await self.cache.get(f"{url}#index", build)
+    
+    async def _team_index(self, team_id: int, league: str, season: str) -> Optional[SeasonIndex]:
+        try:
+            return await self.get_season_index(league, season)
+        except httpx.HTTPError as e:
+            logger.error(f"Fehler beim Abrufen der Spiele für Team-ID {team_id}: {str(e)}")
+            return None
+    
     async def get_team_matches(self, team_id: int, league: str = "bl1", season: str = "2025") -> List[Dict[str, Any]]:
         """
         Holt alle Spiele eines Teams
@@ -87,20 +135,10 @@ class OpenLigaDBClient:
             season: Saison (z.B. "2025" für 2025/2026)
             
         Returns:
-            Liste von Spielen des Teams
+            Liste von Spielen des Teams (nach Datum sortiert)
         """
-        all_matches = await self.get_matches_by_league_season(league, season)
-        
-        # Filtere nach Team-ID
-        team_matches = [
-            match for match in all_matches 
-            if match.get('team1', {}).get('teamId') == team_id or match.get('team2', {}).get('teamId') == team_id
-        ]
-        
-        # Sortiere nach Datum
-        team_matches.sort(key=lambda m: datetime.fromisoformat(m.get('matchDateTime', '').replace('Z', '+00:00')))
-        
-        return team_matches
+        index = await self._team_index(team_id, league, season)
+        return index.team_matches(team_id) if index else []
     
     async def get_past_matches(self, team_id: int, league: str = "bl1", season: str = "2025") -> List[Dict[str, Any]]:
         """
@@ -112,25 +150,10 @@ class OpenLigaDBClient:
             season: Saison (z.B. "2025" für 2025/2026)
             
         Returns:
-            Liste aller vergangenen Spiele des Teams
+            Liste aller vergangenen Spiele des Teams (älteste zuerst)
         """
-        team_matches = await self.get_team_matches(team_id, league, season)
-        
-        # Aktuelles Datum
-        now = datetime.now()
-        
-        # Filtere nach vergangenen Spielen
-        past_matches = [
-            match for match in team_matches 
-            if datetime.fromisoformat(match.get('matchDateTime', '').replace('Z', '+00:00')) < now
-        ]
-        
-        # Sortiere nach Datum (älteste zuerst)
-        past_matches.sort(
-            key=lambda m: datetime.fromisoformat(m.get('matchDateTime', '').replace('Z', '+00:00'))
-        )
-        
-        return past_matches
+        index = await self._team_index(team_id, league, season)
+        return index.team_matches(team_id, before=datetime.now()) if index else []
     
     async def get_last_n_matches(self, team_id: int, n: int = 6, league: str = "bl1", season: str = "2025") -> List[Dict[str, Any]]:
         """
@@ -143,32 +166,17 @@ class OpenLigaDBClient:
             season: Saison (z.B. "2025" für 2025/2026)
             
         Returns:
-            Liste der letzten Spiele des Teams (maximal n)
+            Liste der letzten Spiele des Teams (maximal n, neueste zuerst)
         """
-        team_matches = await self.get_team_matches(team_id, league, season)
-        
-        # Aktuelles Datum
-        now = datetime.now()
-        
-        # Filtere nach vergangenen Spielen
-        past_matches = [
-            match for match in team_matches 
-            if datetime.fromisoformat(match.get('matchDateTime', '').replace('Z', '+00:00')) < now
-        ]
+        index = await self._team_index(team_id, league, season)
+        records = index.last_team_records(team_id, datetime.now(), n) if index else []
         
         # Wenn keine vergangenen Spiele gefunden wurden, gebe leere Liste zurück
-        if not past_matches:
+        if not records:
             logger.warning(f"Keine vergangenen Spiele für Team-ID {team_id} gefunden.")
             return []
         
-        # Sortiere nach Datum (neueste zuerst) und nimm maximal n Spiele
-        past_matches.sort(
-            key=lambda m: datetime.fromisoformat(m.get('matchDateTime', '').replace('Z', '+00:00')), 
-            reverse=True
-        )
-        
-        # Nimm die letzten n Spiele oder alle, wenn weniger als n vorhanden sind
-        return past_matches[:n] if len(past_matches) > n else past_matches
+        return [record.data for record in records]
         
     async def get_matches_across_seasons(self, team_id: int, n: int = 14, league: str = "bl1", current_season: str = "2025", previous_season: str = "2024") -> List[Dict[str, Any]]:
         """
@@ -182,31 +190,17 @@ class OpenLigaDBClient:
             previous_season: Vorherige Saison (z.B. "2024" für 2024/2025)
             
         Returns:
-            Liste der Spiele des Teams aus beiden Saisons (maximal n)
+            Liste der Spiele des Teams aus beiden Saisons (maximal n, neueste zuerst)
         """
-        # Hole Spiele aus aktueller Saison
-        current_matches = await self.get_team_matches(team_id, league, current_season)
-        
-        # Hole Spiele aus vorheriger Saison
-        previous_matches = await self.get_team_matches(team_id, league, previous_season)
-        
-        # Kombiniere die Spiele
-        all_matches = current_matches + previous_matches
-        
-        # Aktuelles Datum
         now = datetime.now()
         
-        # Filtere nach vergangenen Spielen
-        past_matches = [
-            match for match in all_matches 
-            if datetime.fromisoformat(match.get('matchDateTime', '').replace('Z', '+00:00')) < now
-        ]
-        
-        # Sortiere nach Datum (neueste zuerst)
-        past_matches.sort(
-            key=lambda m: datetime.fromisoformat(m.get('matchDateTime', '').replace('Z', '+00:00')), 
-            reverse=True
-        )
+        # Je Saison höchstens n Spiele vor jetzt, dann zusammenführen
+        records = []
+        for season in (current_season, previous_season):
+            index = await self._team_index(team_id, league, season)
+            if index:
+                records.extend(index.last_team_records(team_id, now, n))
         
-        # Nimm die letzten n Spiele oder alle, wenn weniger als n vorhanden sind
-        return past_matches[:n] if len(past_matches) > n else past_matches
+        # Sortiere nach Datum (neueste zuerst) und nimm die letzten n Spiele
+        records.sort(key=lambda record: record.kickoff, reverse=True)
+        return [record.data for record in records[:n]]
@@ -0,0 +1,116 @@
+"""
+Prozessweiter HTTP-Client und Payload-Cache für OpenLigaDB
+
+get_shared_client() liefert pro Event-Loop einen gemeinsamen
+httpx.AsyncClient mit Keep-Alive-Verbindungspool (HTTP/2 über h2 aus
+httpx[http2] in requirements.txt; fehlt h2, HTTP/1.1). So entfällt der
+TCP/TLS-Aufbau für jede neue OpenLigaDBClient-Instanz.
+
+PayloadCache hält Antworten (Saison, Spieltag) für `ttl` Sekunden und
+bündelt gleichzeitige Anfragen auf dieselbe URL (Single-Flight): nur der
+erste Aufrufer lädt, alle anderen warten auf dasselbe Ergebnis. Fehler
+werden nicht gecacht.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import httpx
+
+DEFAULT_TTL = 300.0
+DEFAULT_TIMEOUT = 10.0
+MAX_CONNECTIONS = 10
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Gemeinsamer Client des laufenden Event-Loops (wird bei Bedarf angelegt)"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # Clients beendeter Loops verwerfen, ihre Verbindungen sind nicht mehr nutzbar
+        for old_loop in [old for old in _clients if old.is_closed()]:
+            del _clients[old_loop]
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return client
+
+
+async def close_shared_client():
+    """Schließt den gemeinsamen Client des laufenden Event-Loops (z.B. beim Shutdown)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class PayloadCache:
+    """TTL-Cache für JSON-Antworten mit Single-Flight pro Schlüssel"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Gecachter Wert für key; sonst lädt genau ein Aufrufer über fetch()
+
+        Läuft für key bereits ein Abruf, wartet der Aufrufer auf dessen
+        Ergebnis (oder Fehler), statt selbst zu laden.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self.hits += 1
+            return entry[1]
+
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Fehler an wartende Aufrufer weitergeben, ohne "never retrieved"-Warnung
+            future.exception()
+            raise
+        else:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, prefix: str = ""):
+        """Verwirft alle Einträge, deren Schlüssel mit prefix beginnt"""
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "coalesced": self.coalesced, "ttl": self.ttl, "http2": HTTP2_AVAILABLE}
+
+
+# Gemeinsamer Cache aller OpenLigaDBClient-Instanzen
+payload_cache = PayloadCache()
@@ -1,34 +1,51 @@
 """
 Background scheduler for automatic data synchronization
-Uses APScheduler to run periodic sync tasks
+Registers the sync jobs on the shared asyncio-native JobRunner (job_runner.runner),
+so the process has a single runner. Match, prediction and quality syncs wake up
+from the kickoff times of the open matches (fixture_planner) instead of fixed
+intervals. With several instances only the holder of the leader lease in the
+configured database runs them (leader_lease.py, SYNC_LEADER_LEASE=false disables).
 """
 
 import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from contextlib import asynccontextmanager
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from sqlalchemy import func
+
+from job_runner import MATCH_WINDOW, daily, fixture_planner, runner, weekly
+from leader_lease import SqlAlchemyLease
 
 from app.services.sync_service import SyncService
 
 logger = logging.getLogger(__name__)
 
+# All sync jobs write the same database and call OpenLigaDB: one shared lock
+SYNC_LOCK = "sync"
+
+# sync_type of trigger_immediate_sync -> job id
+SYNC_JOBS = {
+    "teams": "sync_teams",
+    "matches": "sync_matches",
+    "predictions": "sync_predictions",
+    "quality": "sync_quality",
+    "full": "full_sync",
+}
+
 class SchedulerService:
     """Background scheduler for data synchronization"""
     
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        self.runner = runner
         self.sync_service = SyncService()
-        self.is_running = False
-        
-        # Add event listeners
-        self.scheduler.add_listener(self._job_executed_listener, EVENT_JOB_EXECUTED)
-        self.scheduler.add_listener(self._job_error_listener, EVENT_JOB_ERROR)
+        self._add_scheduled_jobs()
+    
+    @property
+    def is_running(self) -> bool:
+        return self.runner.is_running
     
     async def start(self):
         """Start the scheduler"""
@@ -36,193 +53,122 @@ class SchedulerService:
             logger.warning("Scheduler is already running")
             return
         
-        try:
-            logger.info("Starting background scheduler...")
-            
-            # Add scheduled jobs
-            await self._add_scheduled_jobs()
-            
-            # Start the scheduler
-            self.scheduler.start()
-            self.is_running = True
-            
-            logger.info("Background scheduler started successfully")
-            
-        except Exception as e:
-            logger.error(f"Error starting scheduler: {e}")
-            raise
+        logger.info("Starting background scheduler...")
+        if os.getenv("SYNC_LEADER_LEASE", "true").lower() == "true":
+            from app.database.config_enhanced import enhanced_db_config
+            self.runner.use_lease(SqlAlchemyLease(enhanced_db_config.engine))
+        await self.runner.start()
+        logger.info("Background scheduler started successfully")
     
     async def stop(self):
         """Stop the scheduler"""
         if not self.is_running:
             return
         
-        try:
-            logger.info("Stopping background scheduler...")
-            self.scheduler.shutdown(wait=True)
-            self.is_running = False
-            logger.info("Background scheduler stopped")
-        except Exception as e:
-            logger.error(f"Error stopping scheduler: {e}")
+        logger.info("Stopping background scheduler...")
+        await self.runner.stop()
+        logger.info("Background scheduler stopped")
     
-    async def _add_scheduled_jobs(self):
-        """Add all scheduled jobs"""
-        
-        # 1. Team synchronization - once per day at 2 AM
-        self.scheduler.add_job(
-            func=self._sync_teams_job,
-            trigger=CronTrigger(hour=2, minute=0),
-            id="sync_teams",
-            name="Sync Teams",
-            replace_existing=True,
-            max_instances=1
-        )
-        
-        # 2. Match synchronization - every 4 hours
-        self.scheduler.add_job(
-            func=self._sync_matches_job,
-            trigger=IntervalTrigger(hours=4),
-            id="sync_matches",
-            name="Sync Matches",
-            replace_existing=True,
-            max_instances=1
-        )
-        
-        # 3. Prediction synchronization - every 2 hours during active periods
-        # More frequent during weekends (Friday-Monday)
-        self.scheduler.add_job(
-            func=self._sync_predictions_job,
-            trigger=IntervalTrigger(hours=2),
-            id="sync_predictions",
-            name="Sync Predictions",
-            replace_existing=True,
-            max_instances=1
-        )
-        
-        # 4. Prediction quality synchronization - every 6 hours
-        self.scheduler.add_job(
-            func=self._sync_quality_job,
-            trigger=IntervalTrigger(hours=6),
-            id="sync_quality",
-            name="Sync Prediction Quality",
-            replace_existing=True,
-            max_instances=1
-        )
-        
-        # 5. Full synchronization - once per week on Monday at 1 AM
-        self.scheduler.add_job(
-            func=self._full_sync_job,
-            trigger=CronTrigger(day_of_week=0, hour=1, minute=0),  # Monday
-            id="full_sync",
-            name="Full Data Sync",
-            replace_existing=True,
-            max_instances=1
-        )
-        
-        # 6. Cleanup old sync logs - daily at 3 AM
-        self.scheduler.add_job(
-            func=self._cleanup_job,
-            trigger=CronTrigger(hour=3, minute=0),
-            id="cleanup_sync_logs",
-            name="Cleanup Sync Logs",
-            replace_existing=True,
-            max_instances=1
+    def _add_scheduled_jobs(self):
+        """Add all scheduled jobs (mutually exclusive via SYNC_LOCK)"""
+        kickoffs = fixture_planner(self._kickoff_state)
+        jobs = (
+            # 1. Team synchronization - once per day at 2 AM
+            ("sync_teams", self._sync_teams_job, daily(2)),
+            # 2.-4. Matches, predictions and quality - around kickoffs, idle otherwise
+            ("sync_matches", self._sync_matches_job, kickoffs),
+            ("sync_predictions", self._sync_predictions_job, kickoffs),
+            ("sync_quality", self._sync_quality_job, kickoffs),
+            # 5. Full synchronization - once per week on Monday at 1 AM
+            ("full_sync", self._full_sync_job, weekly(0, 1)),
+            # 6. Cleanup old sync logs - daily at 3 AM
+            ("cleanup_sync_logs", self._cleanup_job, daily(3)),
         )
+        for job_id, func, planner in jobs:
+            self.runner.add(job_id, func, planner, lock=SYNC_LOCK)
         
         logger.info("All scheduled jobs added successfully")
     
+    @staticmethod
+    def _load_kickoff_state(now: datetime) -> Tuple[int, Optional[datetime]]:
+        """Running matches and next kickoff from the matches table (like job_runner.kickoff_state)"""
+        from app.database.config_enhanced import DatabaseService
+        from app.database.models import Match
+        
+        with DatabaseService() as db:
+            open_matches = db.session.query(Match).filter(Match.is_finished.isnot(True))
+            live = open_matches.filter(Match.date <= now, Match.date > now - MATCH_WINDOW).count()
+            next_kickoff = open_matches.filter(Match.date > now).with_entities(func.min(Match.date)).scalar()
+        return live, next_kickoff
+    
+    async def _kickoff_state(self, now: datetime) -> Tuple[int, Optional[datetime]]:
+        return await asyncio.to_thread(self._load_kickoff_state, now)
+    
     async def _sync_teams_job(self):
-        """Scheduled job for team synchronization"""
+        """Scheduled job for team synchronization (errors are logged by the runner)"""
         logger.info("Starting scheduled team sync...")
-        try:
-            result = await self.sync_service.sync_teams()
-            logger.info(f"Scheduled team sync completed: {result['count']} teams synced")
-        except Exception as e:
-            logger.error(f"Scheduled team sync failed: {e}")
+        result = await self.sync_service.sync_teams()
+        logger.info(f"Scheduled team sync completed: {result['count']} teams synced")
+        return result
     
     async def _sync_matches_job(self):
         """Scheduled job for match synchronization"""
         logger.info("Starting scheduled match sync...")
-        try:
-            result = await self.sync_service.sync_matches()
-            logger.info(f"Scheduled match sync completed: {result['count']} matches synced")
-        except Exception as e:
-            logger.error(f"Scheduled match sync failed: {e}")
+        result = await self.sync_service.sync_matches()
+        logger.info(f"Scheduled match sync completed: {result['count']} matches synced")
+        return result
     
     async def _sync_predictions_job(self):
         """Scheduled job for prediction synchronization"""
         logger.info("Starting scheduled prediction sync...")
-        try:
-            result = await self.sync_service.sync_current_predictions()
-            logger.info(f"Scheduled prediction sync completed: {result['count']} predictions synced")
-        except Exception as e:
-            logger.error(f"Scheduled prediction sync failed: {e}")
+        result = await self.sync_service.sync_current_predictions()
+        logger.info(f"Scheduled prediction sync completed: {result['count']} predictions synced")
+        return result
     
     async def _sync_quality_job(self):
         """Scheduled job for prediction quality synchronization"""
         logger.info("Starting scheduled quality sync...")
-        try:
-            result = await self.sync_service.sync_prediction_quality()
-            logger.info(f"Scheduled quality sync completed: {result['count']} quality entries synced")
-        except Exception as e:
-            logger.error(f"Scheduled quality sync failed: {e}")
+        result = await self.sync_service.sync_prediction_quality()
+        logger.info(f"Scheduled quality sync completed: {result['count']} quality entries synced")
+        return result
     
     async def _full_sync_job(self):
         """Scheduled job for full synchronization"""
         logger.info("Starting scheduled full sync...")
-        try:
-            result = await self.sync_service.sync_all_data()
-            logger.info(f"Scheduled full sync completed: {result}")
-        except Exception as e:
-            logger.error(f"Scheduled full sync failed: {e}")
+        result = await self.sync_service.sync_all_data()
+        logger.info(f"Scheduled full sync completed: {result}")
+        return result
     
     async def _cleanup_job(self):
         """Scheduled job for cleanup operations"""
         logger.info("Starting scheduled cleanup...")
-        try:
-            from app.database.config_enhanced import DatabaseService
-            from app.database.models import SyncStatus
-            
-            # Delete sync logs older than 30 days
-            cutoff_date = datetime.now() - timedelta(days=30)
-            
-            with DatabaseService() as db:
-                deleted_count = db.session.query(SyncStatus).filter(
-                    SyncStatus.created_at < cutoff_date
-                ).delete()
-                db.session.commit()
-                
-            logger.info(f"Cleanup completed: {deleted_count} old sync logs deleted")
+        from app.database.config_enhanced import DatabaseService
+        from app.database.models import SyncStatus
+        
+        # Delete sync logs older than 30 days
+        cutoff_date = datetime.now() - timedelta(days=30)
+        
+        with DatabaseService() as db:
+            deleted_count = db.session.query(SyncStatus).filter(
+                SyncStatus.created_at < cutoff_date
+            ).delete()
+            db.session.commit()
             
-        except Exception as e:
-            logger.error(f"Scheduled cleanup failed: {e}")
+        logger.info(f"Cleanup completed: {deleted_count} old sync logs deleted")
+        return {"deleted": deleted_count}
     
-    def _job_executed_listener(self, event):
-        """Listener for successful job executions"""
-        logger.info(f"Job '{event.job_id}' executed successfully")
-    
-    def _job_error_listener(self, event):
-        """Listener for job execution errors"""
-        logger.error(f"Job '{event.job_id}' failed: {event.exception}")
+    async def run(self, sync_type: str = "full") -> Dict[str, Any]:
+        """Run a sync job now; waits while another sync job is running"""
+        if sync_type not in SYNC_JOBS:
+            raise ValueError(f"Unknown sync type: {sync_type}")
+        return await self.runner.run_now(SYNC_JOBS[sync_type])
     
     async def trigger_immediate_sync(self, sync_type: str = "full") -> Dict[str, Any]:
         """Trigger immediate synchronization"""
         logger.info(f"Triggering immediate {sync_type} sync...")
         
         try:
-            if sync_type == "teams":
-                result = await self.sync_service.sync_teams()
-            elif sync_type == "matches":
-                result = await self.sync_service.sync_matches()
-            elif sync_type == "predictions":
-                result = await self.sync_service.sync_current_predictions()
-            elif sync_type == "quality":
-                result = await self.sync_service.sync_prediction_quality()
-            elif sync_type == "full":
-                result = await self.sync_service.sync_all_data()
-            else:
-                raise ValueError(f"Unknown sync type: {sync_type}")
-            
+            result = await self.run(sync_type)
             logger.info(f"Immediate {sync_type} sync completed: {result}")
             return result
             
@@ -234,17 +180,21 @@ class SchedulerService:
         """Get status of all scheduled jobs"""
         jobs_info = []
         
-        for job in self.scheduler.get_jobs():
+        for job in self.runner.queue():
             jobs_info.append({
-                "id": job.id,
-                "name": job.name,
-                "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
-                "trigger": str(job.trigger),
-                "max_instances": job.max_instances
+                "id": job["job"],
+                "name": job["job"].replace("_", " ").title(),
+                "next_run": job["next_run"],
+                "trigger": job["reason"],
+                "running": job["running"],
+                "last_run": job["last_run"],
+                "last_error": job["last_error"]
             })
         
         return {
             "scheduler_running": self.is_running,
+            "leader": self.runner.is_leader,
+            "lease": self.runner.lease.status() if self.runner.lease is not None else None,
             "jobs": jobs_info,
             "total_jobs": len(jobs_info)
         }
@@ -0,0 +1,87 @@
+"""
+Index über die Spiele einer OpenLigaDB-Saison
+
+Wird einmal pro Saison-Payload gebaut (OpenLigaDBClient.get_season_index
+cacht ihn zusammen mit dem Payload) und ersetzt das wiederholte Filtern,
+Parsen und Sortieren der Rohliste:
+    - MatchRecord: Spiel mit bereits geparstem Anstoß
+    - by_team: Team-ID -> Spiele des Teams nach Anstoß sortiert
+    - finished: Bitmap (ein Byte pro Spiel) der beendeten Spiele
+
+"Letzte n Spiele von Team X vor Zeitpunkt T" ist damit eine binäre Suche
+über die Anstoßzeiten des Teams.
+"""
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+
+class MatchRecord(NamedTuple):
+    """Spiel mit geparsten Schlüsselfeldern; data ist das unveränderte OpenLigaDB-Dict"""
+    kickoff: datetime
+    match_id: Optional[int]
+    home_team_id: Optional[int]
+    away_team_id: Optional[int]
+    is_finished: bool
+    data: Dict[str, Any]
+
+
+def parse_kickoff(value: str) -> datetime:
+    """matchDateTime wie bisher im Client: ISO-Format, 'Z' als UTC"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class SeasonIndex:
+    """Nach Anstoß sortierte Spiele einer Saison mit Team-Index und Bitmap beendeter Spiele"""
+
+    def __init__(self, payload: Sequence[Dict[str, Any]]):
+        records = [
+            MatchRecord(
+                kickoff=parse_kickoff(match.get('matchDateTime', '')),
+                match_id=match.get('matchID'),
+                home_team_id=match.get('team1', {}).get('teamId'),
+                away_team_id=match.get('team2', {}).get('teamId'),
+                is_finished=bool(match.get('matchIsFinished', False)),
+                data=match,
+            )
+            for match in payload
+        ]
+        # Stabil sortiert: gleiche Anstoßzeiten behalten die Reihenfolge der API
+        records.sort(key=lambda record: record.kickoff)
+        self.records: List[MatchRecord] = records
+        self.finished = bytearray(record.is_finished for record in records)
+
+        self.by_team: Dict[int, List[MatchRecord]] = {}
+        for record in records:
+            for team_id in (record.home_team_id, record.away_team_id):
+                self.by_team.setdefault(team_id, []).append(record)
+        self._team_kickoffs = {
+            team_id: [record.kickoff for record in team_records]
+            for team_id, team_records in self.by_team.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def finished_matches(self) -> Iterator[Dict[str, Any]]:
+        """Beendete Spiele (Rohdaten) in Anstoß-Reihenfolge"""
+        return (record.data for record, finished in zip(self.records, self.finished) if finished)
+
+    def team_records(self, team_id: int, before: Optional[datetime] = None) -> List[MatchRecord]:
+        """Spiele eines Teams aufsteigend nach Anstoß, optional nur mit Anstoß vor `before`"""
+        team_records = self.by_team.get(team_id, [])
+        if before is None:
+            return list(team_records)
+        return team_records[:bisect_left(self._team_kickoffs[team_id], before)] if team_records else []
+
+    def team_matches(self, team_id: int, before: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Wie team_records, aber als OpenLigaDB-Dicts"""
+        return [record.data for record in self.team_records(team_id, before)]
+
+    def last_team_records(self, team_id: int, before: datetime, n: int) -> List[MatchRecord]:
+        """Die n letzten Spiele eines Teams vor `before`, neuestes zuerst"""
+        team_records = self.by_team.get(team_id)
+        if not team_records:
+            return []
+        end = bisect_left(self._team_kickoffs[team_id], before)
+        return team_records[max(0, end - n):end][::-1]
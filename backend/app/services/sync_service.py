@@ -1,10 +1,13 @@
 """
 Synchronization service for API data to database
-Handles the conversion and storage of API data into database models
+Handles the conversion and storage of API data into database models.
+Each sync reports fetch, diff and write spans to the running job
+(sync_telemetry.py, /metrics and /api/sync/runs).
 """
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.exc import SQLAlchemyError
@@ -14,21 +17,26 @@ from app.database.models import Team, Match, Prediction, PredictionQuality, Sync
 from app.services.data_service import DataService
 from app.services.prediction_service import PredictionService
 from app.models.schemas import MatchResult, MatchdayInfo, PredictionData
+from sync_telemetry import record, span
 
 logger = logging.getLogger(__name__)
 
 class SyncService:
     """Service for synchronizing API data to database"""
     
-    def __init__(self):
-        self.data_service = DataService()
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        # Liga und Saison wie DataService (Standard: KICK_DEFAULT_LEAGUE, KICK_CURRENT_SEASON)
+        self.data_service = DataService(league=league, season=season)
+        self.league = self.data_service.league
+        self.season = self.data_service.season
         self.prediction_service = PredictionService()
     
-    async def sync_all_data(self, season: str = "2025", league: str = "bl1") -> Dict[str, Any]:
+    async def sync_all_data(self, season: Optional[str] = None, league: Optional[str] = None) -> Dict[str, Any]:
         """
         Vollständige Synchronisation aller Daten
         Returns sync statistics
         """
+        league, season = league or self.league, season or self.season
         logger.info(f"Starting full data sync for {league} {season}")
         
         stats = {
@@ -84,17 +92,21 @@ class SyncService:
             await self._update_sync_status("full_sync", stats)
             return stats
     
-    async def sync_teams(self, league: str = "bl1", season: str = "2025") -> Dict[str, Any]:
+    async def sync_teams(self, league: Optional[str] = None, season: Optional[str] = None) -> Dict[str, Any]:
         """Synchronize teams from API to database"""
+        league, season = league or self.league, season or self.season
         logger.info(f"Syncing teams for {league} {season}")
         
         result = {"count": 0, "errors": []}
         
         try:
             # Get teams from API
-            teams_data = await self.data_service.get_teams()
+            with span("fetch") as measured:
+                teams_data = await self.data_service.get_teams()
+                measured["rows"] = len(teams_data)
             
             with DatabaseService() as db:
+                started = time.perf_counter()
                 for team_data in teams_data:
                     try:
                         # Check if team exists
@@ -129,7 +141,9 @@ class SyncService:
                         logger.error(error_msg)
                         result["errors"].append(error_msg)
                 
-                db.session.commit()
+                record("diff", time.perf_counter() - started, rows=len(teams_data))
+                with span("write", rows=result["count"]):
+                    db.session.commit()
                 logger.info(f"Successfully synced {result['count']} teams")
                 
         except Exception as e:
@@ -139,15 +153,17 @@ class SyncService:
         
         return result
     
-    async def sync_matches(self, league: str = "bl1", season: str = "2025") -> Dict[str, Any]:
+    async def sync_matches(self, league: Optional[str] = None, season: Optional[str] = None) -> Dict[str, Any]:
         """Synchronize matches from API to database"""
+        league, season = league or self.league, season or self.season
         logger.info(f"Syncing matches for {league} {season}")
         
         result = {"count": 0, "errors": []}
         
         try:
             # Get current matchday info
-            matchday_info = await self.data_service.get_current_matchday_info()
+            with span("fetch"):
+                matchday_info = await self.data_service.get_current_matchday_info()
             current_matchday = matchday_info.current_matchday
             
             # Sync multiple matchdays (current and previous for results)
@@ -156,8 +172,11 @@ class SyncService:
             with DatabaseService() as db:
                 for matchday in matchdays_to_sync:
                     try:
-                        matches_data = await self.data_service.get_matches_by_matchday(matchday)
+                        with span("fetch") as measured:
+                            matches_data = await self.data_service.get_matches_by_matchday(matchday)
+                            measured["rows"] = len(matches_data)
                         
+                        started = time.perf_counter()
                         for match_data in matches_data:
                             try:
                                 # Get team IDs from database
@@ -207,13 +226,15 @@ class SyncService:
                                 error_msg = f"Error syncing match {match_data.match_id}: {str(e)}"
                                 logger.error(error_msg)
                                 result["errors"].append(error_msg)
+                        record("diff", time.perf_counter() - started, rows=len(matches_data))
                     
                     except Exception as e:
                         error_msg = f"Error syncing matchday {matchday}: {str(e)}"
                         logger.error(error_msg)
                         result["errors"].append(error_msg)
                 
-                db.session.commit()
+                with span("write", rows=result["count"]):
+                    db.session.commit()
                 logger.info(f"Successfully synced {result['count']} matches")
                 
         except Exception as e:
@@ -223,21 +244,23 @@ class SyncService:
         
         return result
     
-    async def sync_current_predictions(self, league: str = "bl1", season: str = "2025") -> Dict[str, Any]:
+    async def sync_current_predictions(self, league: Optional[str] = None, season: Optional[str] = None) -> Dict[str, Any]:
         """Synchronize current predictions to database"""
+        league, season = league or self.league, season or self.season
         logger.info(f"Syncing current predictions for {league} {season}")
         
         result = {"count": 0, "errors": []}
         
         try:
-            # Get current matchday info
-            matchday_info = await self.data_service.get_current_matchday_info()
-            current_matchday = matchday_info.current_matchday
-            
-            # Get predictions for current matchday
-            predictions_data = await self.data_service.get_predictions(current_matchday)
+            # Get current matchday info and its predictions
+            with span("fetch") as measured:
+                matchday_info = await self.data_service.get_current_matchday_info()
+                current_matchday = matchday_info.current_matchday
+                predictions_data = await self.data_service.get_predictions(current_matchday)
+                measured["rows"] = len(predictions_data)
             
             with DatabaseService() as db:
+                started = time.perf_counter()
                 for pred_data in predictions_data:
                     try:
                         # Get match from database
@@ -287,7 +310,9 @@ class SyncService:
                         logger.error(error_msg)
                         result["errors"].append(error_msg)
                 
-                db.session.commit()
+                record("diff", time.perf_counter() - started, rows=len(predictions_data))
+                with span("write", rows=result["count"]):
+                    db.session.commit()
                 logger.info(f"Successfully synced {result['count']} predictions")
                 
         except Exception as e:
@@ -297,21 +322,24 @@ class SyncService:
         
         return result
     
-    async def sync_prediction_quality(self, league: str = "bl1", season: str = "2025") -> Dict[str, Any]:
+    async def sync_prediction_quality(self, league: Optional[str] = None, season: Optional[str] = None) -> Dict[str, Any]:
         """Synchronize prediction quality data to database"""
+        league, season = league or self.league, season or self.season
         logger.info(f"Syncing prediction quality for {league} {season}")
         
         result = {"count": 0, "errors": []}
         
         try:
             # Get quality data from API
-            quality_data = await self.data_service.get_prediction_quality()
+            with span("fetch"):
+                quality_data = await self.data_service.get_prediction_quality()
             
             if not quality_data or "entries" not in quality_data:
                 logger.warning("No quality data received from API")
                 return result
             
             with DatabaseService() as db:
+                started = time.perf_counter()
                 for entry in quality_data["entries"]:
                     try:
                         # Get match and prediction from database
@@ -373,7 +401,9 @@ class SyncService:
                         logger.error(error_msg)
                         result["errors"].append(error_msg)
                 
-                db.session.commit()
+                record("diff", time.perf_counter() - started, rows=len(quality_data["entries"]))
+                with span("write", rows=result["count"]):
+                    db.session.commit()
                 logger.info(f"Successfully synced {result['count']} quality entries")
                 
         except Exception as e:
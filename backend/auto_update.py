@@ -22,7 +22,7 @@ class AutoUpdater:
         
         # Lade nur den aktuellen Spieltag
         current_matchday = await self.get_current_matchday()
-        matches = await self.sync.fetch_matches_from_season("2025")
+        matches = await self.sync.fetch_matches_from_season()
         
         # Filtere nur neue/geänderte Matches
         new_results_count = 0
@@ -58,7 +58,7 @@ class AutoUpdater:
             current_matchday = await self.get_current_matchday()
             
             # Update der aktuellen Saison (nur relevante Spieltage)
-            matches = await self.sync.fetch_matches_from_season("2025")
+            matches = await self.sync.fetch_matches_from_season()
             recent_matches = [
                 m for m in matches 
                 if m['matchday'] >= current_matchday - 1
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Historischer Backfill vieler Saisons mit Checkpoints je Partition
+
+backfill() lädt für jede ausgewählte Partition (league, season) den kompletten
+Saison-Payload (getmatchdata/<liga>/<saison>: eine Anfrage statt 34) parallel
+über den ratenbegrenzten MatchdayFetcher, streamend geparst zu kompakten
+MatchRecords (openligadb_stream.py). Fertige Saisons werden gesammelt
+und ab batch_matches Spielen in einer einzigen Transaktion geschrieben,
+während die übrigen Saisons weiterladen:
+    - Teams aus den Payloads (bestehende Einträge bleiben unverändert)
+    - Spiele per gesammeltem Upsert (ingest_matches)
+    - backfill_feed: Tabelle der betroffenen Partitionen komplett neu,
+      Team-Snapshots, Datenversion, Vorhersagen. Statt der Deltas je Spiel und des
+      Änderungslogs von ingest.feed; Leser verwerfen danach ihren Cache.
+    - ein Checkpoint je Partition in backfill_checkpoints (Migration 8)
+
+Spiele und Checkpoint liegen in derselben Transaktion: nach einem Abbruch
+fehlen genau die Partitionen ohne Checkpoint, und nur diese werden beim
+nächsten Lauf geladen (force=True lädt alles neu). Leere Saisons (bei
+OpenLigaDB noch nicht angelegt) erhalten keinen Checkpoint. Die laufende
+Saison hält danach der inkrementelle Sync aktuell (RealDataSync.sync_partitions).
+
+Der Bericht enthält den Durchsatz in Spielen pro Sekunde (gesamt und nur
+Schreiben), Anfragen und Bytes. Gegen Aufnahmen von openligadb_recorder.py
+testbar (OpenLigaDBStub(fixtures=...), siehe test_backfill.py).
+
+Aufruf:
+    python backfill.py [--db kick_predictor_final.db] --leagues bl1 bl2 --seasons 2010-2025 [--batch 5000] [--force]
+"""
+import argparse
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from change_feed import ChangeBatch, ChangeFeed, bump_version
+from ingest import ingest_matches, refresh_snapshots
+from openligadb_fetcher import OPENLIGADB_BASE_URL, MatchdayFetcher
+from openligadb_stream import MatchRecord
+from partitions import LEAGUES, SEASONS, Partition, partitions
+from prediction_store import refresh_predictions
+from real_data_sync import RealDataSync
+from standings import rebuild_standings
+
+logger = logging.getLogger(__name__)
+
+# Spiele pro Schreib-Transaktion (eine Saison hat 306)
+DEFAULT_BATCH_MATCHES = 5000
+
+
+def rebuild_partition_standings(conn, batch: ChangeBatch) -> int:
+    """Abonnent: baut die Tabelle der betroffenen Partitionen neu auf (statt Deltas je Spiel)"""
+    touched = sorted({Partition(league, season) for league, season, _ in batch.matchdays})
+    return sum(rebuild_standings(conn, [partition.season], [partition.league]) for partition in touched)
+
+
+# Feed für große Importe: ganze Partitionen neu statt Einzel-Deltas, kein Änderungslog
+backfill_feed = ChangeFeed()
+backfill_feed.subscribe(rebuild_partition_standings, requires=("standings_real",))
+backfill_feed.subscribe(refresh_snapshots)
+backfill_feed.subscribe(bump_version, requires=("data_version",))
+backfill_feed.subscribe(refresh_predictions, requires=("predictions_real", "prediction_runs"))
+
+
+def load_checkpoints(conn) -> Dict[Partition, Dict[str, Any]]:
+    """Vollständig nachgeladene Partitionen mit Spielanzahl und Zeitpunkt"""
+    return {
+        Partition(league, season): {"matches": matches, "finished": finished, "completed_at": completed_at}
+        for league, season, matches, finished, completed_at in conn.execute(
+            "SELECT league, season, matches, finished, completed_at FROM backfill_checkpoints")
+    }
+
+
+def season_rows(partition: Partition, records: List[MatchRecord]) -> List[Dict[str, Any]]:
+    """MatchRecords einer Saison -> Zeilen für ingest_matches (ohne Spieltag: übersprungen)"""
+    rows = []
+    for record in records:
+        if not record.matchday:
+            logger.warning(f"{partition}: Spiel {record.match_id} ohne Spieltag übersprungen")
+            continue
+        rows.append(record.row())
+    return rows
+
+
+def write_batch(db_path: str, loaded: List[Tuple[Partition, List[MatchRecord]]]) -> Dict[str, int]:
+    """Schreibt mehrere Saisons samt Checkpoints in einer Transaktion"""
+    teams: Dict[int, Tuple] = {}
+    rows: List[Dict[str, Any]] = []
+    checkpoints = []
+    for partition, records in loaded:
+        teams.update((team[0], team) for record in records for team in record.teams() if team[0])
+        partition_rows = season_rows(partition, records)
+        rows.extend(partition_rows)
+        checkpoints.append((partition.league, partition.season, len(partition_rows),
+                            sum(1 for row in partition_rows if row["is_finished"])))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("""
+            INSERT OR IGNORE INTO teams_real (team_id, name, short_name, icon_url)
+            VALUES (?, ?, ?, ?)
+        """, teams.values())
+        result = ingest_matches(conn, rows, change_feed=backfill_feed)
+        conn.executemany("""
+            INSERT OR REPLACE INTO backfill_checkpoints (league, season, matches, finished)
+            VALUES (?, ?, ?, ?)
+        """, checkpoints)
+        conn.commit()
+    finally:
+        conn.close()
+    return {"matches": len(rows), **{key: result[key] for key in ("inserted", "updated", "unchanged")}}
+
+
+async def backfill(db_path: str, selected: Optional[Iterable[Partition]] = None,
+                   fetcher: Optional[MatchdayFetcher] = None,
+                   batch_matches: int = DEFAULT_BATCH_MATCHES, force: bool = False) -> Dict[str, Any]:
+    """
+    Lädt die Partitionen (Standard: KICK_LEAGUES x KICK_SEASONS) als ganze Saisons nach
+
+    Returns:
+        Bericht mit completed, skipped (Checkpoint vorhanden), empty, failed
+        (jeweils Partitionen als "liga/saison"), matches, inserted, updated,
+        unchanged, batches, seconds, matches_per_sec, write_seconds,
+        write_matches_per_sec, requests und bytes_downloaded
+    """
+    sync = RealDataSync(db_path=db_path, fetcher=fetcher)
+    sync.init_database()
+    fetcher = sync.fetcher
+    selected = list(dict.fromkeys(selected if selected is not None else partitions()))
+
+    conn = sqlite3.connect(db_path)
+    done = load_checkpoints(conn)
+    conn.close()
+    pending = [partition for partition in selected if force or partition not in done]
+
+    report: Dict[str, Any] = {
+        "completed": [], "skipped": [str(p) for p in selected if p not in pending], "empty": [], "failed": [],
+        "matches": 0, "inserted": 0, "updated": 0, "unchanged": 0, "batches": 0, "write_seconds": 0.0,
+    }
+    requests_before, bytes_before = fetcher.requests, fetcher.bytes_downloaded
+    start = time.perf_counter()
+    buffer: List[Tuple[Partition, List[MatchRecord]]] = []
+
+    async def load(partition: Partition):
+        try:
+            return partition, await fetcher.fetch_season_records(*partition), None
+        except Exception as e:
+            return partition, None, e
+
+    async def flush():
+        loaded = buffer[:]
+        buffer.clear()
+        if not loaded:
+            return
+        write_start = time.perf_counter()
+        # Im Thread, damit die übrigen Saisons währenddessen weiterladen
+        counts = await asyncio.to_thread(write_batch, db_path, loaded)
+        report["write_seconds"] += time.perf_counter() - write_start
+        for key, value in counts.items():
+            report[key] += value
+        report["batches"] += 1
+        report["completed"].extend(str(partition) for partition, _ in loaded)
+        logger.info(f"Backfill: {counts['matches']} Spiele aus {len(loaded)} Saison(s) geschrieben")
+
+    for next_loaded in asyncio.as_completed([load(partition) for partition in pending]):
+        partition, records, error = await next_loaded
+        if error is not None:
+            logger.error(f"Backfill {partition} fehlgeschlagen: {error}")
+            report["failed"].append(str(partition))
+        elif not records:
+            report["empty"].append(str(partition))
+        else:
+            buffer.append((partition, records))
+            if sum(len(loaded) for _, loaded in buffer) >= batch_matches:
+                await flush()
+    await flush()
+
+    report["seconds"] = time.perf_counter() - start
+    report["matches_per_sec"] = report["matches"] / report["seconds"] if report["seconds"] else 0.0
+    report["write_matches_per_sec"] = (report["matches"] / report["write_seconds"]
+                                       if report["write_seconds"] else 0.0)
+    report["requests"] = fetcher.requests - requests_before
+    report["bytes_downloaded"] = fetcher.bytes_downloaded - bytes_before
+    return report
+
+
+def _seasons(value: str) -> List[str]:
+    """"2010-2025" -> alle Saisons dazwischen, "2024" -> ["2024"]"""
+    start, _, end = value.partition("-")
+    return [str(season) for season in range(int(start), int(end or start) + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historische Saisons mit Checkpoints nachladen")
+    parser.add_argument("--db", default="kick_predictor_final.db")
+    parser.add_argument("--leagues", nargs="+", default=LEAGUES)
+    parser.add_argument("--seasons", nargs="+", type=_seasons, default=[SEASONS], help="z.B. 2010-2025 oder 2023 2024")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_MATCHES, help="Spiele pro Transaktion")
+    parser.add_argument("--force", action="store_true", help="Checkpoints ignorieren und alles neu laden")
+    parser.add_argument("--base-url", default=OPENLIGADB_BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=5.0, help="Anfragen pro Sekunde")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    seasons = [season for group in args.seasons for season in group]
+    fetcher = MatchdayFetcher(base_url=f"{args.base_url}/getmatchdata",
+                              concurrency=args.concurrency, rate=args.rate)
+    report = asyncio.run(backfill(args.db, partitions(args.leagues, seasons), fetcher, args.batch, args.force))
+
+    print(f"📥 Backfill: {len(report['completed'])} Partition(en) geladen, "
+          f"{len(report['skipped'])} per Checkpoint übersprungen")
+    print(f"   {report['matches']} Spiele ({report['inserted']} neu, {report['updated']} geändert, "
+          f"{report['unchanged']} unverändert) in {report['batches']} Transaktion(en)")
+    print(f"   ⏱️ {report['seconds']:.1f}s gesamt: {report['matches_per_sec']:.0f} Spiele/s, "
+          f"Schreiben {report['write_matches_per_sec']:.0f} Spiele/s")
+    print(f"   🌐 {report['requests']} Anfragen, {report['bytes_downloaded'] / 1024 / 1024:.1f} MB")
+    if report["empty"]:
+        print(f"   ⚠️ Ohne Spiele: {', '.join(report['empty'])}")
+    if report["failed"]:
+        print(f"   ❌ Fehlgeschlagen (nächster Lauf versucht es erneut): {', '.join(report['failed'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Point-in-time Backtest für das xG-Vorhersagemodell
+
+Spielt matches_real einmal chronologisch ab und führt pro Team rollierende
+14er-Fenster mit. Für jedes beendete Spiel wird die Vorhersage mit dem Stand
+VOR dem Anstoß erzeugt (as-of), nicht mit der aktuellen Form. Laufzeit O(Spiele),
+eine einzige SQL-Abfrage, Vorhersagen werden am Ende vektorisiert berechnet.
+
+Aufruf: python backtest_engine.py [--db kick_predictor_final.db] [--season 2024 ...] [--model poisson]
+"""
+import argparse
+import sqlite3
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from xg_engine import WINDOW_SIZE, NEUTRAL_FORM, NEUTRAL_XG, MIN_XG, MODELS, predict_from_stats
+
+
+class RollingWindow:
+    """Rollierendes Fenster der letzten n Spiele eines Teams mit laufenden Summen"""
+
+    def __init__(self, n: int = WINDOW_SIZE):
+        self.n = n
+        self.all = deque()
+        self.scored = deque()
+        self.points = 0
+        self.goals = 0
+        self.scored_goals = 0
+
+    @staticmethod
+    def _points(goals_for: int, goals_against: int) -> int:
+        if goals_for > goals_against:
+            return 3
+        if goals_for == goals_against:
+            return 1
+        return 0
+
+    def add(self, goals_for: Optional[int], goals_against: Optional[int]):
+        """Fügt ein beendetes Spiel hinzu (NULL-Tore zählen für Form/xG als 0)"""
+        gf, ga = goals_for or 0, goals_against or 0
+        self.all.append((gf, ga))
+        self.points += self._points(gf, ga)
+        self.goals += gf
+        if len(self.all) > self.n:
+            old_gf, old_ga = self.all.popleft()
+            self.points -= self._points(old_gf, old_ga)
+            self.goals -= old_gf
+
+        if goals_for is not None and goals_against is not None:
+            self.scored.append(goals_for)
+            self.scored_goals += goals_for
+            if len(self.scored) > self.n:
+                self.scored_goals -= self.scored.popleft()
+
+    @property
+    def form(self) -> float:
+        if not self.all:
+            return NEUTRAL_FORM
+        return max(0.0, min(1.0, self.points / (len(self.all) * 3)))
+
+    @property
+    def xg(self) -> float:
+        if not self.all:
+            return NEUTRAL_XG
+        return max(MIN_XG, self.goals / len(self.all))
+
+
+def replay_matches(cursor, seasons: Optional[Sequence[str]] = None,
+                   n: int = WINDOW_SIZE, model: str = "linear") -> List[Dict]:
+    """
+    Erzeugt as-of Vorhersagen für alle beendeten Spiele in chronologischer Reihenfolge
+
+    Args:
+        cursor: SQLite-Cursor auf eine Datenbank mit matches_real
+        seasons: Saisons, die abgespielt werden (None = alle). Die Fenster
+            enthalten nur Spiele aus diesen Saisons.
+        n: Fenstergröße
+        model: Vorhersagemodell ("linear" oder "poisson", siehe xg_engine.MODELS)
+
+    Returns:
+        Liste von Einträgen mit Spieldaten, tatsächlichem Ergebnis und Vorhersage
+    """
+    query = """
+        SELECT id, match_id, season, matchday, home_team_id, away_team_id,
+               home_team_name, away_team_name, home_goals, away_goals, match_date
+        FROM matches_real
+        WHERE is_finished = 1
+    """
+    params: tuple = ()
+    if seasons:
+        query += f" AND season IN ({','.join('?' * len(seasons))})"
+        params = tuple(seasons)
+    query += " ORDER BY match_date, id"
+    cursor.execute(query, params)
+
+    windows: Dict[int, RollingWindow] = {}
+    entries = []
+    home_form, away_form, home_xg, away_xg = [], [], [], []
+
+    for row in cursor.fetchall():
+        (row_id, match_id, season, matchday, home_id, away_id,
+         home_name, away_name, home_goals, away_goals, match_date) = tuple(row)
+
+        home = windows.setdefault(home_id, RollingWindow(n))
+        away = windows.setdefault(away_id, RollingWindow(n))
+
+        # Stand VOR dem Anstoß festhalten
+        home_form.append(home.form)
+        away_form.append(away.form)
+        home_xg.append(home.xg)
+        away_xg.append(away.xg)
+        entries.append({
+            "id": row_id,
+            "match_id": match_id,
+            "season": season,
+            "matchday": matchday,
+            "home_team_id": home_id,
+            "away_team_id": away_id,
+            "home_team_name": home_name,
+            "away_team_name": away_name,
+            "match_date": match_date,
+            "home_goals": home_goals,
+            "away_goals": away_goals,
+            "home_goals_last_14": home.scored_goals,
+            "away_goals_last_14": away.scored_goals,
+        })
+
+        home.add(home_goals, away_goals)
+        away.add(away_goals, home_goals)
+
+    if not entries:
+        return []
+
+    home_form_arr = np.array(home_form)
+    away_form_arr = np.array(away_form)
+    result = predict_from_stats(home_form_arr, away_form_arr, np.array(home_xg), np.array(away_xg), model)
+
+    for i, entry in enumerate(entries):
+        predicted_home = int(result["predicted_home_goals"][i])
+        predicted_away = int(result["predicted_away_goals"][i])
+        entry.update({
+            "predicted_home_goals": predicted_home,
+            "predicted_away_goals": predicted_away,
+            "predicted_score": f"{predicted_home}:{predicted_away}",
+            "home_win_prob": float(result["home_win_prob"][i]),
+            "draw_prob": float(result["draw_prob"][i]),
+            "away_win_prob": float(result["away_win_prob"][i]),
+            "home_xg": float(result["home_xg"][i]),
+            "away_xg": float(result["away_xg"][i]),
+            "home_form": float(home_form_arr[i]),
+            "away_form": float(away_form_arr[i]),
+        })
+
+    return entries
+
+
+def _tendency(home_goals: int, away_goals: int) -> str:
+    if home_goals > away_goals:
+        return "home_win"
+    if away_goals > home_goals:
+        return "away_win"
+    return "draw"
+
+
+def score_entry(entry: Dict) -> Dict:
+    """Bewertet eine Vorhersage: exact_score, tendency_match oder miss"""
+    actual_score = f"{entry['home_goals']}:{entry['away_goals']}"
+    tendency_correct = (_tendency(entry["predicted_home_goals"], entry["predicted_away_goals"])
+                        == _tendency(entry["home_goals"], entry["away_goals"]))
+    exact_score_correct = entry["predicted_score"] == actual_score
+
+    if tendency_correct:
+        hit_type = "exact_score" if exact_score_correct else "tendency_match"
+    else:
+        hit_type = "miss"
+
+    return {
+        "actual_score": actual_score,
+        "hit_type": hit_type,
+        "tendency_correct": tendency_correct,
+        "exact_score_correct": exact_score_correct,
+    }
+
+
+def summarize(scored_entries: List[Dict]) -> Dict:
+    """Berechnet die Qualitäts-Statistiken im Format von /api/prediction-quality"""
+    total = len(scored_entries)
+    tendency_matches = sum(1 for e in scored_entries if e["tendency_correct"])
+    exact_matches = sum(1 for e in scored_entries if e["hit_type"] == "exact_score")
+    misses = total - tendency_matches
+
+    return {
+        "total_predictions": total,
+        "exact_matches": exact_matches,
+        "tendency_matches": tendency_matches,
+        "misses": misses,
+        "exact_match_rate": round((exact_matches / total), 3) if total > 0 else 0,
+        "tendency_match_rate": round((tendency_matches / total), 3) if total > 0 else 0,
+        "overall_accuracy": round((tendency_matches / total), 3) if total > 0 else 0,
+        "quality_score": round((exact_matches * 3 + tendency_matches * 1) / (total * 3), 3) if total > 0 else 0
+    }
+
+
+def backtest(cursor, seasons: Optional[Sequence[str]] = None, model: str = "linear") -> Dict:
+    """Kompletter Backtest: as-of Vorhersagen, Bewertung und Statistik"""
+    entries = [e for e in replay_matches(cursor, seasons, model=model)
+               if e["home_goals"] is not None and e["away_goals"] is not None]
+    for entry in entries:
+        entry.update(score_entry(entry))
+    return {"entries": entries, "stats": summarize(entries)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-time Backtest des xG-Modells")
+    parser.add_argument("--db", default="kick_predictor_final.db")
+    parser.add_argument("--season", action="append", dest="seasons",
+                        help="Saison(s) für Fenster und Auswertung (mehrfach möglich, Standard: alle)")
+    parser.add_argument("--evaluate", action="append", dest="evaluate",
+                        help="Nur diese Saison(s) bewerten, Fenster nutzen trotzdem alle --season")
+    parser.add_argument("--model", choices=MODELS, default="linear",
+                        help="Vorhersagemodell (Standard: linear)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    cursor = conn.cursor()
+
+    start = time.perf_counter()
+    result = backtest(cursor, args.seasons, args.model)
+    duration_ms = (time.perf_counter() - start) * 1000
+    conn.close()
+
+    entries = result["entries"]
+    if args.evaluate:
+        entries = [e for e in entries if e["season"] in args.evaluate]
+    stats = summarize(entries)
+
+    print(f"🧪 Backtest ({args.model}) über {len(result['entries'])} Spiele in {duration_ms:.1f} ms")
+    for season in sorted({e["season"] for e in entries}):
+        season_stats = summarize([e for e in entries if e["season"] == season])
+        print(f"   Saison {season}: {season_stats['total_predictions']} Spiele, "
+              f"Tendenz {season_stats['tendency_match_rate']:.1%}, "
+              f"exakt {season_stats['exact_match_rate']:.1%}, "
+              f"Score {season_stats['quality_score']:.3f}")
+    print(f"📊 Gesamt: Tendenz {stats['tendency_match_rate']:.1%}, "
+          f"exakt {stats['exact_match_rate']:.1%}, Score {stats['quality_score']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Latenz von /health, während /api/prediction-quality unter Last steht
+
+Startet main_cloud je einmal mit DB_READ_THREADS=0 (SQLite direkt im
+Event-Loop, altes Verhalten) und mit Thread-Pool, feuert parallel Anfragen auf
+/api/prediction-quality und misst dabei p50/p99 von /health.
+
+Aufruf: python benchmark_concurrency.py [--db kick_predictor_final.db] [--seconds 5] [--clients 8]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(client, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server nicht erreichbar")
+
+
+async def _hammer(client, stop_at, counter):
+    while time.perf_counter() < stop_at:
+        await client.get("/api/prediction-quality")
+        counter[0] += 1
+
+
+async def _probe(client, stop_at, latencies):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def measure(base_url, seconds, clients):
+    limits = httpx.Limits(max_connections=clients + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        await _wait_until_up(client)
+        await client.get("/api/prediction-quality")  # Aufwärmen
+        stop_at = time.perf_counter() + seconds
+        latencies, counter = [], [0]
+        await asyncio.gather(
+            _probe(client, stop_at, latencies),
+            *(_hammer(client, stop_at, counter) for _ in range(clients))
+        )
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "health_requests": len(latencies),
+        "quality_per_second": counter[0] / seconds,
+    }
+
+
+def run_server(db_path, read_threads, seconds, clients):
+    # Eigene Kopie, damit Migrationen/Snapshots die Original-DB nicht verändern
+    workdir = tempfile.mkdtemp(prefix="kick-bench-")
+    shutil.copy(db_path, os.path.join(workdir, "kick_predictor_final.db"))
+    port = _free_port()
+    env = dict(os.environ, DB_READ_THREADS=str(read_threads),
+               PYTHONPATH=BACKEND_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main_cloud:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        return asyncio.run(measure(f"http://127.0.0.1:{port}", seconds, clients))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "kick_predictor_final.db"))
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"📊 /health unter Last ({args.clients} parallele Clients auf /api/prediction-quality, {args.seconds:.0f}s)")
+    print(f"{'Variante':<22} | {'p50 ms':>8} {'p99 ms':>8} | {'quality req/s':>13}")
+    for label, threads in (("Event-Loop (alt)", 0), (f"Thread-Pool ({args.threads})", args.threads)):
+        result = run_server(args.db, threads, args.seconds, args.clients)
+        print(f"{label:<22} | {result['p50']:>8.1f} {result['p99']:>8.1f} | {result['quality_per_second']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Requests/Sekunde mit neuer Verbindung pro Request vs. ConnectionManager
+
+Misst /api/table und /api/predictions/{n} über den FastAPI-TestClient, einmal
+mit dem früheren Muster (os.path.exists + sqlite3.connect + close je Request)
+und einmal mit den wiederverwendeten Verbindungen aus db_connection.
+
+Aufruf: python benchmark_connections.py [--db kick_predictor_final.db] [--requests 300]
+"""
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+import main_cloud
+from db_connection import ConnectionManager, AsyncDatabase
+
+
+class PerRequestConnections:
+    """Altes Verhalten: jede Anfrage öffnet und schließt ihre eigene Verbindung"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def _connect(self):
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def reader(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def writer(self):
+        conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def close_all(self):
+        pass
+
+
+def requests_per_second(client, path, count):
+    client.get(path)  # Aufwärmen (öffnet ggf. die Verbindung)
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path)
+        assert response.status_code == 200
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="kick_predictor_final.db")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--matchday", type=int, default=3)
+    args = parser.parse_args()
+
+    main_cloud.DATABASE_PATH = args.db
+    paths = ["/api/table", f"/api/predictions/{args.matchday}"]
+    managers = {
+        "pro Request": PerRequestConnections(args.db),
+        "ConnectionManager": ConnectionManager(args.db),
+    }
+
+    results = {}
+    for label, manager in managers.items():
+        main_cloud.database = AsyncDatabase(manager)
+        with TestClient(main_cloud.app) as client:
+            results[label] = {path: requests_per_second(client, path, args.requests) for path in paths}
+
+    print(f"📊 Benchmark Verbindungen ({args.db}, {args.requests} Requests je Endpoint)")
+    print(f"{'Endpoint':<22} | {'req/s alt':>10} {'req/s neu':>10} {'Faktor':>7}")
+    for path in paths:
+        old = results["pro Request"][path]
+        new = results["ConnectionManager"][path]
+        print(f"{path:<22} | {old:>10.0f} {new:>10.0f} {new / old:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Spieltage sequentiell mit fester Pause vs. MatchdayFetcher
+
+Startet openligadb_stub als lokalen Server (mit künstlicher Latenz) und lädt
+dieselben Spieltage einmal wie früher in RealDataSync (nacheinander, 0,5 s
+Pause) und einmal parallel mit Token-Bucket. Der Stub protokolliert die
+Anfragen, daraus werden Dauer, maximale Parallelität und die höchste Anzahl
+Anfragen pro Sekunde berechnet.
+
+Aufruf: python benchmark_fetcher.py [--matchdays 10] [--latency 0.15] [--rate 5] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+import httpx
+import uvicorn
+
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def legacy_fetch(base_url, keys):
+    """Altes Verhalten aus fetch_matches_from_season"""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        for league, season, matchday in keys:
+            response = await client.get(f"{base_url}/{league}/{season}/{matchday}")
+            response.raise_for_status()
+            response.json()
+            await asyncio.sleep(0.5)
+
+
+async def run(args):
+    keys = [("bl1", season, matchday) for season in ("2024", "2025")
+            for matchday in range(1, args.matchdays + 1)]
+    results = {}
+    for label in ("sequentiell + 0,5s", "MatchdayFetcher"):
+        stub = OpenLigaDBStub(latency=args.latency)
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(stub, port=port, log_level="warning"))
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        base_url = f"http://127.0.0.1:{port}/getmatchdata"
+
+        start = time.perf_counter()
+        if label == "MatchdayFetcher":
+            fetcher = MatchdayFetcher(base_url, concurrency=args.concurrency, rate=args.rate)
+            await fetcher.fetch_many(keys)
+        else:
+            await legacy_fetch(base_url, keys)
+        duration = time.perf_counter() - start
+
+        server.should_exit = True
+        await task
+        results[label] = (duration, stub.max_active, stub.max_requests_per_window(1.0))
+    return keys, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matchdays", type=int, default=10, help="Spieltage je Saison (2024 und 2025)")
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--rate", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    keys, results = asyncio.run(run(args))
+    print(f"📊 {len(keys)} Spieltage, Stub-Latenz {args.latency * 1000:.0f} ms")
+    print(f"{'Variante':<20} | {'Dauer s':>8} {'parallel':>8} {'max req/s':>9}")
+    for label, (duration, max_active, per_second) in results.items():
+        print(f"{label:<20} | {duration:>8.2f} {max_active:>8} {per_second:>9}")
+
+
+if __name__ == "__main__":
+    main()
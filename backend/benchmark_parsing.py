@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response.json() + convert_match vs. streamender MatchStreamParser
+
+Erzeugt Saison-Payloads im Format von OpenLigaDB (Spiele aus
+openligadb_stub.py, angereichert um Torschützen, Spielort und die übrigen
+Felder echter Antworten) und parst alle Saisons einmal wie bisher
+(json.loads des kompletten Payloads, convert_match + match_row; alle
+Saisons liegen wie nach fetch_many gleichzeitig im Speicher) und einmal
+streamend in 64-KB-Chunks zu MatchRecords.
+
+Jeder Modus läuft in einem eigenen Prozess, damit die Spitzen-RSS
+(ru_maxrss abzüglich des Stands nach den Imports) nicht vom anderen Modus
+verfälscht wird. Gemessen werden außerdem Durchsatz in MB/s und Spielen/s
+(bester von --repeat Läufen).
+
+Aufruf:
+    python benchmark_parsing.py [--seasons 20] [--repeat 3]
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from openligadb_stream import MatchStreamParser
+from openligadb_stub import MATCHDAYS, OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+CHUNK_SIZE = 64 * 1024
+LATEST_SEASON = 2025
+
+
+def enriched_matches(stub: OpenLigaDBStub, season: str):
+    """Spiele einer Saison mit den Feldern einer echten OpenLigaDB-Antwort"""
+    matches = []
+    for matchday in range(1, MATCHDAYS + 1):
+        for match in stub.synthetic_matches("bl1", season, matchday):
+            final = next((r for r in match["matchResults"] if r["resultTypeID"] == 2), None)
+            home, away = (final["pointsTeam1"], final["pointsTeam2"]) if final else (0, 0)
+            scores = [(goal, 0) for goal in range(1, home + 1)] + [(home, goal) for goal in range(1, away + 1)]
+            goals = [{
+                "goalID": match["matchID"] * 10 + index, "scoreTeam1": score1, "scoreTeam2": score2,
+                "matchMinute": 10 + index * 17, "goalGetterID": 1000 + index,
+                "goalGetterName": f"Spieler {index}", "isPenalty": False, "isOwnGoal": False,
+                "isOvertime": False, "comment": None,
+            } for index, (score1, score2) in enumerate(scores)]
+            matches.append(dict(
+                match,
+                matchDateTimeUTC=match["matchDateTime"] + "Z",
+                timeZoneID="W. Europe Standard Time",
+                leagueId=4000 + int(season),
+                leagueName=f"1. Fußball-Bundesliga {season}/{int(season) + 1}",
+                group=dict(match["group"], groupID=40000 + matchday),
+                lastUpdateDateTime=match["matchDateTime"],
+                goals=goals,
+                location={"locationID": match["team1"]["teamId"], "locationCity": "Stadt",
+                          "locationStadium": f"Stadion {match['team1']['teamId']}"},
+                numberOfViewers=None,
+            ))
+    return matches
+
+
+def write_payloads(directory: Path, seasons: int) -> int:
+    stub = OpenLigaDBStub()
+    total = 0
+    for offset in range(seasons):
+        season = str(LATEST_SEASON - offset)
+        body = json.dumps(enriched_matches(stub, season), ensure_ascii=False).encode("utf-8")
+        (directory / f"{season}.json").write_bytes(body)
+        total += len(body)
+    return total
+
+
+def _rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_mode(mode: str, directory: Path) -> dict:
+    """Parst alle Payloads eines Verzeichnisses (im Kindprozess)"""
+    baseline = _rss_kb()
+    start = time.perf_counter()
+    results = []
+    for path in sorted(directory.glob("*.json")):
+        season = path.stem
+        if mode == "json":
+            # Bisher: kompletter Baum je Saison, danach Auswahl der Felder
+            results.append(json.loads(path.read_bytes()))
+        else:
+            parser = MatchStreamParser("bl1", season)
+            records = []
+            with path.open("rb") as payload:
+                for chunk in iter(lambda: payload.read(CHUNK_SIZE), b""):
+                    records.extend(parser.feed(chunk))
+            records.extend(parser.close())
+            results.append(records)
+    if mode == "json":
+        results = [[RealDataSync.match_row(RealDataSync.convert_match(
+                        match, str(match["leagueSeason"]), match["group"]["groupOrderID"], "bl1"))
+                    for match in payload] for payload in results]
+    else:
+        results = [[record.row() for record in records] for records in results]
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "matches": sum(len(rows) for rows in results),
+            "peak_rss_kb": _rss_kb() - baseline}
+
+
+def measure(mode: str, directory: Path, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, __file__, "--child", mode, str(directory)],
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": min(run["seconds"] for run in runs),
+        "matches": runs[0]["matches"],
+        "peak_rss_kb": min(run["peak_rss_kb"] for run in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parsing-Benchmark für OpenLigaDB-Payloads")
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child[0], Path(args.child[1]))))
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="kick_parse_bench_"))
+    try:
+        size = write_payloads(workdir, args.seasons)
+        results = {mode: measure(mode, workdir, args.repeat) for mode in ("json", "stream")}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    megabytes = size / 1024 / 1024
+    print(f"📊 Parsing-Benchmark: {args.seasons} Saison(s), "
+          f"{results['json']['matches']} Spiele, {megabytes:.1f} MB JSON")
+    print(f"   {'Verfahren':<34} {'Zeit':>8} {'MB/s':>8} {'Spiele/s':>10} {'Spitzen-RSS':>12}")
+    labels = {"json": "response.json() + convert_match", "stream": "MatchStreamParser (64 KB)"}
+    for mode, result in results.items():
+        print(f"   {labels[mode]:<34} {result['seconds'] * 1000:6.0f}ms {megabytes / result['seconds']:8.1f} "
+              f"{result['matches'] / result['seconds']:10.0f} {result['peak_rss_kb'] / 1024:9.1f} MB")
+    ratio = results["json"]["peak_rss_kb"] / max(1, results["stream"]["peak_rss_kb"])
+    print(f"\n   Spitzen-RSS streamend: {ratio:.1f}x geringer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Abfragen einer Partition bei wachsender Historie
+
+Baut synthetische Datenbanken mit 1 Liga x 2 Saisons (die Form-Fenster der
+Vorhersagen reichen in die Vorsaison) und mit --leagues x --seasons Partitionen (je 306 Spiele, Ergebnisse aus openligadb_stub.py) und
+misst für die Partition bl1/<neueste Saison> die Abfragen hinter /api/table,
+/api/next-matchday, /api/matchday-info und /api/predictions/{n}.
+
+Neben der Laufzeit wird die Anzahl der SQLite-VM-Schritte gezählt
+(Progress-Handler, in Tausend). Bleibt sie zwischen kleiner und großer
+Datenbank gleich, liest die Abfrage nur ihre Partition.
+
+Aufruf:
+    python benchmark_partitions.py [--leagues 10] [--seasons 20] [--repeat 20]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import main_cloud
+from ingest import ingest_matches
+from openligadb_stub import MATCHDAYS, TEAMS_PER_LEAGUE, OpenLigaDBStub
+from partitions import Partition, partitions
+from real_data_sync import RealDataSync
+
+LATEST_SEASON = 2025
+# Spieltage mit Ergebnis in der neuesten Saison (ältere Saisons sind komplett)
+PLAYED = 10
+VM_STEP = 100
+
+
+def league_name(index: int) -> str:
+    return f"bl{index + 1}"
+
+
+def partition_rows(stub: OpenLigaDBStub, league_index: int, partition: Partition):
+    """Spiele einer Partition als Zeilen für ingest_matches (IDs je Liga verschoben)"""
+    rows = []
+    stub.finished_until = PLAYED if int(partition.season) == LATEST_SEASON else MATCHDAYS
+    for matchday in range(1, MATCHDAYS + 1):
+        for match in stub.synthetic_matches(partition.league, partition.season, matchday):
+            match = dict(match, matchID=league_index * 10_000_000 + match["matchID"])
+            for side in ("team1", "team2"):
+                team = match[side]
+                match[side] = dict(team, teamId=league_index * 100 + team["teamId"])
+            converted = RealDataSync.convert_match(match, partition.season, matchday, partition.league)
+            rows.append(RealDataSync.match_row(converted))
+    return rows
+
+
+def build_database(path: str, leagues: int, seasons: int):
+    """Legt die Datenbank an und liefert die Einspielzeit pro Partition (s)"""
+    RealDataSync(db_path=path).init_database()
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO teams_real (team_id, name, short_name) VALUES (?, ?, ?)", [
+        (index * 100 + team, f"{league_name(index)} Team {team:02d}", f"T{team}")
+        for index in range(leagues) for team in range(1, TEAMS_PER_LEAGUE + 1)
+    ])
+    stub = OpenLigaDBStub()
+    selected = partitions([league_name(index) for index in range(leagues)],
+                          [str(LATEST_SEASON - offset) for offset in range(seasons)])
+    timings = []
+    # Älteste Saison zuerst, wie beim Nachladen der Historie
+    for partition in reversed(selected):
+        rows = partition_rows(stub, int(partition.league[2:]) - 1, partition)
+        start = time.perf_counter()
+        ingest_matches(conn, rows)
+        conn.commit()
+        timings.append(time.perf_counter() - start)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    return timings
+
+
+def measure(path: str, repeat: int):
+    """Laufzeit (Median, ms) und VM-Schritte (Tsd.) je Abfrage für bl1/LATEST_SEASON"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    main_cloud.schema.refresh(conn)
+    season = str(LATEST_SEASON)
+    queries = {
+        "Tabelle (standings_real)": lambda c: main_cloud._table_from_standings(c, None, "bl1", season),
+        "Tabelle (matches_real)": lambda c: main_cloud._table_from_matches_real(c, None, "bl1", season),
+        "Nächster Spieltag": lambda c: main_cloud._next_matchday_from_matches_real(c, "bl1", season),
+        "Spieltag-Info": lambda c: main_cloud._matchday_info_from_matches_real(c, "bl1", season),
+        "Vorhersagen Spieltag": lambda c: main_cloud._matchday_predictions_from_matches_real(
+            c, PLAYED + 1, "linear", "bl1", season),
+    }
+    results = {}
+    for label, query in queries.items():
+        steps = [0]
+
+        def count():
+            steps[0] += 1
+            return 0
+
+        conn.set_progress_handler(count, VM_STEP)
+        query(conn.cursor())
+        conn.set_progress_handler(None, VM_STEP)
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query(conn.cursor())
+            durations.append((time.perf_counter() - start) * 1000)
+        results[label] = (statistics.median(durations), steps[0])
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitions-Benchmark mit wachsender Historie")
+    parser.add_argument("--leagues", type=int, default=10)
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="Wiederholungen je Abfrage")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    workdir = tempfile.mkdtemp(prefix="kick_partition_bench_")
+    try:
+        sizes = [(1, 2), (args.leagues, args.seasons)]
+        report = []
+        for leagues, seasons in sizes:
+            path = os.path.join(workdir, f"{leagues}x{seasons}.db")
+            timings = build_database(path, leagues, seasons)
+            report.append((leagues, seasons, timings, measure(path, args.repeat), os.path.getsize(path)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("📊 Partitions-Benchmark (Partition bl1/%d, je 306 Spiele)" % LATEST_SEASON)
+    for leagues, seasons, timings, results, size in report:
+        print(f"\n   {leagues} Liga(en) x {seasons} Saison(s): {leagues * seasons * 306} Spiele, "
+              f"{size / 1024 / 1024:.1f} MB")
+        print(f"   Einspielen je Partition: erste {timings[0] * 1000:.1f} ms, "
+              f"letzte {timings[-1] * 1000:.1f} ms")
+        print(f"   {'Abfrage':<28} {'Median':>9} {'VM-Schritte':>12}")
+        for label, (median, steps) in results.items():
+            print(f"   {label:<28} {median:7.2f}ms {steps * VM_STEP / 1000:>11.1f}k")
+
+
+if __name__ == "__main__":
+    main()
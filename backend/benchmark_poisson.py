@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Poisson-Ergebnismatrix für viele Spiele auf einmal
+
+Bewertet N Zufallspaarungen (Standard 10.000) mit poisson_engine.score_fixtures
+und zum Vergleich eine Stichprobe Spiel für Spiel in reinem Python. Mit --db
+läuft zusätzlich der komplette Backtest aller Saisons mit model="poisson".
+
+Aufruf: python benchmark_poisson.py [--fixtures 10000] [--repeat 5] [--db kick_predictor_final.db]
+"""
+import argparse
+import math
+import sqlite3
+import statistics
+import time
+
+import numpy as np
+
+from backtest_engine import backtest
+from poisson_engine import MAX_GOALS, OVER_UNDER_LINES, score_fixtures
+
+
+def score_fixture_loop(home_xg: float, away_xg: float):
+    """Ein Spiel ohne NumPy: Matrix, 1X2, wahrscheinlichstes Ergebnis, Over/Under"""
+    home = [math.exp(-home_xg) * home_xg ** k / math.factorial(k) for k in range(MAX_GOALS + 1)]
+    away = [math.exp(-away_xg) * away_xg ** k / math.factorial(k) for k in range(MAX_GOALS + 1)]
+    matrix = [[h * a for a in away] for h in home]
+    total = sum(map(sum, matrix))
+    result = {"home": 0.0, "draw": 0.0, "away": 0.0, "best": (0, 0, 0.0)}
+    result.update({line: 0.0 for line in OVER_UNDER_LINES})
+    for h, row in enumerate(matrix):
+        for a, p in enumerate(row):
+            p /= total
+            key = "home" if h > a else "away" if a > h else "draw"
+            result[key] += p
+            for line in OVER_UNDER_LINES:
+                if h + a > line:
+                    result[line] += p
+            if p > result["best"][2]:
+                result["best"] = (h, a, p)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=1000,
+                        help="Spiele für die Python-Schleife (hochgerechnet auf --fixtures)")
+    parser.add_argument("--db", help="Zusätzlich Backtest über alle Saisons dieser Datenbank")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    home_xg = rng.uniform(0.5, 3.5, args.fixtures)
+    away_xg = rng.uniform(0.5, 3.0, args.fixtures)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        score_fixtures(home_xg, away_xg)
+        timings.append((time.perf_counter() - start) * 1000)
+    vectorized_ms = statistics.median(timings)
+
+    sample = min(args.sample, args.fixtures)
+    start = time.perf_counter()
+    for i in range(sample):
+        score_fixture_loop(home_xg[i], away_xg[i])
+    loop_ms = (time.perf_counter() - start) * 1000 * args.fixtures / sample
+
+    print(f"📊 Poisson-Matrix für {args.fixtures} Spiele ({MAX_GOALS + 1}×{MAX_GOALS + 1})")
+    print(f"   NumPy (score_fixtures):     {vectorized_ms:8.1f} ms (Median aus {args.repeat})")
+    print(f"   Python-Schleife (hochger.): {loop_ms:8.1f} ms ({loop_ms / vectorized_ms:.0f}x)")
+
+    if args.db:
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        cursor = conn.cursor()
+        for model in ("linear", "poisson"):
+            start = time.perf_counter()
+            result = backtest(cursor, model=model)
+            duration_ms = (time.perf_counter() - start) * 1000
+            stats = result["stats"]
+            print(f"🧪 Backtest {model:<8} {stats['total_predictions']} Spiele in {duration_ms:6.1f} ms, "
+                  f"Tendenz {stats['tendency_match_rate']:.1%}, exakt {stats['exact_match_rate']:.1%}, "
+                  f"Score {stats['quality_score']:.3f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
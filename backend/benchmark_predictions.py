@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Spieltag-Vorhersagen pro Spiel (predict_match_xg) vs. gebündelte xG-Engine
+
+Misst Anzahl SQL-Abfragen und Laufzeit je Spieltag und prüft, dass beide
+Pfade identische Werte liefern.
+
+Aufruf: python benchmark_predictions.py [--db kick_predictor_final.db] [--repeat 20]
+"""
+import argparse
+import asyncio
+import sqlite3
+import statistics
+import time
+
+from main_cloud import predict_match_xg, get_team_goals_last_n_matches
+from xg_engine import predict_fixtures
+
+
+class QueryCounter:
+    """Zählt ausgeführte SQL-Statements über den sqlite3 Trace-Callback"""
+
+    def __init__(self, conn):
+        self.count = 0
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.count += 1
+
+
+async def legacy_matchday(cursor, fixtures):
+    results = []
+    for home_id, away_id in fixtures:
+        result = await predict_match_xg(cursor, home_id, away_id)
+        result['home_goals_last_14'] = await get_team_goals_last_n_matches(cursor, home_id, 14)
+        result['away_goals_last_14'] = await get_team_goals_last_n_matches(cursor, away_id, 14)
+        results.append(result)
+    return results
+
+
+def batched_matchday(cursor, fixtures):
+    return predict_fixtures(cursor, fixtures)
+
+
+def measure(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="kick_predictor_final.db")
+    parser.add_argument("--season", default="2025")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    counter = QueryCounter(conn)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT matchday FROM matches_real WHERE season = ? ORDER BY matchday",
+                   (args.season,))
+    matchdays = [row[0] for row in cursor.fetchall()]
+
+    print(f"📊 Benchmark Spieltag-Vorhersagen ({args.db}, Saison {args.season}, {args.repeat} Wiederholungen)")
+    print(f"{'Spieltag':>8} {'Spiele':>6} | {'Queries alt':>11} {'Queries neu':>11} | {'ms alt':>8} {'ms neu':>8} {'Faktor':>7}")
+
+    for matchday in matchdays:
+        cursor.execute("""
+            SELECT home_team_id, away_team_id FROM matches_real
+            WHERE season = ? AND matchday = ? ORDER BY match_date
+        """, (args.season, matchday))
+        fixtures = [(row[0], row[1]) for row in cursor.fetchall()]
+
+        counter.count = 0
+        legacy, legacy_ms = measure(lambda: asyncio.run(legacy_matchday(cursor, fixtures)), args.repeat)
+        legacy_queries = counter.count // args.repeat
+
+        counter.count = 0
+        batched, batched_ms = measure(lambda: batched_matchday(cursor, fixtures), args.repeat)
+        batched_queries = counter.count // args.repeat
+
+        for old, new in zip(legacy, batched):
+            assert all(new[key] == value for key, value in old.items()), "Ergebnisse weichen ab!"
+
+        print(f"{matchday:>8} {len(fixtures):>6} | {legacy_queries:>11} {batched_queries:>11} | "
+              f"{legacy_ms:>8.2f} {batched_ms:>8.2f} {legacy_ms / batched_ms:>6.1f}x")
+
+    conn.close()
+    print("✅ Beide Pfade liefern identische Werte")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: volle und inkrementelle Syncs gegen den lokalen OpenLigaDB-Stub
+
+Misst für RealDataSync und /api/update-data jeweils Laufzeit, Anfragen an
+OpenLigaDB, heruntergeladene Bytes, geschriebene Zeilen und das
+Schreibvolumen des Prozesses (wchar aus /proc/self/io, ohne Log-Ausgaben;
+fehlt /proc, wird die Größenänderung von DB und WAL gemessen).
+
+Szenarien (die Stub-Uhr steht nach Spieltag --played, siehe openligadb_stub.py):
+    voll (legacy)           RealDataSync.sync_all_real_data auf leerer DB
+    voll (inkrementell)     sync_changed_matchdays auf leerer DB
+    ohne Änderung           derselbe Sync direkt noch einmal
+    +1 Spieltag             Uhr eine Woche weiter, nur der neue Spieltag ändert sich
+    /api/update-data ...    dieselben drei Schritte über den Endpoint (Kopie von --db)
+
+Aufruf:
+    python benchmark_sync.py [--fixtures fixtures/openligadb] [--latency 0.05] [--played 4]
+                             [--rate 5] [--db kick_predictor_final.db]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import MATCH_DURATION, OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+SEASON_START = datetime(2025, 8, 22, 15, 30)
+
+
+def _written_bytes(db_path: str) -> int:
+    """Bisher vom Prozess geschriebene Bytes (Fallback: Größe von DB und WAL)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+
+def _fetcher(stub, rate):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    return MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=rate)
+
+
+def measure(label, stub, fetcher, db_path, action):
+    """Führt action() aus und liefert eine Ergebniszeile"""
+    requests_before, bytes_before = len(stub.requests), fetcher.bytes_downloaded
+    written_before = _written_bytes(db_path)
+    # Log- und print-Ausgaben nicht als Schreibvolumen mitzählen
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        rows = action()
+        duration = time.perf_counter() - start
+    return {
+        "label": label,
+        "seconds": duration,
+        "requests": len(stub.requests) - requests_before,
+        "kb_downloaded": (fetcher.bytes_downloaded - bytes_before) / 1024,
+        "rows": rows,
+        "kb_written": (_written_bytes(db_path) - written_before) / 1024,
+    }
+
+
+def bench_real_data_sync(args, workdir):
+    results = []
+    clock = SEASON_START + timedelta(weeks=args.played - 1, hours=3) + MATCH_DURATION
+
+    stub = OpenLigaDBStub(latency=args.latency, fixtures=args.fixtures, clock=clock)
+    db_path = os.path.join(workdir, "legacy.db")
+    sync = RealDataSync(db_path=db_path, fetcher=_fetcher(stub, args.rate))
+    results.append(measure("voll (legacy)", stub, sync.fetcher, db_path,
+                           lambda: asyncio.run(sync.sync_all_real_data()) and None))
+
+    stub = OpenLigaDBStub(latency=args.latency, fixtures=args.fixtures, clock=clock)
+    db_path = os.path.join(workdir, "incremental.db")
+    sync = RealDataSync(db_path=db_path, fetcher=_fetcher(stub, args.rate))
+    sync.init_database()
+
+    def incremental():
+        report = asyncio.run(sync.sync_changed_matchdays("2025"))
+        return report["rows_touched"]
+
+    results.append(measure("voll (inkrementell)", stub, sync.fetcher, db_path, incremental))
+    results.append(measure("ohne Änderung", stub, sync.fetcher, db_path, incremental))
+    stub.advance(clock + timedelta(weeks=1))
+    results.append(measure("+1 Spieltag", stub, sync.fetcher, db_path, incremental))
+    return results
+
+
+def bench_update_endpoint(args, workdir):
+    from fastapi.testclient import TestClient
+
+    import main_cloud
+    from db_connection import AsyncDatabase, ConnectionManager
+    from response_cache import ResponseCache
+
+    clock = SEASON_START + timedelta(weeks=args.played - 1, hours=3) + MATCH_DURATION
+    stub = OpenLigaDBStub(latency=args.latency, fixtures=args.fixtures, clock=clock)
+    db_path = os.path.join(workdir, "cloud.db")
+    shutil.copy(args.db, db_path)
+    main_cloud.DATABASE_PATH = db_path
+    main_cloud.database = AsyncDatabase(ConnectionManager(db_path))
+    main_cloud.response_cache = ResponseCache()
+    main_cloud.openligadb = fetcher = _fetcher(stub, args.rate)
+
+    results = []
+    with TestClient(main_cloud.app) as client:
+        def update():
+            return client.post("/api/update-data").json()["stats"]["rows_touched"]
+
+        results.append(measure("/api/update-data voll", stub, fetcher, db_path, update))
+        results.append(measure("/api/update-data ohne Änderung", stub, fetcher, db_path, update))
+        stub.advance(clock + timedelta(weeks=1))
+        results.append(measure("/api/update-data +1 Spieltag", stub, fetcher, db_path, update))
+    main_cloud.database.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync-Benchmark gegen den lokalen OpenLigaDB-Stub")
+    parser.add_argument("--fixtures", help="Aufnahmen von openligadb_recorder.py (sonst synthetische Saison)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Künstliche Antwortzeit je Anfrage (s)")
+    parser.add_argument("--played", type=int, default=4, help="Gespielte Spieltage zu Beginn")
+    parser.add_argument("--rate", type=float, default=5.0, help="Anfragen pro Sekunde (MatchdayFetcher)")
+    parser.add_argument("--db", default="kick_predictor_final.db", help="Vorlage für /api/update-data")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    workdir = tempfile.mkdtemp(prefix="kick_sync_bench_")
+    try:
+        results = bench_real_data_sync(args, workdir)
+        if os.path.exists(args.db):
+            results += bench_update_endpoint(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    source = args.fixtures or "synthetisch"
+    print(f"📊 Sync-Benchmark ({source}, Latenz {args.latency * 1000:.0f} ms, {args.rate:g} Anfragen/s)")
+    print(f"   {'Szenario':<32} {'Dauer':>8} {'Anfragen':>9} {'KB geladen':>11} {'Zeilen':>7} {'KB geschr.':>11}")
+    for r in results:
+        rows = "-" if r["rows"] is None else r["rows"]
+        print(f"   {r['label']:<32} {r['seconds']:7.2f}s {r['requests']:>9} {r['kb_downloaded']:>11.1f} "
+              f"{rows:>7} {r['kb_written']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Änderungs-Feed der Spiel-Ingestion
+
+ingest_matches() (ingest.py) fasst alle neuen und geänderten Spiele eines
+Schreibvorgangs zu einem ChangeBatch zusammen: Match-IDs, betroffene Teams,
+Spieltage (mit Liga und Saison) sowie alter und neuer Stand (Ergebnis, beendet). Der Batch wird
+über einen ChangeFeed veröffentlicht. Dessen Abonnenten laufen in derselben
+Transaktion und aktualisieren nur die betroffenen Einträge (Tabelle in
+standings_real, Team-Snapshots, Datenversion).
+
+bump_version() erhöht die Datenversion, record_batch() schreibt den Batch
+unter dieser Version in match_changes und change_batches (Migration 6). Lesende
+Prozesse holen sich mit load_changes() die Änderungen seit der zuletzt
+gesehenen Version und invalidieren ihre Caches gezielt (response_cache.py).
+Fehlt eine Version im Log (z.B. durch einen Team-Import), liefert
+load_changes() None und der Leser verwirft alles.
+"""
+import sqlite3
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from data_version import bump_data_version, current_data_version
+
+# So viele Batches bleiben im Log, ältere Leser verwerfen ihren Cache komplett
+LOG_RETENTION = 1000
+
+SCORE_KEYS = ("is_finished", "home_goals", "away_goals")
+
+
+class MatchChange(NamedTuple):
+    """Änderung eines Spiels; old/new mit den Schlüsseln aus standings.MATCH_KEYS (old=None: neues Spiel)"""
+    match_id: int
+    old: Optional[Mapping[str, Any]]
+    new: Mapping[str, Any]
+
+    @property
+    def team_ids(self) -> Tuple[int, ...]:
+        teams = {self.new["home_team_id"], self.new["away_team_id"]}
+        if self.old is not None:
+            teams.update((self.old["home_team_id"], self.old["away_team_id"]))
+        return tuple(sorted(team for team in teams if team is not None))
+
+    @property
+    def matchdays(self) -> Tuple[Tuple[str, str, int], ...]:
+        """Betroffene Spieltage als (league, season, matchday)"""
+        keys = {(self.new["league"], str(self.new["season"]), self.new["matchday"])}
+        if self.old is not None:
+            keys.add((self.old["league"], str(self.old["season"]), self.old["matchday"]))
+        return tuple(sorted(keys))
+
+
+class ChangeBatch:
+    """Alle Änderungen eines Schreibvorgangs mit den betroffenen Teams und Spieltagen"""
+
+    def __init__(self, changes: Iterable[MatchChange] = ()):
+        self.changes: List[MatchChange] = list(changes)
+        self.team_ids: FrozenSet[int] = frozenset(t for c in self.changes for t in c.team_ids)
+        self.matchdays: FrozenSet[Tuple[str, str, int]] = frozenset(k for c in self.changes for k in c.matchdays)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def tags(self) -> FrozenSet[str]:
+        """Cache-Tags der Änderungen: team:<id>, season:<liga>:<s>, matchday:<liga>:<s>:<n>"""
+        tags = {f"team:{team_id}" for team_id in self.team_ids}
+        for league, season, matchday in self.matchdays:
+            tags.add(f"season:{league}:{season}")
+            tags.add(f"matchday:{league}:{season}:{matchday}")
+        return frozenset(tags)
+
+
+Handler = Callable[[Any, ChangeBatch], Any]
+
+
+class ChangeFeed:
+    """
+    Abonnenten für ChangeBatches, in Registrierungsreihenfolge aufgerufen
+
+    requires nennt Tabellen, ohne die ein Abonnent übersprungen wird (wie
+    SchemaRegistry.plan in main_cloud) - so funktioniert der Feed auch auf
+    Datenbanken, denen einzelne Migrationen fehlen.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Tuple[str, Handler, Tuple[str, ...]]] = []
+
+    def subscribe(self, handler: Handler, requires: Sequence[str] = (), name: Optional[str] = None) -> Handler:
+        self._subscribers.append((name or handler.__name__, handler, tuple(requires)))
+        return handler
+
+    @property
+    def subscribers(self) -> List[str]:
+        return [name for name, _, _ in self._subscribers]
+
+    def publish(self, conn, batch: ChangeBatch) -> Dict[str, Any]:
+        """
+        Ruft alle Abonnenten mit (conn, batch) auf. Commit macht der Aufrufer.
+
+        Returns:
+            Rückgabewerte der aufgerufenen Abonnenten nach Name
+        """
+        if not batch:
+            return {}
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        results = {}
+        for name, handler, requires in self._subscribers:
+            if all(table in tables for table in requires):
+                results[name] = handler(conn, batch)
+        return results
+
+
+def bump_version(conn, batch: ChangeBatch) -> None:
+    """Abonnent: neue Datenversion für den Batch (vor record_batch registrieren)"""
+    bump_data_version(conn)
+
+
+def record_batch(conn, batch: ChangeBatch) -> int:
+    """
+    Abonnent: protokolliert den Batch unter der aktuellen Datenversion
+
+    Returns:
+        Datenversion des Batches
+    """
+    version = current_data_version(conn)
+    conn.execute("INSERT INTO change_batches (data_version, changes) VALUES (?, ?)", (version, len(batch)))
+    conn.executemany("""
+        INSERT INTO match_changes
+        (data_version, match_id, league, season, matchday, home_team_id, away_team_id,
+         old_season, old_matchday, old_home_team_id, old_away_team_id,
+         old_is_finished, old_home_goals, old_away_goals,
+         new_is_finished, new_home_goals, new_away_goals)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (version, c.match_id, c.new["league"], str(c.new["season"]), c.new["matchday"],
+         c.new["home_team_id"], c.new["away_team_id"],
+         *((str(c.old["season"]), c.old["matchday"], c.old["home_team_id"], c.old["away_team_id"],
+            *(c.old[key] for key in SCORE_KEYS)) if c.old is not None else (None,) * 7),
+         *(c.new[key] for key in SCORE_KEYS))
+        for c in batch.changes
+    ])
+    # Log begrenzen
+    conn.execute("DELETE FROM change_batches WHERE data_version <= ?", (version - LOG_RETENTION,))
+    conn.execute("DELETE FROM match_changes WHERE data_version <= ?", (version - LOG_RETENTION,))
+    return version
+
+
+def load_changes(conn, since_version: int, until_version: int) -> Optional[ChangeBatch]:
+    """
+    Alle protokollierten Änderungen mit since_version < Version <= until_version
+
+    Returns:
+        ChangeBatch oder None, wenn nicht jede Version im Log steht (z.B.
+        Schreibvorgang ohne Feed oder Log bereits gekürzt)
+    """
+    if until_version <= since_version:
+        return ChangeBatch()
+    try:
+        logged = conn.execute("""
+            SELECT COUNT(*) FROM change_batches WHERE data_version > ? AND data_version <= ?
+        """, (since_version, until_version)).fetchone()[0]
+        if logged != until_version - since_version:
+            return None
+        rows = conn.execute("""
+            SELECT match_id, league, season, matchday, home_team_id, away_team_id,
+                   old_season, old_matchday, old_home_team_id, old_away_team_id,
+                   old_is_finished, old_home_goals, old_away_goals,
+                   new_is_finished, new_home_goals, new_away_goals
+            FROM match_changes WHERE data_version > ? AND data_version <= ?
+            ORDER BY seq
+        """, (since_version, until_version)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+
+    changes = []
+    for (match_id, league, season, matchday, home, away, old_season, old_matchday, old_home, old_away,
+         old_finished, old_home_goals, old_away_goals, new_finished, new_home_goals, new_away_goals) in rows:
+        old = None
+        if old_season is not None:
+            old = {"league": league, "season": old_season, "matchday": old_matchday, "home_team_id": old_home,
+                   "away_team_id": old_away, "is_finished": old_finished,
+                   "home_goals": old_home_goals, "away_goals": old_away_goals}
+        new = {"league": league, "season": season, "matchday": matchday, "home_team_id": home, "away_team_id": away,
+               "is_finished": new_finished, "home_goals": new_home_goals, "away_goals": new_away_goals}
+        changes.append(MatchChange(match_id, old, new))
+    return ChangeBatch(changes)
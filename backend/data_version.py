@@ -0,0 +1,26 @@
+"""
+Monoton steigende Datenversion der Datenbank (Tabelle data_version)
+
+Jeder Schreibvorgang, der Spiele oder Teams ändert, erhöht die Version in
+derselben Transaktion (bump_data_version vor dem Commit). Lesende Prozesse
+erkennen daran mit einem Primärschlüssel-Lookup, ob sich seit ihrem letzten
+Lesen etwas geändert hat - auch wenn der Sync in einem anderen Prozess lief.
+Der HTTP-Cache in main_cloud (response_cache.py) ist nach dieser Version
+geschlüsselt.
+"""
+import sqlite3
+from typing import Optional
+
+
+def bump_data_version(conn) -> None:
+    """Erhöht die Datenversion. Commit macht der Aufrufer."""
+    conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def current_data_version(conn) -> Optional[int]:
+    """Aktuelle Datenversion, None wenn die Tabelle (noch) fehlt"""
+    try:
+        row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
@@ -0,0 +1,191 @@
+"""
+Verbindungsverwaltung für die SQLite-Datenbank
+
+Statt pro Request eine neue Verbindung zu öffnen, hält jeder Worker-Thread
+eine Lese- und eine Schreibverbindung offen. Leser öffnen die Datenbank
+read-only (mode=ro) im WAL-Modus, damit Updates Lesezugriffe nicht blockieren.
+Verbindungen werden über Context-Manager ausgegeben und bei Fehlern nicht
+mehr verwaist zurückgelassen.
+
+Verwendung:
+    db = ConnectionManager("kick_predictor_final.db")
+    with db.reader() as conn:
+        conn.execute("SELECT ...")
+    with db.writer() as conn:      # Commit bei Erfolg, Rollback bei Fehler
+        conn.execute("UPDATE ...")
+
+In async-Endpoints läuft die Datenbankarbeit über AsyncDatabase in einem
+begrenzten Thread-Pool, damit der Event-Loop nicht blockiert:
+    database = AsyncDatabase(db)
+    rows = await database.read(lambda conn: conn.execute("SELECT ...").fetchall())
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List
+
+# Seiten-Cache in KiB (negativer Wert) und Memory-Mapping in Bytes
+CACHE_SIZE_KIB = 16384
+MMAP_SIZE = 64 * 1024 * 1024
+BUSY_TIMEOUT_MS = 5000
+
+# Threads für Lesezugriffe aus async-Endpoints (Schreiben läuft immer in einem Thread)
+READ_THREADS = 4
+
+
+class ConnectionManager:
+    """Thread-lokale, wiederverwendete SQLite-Verbindungen für einen Worker"""
+
+    def __init__(self, db_path: str, cache_size_kib: int = CACHE_SIZE_KIB,
+                 mmap_size: int = MMAP_SIZE):
+        self.db_path = db_path
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._wal_enabled = False
+
+    def _check_exists(self):
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Datenbank nicht gefunden: {self.db_path}")
+
+    def _tune(self, conn: sqlite3.Connection):
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+    def _register(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _enable_wal(self):
+        """Stellt die Datenbank einmalig auf WAL um (bleibt in der Datei gespeichert)"""
+        if self._wal_enabled:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        finally:
+            conn.close()
+        self._wal_enabled = True
+
+    def _open_reader(self) -> sqlite3.Connection:
+        self._check_exists()
+        self._enable_wal()
+        uri = f"{Path(os.path.abspath(self.db_path)).as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._tune(conn)
+        conn.execute("PRAGMA query_only = ON")
+        return self._register(conn)
+
+    def _open_writer(self) -> sqlite3.Connection:
+        self._check_exists()
+        self._enable_wal()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._tune(conn)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return self._register(conn)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Read-only Verbindung des aktuellen Threads"""
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = self._local.reader = self._open_reader()
+        try:
+            yield conn
+        finally:
+            # Offene Lesetransaktion beenden, damit der WAL-Snapshot nicht veraltet
+            if conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Schreibverbindung des aktuellen Threads: Commit bei Erfolg, sonst Rollback"""
+        conn = getattr(self._local, "writer", None)
+        if conn is None:
+            conn = self._local.writer = self._open_writer()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close_all(self):
+        """Schließt alle Verbindungen (z.B. beim Shutdown oder nach Austausch der DB-Datei)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
+        self._wal_enabled = False
+
+
+class AsyncDatabase:
+    """
+    Führt blockierende SQLite-Arbeit außerhalb des Event-Loops aus
+
+    Leser laufen in einem Pool mit read_threads Threads (jeder Thread hat seine
+    eigene Verbindung aus dem ConnectionManager), Schreiber nacheinander in einem
+    eigenen Thread. read_threads=0 führt alles direkt im Event-Loop aus (altes
+    Verhalten, nur für Vergleichsmessungen).
+    """
+
+    def __init__(self, manager: ConnectionManager, read_threads: int = READ_THREADS):
+        self.manager = manager
+        self.read_threads = read_threads
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, kind: str):
+        """Thread-Pool für "read" oder "write", wird beim ersten Aufruf erstellt"""
+        if self.read_threads <= 0:
+            return None
+        with self._lock:
+            if kind not in self._executors:
+                workers = self.read_threads if kind == "read" else 1
+                self._executors[kind] = ThreadPoolExecutor(workers, thread_name_prefix=f"sqlite-{kind}")
+            return self._executors[kind]
+
+    @staticmethod
+    def _call(connection_factory, fn: Callable, args, kwargs):
+        with connection_factory() as conn:
+            return fn(conn, *args, **kwargs)
+
+    async def _submit(self, executor, connection_factory, fn, args, kwargs):
+        call = functools.partial(self._call, connection_factory, fn, args, kwargs)
+        if executor is None:
+            return call()
+        # Kontext mitnehmen wie asyncio.to_thread (z.B. laufender Sync, sync_telemetry.py)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(executor, context.run, call)
+
+    async def read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ruft fn(conn, *args) mit einer read-only Verbindung auf"""
+        return await self._submit(self._executor("read"), self.manager.reader, fn, args, kwargs)
+
+    async def write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ruft fn(conn, *args) mit der Schreibverbindung auf (Commit bei Erfolg)"""
+        return await self._submit(self._executor("write"), self.manager.writer, fn, args, kwargs)
+
+    def shutdown(self):
+        """Beendet die Thread-Pools und schließt alle Verbindungen"""
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+        self.manager.close_all()
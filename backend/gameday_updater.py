@@ -1,14 +1,21 @@
 """
 Automatisches Update-System für Spieltage
-Läuft zwischen 17:00 und 23:00 Uhr alle 30 Minuten
-Optimiert für Bundesliga-Spielzeiten (Freitag, Samstag, Sonntag)
+
+Die Updates laufen als Jobs des gemeinsamen Job-Runners (job_runner.py):
+geweckt wird nach den Anstoßzeiten in matches_real statt über einen
+schedule-Thread, der jede Minute aufwacht. Während der Spiele fragt der
+Live-Modus (live_mode.py) nur die laufenden Spieltage im adaptiven Takt ab. In main_cloud registriert die App selbst die Jobs,
+main_real_data registriert beim Start die Jobs dieses Moduls (register) im
+gemeinsamen Runner und startet ihn; start/stop/Status steuern diesen Runner.
+Direkt gestartet (python gameday_updater.py) läuft ein eigener Runner.
 """
 import asyncio
-import schedule
-import time
-import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from real_data_sync import RealDataSync
+from partitions import CURRENT_SEASON
+from job_runner import JobRunner, fixture_planner, kickoff_state, runner, weekly
+from live_mode import LiveMode
+from db_connection import AsyncDatabase, ConnectionManager
 import logging
 
 # Logging konfigurieren
@@ -35,19 +42,9 @@ logger = logging.getLogger(__name__)
 class GamedayAutoUpdater:
     def __init__(self):
         self.sync = RealDataSync()
-        self.is_running = False
         self.last_update = None
         self.update_count = 0
-        
-    def is_gameday_time(self) -> bool:
-        """Prüfe ob es gerade Update-Zeit ist (17:30, 20:30 oder 22:30)"""
-        now = datetime.now()
-        current_time = now.strftime("%H:%M")
-        
-        # Update-Zeiten: täglich um 17:30, 20:30 und 22:30
-        update_times = ["17:30", "20:30", "22:30"]
-        
-        return current_time in update_times
+        self._database = None
     
     async def smart_update(self) -> dict:
         """Intelligentes Update - nur wenn nötig"""
@@ -62,8 +59,8 @@ class GamedayAutoUpdater:
             cursor.execute("""
                 SELECT MAX(matchday) 
                 FROM matches_real 
-                WHERE season = '2025' AND is_finished = 1
-            """)
+                WHERE league = ? AND season = ? AND is_finished = 1
+            """, (self.sync.league, CURRENT_SEASON))
             last_completed = cursor.fetchone()[0] or 3
             next_matchday = last_completed + 1
             
@@ -72,11 +69,11 @@ class GamedayAutoUpdater:
                 SELECT COUNT(*), 
                        SUM(CASE WHEN is_finished = 1 THEN 1 ELSE 0 END) as finished
                 FROM matches_real 
-                WHERE season = '2025' 
+                WHERE league = ? AND season = ?
                 AND matchday = ?
                 AND date(match_date) >= date('now', '-1 day')
                 AND date(match_date) <= date('now', '+1 day')
-            """, (next_matchday,))
+            """, (self.sync.league, CURRENT_SEASON, next_matchday))
             
             result = cursor.fetchone()
             todays_matches = result[0] if result else 0
@@ -91,179 +88,110 @@ class GamedayAutoUpdater:
             # Lade neue Daten
             logger.info(f"⚽ Prüfe Spieltag {next_matchday} - {todays_matches} Spiele heute, {finished_today} beendet")
             
-            # Nur den aktuellen Spieltag laden (effizienter)
-            current_matches = await self.sync.fetch_matches_from_season("2025")
-            recent_matches = [
-                m for m in current_matches 
-                if m['matchday'] == next_matchday
-            ]
+            # Nur Spieltage laden, die sich laut OpenLigaDB seit dem letzten Sync geändert haben
+            report = await self.sync.sync_changed_matchdays(CURRENT_SEASON)
             
-            if recent_matches:
-                self.sync.save_matches_to_db(recent_matches)
+            if report["matchdays_changed"]:
                 self.sync.update_season_info()
                 
-                # Zähle neue beendete Spiele
-                new_finished = sum(1 for m in recent_matches if m['isFinished'])
-                
                 self.last_update = datetime.now()
                 self.update_count += 1
                 
-                logger.info(f"✅ Update #{self.update_count} abgeschlossen - {new_finished} beendete Spiele")
+                logger.info(f"✅ Update #{self.update_count} abgeschlossen - Spieltage {report['matchdays_changed']}, "
+                            f"{report['finished_matches']} beendete Spiele, {report['bytes_downloaded']} Bytes")
                 
                 return {
                     "status": "success",
-                    "message": f"Spieltag {next_matchday} aktualisiert",
-                    "matches_updated": len(recent_matches),
-                    "finished_matches": new_finished,
+                    "message": f"Spieltage {', '.join(map(str, report['matchdays_changed']))} aktualisiert",
+                    "matches_updated": report["rows_touched"],
+                    "finished_matches": report["finished_matches"],
+                    "bytes_downloaded": report["bytes_downloaded"],
                     "update_count": self.update_count,
                     "last_update": self.last_update.isoformat()
                 }
             else:
-                logger.info("ℹ️ Keine neuen Daten verfügbar")
-                return {"status": "no_new_data", "message": "Keine Änderungen"}
+                logger.info(f"ℹ️ Keine neuen Daten verfügbar ({report['bytes_downloaded']} Bytes geprüft)")
+                return {"status": "no_new_data", "message": "Keine Änderungen",
+                        "bytes_downloaded": report["bytes_downloaded"]}
                 
         except Exception as e:
             logger.error(f"❌ Fehler beim Smart-Update: {e}")
             return {"status": "error", "message": str(e)}
     
-    def run_update_if_gameday(self):
-        """Führe Update aus (täglich zu den konfigurierten Zeiten)"""
-        logger.info("🎮 Update-Zeit erkannt - starte automatisches Update...")
-        
-        # Async Update in Thread ausführen
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.smart_update())
-            loop.close()
-            
-            if result["status"] == "success":
-                logger.info(f"🎯 Automatisches Update erfolgreich: {result['message']}")
-        except Exception as e:
-            logger.error(f"❌ Fehler beim automatischen Update: {e}")
-    
-    def schedule_gameday_updates(self):
-        """Plane Updates täglich um 17:30, 20:30 und 22:30"""
-        # Täglich um die definierten Zeiten
-        schedule.every().day.at("17:30").do(self.run_update_if_gameday)
-        schedule.every().day.at("20:30").do(self.run_update_if_gameday)
-        schedule.every().day.at("22:30").do(self.run_update_if_gameday)
-        
-        # Zusätzlich: Montagmorgen Vollupdate (falls etwas verpasst wurde)
-        schedule.every().monday.at("03:00").do(self.weekly_cleanup)
-        
-        logger.info("⏰ Automatische Updates geplant:")
-        logger.info("   - Täglich: 17:30, 20:30, 22:30")
-        logger.info("   - Montag 03:00: Wöchentliches Cleanup")
-    
-    def weekly_cleanup(self):
+    async def weekly_cleanup(self):
         """Wöchentliches Vollupdate zur Sicherheit"""
         logger.info("🧹 Wöchentliches Cleanup gestartet...")
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.sync.sync_all_real_data())
-            loop.close()
-            logger.info("✅ Wöchentliches Cleanup abgeschlossen")
-        except Exception as e:
-            logger.error(f"❌ Fehler beim wöchentlichen Cleanup: {e}")
+        await self.sync.sync_all_real_data()
+        logger.info("✅ Wöchentliches Cleanup abgeschlossen")
     
-    def start_scheduler(self):
-        """Starte den Scheduler in separatem Thread"""
-        if self.is_running:
-            logger.warning("⚠️ Scheduler läuft bereits!")
-            return
-        
-        self.is_running = True
-        logger.info("🚀 Gameday Auto-Updater gestartet...")
-        logger.info(f"   Aktuelle Zeit: {datetime.now().strftime('%A, %H:%M')}")
-        logger.info(f"   Nächste Update-Zeit: 17:30, 20:30 oder 22:30")
-        
-        def scheduler_thread():
-            while self.is_running:
-                try:
-                    schedule.run_pending()
-                    time.sleep(60)  # Prüfe jede Minute
-                except Exception as e:
-                    logger.error(f"❌ Scheduler-Fehler: {e}")
-                    time.sleep(300)  # 5 Min warten bei Fehler
-        
-        thread = threading.Thread(target=scheduler_thread, daemon=True)
-        thread.start()
-        
-        return thread
+    async def _kickoff_state(self, now: datetime):
+        conn = self.sync.get_db_connection()
+        try:
+            return kickoff_state(conn, now, [(self.sync.league, CURRENT_SEASON)])
+        finally:
+            conn.close()
     
-    def stop_scheduler(self):
-        """Stoppe den Scheduler"""
-        self.is_running = False
-        logger.info("⏹️ Gameday Auto-Updater gestoppt")
+    def database(self) -> AsyncDatabase:
+        """AsyncDatabase für den aktuellen sync.db_path (neu angelegt, wenn er sich ändert)"""
+        if self._database is None or self._database.manager.db_path != self.sync.db_path:
+            if self._database is not None:
+                self._database.shutdown()
+            self._database = AsyncDatabase(ConnectionManager(self.sync.db_path))
+        return self._database
     
-    def get_status(self) -> dict:
-        """Hole aktuellen Status"""
-        return {
-            "is_running": self.is_running,
-            "is_gameday_time": self.is_gameday_time(),
-            "last_update": self.last_update.isoformat() if self.last_update else None,
-            "update_count": self.update_count,
-            "current_time": datetime.now().isoformat(),
-            "next_scheduled_updates": self.get_next_updates()
-        }
+    def register(self, job_runner: JobRunner):
+        """Registriert Smart-Update (nach Anstoßzeiten), Live-Modus und Montag-03:00-Cleanup"""
+        live_mode = LiveMode(lambda: self.sync.fetcher, self.database,
+                             selected=lambda: [(self.sync.league, CURRENT_SEASON)])
+        job_runner.add("gameday_sync", self.smart_update,
+                       fixture_planner(self._kickoff_state, live_interval=None), lock="openligadb")
+        job_runner.add("live_scores", live_mode.poll, live_mode.planner, lock="openligadb")
+        job_runner.add("weekly_cleanup", self.weekly_cleanup, weekly(0, 3), lock="openligadb")
     
-    def get_next_updates(self) -> list:
-        """Berechne nächste geplante Updates"""
-        now = datetime.now()
-        next_updates = []
-        
-        # Update-Zeiten: 17:30, 20:30, 22:30
-        update_times = ["17:30", "20:30", "22:30"]
-        
-        # Nächste 3 Tage
-        for days_ahead in range(3):
-            check_date = now + timedelta(days=days_ahead)
-            day_name = check_date.strftime('%A')
-            
-            next_updates.append({
-                "date": check_date.strftime('%Y-%m-%d'),
-                "day": day_name,
-                "times": "17:30, 20:30, 22:30"
-            })
-        
-        return next_updates
+    async def run_forever(self):
+        """Eigenständiger Betrieb mit eigenem Runner"""
+        job_runner = JobRunner()
+        self.register(job_runner)
+        await job_runner.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await job_runner.stop()
 
 # Globale Instanz
 auto_updater = GamedayAutoUpdater()
 
 def start_auto_updater():
-    """Starte den Auto-Updater"""
-    auto_updater.schedule_gameday_updates()
-    return auto_updater.start_scheduler()
+    """Setzt die geplanten Läufe des gemeinsamen Job-Runners fort"""
+    runner.resume()
+    logger.info("🚀 Auto-Updater (Job-Runner) fortgesetzt")
 
 def stop_auto_updater():
-    """Stoppe den Auto-Updater"""
-    auto_updater.stop_scheduler()
+    """Pausiert die geplanten Läufe (manuelle Updates bleiben möglich)"""
+    runner.pause()
+    logger.info("⏹️ Auto-Updater (Job-Runner) pausiert")
 
 def get_updater_status():
-    """Hole Status des Auto-Updaters"""
-    return auto_updater.get_status()
+    """Hole Status des Auto-Updaters aus dem Job-Runner"""
+    queue = runner.queue()
+    last_runs = [job["last_run"] for job in queue if job["last_run"]]
+    return {
+        "is_running": runner.is_running and not runner.paused,
+        "is_gameday_time": any(job["live"] for job in queue),
+        "last_update": max(last_runs, default=None),
+        "update_count": sum(job["runs"] for job in queue),
+        "current_time": datetime.now().isoformat(),
+        "next_scheduled_updates": [
+            {"job": job["job"], "time": job["next_run"], "reason": job["reason"]}
+            for job in queue if job["next_run"]
+        ],
+    }
 
 if __name__ == "__main__":
     # Für direkten Start
     updater = GamedayAutoUpdater()
-    updater.schedule_gameday_updates()
-    
-    # Einmaliger Test-Update
-    logger.info("🧪 Teste einmaliges Update...")
-    asyncio.run(updater.smart_update())
-    
-    # Dann Scheduler starten
     try:
-        updater.start_scheduler()
         logger.info("✅ Auto-Updater läuft - Drücke Ctrl+C zum Beenden")
-        
-        # Hauptloop
-        while True:
-            time.sleep(60)
-            
+        asyncio.run(updater.run_forever())
     except KeyboardInterrupt:
         logger.info("⏹️ Auto-Updater wird beendet...")
-        updater.stop_scheduler()
\ No newline at end of file
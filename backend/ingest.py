@@ -0,0 +1,184 @@
+"""
+Gemeinsamer Schreibpfad für Spiele in matches_real
+
+ingest_matches() schreibt einen kompletten Payload in einer Transaktion:
+    1. alle Zeilen per executemany in eine temporäre Staging-Tabelle
+    2. ein LEFT JOIN gegen matches_real klassifiziert jede Zeile als neu,
+       geändert oder unverändert (und liefert den alten Stand für die
+       Tabellen-Deltas, siehe standings.py)
+    3. ein einziges INSERT ... SELECT ... ON CONFLICT(match_id) DO UPDATE
+       ... WHERE <geändert> übernimmt nur neue und geänderte Zeilen
+    4. die Änderungen gehen als ChangeBatch an die Abonnenten des Feeds
+       (change_feed.py): Tabelle, Team-Snapshots, Datenversion, Änderungslog,
+       vorberechnete Vorhersagen (prediction_store.py)
+
+Anders als INSERT OR REPLACE bleiben id und Indexeinträge unveränderter
+Spiele unangetastet. Commit macht der Aufrufer. Die Schritte 1-2, 3 und 4
+melden sich als Stufen diff, write und publish beim laufenden Sync
+(sync_telemetry.py).
+"""
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+from change_feed import ChangeBatch, ChangeFeed, MatchChange, bump_version, record_batch
+from partitions import DEFAULT_LEAGUE
+from prediction_store import refresh_predictions
+from standings import MATCH_KEYS, apply_result_change
+from sync_telemetry import span
+from team_stats import refresh_team_snapshots
+
+MATCH_COLUMNS = (
+    "match_id", "league", "season", "matchday", "home_team_id", "away_team_id",
+    "home_team_name", "away_team_name", "match_date", "is_finished",
+    "home_goals", "away_goals", "home_goals_ht", "away_goals_ht", "goals_json",
+)
+# Standard: alle Spalten außer dem Schlüssel übernehmen
+UPDATE_COLUMNS = MATCH_COLUMNS[1:]
+# Nur Anstoß und Ergebnis (Teams und Spieltag bestehender Spiele bleiben)
+RESULT_COLUMNS = ("match_date", "is_finished", "home_goals", "away_goals")
+# Live-Modus: zusätzlich die Torfolge (laufender Spielstand, live_mode.py)
+LIVE_COLUMNS = RESULT_COLUMNS + ("goals_json",)
+
+STAGING_TABLE = "ingest_matches_staging"
+
+
+def book_standings(conn, batch: ChangeBatch) -> int:
+    """Bucht nur die geänderten Spiele auf standings_real"""
+    return sum(apply_result_change(conn, change.old, change.new) for change in batch.changes)
+
+
+def refresh_snapshots(conn, batch: ChangeBatch) -> int:
+    """
+    Schreibt die Snapshots der Teams mit neuen Ergebnissen ab dem frühesten
+    geänderten Anstoß fort; korrigierte Ergebnisse spielen das Team komplett ab
+    """
+    since: Dict[int, Optional[str]] = {}
+    for change in batch.changes:
+        corrected = change.old is not None and change.old["is_finished"]
+        if not corrected and not change.new["is_finished"]:
+            continue
+        kickoff = None if corrected else change.new.get("match_date")
+        for team_id in change.team_ids:
+            if team_id not in since:
+                since[team_id] = kickoff
+            elif since[team_id] is not None:
+                since[team_id] = None if kickoff is None else min(since[team_id], kickoff)
+    return refresh_team_snapshots(conn, since, since=since)
+
+
+# Standard-Feed der Ingestion; die Datenversion wird vor dem Log erhöht
+feed = ChangeFeed()
+feed.subscribe(book_standings, requires=("standings_real",))
+feed.subscribe(refresh_snapshots)
+feed.subscribe(bump_version, requires=("data_version",))
+feed.subscribe(record_batch, requires=("data_version", "change_batches", "match_changes"))
+# Nach record_batch: die Läufe tragen die Version dieser Änderungen (is_current prüft nur spätere)
+feed.subscribe(refresh_predictions, requires=("predictions_real", "prediction_runs"))
+
+
+def _prepare_staging(cursor):
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+            match_id INTEGER PRIMARY KEY,
+            league TEXT, season TEXT, matchday INTEGER,
+            home_team_id INTEGER, away_team_id INTEGER,
+            home_team_name TEXT, away_team_name TEXT,
+            match_date TEXT, is_finished BOOLEAN,
+            home_goals INTEGER, away_goals INTEGER,
+            home_goals_ht INTEGER, away_goals_ht INTEGER,
+            goals_json TEXT
+        )
+    """)
+    cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+
+
+def _staged_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    staged = {column: row.get(column) for column in MATCH_COLUMNS}
+    staged["league"] = staged["league"] or DEFAULT_LEAGUE
+    staged["season"] = str(staged["season"])
+    staged["is_finished"] = bool(staged["is_finished"])
+    return staged
+
+
+def ingest_matches(conn, rows: Iterable[Mapping[str, Any]],
+                   update_columns: Sequence[str] = UPDATE_COLUMNS,
+                   change_feed: Optional[ChangeFeed] = None) -> Dict[str, Any]:
+    """
+    Schreibt Spiele gesammelt nach matches_real (Upsert über match_id)
+
+    Args:
+        rows: Zeilen mit den Schlüsseln aus MATCH_COLUMNS (fehlende = NULL,
+            ohne league: DEFAULT_LEAGUE); doppelte match_ids: die letzte Zeile gewinnt
+        update_columns: Spalten, die bei bestehenden Spielen verglichen und
+            übernommen werden
+        change_feed: Feed für die Änderungen (Standard: feed dieses Moduls)
+
+    Returns:
+        Dict mit inserted, updated, unchanged, changes (Liste von
+        MatchChange mit alter und neuer Zeile, alt=None bei neuen Spielen),
+        batch (ChangeBatch), affected_team_ids und published (Rückgaben der
+        Abonnenten)
+    """
+    unknown = set(update_columns) - set(UPDATE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unbekannte Spalten: {sorted(unknown)}")
+
+    staged = {}
+    for row in rows:
+        row = _staged_row(row)
+        staged[row["match_id"]] = row
+
+    cursor = conn.cursor()
+    with span("diff", rows=len(staged)):
+        _prepare_staging(cursor)
+        cursor.executemany(
+            f"INSERT INTO {STAGING_TABLE} ({', '.join(MATCH_COLUMNS)}) "
+            f"VALUES ({', '.join(':' + column for column in MATCH_COLUMNS)})",
+            staged.values(),
+        )
+
+        changed_expr = " OR ".join(f"m.{column} IS NOT s.{column}" for column in update_columns)
+        cursor.execute(f"""
+            SELECT s.match_id, m.match_id IS NOT NULL, {changed_expr},
+                   {', '.join('m.' + key for key in MATCH_KEYS)}
+            FROM {STAGING_TABLE} s
+            LEFT JOIN matches_real m ON m.match_id = s.match_id
+        """)
+
+        result: Dict[str, Any] = {"inserted": 0, "updated": 0, "unchanged": 0, "changes": []}
+        for match_id, exists, changed, *old_values in cursor.fetchall():
+            new = staged[match_id]
+            if not exists:
+                old = None
+                result["inserted"] += 1
+            elif changed:
+                old = dict(zip(MATCH_KEYS, old_values))
+                # Nicht übernommene Spalten behalten ihren bisherigen Wert
+                new = dict(new, **{key: old[key] for key in MATCH_KEYS if key not in update_columns})
+                result["updated"] += 1
+            else:
+                result["unchanged"] += 1
+                continue
+            result["changes"].append(MatchChange(match_id, old, new))
+
+    if result["changes"]:
+        # "WHERE true" trennt SELECT und ON CONFLICT für den SQLite-Parser
+        with span("write", rows=len(result["changes"])):
+            cursor.execute(f"""
+                INSERT INTO matches_real ({', '.join(MATCH_COLUMNS)})
+                SELECT {', '.join(MATCH_COLUMNS)} FROM {STAGING_TABLE} WHERE true
+                ON CONFLICT (match_id) DO UPDATE SET
+                    {', '.join(f'{column} = excluded.{column}' for column in update_columns)},
+                    synced_at = CURRENT_TIMESTAMP
+                WHERE {' OR '.join(f'{column} IS NOT excluded.{column}' for column in update_columns)}
+            """)
+
+    cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+    batch = ChangeBatch(result["changes"])
+    result["batch"] = batch
+    result["affected_team_ids"] = set(batch.team_ids)
+    if batch:
+        with span("publish", rows=len(batch)):
+            result["published"] = (change_feed or feed).publish(conn, batch)
+    else:
+        result["published"] = {}
+    return result
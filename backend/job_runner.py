@@ -0,0 +1,383 @@
+"""
+Asynchroner Job-Runner mit Weckzeiten aus dem Spielplan
+
+Ersetzt die bisherigen Scheduler (schedule-Thread in gameday_updater,
+APScheduler in app/services/scheduler_service.py, Thread mit asyncio.run pro
+Sync in app/services/background_sync.py), die unabhängig voneinander
+OpenLigaDB abgefragt und dieselbe SQLite-Datei beschrieben haben.
+
+Ein JobRunner läuft als Task im Event-Loop der App (Start/Stop im Lifespan):
+    - jeder Job hat einen Planer, der aus Uhrzeit und letztem Lauf den
+      nächsten Termin (Plan) berechnet; der Runner schläft bis zum
+      frühesten Termin und plant nach jedem Lauf neu
+    - Jobs mit demselben lock laufen nie gleichzeitig; ein fälliger Job,
+      dessen Lock belegt ist, wartet auf das Ende des anderen Laufs.
+      Manuelle Läufe (run_now) nehmen denselben Lock.
+    - queue() liefert die anstehenden Läufe mit Termin und Begründung
+    - mit lease (leader_lease.py) starten nur der Leader geplante und
+      manuelle Läufe; Jobs mit leader_only=False laufen auf jeder Instanz
+    - jeder Lauf wird mit Stufen, Bytes und Zeilen erfasst
+      (sync_telemetry.py); record=False nimmt Jobs davon aus
+
+fixture_planner() leitet die Weckzeiten aus matches_real.match_date ab:
+    - laufende Spiele (Anstoß bis MATCH_WINDOW danach, noch ohne Ergebnis):
+      alle LIVE_INTERVAL
+    - sonst: LIVE_INTERVAL nach dem nächsten Anstoß
+    - spätestens nach IDLE_INTERVAL (verschobene Anstoßzeiten, neue Spiele)
+Mit live_interval=None pausiert der Planer während laufender Spiele; dann
+übernimmt der Live-Modus (live_mode.py) mit eigenem, adaptivem Takt.
+Zwischen den Spielen schläft der Runner also stunden- bis tagelang, statt
+jede Minute aufzuwachen. daily(), weekly() und every() sind feste Planer.
+Die Uhr (match_clock) liefert wie match_date naive Ortszeit Europe/Berlin,
+damit Fenster und Weckzeiten auch auf einem UTC-Host stimmen.
+"""
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from leader_lease import LeaderLease, NotLeaderError
+from sync_telemetry import SyncTelemetry, telemetry as default_telemetry
+
+logger = logging.getLogger(__name__)
+
+LIVE_INTERVAL = timedelta(minutes=15)
+# Anstoß bis Ergebnis inklusive Pause, Nachspielzeit und Verzögerung bei OpenLigaDB
+MATCH_WINDOW = timedelta(hours=3)
+IDLE_INTERVAL = timedelta(hours=12)
+# Neuer Versuch, wenn ein Planer fehlschlägt (z.B. Datenbank noch nicht angelegt)
+RETRY_INTERVAL = timedelta(minutes=5)
+# Längster Schlaf am Stück, danach werden alle Jobs neu geplant
+MAX_SLEEP = 3600.0
+
+MATCH_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# match_date kommt aus matchDateTime: Ortszeit Europe/Berlin ohne Offset
+MATCH_TIMEZONE = ZoneInfo("Europe/Berlin")
+
+
+def match_clock() -> datetime:
+    """Jetzt als naive Ortszeit von match_date (unabhängig von der Zeitzone des Hosts)"""
+    return datetime.now(MATCH_TIMEZONE).replace(tzinfo=None)
+
+
+class Plan(NamedTuple):
+    """Nächster Lauf eines Jobs; live=True, solange Spiele laufen"""
+    when: datetime
+    reason: str
+    live: bool = False
+
+
+Planner = Callable[[datetime, Optional[datetime]], Awaitable[Plan]]
+
+
+class Job:
+    """Registrierter Job mit Zustand des letzten Laufs"""
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], planner: Planner,
+                 lock: Optional[str] = None, leader_only: bool = True, record: bool = True):
+        self.name = name
+        self.func = func
+        self.planner = planner
+        self.lock = lock or name
+        self.leader_only = leader_only
+        self.record = record
+        self.plan: Optional[Plan] = None
+        self.running = False
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "job": self.name,
+            "lock": self.lock,
+            "running": self.running,
+            "runs": self.runs,
+            "next_run": self.plan.when.isoformat() if self.plan else None,
+            "reason": self.plan.reason if self.plan else None,
+            "live": bool(self.plan and self.plan.live),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+        }
+
+
+class JobRunner:
+    """Führt Jobs im Event-Loop aus, geweckt zum frühesten geplanten Termin"""
+
+    def __init__(self, clock: Callable[[], datetime] = match_clock, max_sleep: float = MAX_SLEEP,
+                 lease: Optional[LeaderLease] = None, telemetry: Optional[SyncTelemetry] = None):
+        self.clock = clock
+        self.max_sleep = max_sleep
+        self.lease = lease
+        self.telemetry = telemetry or default_telemetry
+        self.is_leader = lease is None
+        self.jobs: Dict[str, Job] = {}
+        self.paused = False
+        self.started_at: Optional[datetime] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._runs: set = set()
+        self._loop = None
+        self._stopping = False
+
+    def add(self, name: str, func: Callable[[], Awaitable[Any]], planner: Planner,
+            lock: Optional[str] = None, leader_only: bool = True, record: bool = True) -> Job:
+        """Registriert einen Job (gleicher Name ersetzt den bisherigen)"""
+        job = Job(name, func, planner, lock, leader_only, record)
+        self.jobs[name] = job
+        self._poke()
+        return job
+
+    def use_lease(self, lease: Optional[LeaderLease]):
+        """Setzt die Leader-Lease (vor start(); None = immer Leader)"""
+        self.lease = lease
+        self.is_leader = lease is None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _bind_loop(self):
+        # Locks und Event gehören zum Event-Loop; der Runner kann mehrere Loops überleben (Tests)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._locks, self._wakeup, self._loop = {}, asyncio.Event(), loop
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        self._bind_loop()
+        return self._locks.setdefault(name, asyncio.Lock())
+
+    def _poke(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        """Startet den Runner als Task im laufenden Event-Loop"""
+        if self.is_running:
+            return
+        self._bind_loop()
+        self._stopping = False
+        self.started_at = self.clock()
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"Job-Runner gestartet: {', '.join(self.jobs) or 'keine Jobs'}")
+
+    async def stop(self):
+        """Beendet den Runner und bricht laufende Jobs ab"""
+        # Zusätzlich zum cancel(): wait_for verschluckt den Abbruch, wenn gleichzeitig geweckt wird
+        self._stopping = True
+        self._poke()
+        tasks = [task for task in (self._task, *self._runs) if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        if self.lease is not None and self.is_leader:
+            await asyncio.to_thread(self.lease.release)
+            self.is_leader = False
+        logger.info("Job-Runner gestoppt")
+
+    def pause(self):
+        """Keine geplanten Läufe mehr starten (manuelle Läufe bleiben möglich)"""
+        self.paused = True
+        self._poke()
+
+    def resume(self):
+        self.paused = False
+        self._poke()
+
+    async def run_now(self, name: str) -> Any:
+        """
+        Führt einen Job sofort aus (wartet, falls er oder ein Job mit demselben Lock gerade läuft)
+
+        NotLeaderError, wenn eine andere Instanz die Lease hält.
+        """
+        job = self.jobs[name]
+        if job.leader_only and not await self._hold_lease():
+            raise NotLeaderError(f"Sync läuft auf einer anderen Instanz ({self.lease.current_holder})")
+        return await self._execute(job, raise_errors=True)
+
+    async def _hold_lease(self) -> bool:
+        """Übernimmt bzw. verlängert die Lease (ohne Lease immer Leader)"""
+        if self.lease is None:
+            return True
+        try:
+            leader = await asyncio.to_thread(self.lease.acquire)
+        except Exception as e:
+            # Ohne bestätigte Lease lieber nichts ausführen
+            logger.error(f"Leader-Lease nicht erreichbar: {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(f"Leader-Lease {'übernommen' if leader else 'abgegeben'} "
+                        f"({self.lease.holder}, Halter: {self.lease.current_holder})")
+        self.is_leader = leader
+        return leader
+
+    async def _execute(self, job: Job, raise_errors: bool = False) -> Any:
+        async with self._lock(job.lock):
+            job.running = True
+            started = self.clock()
+            try:
+                async with self.telemetry.run(job.name) if job.record else contextlib.nullcontext():
+                    job.last_result = await job.func()
+                job.last_error = None
+                return job.last_result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.last_error = str(e)
+                logger.error(f"Job {job.name} fehlgeschlagen: {e}")
+                if raise_errors:
+                    raise
+            finally:
+                job.running = False
+                job.runs += 1
+                job.last_run = started
+                # Nach jedem Lauf neu planen
+                job.plan = None
+                self._poke()
+
+    async def _replan(self, now: datetime):
+        for job in self.jobs.values():
+            if job.running:
+                continue
+            try:
+                plan = await job.planner(now, job.last_run)
+            except Exception as e:
+                logger.error(f"Planung von {job.name} fehlgeschlagen: {e}")
+                plan = Plan(now + RETRY_INTERVAL, f"Planer-Fehler: {e}")
+            # Ein einmal geplanter Termin rückt nur nach vorn, nie nach hinten
+            if job.plan is None or plan.when < job.plan.when:
+                job.plan = plan
+
+    def _spawn(self, job: Job):
+        job.running = True
+        task = asyncio.create_task(self._execute(job))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run_loop(self):
+        while not self._stopping:
+            leader = await self._hold_lease()
+            now = self.clock()
+            await self._replan(now)
+            waiting = []
+            for job in self.jobs.values():
+                if job.running or job.plan is None or self._lock(job.lock).locked():
+                    continue
+                if job.leader_only and not leader:
+                    continue
+                if job.plan.when <= now and not self.paused:
+                    logger.info(f"Job {job.name}: {job.plan.reason}")
+                    self._spawn(job)
+                else:
+                    waiting.append(job.plan.when)
+            # Lease rechtzeitig verlängern bzw. als Follower regelmäßig prüfen
+            delay = self.lease.renew_interval if self.lease is not None else self.max_sleep
+            delay = min(delay, self.max_sleep)
+            if waiting and not self.paused:
+                delay = min(delay, max(0.0, (min(waiting) - now).total_seconds()))
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def queue(self) -> List[Dict[str, Any]]:
+        """Anstehende Läufe, frühester zuerst"""
+        jobs = sorted(self.jobs.values(), key=lambda job: (job.plan is None, job.plan.when if job.plan else None))
+        return [job.status() for job in jobs]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "is_running": self.is_running,
+            "paused": self.paused,
+            "leader": self.is_leader,
+            "lease": self.lease.status() if self.lease is not None else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "queue": self.queue(),
+        }
+
+
+def _parse_match_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "")[:19])
+
+
+def kickoff_state(conn, now: datetime, selected: Iterable[Tuple[str, str]]) -> Tuple[int, Optional[datetime]]:
+    """
+    Spiele, deren Ergebnis gerade aussteht, und nächster Anstoß in den Partitionen
+
+    Liest nur offene Spiele (Index idx_matches_real_partition_open).
+    """
+    live, upcoming = 0, []
+    window_start = (now - MATCH_WINDOW).strftime(MATCH_DATE_FORMAT)
+    current = now.strftime(MATCH_DATE_FORMAT)
+    for league, season in selected:
+        partition_live, next_kickoff = conn.execute("""
+            SELECT SUM(match_date <= ? AND match_date > ?), MIN(CASE WHEN match_date > ? THEN match_date END)
+            FROM matches_real
+            WHERE league = ? AND season = ? AND is_finished = 0
+        """, (current, window_start, current, league, season)).fetchone()
+        live += partition_live or 0
+        if next_kickoff:
+            upcoming.append(_parse_match_date(next_kickoff))
+    return live, min(upcoming, default=None)
+
+
+def fixture_planner(load_state: Callable[[datetime], Awaitable[Tuple[int, Optional[datetime]]]],
+                    live_interval: Optional[timedelta] = LIVE_INTERVAL) -> Planner:
+    """
+    Planer aus dem Spielplan; load_state(now) liefert (laufende Spiele, nächster Anstoß)
+
+    live_interval=None: während laufender Spiele pausieren (der Live-Modus übernimmt)
+    """
+
+    async def plan(now: datetime, last_run: Optional[datetime]) -> Plan:
+        live, next_kickoff = await load_state(now)
+        if live and live_interval is None:
+            return Plan(now + MATCH_WINDOW, f"{live} Spiel(e) laufen, Live-Modus übernimmt", live=True)
+        if live:
+            return Plan(last_run + live_interval if last_run else now, f"{live} Spiel(e) laufen", live=True)
+        idle = (last_run or now) + IDLE_INTERVAL
+        if next_kickoff is not None and next_kickoff + LIVE_INTERVAL < idle:
+            return Plan(next_kickoff + LIVE_INTERVAL, f"Anstoß {next_kickoff.strftime('%a %d.%m. %H:%M')}")
+        return Plan(idle, "kein Anstoß in Sicht")
+
+    return plan
+
+
+def daily(hour: int, minute: int = 0) -> Planner:
+    """Täglich zur angegebenen Uhrzeit"""
+    return weekly(None, hour, minute)
+
+
+def weekly(weekday: Optional[int], hour: int, minute: int = 0) -> Planner:
+    """Wöchentlich (weekday: 0 = Montag, None = täglich) zur angegebenen Uhrzeit"""
+
+    async def plan(now: datetime, last_run: Optional[datetime]) -> Plan:
+        base = max(now, last_run) if last_run else now
+        when = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        while when <= base or (weekday is not None and when.weekday() != weekday):
+            when += timedelta(days=1)
+        label = "täglich" if weekday is None else when.strftime("%A")
+        return Plan(when, f"{label} {hour:02d}:{minute:02d}")
+
+    return plan
+
+
+def every(interval: timedelta) -> Planner:
+    """Im festen Abstand zum letzten Lauf (erster Lauf ein Intervall nach dem Start)"""
+
+    async def plan(now: datetime, last_run: Optional[datetime]) -> Plan:
+        return Plan((last_run or now) + interval, f"alle {interval}")
+
+    return plan
+
+
+# Gemeinsamer Runner der App (main_cloud und app/services/scheduler_service registrieren ihre Jobs beim Import)
+runner = JobRunner()
@@ -0,0 +1,175 @@
+"""
+Leader-Lease: nur eine Instanz führt die Sync-Jobs aus
+
+Cloud Run (service.yaml) und Render (render.yaml) skalieren auf mehrere
+Instanzen; jede startet ihren Job-Runner. Damit nicht N Instanzen denselben
+Sync fahren und um die Datenbank konkurrieren, hält eine Instanz eine Lease
+als Zeile in sync_leases (name, holder, expires_at) der konfigurierten
+Datenbank:
+
+    - acquire() übernimmt oder verlängert die Lease in einem einzigen
+      Upsert, der nur greift, wenn die Lease frei, abgelaufen oder schon die
+      eigene ist (INSERT ... ON CONFLICT DO UPDATE ... WHERE)
+    - der Halter verlängert alle renew_interval (ttl / 3); fällt er aus,
+      übernimmt eine andere Instanz spätestens nach ttl
+    - release() gibt die Lease beim Herunterfahren sofort frei
+
+SqliteLease arbeitet auf der SQLite-Datei (lokal, main_cloud) und nimmt mit
+BEGIN IMMEDIATE deren Schreibsperre, sodass auch mehrere lokale Prozesse
+nie gleichzeitig Leader sind. SqlAlchemyLease nutzt dieselbe Abfrage über
+eine SQLAlchemy-Engine (PostgreSQL/Supabase in app/).
+
+Der JobRunner (job_runner.py) startet geplante Jobs nur als Leader;
+Follower übernehmen neue Daten über die Datenversion (data_version.py).
+"""
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+# Ohne Verlängerung verfällt die Lease nach so vielen Sekunden
+LEASE_TTL = 90.0
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS sync_leases (
+        name TEXT PRIMARY KEY,
+        holder TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+"""
+# Übernimmt freie/abgelaufene Leases, verlängert die eigene; sonst keine Änderung
+ACQUIRE = """
+    INSERT INTO sync_leases (name, holder, expires_at) VALUES (:name, :holder, :expires_at)
+    ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+    WHERE sync_leases.holder = excluded.holder OR sync_leases.expires_at < :now
+"""
+RELEASE = "DELETE FROM sync_leases WHERE name = :name AND holder = :holder"
+HOLDER = "SELECT holder, expires_at FROM sync_leases WHERE name = :name"
+
+
+def instance_id() -> str:
+    """Eindeutige Kennung dieses Prozesses (Cloud Run: K_REVISION, Render: RENDER_INSTANCE_ID)"""
+    instance = os.getenv("RENDER_INSTANCE_ID") or os.getenv("K_REVISION") or socket.gethostname()
+    return f"{instance}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class NotLeaderError(RuntimeError):
+    """Eine andere Instanz hält die Lease"""
+
+
+class LeaderLease:
+    """Gemeinsamer Zustand; Unterklassen führen die Abfragen auf ihrer Datenbank aus"""
+
+    def __init__(self, name: str = "sync", holder: Optional[str] = None, ttl: float = LEASE_TTL):
+        self.name = name
+        self.holder = holder or instance_id()
+        self.ttl = ttl
+        self.is_leader = False
+        self.expires_at: Optional[float] = None
+        self.current_holder: Optional[str] = None
+
+    @property
+    def renew_interval(self) -> float:
+        return self.ttl / 3
+
+    def _acquire(self, params: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    def _release(self, params: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _current(self, params: Dict[str, Any]):
+        raise NotImplementedError
+
+    def acquire(self) -> bool:
+        """Übernimmt oder verlängert die Lease; True, wenn diese Instanz Leader ist"""
+        now = time.time()
+        params = {"name": self.name, "holder": self.holder, "now": now, "expires_at": now + self.ttl}
+        self.is_leader = self._acquire(params)
+        if self.is_leader:
+            self.current_holder, self.expires_at = self.holder, params["expires_at"]
+        else:
+            self.current_holder, self.expires_at = self._current(params) or (None, None)
+        return self.is_leader
+
+    def release(self):
+        """Gibt die eigene Lease frei (andere Instanzen übernehmen sofort)"""
+        if self.is_leader:
+            self._release({"name": self.name, "holder": self.holder})
+        self.is_leader = False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "lease": self.name,
+            "instance": self.holder,
+            "role": "leader" if self.is_leader else "follower",
+            "holder": self.current_holder,
+            "expires_in": round(self.expires_at - time.time(), 1) if self.expires_at else None,
+        }
+
+
+class SqliteLease(LeaderLease):
+    """Lease in der SQLite-Datei; BEGIN IMMEDIATE sperrt die Datei für andere Prozesse"""
+
+    def __init__(self, db_path: str, name: str = "sync", holder: Optional[str] = None, ttl: float = LEASE_TTL):
+        super().__init__(name, holder, ttl)
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute(CREATE_TABLE)
+        return conn
+
+    def _acquire(self, params):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            acquired = conn.execute(ACQUIRE, params).rowcount == 1
+            conn.execute("COMMIT")
+            return acquired
+        finally:
+            conn.close()
+
+    def _release(self, params):
+        conn = self._connect()
+        try:
+            conn.execute(RELEASE, params)
+        finally:
+            conn.close()
+
+    def _current(self, params):
+        conn = self._connect()
+        try:
+            return conn.execute(HOLDER, params).fetchone()
+        finally:
+            conn.close()
+
+
+class SqlAlchemyLease(LeaderLease):
+    """Lease in der über DATABASE_URL konfigurierten Datenbank (SQLAlchemy-Engine)"""
+
+    def __init__(self, engine, name: str = "sync", holder: Optional[str] = None, ttl: float = LEASE_TTL):
+        super().__init__(name, holder, ttl)
+        self.engine = engine
+        self._created = False
+
+    def _execute(self, sql: str, params):
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            if not self._created:
+                conn.execute(text(CREATE_TABLE))
+                self._created = True
+            result = conn.execute(text(sql), params)
+            return result.fetchone() if result.returns_rows else result.rowcount
+
+    def _acquire(self, params):
+        return self._execute(ACQUIRE, params) == 1
+
+    def _release(self, params):
+        self._execute(RELEASE, params)
+
+    def _current(self, params):
+        return self._execute(HOLDER, params)
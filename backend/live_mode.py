@@ -0,0 +1,154 @@
+"""
+Live-Modus: Spielstände laufender Spiele im adaptiven Takt
+
+Solange in matches_real ein Spiel läuft (Anstoß bis MATCH_WINDOW danach,
+noch ohne Ergebnis), fragt der Job live_scores nur die Spieltage dieser
+Spiele bei OpenLigaDB ab und schreibt Anstoß, Spielstand (goals_json),
+Ergebnis und Abpfiff über den gesammelten Upsert (ingest_matches mit
+LIVE_COLUMNS). Tabelle, Snapshots, Datenversion und Änderungslog folgen
+über den Feed.
+
+Der Abstand zwischen zwei Abfragen folgt der beobachteten Änderungsrate:
+    - Abfrage mit Änderungen: Abstand halbieren (bis MIN_INTERVAL)
+    - Abfrage ohne Änderungen: Abstand x BACKOFF (bis MAX_INTERVAL)
+Ist das letzte Spiel des Fensters beendet, schaltet sich der Modus ab und
+der Planer schläft bis zum nächsten Anstoß. Der reguläre Sync
+(fixture_planner mit live_interval=None) pausiert währenddessen.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ingest import LIVE_COLUMNS, ingest_matches
+from job_runner import IDLE_INTERVAL, MATCH_DATE_FORMAT, MATCH_WINDOW, Plan, kickoff_state, match_clock
+from openligadb_fetcher import MatchdayFetcher
+from partitions import partitions
+
+logger = logging.getLogger(__name__)
+
+START_INTERVAL = timedelta(minutes=2)
+MIN_INTERVAL = timedelta(minutes=1)
+MAX_INTERVAL = timedelta(minutes=10)
+BACKOFF = 1.5
+
+
+def live_matchdays(conn, now: datetime, selected: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, int]]:
+    """Spieltage mit laufenden Spielen als (league, season, matchday)"""
+    window_start = (now - MATCH_WINDOW).strftime(MATCH_DATE_FORMAT)
+    current = now.strftime(MATCH_DATE_FORMAT)
+    keys = []
+    for league, season in selected:
+        keys += [(league, season, matchday) for (matchday,) in conn.execute("""
+            SELECT DISTINCT matchday FROM matches_real
+            WHERE league = ? AND season = ? AND is_finished = 0
+              AND match_date <= ? AND match_date > ?
+            ORDER BY matchday
+        """, (league, season, current, window_start))]
+    return keys
+
+
+def apply_live_records(conn, fetched) -> Dict[str, Any]:
+    """Schreibt die Spiele der Live-Spieltage; nur Anstoß, Spielstand und Ergebnis"""
+    rows = [record.row() for records in fetched.values() for record in records]
+    result = ingest_matches(conn, rows, update_columns=LIVE_COLUMNS)
+    finished = sum(1 for _, old, new in result["changes"]
+                   if new["is_finished"] and not (old and old["is_finished"]))
+    return {**{key: result[key] for key in ("inserted", "updated", "unchanged")}, "finished": finished}
+
+
+class LiveMode:
+    """
+    Zustand des Live-Modus; planner() und poll() werden als Job beim JobRunner registriert
+
+    fetcher und database sind Zugriffsfunktionen, die bei jedem Lauf gelesen
+    werden: so gelten später ausgetauschte Instanzen (z.B. main_cloud.database
+    in Tests oder nach einem Wechsel der DB-Datei) auch für den Live-Modus.
+    """
+
+    def __init__(self, fetcher: Callable[[], MatchdayFetcher], database: Callable[[], Any],
+                 selected: Callable[[], Iterable[Tuple[str, str]]] = partitions,
+                 clock: Callable[[], datetime] = match_clock):
+        self.fetcher = fetcher
+        self.database = database
+        self.selected = selected
+        self.clock = clock
+        self.active = False
+        self.interval = START_INTERVAL
+        self.matchdays: List[Tuple[str, str, int]] = []
+        self.activated_at: Optional[datetime] = None
+        self.polls = 0
+        self.changes = 0
+        self.last_changes = 0
+
+    def _activate(self, now: datetime, live: int):
+        self.active = True
+        self.interval = START_INTERVAL
+        self.activated_at = now
+        self.polls = self.changes = self.last_changes = 0
+        logger.info(f"🔴 Live-Modus aktiv: {live} Spiel(e) laufen")
+
+    def _deactivate(self):
+        if self.active:
+            logger.info(f"⚪ Live-Modus beendet nach {self.polls} Abfragen, {self.changes} Änderungen")
+        self.active = False
+        self.matchdays = []
+
+    def _adapt(self, changed: int):
+        """Kürzerer Abstand, solange sich etwas tut; länger, wenn nicht"""
+        if changed:
+            self.interval = max(MIN_INTERVAL, self.interval / 2)
+        else:
+            self.interval = min(MAX_INTERVAL, self.interval * BACKOFF)
+
+    async def planner(self, now: datetime, last_run: Optional[datetime]) -> Plan:
+        live, next_kickoff = await self.database().read(kickoff_state, now, list(self.selected()))
+        if live:
+            if not self.active:
+                self._activate(now, live)
+            # Erster Lauf sofort, danach im adaptiven Abstand
+            if last_run is None or last_run < self.activated_at:
+                return Plan(now, f"Live-Modus: {live} Spiel(e) laufen", live=True)
+            return Plan(last_run + self.interval,
+                        f"Live-Modus: {live} Spiel(e), alle {int(self.interval.total_seconds())}s", live=True)
+        self._deactivate()
+        if next_kickoff is not None and next_kickoff < now + IDLE_INTERVAL:
+            return Plan(next_kickoff, f"Anstoß {next_kickoff.strftime('%a %d.%m. %H:%M')}")
+        return Plan(now + IDLE_INTERVAL, "kein Anstoß in Sicht")
+
+    async def poll(self) -> Dict[str, Any]:
+        """Lädt die Live-Spieltage und schreibt die Änderungen (Job live_scores)"""
+        now = self.clock()
+        selected = list(self.selected())
+        self.matchdays = await self.database().read(live_matchdays, now, selected)
+        report: Dict[str, Any] = {"matchdays": [list(key) for key in self.matchdays],
+                                  "inserted": 0, "updated": 0, "unchanged": 0, "finished": 0}
+        if self.matchdays:
+            fetched = await self.fetcher().fetch_records(self.matchdays)
+            if fetched:
+                report.update(await self.database().write(apply_live_records, fetched))
+            self.polls += 1
+            self.last_changes = report["inserted"] + report["updated"]
+            self.changes += self.last_changes
+            # Fehlgeschlagene Abfragen ändern den Takt nicht
+            if fetched:
+                self._adapt(self.last_changes)
+            if report["finished"]:
+                logger.info(f"✅ Live: {report['finished']} Spiel(e) beendet")
+
+        # Letztes Spiel des Fensters beendet: abschalten
+        live, _ = await self.database().read(kickoff_state, now, selected)
+        if not live:
+            self._deactivate()
+        report.update(self.status())
+        return report
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "interval_seconds": int(self.interval.total_seconds()),
+            "live_matchdays": [list(key) for key in self.matchdays],
+            "polls": self.polls,
+            "changes": self.changes,
+            "last_changes": self.last_changes,
+            "activated_at": self.activated_at.isoformat() if self.activated_at else None,
+        }
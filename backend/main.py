@@ -3,8 +3,11 @@ import logging
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import router
+from leader_lease import NotLeaderError
+from sync_telemetry import telemetry
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -50,13 +53,14 @@ async def lifespan(app: FastAPI):
     if os.getenv("AUTO_SYNC_ON_START") == "true":
         logger.info("Auto-sync on start enabled, triggering initial sync...")
         try:
-            from app.services.sync_service import SyncService
-            sync_service = SyncService()
+            from app.services.scheduler_service import scheduler_service
             
-            # Führe initiale Synchronisation durch
-            result = await sync_service.sync_all_data()
+            # Führe initiale Synchronisation durch (gleicher Lock wie die geplanten Jobs)
+            result = await scheduler_service.run("full")
             logger.info(f"Initial sync completed: {result}")
             
+        except NotLeaderError as e:
+            logger.info(f"Auto-sync skipped, another instance holds the sync lease: {e}")
         except Exception as e:
             logger.error(f"Auto-sync failed: {e}")
     
@@ -70,6 +74,10 @@ async def lifespan(app: FastAPI):
         logger.info("Background scheduler stopped")
     except Exception as e:
         logger.error(f"Failed to stop scheduler: {e}")
+    
+    # Gemeinsamen OpenLigaDB-Verbindungspool schließen
+    from app.services.openliga_pool import close_shared_client
+    await close_shared_client()
 
 app = FastAPI(
     title="Kick Predictor API",
@@ -116,6 +124,11 @@ async def root():
 async def health_check():
     return {"status": "online"}
 
+@app.get("/metrics")
+async def metrics():
+    """Sync-Metriken im Prometheus-Textformat"""
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Routen einbinden
 app.include_router(router, prefix="/api")
 
@@ -5,15 +5,39 @@ Vereinfaapp = FastAPI(
     version="3.2.0"
 )Backend Version für Cloud Run Deployment - Master DB Schema
 """
+import asyncio
 import os
 import sqlite3
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import httpx
+from typing import List, Dict, Any, Literal, Optional
+from datetime import datetime, timedelta
 import json
 
+from db_connection import ConnectionManager, AsyncDatabase, READ_THREADS
+from schema_registry import SchemaRegistry
+from migrations import apply_migrations
+from xg_engine import predict_fixtures, load_team_windows, compute_team_stats, FORM_SEASONS
+from backtest_engine import backtest, summarize
+from team_stats import (init_snapshot_table, rebuild_snapshots,
+                        get_team_snapshot, load_team_stats)
+from standings import StandingsCache
+from partitions import CURRENT_SEASON, DEFAULT_LEAGUE, partitions
+from data_version import current_data_version
+from change_feed import load_changes
+from response_cache import ResponseCache
+from openligadb_fetcher import MatchdayFetcher
+from watermarks import MATCHDAYS, detect_changes, load_watermarks, save_watermarks, sentinel_matchday
+from ingest import RESULT_COLUMNS, ingest_matches
+from job_runner import every, fixture_planner, kickoff_state, runner, weekly
+from live_mode import LiveMode
+from prediction_store import is_current, load_stored_predictions, materialize_predictions, predict_as_of_kickoff
+from leader_lease import NotLeaderError, SqliteLease
+from sync_telemetry import RUN_RETENTION, load_sync_runs, save_sync_run, telemetry
+
 app = FastAPI(
     title="Kick Predictor API - Cloud Edition",
     description="API mit echten Bundesliga-Daten - Master DB Schema",
@@ -27,12 +51,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 DATABASE_PATH = 'kick_predictor_final.db'
 
+# Wiederverwendete Verbindungen pro Worker-Thread (Leser read-only im WAL-Modus)
+db = ConnectionManager(DATABASE_PATH)
+
+# Datenbankzugriffe der async-Endpoints laufen im Thread-Pool, nicht im Event-Loop
+database = AsyncDatabase(db, read_threads=int(os.getenv("DB_READ_THREADS", READ_THREADS)))
+
+# Vorhandene Tabellen und die daraus gewählten Abfragepläne der Endpoints
+schema = SchemaRegistry()
+
+# Fertige JSON-Antworten lesender Endpoints, gültig bis zur nächsten Datenversion
+response_cache = ResponseCache()
+
+# Tabellen der Partitionen im Speicher, fortgeschrieben über den Änderungs-Feed
+standings_cache = StandingsCache()
+
+# OpenLigaDB-Abruf für /api/update-data (parallel, ratenbegrenzt, mit Retries)
+openligadb = MatchdayFetcher(timeout=10.0)
+
 def get_db_connection():
-    """Datenbankverbindung erstellen"""
+    """Einzelne Datenbankverbindung erstellen (für Skripte, Endpoints nutzen database.read()/write())"""
     if not os.path.exists(DATABASE_PATH):
         raise HTTPException(status_code=500, detail="Datenbank nicht gefunden")
     
@@ -40,6 +83,106 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row
     return conn
 
+async def read_json(fn, *args):
+    """
+    Führt fn(conn, *args) im Datenbank-Thread-Pool aus und serialisiert das
+    Ergebnis dort gleich zu JSON, damit auch das nicht den Event-Loop belegt
+    """
+    return await database.read(lambda conn: JSONResponse(fn(conn, *args)))
+
+async def run_plan(name: str, *args):
+    """Führt den aufgelösten Abfrageplan eines Endpoints im Datenbank-Thread-Pool aus"""
+    return await read_json(lambda conn: schema.resolve(name, conn)(conn.cursor(), *args))
+
+def _advance_cache(conn) -> Optional[int]:
+    """Bringt response_cache auf die aktuelle Datenversion (verwirft nur betroffene Einträge)"""
+    version = current_data_version(conn)
+    since = response_cache.version
+    if version is not None and since != version:
+        batch = load_changes(conn, since, version) if since is not None else None
+        response_cache.advance(since, version, batch.tags() if batch is not None else None)
+    return version
+
+async def cached_json(request: Request, fn, *args, tags=None):
+    """
+    Wie read_json, aber über response_cache: solange sich die Datenversion
+    nicht ändert, werden die gespeicherten Bytes mit ETag ausgeliefert und
+    If-None-Match mit 304 beantwortet
+
+    tags (z.B. {"team:7"}) grenzen ein, welche Änderungen die Antwort
+    betreffen; Einträge mit unberührten Tags überleben einen Sync (siehe
+    change_feed.py). Ohne tags wird bei jeder neuen Datenversion neu berechnet.
+    """
+    key = (request.url.path, request.url.query)
+
+    def load(conn):
+        version = _advance_cache(conn)
+        if version is None:
+            return JSONResponse(fn(conn, *args))
+        entry = response_cache.get(key, version)
+        if entry is None:
+            entry = response_cache.put(key, version, JSONResponse(fn(conn, *args)).body, tags)
+        return entry
+
+    result = await database.read(load)
+    if isinstance(result, JSONResponse):
+        return result
+    return result.response(request.headers.get("if-none-match"))
+
+async def cached_plan(request: Request, name: str, *args, tags=None):
+    """run_plan über response_cache (siehe cached_json)"""
+    return await cached_json(request, lambda conn: schema.resolve(name, conn)(conn.cursor(), *args),
+                             tags=tags)
+
+def _prepare_database(conn):
+    applied = apply_migrations(conn)
+    if applied:
+        print(f"🧱 Migrationen angewendet: {applied}")
+    init_snapshot_table(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM team_stats_snapshot)")
+    if not cursor.fetchone()[0]:
+        rows = rebuild_snapshots(conn)
+        print(f"📸 team_stats_snapshot aufgebaut: {rows} Einträge")
+    # Vorhersagen fehlen oder passen nicht zu Datenversion/Algorithmus (z.B. nach einem Update)
+    stale = [partition for partition in partitions() if not is_current(conn, *partition)]
+    if stale:
+        written = materialize_predictions(conn, stale)
+        print(f"🔮 Vorhersagen vorberechnet: {written} für {', '.join(map(str, stale))}")
+    schema.refresh(conn)
+    if schema.has("standings_real"):
+        standings_cache.load(conn, partitions())
+
+@app.on_event("startup")
+async def ensure_team_stats_snapshots():
+    """Wendet Migrationen an, baut team_stats_snapshot bei Bedarf auf und liest das Schema ein"""
+    if not os.path.exists(DATABASE_PATH):
+        return
+    try:
+        await database.write(_prepare_database)
+    except Exception as e:
+        print(f"Snapshot startup error: {e}")
+
+@app.on_event("startup")
+async def start_job_runner():
+    """
+    Startet den Job-Runner (abschaltbar mit KICK_JOB_RUNNER=false)
+
+    Bei mehreren Instanzen synchronisiert nur der Halter der Leader-Lease
+    (KICK_LEADER_LEASE=false: jede Instanz für sich)
+    """
+    if os.getenv("KICK_JOB_RUNNER", "true").lower() == "true":
+        if os.getenv("KICK_LEADER_LEASE", "true").lower() == "true" and os.path.exists(DATABASE_PATH):
+            runner.use_lease(SqliteLease(DATABASE_PATH))
+        await runner.start()
+        print(f"⏰ Job-Runner gestartet: {', '.join(runner.jobs)}")
+
+@app.on_event("shutdown")
+async def close_db_connections():
+    """Stoppt den Job-Runner, beendet den Datenbank-Thread-Pool und schließt die Verbindungen"""
+    await runner.stop()
+    database.shutdown()
+
 @app.get("/")
 async def root():
     """Root Endpoint"""
@@ -53,8 +196,7 @@ async def health_check():
 @app.get("/api/teams")
 async def get_teams():
     """Alle Teams abrufen"""
-    try:
-        conn = get_db_connection()
+    def query(conn):
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -72,124 +214,162 @@ async def get_teams():
                 "shortname": row["short_name"]
             })
         
-        conn.close()
         return teams
         
+    try:
+        return await read_json(query)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Teams: {str(e)}")
 
+def _partition_teams(cursor, league: str, season: str):
+    """Teams mit mindestens einem Heimspiel in der Partition (Suche über idx_matches_real_partition)"""
+    cursor.execute("""
+        SELECT DISTINCT team_id, name, short_name, icon_url
+        FROM teams_real
+        WHERE team_id IN (SELECT home_team_id FROM matches_real WHERE league = ? AND season = ?)
+        ORDER BY name
+    """, (league, season))
+    return cursor.fetchall()
+
+@schema.plan("table", requires=("standings_real", "teams_real"))
+def _table_from_standings(cursor, matchday: Optional[int] = None,
+                          league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Tabelle einer Partition aus den beim Einspielen gebuchten Deltas (standings_cache)"""
+    teams = {team["team_id"]: team for team in _partition_teams(cursor, league, season)}
+
+    table = []
+    for entry in standings_cache.table(cursor.connection, teams, matchday, season, league):
+        team = teams[entry["team_id"]]
+        table.append({
+            "team_id": entry["team_id"],
+            "team_name": team["name"],
+            "shortname": team["short_name"],
+            "team_icon_url": team["icon_url"],
+            "games": entry["games"],
+            "wins": entry["wins"],
+            "draws": entry["draws"],
+            "losses": entry["losses"],
+            "goals_for": entry["goals_for"],
+            "goals_against": entry["goals_against"],
+            "points": entry["points"],
+            "goal_difference": entry["goal_difference"],
+            "position": entry["position"]
+        })
+    return table
+
+@schema.plan("table", requires=("matches_real",))
+def _table_from_matches_real(cursor, matchday: Optional[int] = None,
+                             league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Tabelle aus den beendeten Spielen einer Partition in matches_real"""
+    # Initialisiere Team-Statistiken Dictionary
+    team_stats = {}
+
+    # Teams der Partition aus teams_real
+    teams = _partition_teams(cursor, league, season)
+    for team in teams:
+        team_stats[team["team_id"]] = {
+            "team_id": team["team_id"],
+            "team_name": team["name"],
+            "shortname": team["short_name"],
+            "team_icon_url": team["icon_url"],
+            "games": 0,
+            "wins": 0,
+            "draws": 0,
+            "losses": 0,
+            "goals_for": 0,
+            "goals_against": 0,
+            "points": 0
+        }
+
+    # Verarbeite alle abgeschlossenen Spiele der Partition
+    cursor.execute("""
+        SELECT 
+            home_team_id,
+            away_team_id,
+            home_goals,
+            away_goals,
+            is_finished
+        FROM matches_real
+        WHERE league = ? AND season = ? AND matchday <= ? AND is_finished = 1
+            AND home_goals IS NOT NULL AND away_goals IS NOT NULL
+    """, (league, season, matchday if matchday is not None else 99))
+
+    matches = cursor.fetchall()
+    for match in matches:
+        home_id = match["home_team_id"]
+        away_id = match["away_team_id"]
+        home_goals = match["home_goals"]
+        away_goals = match["away_goals"]
+
+        # Stelle sicher, dass beide Teams existieren
+        if home_id not in team_stats or away_id not in team_stats:
+            continue
+
+        # Aktualisiere Spiele-Anzahl
+        team_stats[home_id]["games"] += 1
+        team_stats[away_id]["games"] += 1
+
+        # Aktualisiere Tore
+        team_stats[home_id]["goals_for"] += home_goals
+        team_stats[home_id]["goals_against"] += away_goals
+        team_stats[away_id]["goals_for"] += away_goals
+        team_stats[away_id]["goals_against"] += home_goals
+
+        # Bestimme Ergebnis und vergebe Punkte
+        if home_goals > away_goals:  # Heimsieg
+            team_stats[home_id]["wins"] += 1
+            team_stats[home_id]["points"] += 3
+            team_stats[away_id]["losses"] += 1
+        elif home_goals < away_goals:  # Auswärtssieg
+            team_stats[away_id]["wins"] += 1
+            team_stats[away_id]["points"] += 3
+            team_stats[home_id]["losses"] += 1
+        else:  # Unentschieden
+            team_stats[home_id]["draws"] += 1
+            team_stats[home_id]["points"] += 1
+            team_stats[away_id]["draws"] += 1
+            team_stats[away_id]["points"] += 1
+
+    # Berechne Tordifferenz und erstelle finale Tabelle
+    table = []
+    for team_id, stats in team_stats.items():
+        stats["goal_difference"] = stats["goals_for"] - stats["goals_against"]
+        table.append(stats)
+
+    # Sortiere nach Bundesliga-Regeln: 1. Punkte, 2. Tordifferenz, 3. Tore
+    table.sort(key=lambda x: (-x["points"], -x["goal_difference"], -x["goals_for"]))
+
+    # Setze Positionen
+    for i, entry in enumerate(table):
+        entry["position"] = i + 1
+
+    return table
+
+@schema.plan("table")
+def _table_empty(cursor, matchday: Optional[int] = None,
+                 league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Keine Daten verfügbar"""
+    return []
+
 @app.get("/api/table")
-async def get_table():
-    """Aktuelle Bundesliga-Tabelle basierend auf echten Ergebnissen - wie lokale App"""
+async def get_table(request: Request, matchday: Optional[int] = None,
+                    league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """
+    Aktuelle Bundesliga-Tabelle basierend auf echten Ergebnissen - wie lokale App
+
+    Mit ?matchday=n die Tabelle nach dem n-ten Spieltag, mit ?league=bl2&season=2024
+    die Tabelle einer anderen Partition
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Prüfe zuerst matches_real Tabelle (hat die echten Ergebnisse)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            # Initialisiere Team-Statistiken Dictionary
-            team_stats = {}
-            
-            # Hole alle Teams aus teams_real
-            cursor.execute("""
-                SELECT DISTINCT team_id, name, short_name, icon_url
-                FROM teams_real
-                ORDER BY name
-            """)
-            
-            teams = cursor.fetchall()
-            for team in teams:
-                team_stats[team["team_id"]] = {
-                    "team_id": team["team_id"],
-                    "team_name": team["name"],
-                    "shortname": team["short_name"],
-                    "team_icon_url": team["icon_url"],
-                    "games": 0,
-                    "wins": 0,
-                    "draws": 0,
-                    "losses": 0,
-                    "goals_for": 0,
-                    "goals_against": 0,
-                    "points": 0
-                }
-            
-            # Verarbeite alle abgeschlossenen Spiele der Saison 2025
-            cursor.execute("""
-                SELECT 
-                    home_team_id,
-                    away_team_id,
-                    home_goals,
-                    away_goals,
-                    is_finished
-                FROM matches_real
-                WHERE season = '2025' AND is_finished = 1
-                    AND home_goals IS NOT NULL AND away_goals IS NOT NULL
-            """)
-            
-            matches = cursor.fetchall()
-            for match in matches:
-                home_id = match["home_team_id"]
-                away_id = match["away_team_id"]
-                home_goals = match["home_goals"]
-                away_goals = match["away_goals"]
-                
-                # Stelle sicher, dass beide Teams existieren
-                if home_id not in team_stats or away_id not in team_stats:
-                    continue
-                
-                # Aktualisiere Spiele-Anzahl
-                team_stats[home_id]["games"] += 1
-                team_stats[away_id]["games"] += 1
-                
-                # Aktualisiere Tore
-                team_stats[home_id]["goals_for"] += home_goals
-                team_stats[home_id]["goals_against"] += away_goals
-                team_stats[away_id]["goals_for"] += away_goals
-                team_stats[away_id]["goals_against"] += home_goals
-                
-                # Bestimme Ergebnis und vergebe Punkte
-                if home_goals > away_goals:  # Heimsieg
-                    team_stats[home_id]["wins"] += 1
-                    team_stats[home_id]["points"] += 3
-                    team_stats[away_id]["losses"] += 1
-                elif home_goals < away_goals:  # Auswärtssieg
-                    team_stats[away_id]["wins"] += 1
-                    team_stats[away_id]["points"] += 3
-                    team_stats[home_id]["losses"] += 1
-                else:  # Unentschieden
-                    team_stats[home_id]["draws"] += 1
-                    team_stats[home_id]["points"] += 1
-                    team_stats[away_id]["draws"] += 1
-                    team_stats[away_id]["points"] += 1
-            
-            # Berechne Tordifferenz und erstelle finale Tabelle
-            table = []
-            for team_id, stats in team_stats.items():
-                stats["goal_difference"] = stats["goals_for"] - stats["goals_against"]
-                table.append(stats)
-            
-            # Sortiere nach Bundesliga-Regeln: 1. Punkte, 2. Tordifferenz, 3. Tore
-            table.sort(key=lambda x: (-x["points"], -x["goal_difference"], -x["goals_for"]))
-            
-            # Setze Positionen
-            for i, entry in enumerate(table):
-                entry["position"] = i + 1
-            
-            conn.close()
-            return table
-        
-        # Fallback: Keine Daten verfügbar
-        conn.close()
-        return []
+        # Tabelle bis Spieltag n hängt nur an den Spieltagen 1..n der Partition
+        tags = ({f"matchday:{league}:{season}:{day}" for day in range(1, matchday + 1)}
+                if matchday is not None else {f"season:{league}:{season}"})
+        return await cached_plan(request, "table", matchday, league, season, tags=tags)
         
     except Exception as e:
         print(f"Error in get_table: {str(e)}")
         # Fallback-Tabelle mit 0-Werten falls Fehler
-        try:
-            conn = get_db_connection()
+        def query(conn):
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -221,495 +401,523 @@ async def get_table():
                 })
                 position += 1
             
-            conn.close()
             return table
+            
+        try:
+            return await read_json(query)
         except:
             return []
 
-@app.get("/api/next-matchday")
-async def get_next_matchday():
-    """Nächster Spieltag mit Matches für Frontend Homepage"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Prüfe zuerst matches_real Tabelle (hat die aktuellen Daten!)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            # Hole nächsten Spieltag aus matches_real Tabelle  
-            cursor.execute("""
-                SELECT DISTINCT matchday, season 
-                FROM matches_real 
-                WHERE is_finished = 0 OR is_finished IS NULL
-                ORDER BY season DESC, matchday ASC 
-                LIMIT 1
-            """)
-            
-            matchday_result = cursor.fetchone()
-            if matchday_result:
-                matchday = matchday_result["matchday"]
-                season = matchday_result["season"]
-                
-                # Hole alle Matches für diesen Spieltag mit Team-Details aus matches_real
-                cursor.execute("""
-                    SELECT 
-                        mr.id as match_id,
-                        mr.matchday,
-                        mr.season,
-                        mr.match_date as date,
-                        mr.is_finished,
-                        mr.home_goals,
-                        mr.away_goals,
-                        mr.home_team_id,
-                        mr.home_team_name,
-                        mr.away_team_id,
-                        mr.away_team_name,
-                        tr_home.short_name as home_team_short,
-                        tr_home.icon_url as home_team_logo,
-                        tr_away.short_name as away_team_short,
-                        tr_away.icon_url as away_team_logo
-                    FROM matches_real mr
-                    LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
-                    LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
-                    WHERE mr.matchday = ? AND mr.season = ?
-                    ORDER BY mr.match_date
-                """, (matchday, season))
-                
-                matches = []
-                for row in cursor.fetchall():
-                    matches.append({
-                        "id": row["match_id"],
-                        "home_team": {
-                            "id": row["home_team_id"],
-                            "name": row["home_team_name"],
-                            "short_name": row["home_team_short"] or row["home_team_name"],
-                            "logo_url": row["home_team_logo"]
-                        },
-                        "away_team": {
-                            "id": row["away_team_id"],
-                            "name": row["away_team_name"],
-                            "short_name": row["away_team_short"] or row["away_team_name"],
-                            "logo_url": row["away_team_logo"]
-                        },
-                        "date": row["date"],
-                        "matchday": row["matchday"],
-                        "season": row["season"],
-                        "is_finished": bool(row["is_finished"]) if row["is_finished"] is not None else False,
-                        "home_goals": row["home_goals"],
-                        "away_goals": row["away_goals"]
-                    })
-                
-                conn.close()
-                return {
-                    "matchday": matchday,
-                    "season": season,
-                    "matches": matches
-                }
-        
-        # Fallback: Prüfe ob matches Tabelle existiert
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches'")
-        matches_table_exists = cursor.fetchone() is not None
-        
-        if matches_table_exists:
-            # Hole nächsten Spieltag aus matches Tabelle
-            cursor.execute("""
-                SELECT DISTINCT matchday, season 
-                FROM matches 
-                ORDER BY season DESC, matchday ASC 
-                LIMIT 1
-            """)
-            
-            matchday_result = cursor.fetchone()
-            if matchday_result:
-                matchday = matchday_result["matchday"]
-                season = matchday_result["season"]
-                
-                # Hole alle Matches für diesen Spieltag mit Team-Details
-                cursor.execute("""
-                    SELECT 
-                        m.id as match_id,
-                        m.matchday,
-                        m.season,
-                        m.date,
-                        m.home_goals,
-                        m.away_goals,
-                        ht.external_id as home_team_id,
-                        ht.name as home_team_name,
-                        ht.short_name as home_team_short,
-                        ht.logo_url as home_team_logo,
-                        at.external_id as away_team_id,
-                        at.name as away_team_name,
-                        at.short_name as away_team_short,
-                        at.logo_url as away_team_logo
-                    FROM matches m
-                    JOIN teams ht ON m.home_team_id = ht.id
-                    JOIN teams at ON m.away_team_id = at.id
-                    WHERE m.matchday = ? AND m.season = ?
-                    ORDER BY m.date
-                """, (matchday, season))
-                
-                matches = []
-                for row in cursor.fetchall():
-                    matches.append({
-                        "id": row["match_id"],
-                        "home_team": {
-                            "id": row["home_team_id"],
-                            "name": row["home_team_name"],
-                            "short_name": row["home_team_short"],
-                            "logo_url": row["home_team_logo"]
-                        },
-                        "away_team": {
-                            "id": row["away_team_id"],
-                            "name": row["away_team_name"],
-                            "short_name": row["away_team_short"],
-                            "logo_url": row["away_team_logo"]
-                        },
-                        "date": row["date"],
-                        "matchday": row["matchday"],
-                        "season": row["season"],
-                        "is_finished": False,  # Standard für matches ohne is_finished Feld
-                        "home_goals": row["home_goals"],
-                        "away_goals": row["away_goals"]
-                    })
-                
-                conn.close()
-                return {
-                    "matchday": matchday,
-                    "season": season,
-                    "matches": matches
-                }
-        
-        # Fallback: Verwende matches_real Tabelle falls vorhanden
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            cursor.execute("""
-                SELECT DISTINCT matchday, season 
-                FROM matches_real 
-                ORDER BY season DESC, matchday ASC 
-                LIMIT 1
-            """)
-            
-            matchday_result = cursor.fetchone()
-            if matchday_result:
-                matchday = matchday_result["matchday"]
-                season = matchday_result["season"]
-                
-                # Hole Matches mit Team-Details aus matches_real und teams_real
-                cursor.execute("""
-                    SELECT 
-                        mr.match_id,
-                        mr.matchday,
-                        mr.season,
-                        mr.match_date,
-                        mr.is_finished,
-                        mr.home_goals,
-                        mr.away_goals,
-                        mr.home_team_id,
-                        mr.home_team_name,
-                        mr.away_team_id,
-                        mr.away_team_name,
-                        ht.short_name as home_team_short,
-                        ht.icon_url as home_team_logo,
-                        at.short_name as away_team_short,
-                        at.icon_url as away_team_logo
-                    FROM matches_real mr
-                    LEFT JOIN teams_real ht ON mr.home_team_id = ht.team_id
-                    LEFT JOIN teams_real at ON mr.away_team_id = at.team_id
-                    WHERE mr.matchday = ? AND mr.season = ?
-                    ORDER BY mr.match_date
-                """, (matchday, season))
-                
-                matches = []
-                for row in cursor.fetchall():
-                    matches.append({
-                        "id": row["match_id"],
-                        "home_team": {
-                            "id": row["home_team_id"],
-                            "name": row["home_team_name"],
-                            "short_name": row["home_team_short"] or row["home_team_name"][:3],
-                            "logo_url": row["home_team_logo"] or ""
-                        },
-                        "away_team": {
-                            "id": row["away_team_id"],
-                            "name": row["away_team_name"],
-                            "short_name": row["away_team_short"] or row["away_team_name"][:3],
-                            "logo_url": row["away_team_logo"] or ""
-                        },
-                        "date": row["match_date"],
-                        "matchday": row["matchday"],
-                        "season": row["season"],
-                        "is_finished": bool(row["is_finished"]),
-                        "home_goals": row["home_goals"],
-                        "away_goals": row["away_goals"]
-                    })
-                
-                conn.close()
-                return {
-                    "matchday": matchday,
-                    "season": season,
-                    "matches": matches
-                }
-        
-        # Fallback: Generiere Dummy-Matches basierend auf Teams
+@schema.plan("next_matchday", requires=("matches_real",))
+def _next_matchday_from_matches_real(cursor, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Nächster Spieltag einer Partition mit offenen Spielen aus matches_real"""
+    # Hole nächsten Spieltag aus matches_real Tabelle (offene Spiele über
+    # idx_matches_real_partition_open, Zeilen ohne Status (NULL) zählen als offen)
+    cursor.execute("""
+        SELECT MIN(matchday) AS matchday FROM (
+            SELECT MIN(matchday) AS matchday FROM matches_real
+            WHERE league = ? AND season = ? AND is_finished = 0
+            UNION ALL
+            SELECT MIN(matchday) FROM matches_real
+            WHERE league = ? AND season = ? AND is_finished IS NULL
+        )
+    """, (league, season, league, season))
+
+    matchday_result = cursor.fetchone()
+    if matchday_result["matchday"] is not None:
+        matchday = matchday_result["matchday"]
+
+        # Hole alle Matches für diesen Spieltag mit Team-Details aus matches_real
         cursor.execute("""
-            SELECT external_id, name, short_name, logo_url
-            FROM teams 
-            ORDER BY name
-            LIMIT 18
-        """)
-        teams = cursor.fetchall()
-        
-        if len(teams) >= 2:
-            matches = []
-            # Erstelle einige Dummy-Matches
-            for i in range(0, min(len(teams)-1, 8), 2):
-                if i+1 < len(teams):
-                    matches.append({
-                        "id": i+1,
-                        "home_team": {
-                            "id": teams[i]["external_id"],
-                            "name": teams[i]["name"],
-                            "short_name": teams[i]["short_name"],
-                            "logo_url": teams[i]["logo_url"]
-                        },
-                        "away_team": {
-                            "id": teams[i+1]["external_id"],
-                            "name": teams[i+1]["name"],
-                            "short_name": teams[i+1]["short_name"],
-                            "logo_url": teams[i+1]["logo_url"]
-                        },
-                        "date": "2025-09-21T15:30:00Z",
-                        "matchday": 1,
-                        "season": "2025",
-                        "is_finished": False,
-                        "home_goals": None,
-                        "away_goals": None
-                    })
-            
-            conn.close()
-            return {
-                "matchday": 1,
-                "season": "2025",
-                "matches": matches
-            }
-        
-        conn.close()
+            SELECT 
+                mr.id as match_id,
+                mr.matchday,
+                mr.season,
+                mr.match_date as date,
+                mr.is_finished,
+                mr.home_goals,
+                mr.away_goals,
+                mr.home_team_id,
+                mr.home_team_name,
+                mr.away_team_id,
+                mr.away_team_name,
+                tr_home.short_name as home_team_short,
+                tr_home.icon_url as home_team_logo,
+                tr_away.short_name as away_team_short,
+                tr_away.icon_url as away_team_logo
+            FROM matches_real mr
+            LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
+            LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
+            WHERE mr.league = ? AND mr.season = ? AND mr.matchday = ?
+            ORDER BY mr.match_date
+        """, (league, season, matchday))
+
+        matches = []
+        for row in cursor.fetchall():
+            matches.append({
+                "id": row["match_id"],
+                "home_team": {
+                    "id": row["home_team_id"],
+                    "name": row["home_team_name"],
+                    "short_name": row["home_team_short"] or row["home_team_name"],
+                    "logo_url": row["home_team_logo"]
+                },
+                "away_team": {
+                    "id": row["away_team_id"],
+                    "name": row["away_team_name"],
+                    "short_name": row["away_team_short"] or row["away_team_name"],
+                    "logo_url": row["away_team_logo"]
+                },
+                "date": row["date"],
+                "matchday": row["matchday"],
+                "season": row["season"],
+                "is_finished": bool(row["is_finished"]) if row["is_finished"] is not None else False,
+                "home_goals": row["home_goals"],
+                "away_goals": row["away_goals"]
+            })
+
+        return {
+            "matchday": matchday,
+            "season": season,
+            "matches": matches
+        }
+    
+    return _latest_matchday_from_matches_real(cursor, league, season)
+
+def _latest_matchday_from_matches_real(cursor, league: str, season: str):
+    """Letzter Spieltag aus matches_real, falls kein Spiel mehr offen ist"""
+    cursor.execute("""
+        SELECT DISTINCT matchday, season 
+        FROM matches_real 
+        WHERE league = ? AND season = ?
+        ORDER BY matchday ASC 
+        LIMIT 1
+    """, (league, season))
+
+    matchday_result = cursor.fetchone()
+    if matchday_result:
+        matchday = matchday_result["matchday"]
+        season = matchday_result["season"]
+
+        # Hole Matches mit Team-Details aus matches_real und teams_real
+        cursor.execute("""
+            SELECT 
+                mr.match_id,
+                mr.matchday,
+                mr.season,
+                mr.match_date,
+                mr.is_finished,
+                mr.home_goals,
+                mr.away_goals,
+                mr.home_team_id,
+                mr.home_team_name,
+                mr.away_team_id,
+                mr.away_team_name,
+                ht.short_name as home_team_short,
+                ht.icon_url as home_team_logo,
+                at.short_name as away_team_short,
+                at.icon_url as away_team_logo
+            FROM matches_real mr
+            LEFT JOIN teams_real ht ON mr.home_team_id = ht.team_id
+            LEFT JOIN teams_real at ON mr.away_team_id = at.team_id
+            WHERE mr.league = ? AND mr.season = ? AND mr.matchday = ?
+            ORDER BY mr.match_date
+        """, (league, season, matchday))
+
+        matches = []
+        for row in cursor.fetchall():
+            matches.append({
+                "id": row["match_id"],
+                "home_team": {
+                    "id": row["home_team_id"],
+                    "name": row["home_team_name"],
+                    "short_name": row["home_team_short"] or row["home_team_name"][:3],
+                    "logo_url": row["home_team_logo"] or ""
+                },
+                "away_team": {
+                    "id": row["away_team_id"],
+                    "name": row["away_team_name"],
+                    "short_name": row["away_team_short"] or row["away_team_name"][:3],
+                    "logo_url": row["away_team_logo"] or ""
+                },
+                "date": row["match_date"],
+                "matchday": row["matchday"],
+                "season": row["season"],
+                "is_finished": bool(row["is_finished"]),
+                "home_goals": row["home_goals"],
+                "away_goals": row["away_goals"]
+            })
+
+        return {
+            "matchday": matchday,
+            "season": season,
+            "matches": matches
+        }
+    
+    return _next_matchday_dummy(cursor)
+
+@schema.plan("next_matchday", requires=("matches",))
+def _next_matchday_from_matches(cursor, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Nächster Spieltag aus der alten matches Tabelle"""
+    # Hole nächsten Spieltag aus matches Tabelle
+    cursor.execute("""
+        SELECT DISTINCT matchday, season 
+        FROM matches 
+        ORDER BY season DESC, matchday ASC 
+        LIMIT 1
+    """)
+
+    matchday_result = cursor.fetchone()
+    if matchday_result:
+        matchday = matchday_result["matchday"]
+        season = matchday_result["season"]
+
+        # Hole alle Matches für diesen Spieltag mit Team-Details
+        cursor.execute("""
+            SELECT 
+                m.id as match_id,
+                m.matchday,
+                m.season,
+                m.date,
+                m.home_goals,
+                m.away_goals,
+                ht.external_id as home_team_id,
+                ht.name as home_team_name,
+                ht.short_name as home_team_short,
+                ht.logo_url as home_team_logo,
+                at.external_id as away_team_id,
+                at.name as away_team_name,
+                at.short_name as away_team_short,
+                at.logo_url as away_team_logo
+            FROM matches m
+            JOIN teams ht ON m.home_team_id = ht.id
+            JOIN teams at ON m.away_team_id = at.id
+            WHERE m.matchday = ? AND m.season = ?
+            ORDER BY m.date
+        """, (matchday, season))
+
+        matches = []
+        for row in cursor.fetchall():
+            matches.append({
+                "id": row["match_id"],
+                "home_team": {
+                    "id": row["home_team_id"],
+                    "name": row["home_team_name"],
+                    "short_name": row["home_team_short"],
+                    "logo_url": row["home_team_logo"]
+                },
+                "away_team": {
+                    "id": row["away_team_id"],
+                    "name": row["away_team_name"],
+                    "short_name": row["away_team_short"],
+                    "logo_url": row["away_team_logo"]
+                },
+                "date": row["date"],
+                "matchday": row["matchday"],
+                "season": row["season"],
+                "is_finished": False,  # Standard für matches ohne is_finished Feld
+                "home_goals": row["home_goals"],
+                "away_goals": row["away_goals"]
+            })
+
+        return {
+            "matchday": matchday,
+            "season": season,
+            "matches": matches
+        }
+    
+    return _next_matchday_dummy(cursor)
+
+@schema.plan("next_matchday")
+def _next_matchday_dummy(cursor, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Generiert Dummy-Matches basierend auf Teams"""
+    cursor.execute("""
+        SELECT external_id, name, short_name, logo_url
+        FROM teams 
+        ORDER BY name
+        LIMIT 18
+    """)
+    teams = cursor.fetchall()
+
+    if len(teams) >= 2:
+        matches = []
+        # Erstelle einige Dummy-Matches
+        for i in range(0, min(len(teams)-1, 8), 2):
+            if i+1 < len(teams):
+                matches.append({
+                    "id": i+1,
+                    "home_team": {
+                        "id": teams[i]["external_id"],
+                        "name": teams[i]["name"],
+                        "short_name": teams[i]["short_name"],
+                        "logo_url": teams[i]["logo_url"]
+                    },
+                    "away_team": {
+                        "id": teams[i+1]["external_id"],
+                        "name": teams[i+1]["name"],
+                        "short_name": teams[i+1]["short_name"],
+                        "logo_url": teams[i+1]["logo_url"]
+                    },
+                    "date": "2025-09-21T15:30:00Z",
+                    "matchday": 1,
+                    "season": season,
+                    "is_finished": False,
+                    "home_goals": None,
+                    "away_goals": None
+                })
+
         return {
             "matchday": 1,
-            "season": "2025",
-            "matches": []
+            "season": season,
+            "matches": matches
         }
+
+    return {
+        "matchday": 1,
+        "season": season,
+        "matches": []
+    }
+
+@app.get("/api/next-matchday")
+async def get_next_matchday(request: Request, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Nächster Spieltag mit Matches für Frontend Homepage"""
+    try:
+        return await cached_plan(request, "next_matchday", league, season, tags={f"season:{league}:{season}"})
             
     except Exception as e:
         return {
             "matchday": 1,
-            "season": "2025",
+            "season": season,
             "matches": [],
             "error": str(e)
         }
 
+@schema.plan("matchday_info", requires=("matches_real",))
+def _matchday_info_from_matches_real(cursor, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Spieltag-Übersicht einer Partition aus matches_real"""
+    cursor.execute("""
+        SELECT matchday, season, COUNT(*) as match_count
+        FROM matches_real 
+        WHERE league = ? AND season = ?
+        GROUP BY matchday
+        ORDER BY matchday DESC
+        LIMIT 10
+    """, (league, season))
+
+    matchdays = []
+    max_matchday = 0
+    current_season = None
+
+    for row in cursor.fetchall():
+        matchdays.append({
+            "matchday": row["matchday"],
+            "season": row["season"],
+            "match_count": row["match_count"]
+        })
+
+        if current_season is None:
+            current_season = row["season"]
+
+        if row["season"] == current_season and row["matchday"] > max_matchday:
+            max_matchday = row["matchday"]
+
+    # Gebe erweiterte Info zurück für Vorhersageseite
+    return {
+        "current_matchday": max_matchday,
+        "next_matchday": max_matchday + 1 if max_matchday < 34 else max_matchday,
+        "predictions_available_until": max_matchday,
+        "season": current_season or season,
+        "matchdays": matchdays
+    }
+
+@schema.plan("matchday_info", requires=("matches",))
+def _matchday_info_from_matches(cursor, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Spieltag-Übersicht aus der alten matches Tabelle"""
+    cursor.execute("""
+        SELECT matchday, season, COUNT(*) as match_count
+        FROM matches 
+        GROUP BY matchday, season
+        ORDER BY season DESC, matchday DESC
+        LIMIT 10
+    """)
+
+    matchdays = []
+    for row in cursor.fetchall():
+        matchdays.append({
+            "matchday": row["matchday"],
+            "season": row["season"],
+            "match_count": row["match_count"]
+        })
+
+    return {
+        "current_matchday": 1,
+        "next_matchday": 2,
+        "predictions_available_until": 1,
+        "season": season,
+        "matchdays": matchdays
+    }
+
 @app.get("/api/matchday-info")
-async def get_matchday_info():
+async def get_matchday_info(request: Request, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
     """Spieltag Informationen - verwendet matches_real für aktuelle Daten"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Prüfe zuerst matches_real Tabelle (hat aktuelle Daten)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            cursor.execute("""
-                SELECT matchday, season, COUNT(*) as match_count
-                FROM matches_real 
-                GROUP BY matchday, season
-                ORDER BY season DESC, matchday DESC
-                LIMIT 10
-            """)
-            
-            matchdays = []
-            max_matchday = 0
-            current_season = None
-            
-            for row in cursor.fetchall():
-                matchdays.append({
-                    "matchday": row["matchday"],
-                    "season": row["season"],
-                    "match_count": row["match_count"]
-                })
-                
-                if current_season is None:
-                    current_season = row["season"]
-                    
-                if row["season"] == current_season and row["matchday"] > max_matchday:
-                    max_matchday = row["matchday"]
-            
-            # Gebe erweiterte Info zurück für Vorhersageseite
-            conn.close()
-            return {
-                "current_matchday": max_matchday,
-                "next_matchday": max_matchday + 1 if max_matchday < 34 else max_matchday,
-                "predictions_available_until": max_matchday,
-                "season": current_season or "2025",
-                "matchdays": matchdays
-            }
-        
-        # Fallback: verwende matches Tabelle
-        cursor.execute("""
-            SELECT matchday, season, COUNT(*) as match_count
-            FROM matches 
-            GROUP BY matchday, season
-            ORDER BY season DESC, matchday DESC
-            LIMIT 10
-        """)
-        
-        matchdays = []
-        for row in cursor.fetchall():
-            matchdays.append({
-                "matchday": row["matchday"],
-                "season": row["season"],
-                "match_count": row["match_count"]
-            })
-        
-        conn.close()
-        return {
-            "current_matchday": 1,
-            "next_matchday": 2,
-            "predictions_available_until": 1,
-            "season": "2025",
-            "matchdays": matchdays
-        }
+        return await cached_plan(request, "matchday_info", league, season, tags={f"season:{league}:{season}"})
         
     except Exception as e:
         return {
             "current_matchday": 1,
             "next_matchday": 2,
             "predictions_available_until": 1,
-            "season": "2025",
+            "season": season,
             "matchdays": []
         }
 
+def _prediction_entries(rows, fixture_predictions):
+    """Antwort von /api/predictions/{n} aus Spielzeilen und Vorhersagen (Format von predict_fixtures)"""
+    predictions = []
+    for row, prediction_result in zip(rows, fixture_predictions):
+        if prediction_result is not None:
+            # Extrahiere Werte aus xG-Modell
+            home_win_prob = prediction_result['home_win_prob']
+            draw_prob = prediction_result['draw_prob']
+            away_win_prob = prediction_result['away_win_prob']
+            predicted_score = prediction_result['predicted_score']
+
+            # Erstelle form_factors mit ECHTER Anzahl Tore aus letzten 14 Spielen
+            form_factors = {
+                "home_form": round(prediction_result['home_form'] * 100, 1),
+                "away_form": round(prediction_result['away_form'] * 100, 1),
+                "home_goals_last_14": prediction_result['home_goals_last_14'],
+                "away_goals_last_14": prediction_result['away_goals_last_14']
+            }
+        else:
+            # Fallback bei Fehlern
+            home_win_prob = 0.4
+            draw_prob = 0.3
+            away_win_prob = 0.3
+            predicted_score = "1:1"
+            form_factors = {
+                "home_form": 50.0,
+                "away_form": 50.0,
+                "home_goals_last_14": 0,  # Fallback auf 0 statt 14
+                "away_goals_last_14": 0   # Fallback auf 0 statt 14
+            }
+
+        predictions.append({
+            "match": {
+                "id": row["match_id"],
+                "home_team": {
+                    "id": row["home_team_id"],
+                    "name": row["home_team_name"],
+                    "short_name": row["home_team_short"] or row["home_team_name"],
+                    "logo_url": row["home_team_logo"]
+                },
+                "away_team": {
+                    "id": row["away_team_id"],
+                    "name": row["away_team_name"],
+                    "short_name": row["away_team_short"] or row["away_team_name"],
+                    "logo_url": row["away_team_logo"]
+                },
+                "date": row["date"],
+                "matchday": row["matchday"],
+                "season": row["season"]
+            },
+            "home_win_prob": round(home_win_prob, 3),
+            "draw_prob": round(draw_prob, 3),
+            "away_win_prob": round(away_win_prob, 3),
+            "predicted_score": predicted_score,
+            "form_factors": form_factors
+        })
+        if prediction_result is not None and "over_under" in prediction_result:
+            predictions[-1]["over_under"] = {
+                line: round(prob, 3) for line, prob in prediction_result["over_under"].items()
+            }
+
+    return predictions
+
+@schema.plan("matchday_predictions", requires=("matches_real", "predictions_real", "prediction_runs"))
+def _matchday_predictions_stored(cursor, matchday: int, model: str = "linear",
+                                 league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """
+    Vorberechnete Vorhersagen aus predictions_real (fehlende Spiele mit dem Stand
+    vor dem Anstoß nachgerechnet); live gerechnet, wenn die Partition nicht aktuell ist
+    """
+    stored = load_stored_predictions(cursor, league, season, matchday, model)
+    if stored is None:
+        return _matchday_predictions_from_matches_real(cursor, matchday, model, league, season)
+    return _prediction_entries(*zip(*stored))
+
+@schema.plan("matchday_predictions", requires=("matches_real",))
+def _matchday_predictions_from_matches_real(cursor, matchday: int, model: str = "linear",
+                                            league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Vorhersagen für einen Spieltag einer Partition aus matches_real"""
+    # Hole alle Matches für diesen Spieltag aus matches_real
+    cursor.execute("""
+        SELECT 
+            mr.id as match_id,
+            mr.matchday,
+            mr.season,
+            mr.match_date as date,
+            mr.is_finished,
+            mr.home_goals,
+            mr.away_goals,
+            mr.home_team_id,
+            mr.home_team_name,
+            mr.away_team_id,
+            mr.away_team_name,
+            tr_home.short_name as home_team_short,
+            tr_home.icon_url as home_team_logo,
+            tr_away.short_name as away_team_short,
+            tr_away.icon_url as away_team_logo
+        FROM matches_real mr
+        LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
+        LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
+        WHERE mr.league = ? AND mr.season = ? AND mr.matchday = ?
+        ORDER BY mr.match_date
+    """, (league, season, matchday))
+
+    rows = cursor.fetchall()
+
+    # ✅ VERWENDE DAS EINHEITLICHE xG-VORHERSAGEMODELL ✅
+    # Gebündelt: eine Abfrage für die 14er-Fenster aller Teams des Spieltags,
+    # mit Snapshots wie die gespeicherten Vorhersagen zum Stand vor dem Anstoß
+    try:
+        if schema.has("team_stats_snapshot"):
+            fixture_predictions = predict_as_of_kickoff(cursor, rows, model)
+        else:
+            fixture_predictions = predict_fixtures(
+                cursor, [(row["home_team_id"], row["away_team_id"]) for row in rows], model=model
+            )
+    except Exception as e:
+        print(f"xG batch prediction error for matchday {matchday}: {e}")
+        fixture_predictions = [None] * len(rows)
+
+    return _prediction_entries(rows, fixture_predictions)
+
+@schema.plan("matchday_predictions")
+def _matchday_predictions_empty(cursor, matchday: int, model: str = "linear",
+                                league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Keine Vorhersagen verfügbar"""
+    return []
+
 @app.get("/api/predictions/{matchday}")
-async def get_predictions_for_matchday(matchday: int):
-    """Vorhersagen für einen bestimmten Spieltag - echte Implementierung wie lokale App"""
+async def get_predictions_for_matchday(request: Request, matchday: int,
+                                       model: Literal["linear", "poisson"] = "linear",
+                                       league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """
+    Vorhersagen für einen bestimmten Spieltag - echte Implementierung wie lokale App
+
+    Mit ?model=poisson kommen Wahrscheinlichkeiten und Tipp aus der
+    Poisson-Ergebnismatrix, zusätzlich mit Over/Under-Wahrscheinlichkeiten
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Prüfe zuerst matches_real Tabelle (hat aktuelle Daten)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            # Hole alle Matches für diesen Spieltag aus matches_real
-            cursor.execute("""
-                SELECT 
-                    mr.id as match_id,
-                    mr.matchday,
-                    mr.season,
-                    mr.match_date as date,
-                    mr.is_finished,
-                    mr.home_goals,
-                    mr.away_goals,
-                    mr.home_team_id,
-                    mr.home_team_name,
-                    mr.away_team_id,
-                    mr.away_team_name,
-                    tr_home.short_name as home_team_short,
-                    tr_home.icon_url as home_team_logo,
-                    tr_away.short_name as away_team_short,
-                    tr_away.icon_url as away_team_logo
-                FROM matches_real mr
-                LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
-                LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
-                WHERE mr.matchday = ? AND mr.season = '2025'
-                ORDER BY mr.match_date
-            """, (matchday,))
-            
-            predictions = []
-            for row in cursor.fetchall():
-                # ✅ VERWENDE DAS EINHEITLICHE xG-VORHERSAGEMODELL ✅
-                home_team_id = row["home_team_id"]
-                away_team_id = row["away_team_id"]
-                
-                try:
-                    # Berechne Vorhersage mit einheitlichem xG-Modell
-                    prediction_result = await predict_match_xg(cursor, home_team_id, away_team_id)
-                    
-                    # Extrahiere Werte aus xG-Modell
-                    home_win_prob = prediction_result['home_win_prob']
-                    draw_prob = prediction_result['draw_prob']
-                    away_win_prob = prediction_result['away_win_prob']
-                    predicted_score = prediction_result['predicted_score']
-                    
-                    # ✅ KORRIGIERT: Hole ECHTE Anzahl Tore aus letzten 14 Spielen
-                    home_goals_last_14 = await get_team_goals_last_n_matches(cursor, home_team_id, 14)
-                    away_goals_last_14 = await get_team_goals_last_n_matches(cursor, away_team_id, 14)
-                    
-                    # Erstelle form_factors mit korrigierten Werten
-                    form_factors = {
-                        "home_form": round(prediction_result['home_form'] * 100, 1),
-                        "away_form": round(prediction_result['away_form'] * 100, 1),
-                        "home_goals_last_14": home_goals_last_14,  # Echte Anzahl Tore
-                        "away_goals_last_14": away_goals_last_14   # Echte Anzahl Tore
-                    }
-                    
-                except Exception as e:
-                    print(f"xG prediction error for match {row['match_id']}: {e}")
-                    # Fallback bei Fehlern
-                    home_win_prob = 0.4
-                    draw_prob = 0.3
-                    away_win_prob = 0.3
-                    predicted_score = "1:1"
-                    form_factors = {
-                        "home_form": 50.0,
-                        "away_form": 50.0,
-                        "home_goals_last_14": 0,  # Fallback auf 0 statt 14
-                        "away_goals_last_14": 0   # Fallback auf 0 statt 14
-                    }
-                
-                predictions.append({
-                    "match": {
-                        "id": row["match_id"],
-                        "home_team": {
-                            "id": row["home_team_id"],
-                            "name": row["home_team_name"],
-                            "short_name": row["home_team_short"] or row["home_team_name"],
-                            "logo_url": row["home_team_logo"]
-                        },
-                        "away_team": {
-                            "id": row["away_team_id"],
-                            "name": row["away_team_name"],
-                            "short_name": row["away_team_short"] or row["away_team_name"],
-                            "logo_url": row["away_team_logo"]
-                        },
-                        "date": row["date"],
-                        "matchday": row["matchday"],
-                        "season": row["season"]
-                    },
-                    "home_win_prob": round(home_win_prob, 3),
-                    "draw_prob": round(draw_prob, 3),
-                    "away_win_prob": round(away_win_prob, 3),
-                    "predicted_score": predicted_score,
-                    "form_factors": form_factors
-                })
-            
-            conn.close()
-            return predictions
-        
-        # Fallback: keine Vorhersagen verfügbar
-        conn.close()
-        return []
+        return await cached_plan(request, "matchday_predictions", matchday, model, league, season)
         
     except Exception as e:
         print(f"Error in get_predictions_for_matchday: {str(e)}")
         return []
 
+
 # ===== EINHEITLICHES VORHERSAGEMODELL MIT xG =====
 
 async def get_team_form_from_db(cursor, team_id: int) -> float:
@@ -726,10 +934,10 @@ async def get_team_form_from_db(cursor, team_id: int) -> float:
             FROM matches_real mr
             WHERE (mr.home_team_id = ? OR mr.away_team_id = ?)
                 AND mr.is_finished = 1
-                AND mr.season IN ('2024', '2025')
+                AND mr.season IN (?, ?)
             ORDER BY mr.match_date DESC
             LIMIT 14
-        """, (team_id, team_id))
+        """, (team_id, team_id, *FORM_SEASONS))
         
         matches = cursor.fetchall()
         if not matches:
@@ -849,10 +1057,10 @@ async def get_team_expected_goals(cursor, team_id: int, num_matches: int = 14) -
             FROM matches_real mr
             WHERE (mr.home_team_id = ? OR mr.away_team_id = ?)
                 AND mr.is_finished = 1
-                AND mr.season IN ('2024', '2025')
+                AND mr.season IN (?, ?)
             ORDER BY mr.match_date DESC
             LIMIT ?
-        """, (team_id, team_id, num_matches))
+        """, (team_id, team_id, *FORM_SEASONS, num_matches))
         
         matches = cursor.fetchall()
         if not matches:
@@ -891,12 +1099,12 @@ async def get_team_goals_last_n_matches(cursor, team_id: int, n: int = 14) -> in
             FROM matches_real mr
             WHERE (mr.home_team_id = ? OR mr.away_team_id = ?)
                 AND mr.is_finished = 1
-                AND mr.season IN ('2024', '2025')
+                AND mr.season IN (?, ?)
                 AND mr.home_goals IS NOT NULL 
                 AND mr.away_goals IS NOT NULL
             ORDER BY mr.match_date DESC
             LIMIT ?
-        """, (team_id, team_id, n))
+        """, (team_id, team_id, *FORM_SEASONS, n))
         
         matches = cursor.fetchall()
         if not matches:
@@ -921,113 +1129,119 @@ async def get_team_goals_last_n_matches(cursor, team_id: int, n: int = 14) -> in
         return 0  # Fallback auf 0 statt 14
 
 @app.get("/api/team/{team_id}/form")
-async def get_team_form(team_id: int):
+async def get_team_form(request: Request, team_id: int):
     """Team-Form basierend auf letzten 14 Spielen - exakt wie lokale App"""
-    try:
-        conn = get_db_connection()
+    def query(conn):
         cursor = conn.cursor()
         
-        # Berechne Form basierend auf letzten 14 Spielen (wie in der lokalen App)
-        form = await get_team_form_from_db(cursor, team_id)
+        # Form aus dem materialisierten Snapshot, sonst live aus den letzten 14 Spielen
+        snapshot = get_team_snapshot(cursor, team_id) if schema.has("team_stats_snapshot") else None
+        if snapshot is not None:
+            form = snapshot["form"]
+        else:
+            form = float(compute_team_stats(load_team_windows(cursor, [team_id]), [team_id])["form"][0])
         
-        conn.close()
         return {
             "details": {
                 "form_percentage": form * 100  # Frontend erwartet Prozent-Wert
             }
         }
         
+    try:
+        return await cached_json(request, query, tags={f"team:{team_id}"})
     except Exception as e:
         print(f"Error in get_team_form: {str(e)}")
         return {"details": {"form_percentage": 50.0}}
 
+@schema.plan("team_matches", requires=("matches_real",))
+def _team_matches_from_matches_real(cursor, team_id: int):
+    """Letzte 14 beendete Spiele eines Teams aus matches_real"""
+    # Hole die letzten Spiele des Teams aus matches_real
+    cursor.execute("""
+        SELECT 
+            mr.id as match_id,
+            mr.matchday,
+            mr.season,
+            mr.match_date as date,
+            mr.is_finished,
+            mr.home_goals,
+            mr.away_goals,
+            mr.home_team_id,
+            mr.home_team_name,
+            mr.away_team_id,
+            mr.away_team_name,
+            tr_home.short_name as home_team_short,
+            tr_home.icon_url as home_team_logo,
+            tr_away.short_name as away_team_short,
+            tr_away.icon_url as away_team_logo
+        FROM (
+            -- Heim- und Auswärtsspiele getrennt, damit beide Team-Indizes greifen
+            SELECT id FROM matches_real
+            WHERE home_team_id = ? AND is_finished = 1 AND season IN (?, ?)
+            UNION ALL
+            SELECT id FROM matches_real
+            WHERE away_team_id = ? AND is_finished = 1 AND season IN (?, ?)
+        ) tm
+        JOIN matches_real mr ON mr.id = tm.id
+        LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
+        LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
+        ORDER BY mr.match_date DESC
+        LIMIT 14
+    """, (team_id, *FORM_SEASONS, team_id, *FORM_SEASONS))
+
+    matches = []
+    for row in cursor.fetchall():
+        # Berechne xG-Werte (vereinfacht basierend auf Toren, da keine echten xG-Daten)
+        home_goals = row["home_goals"] or 0
+        away_goals = row["away_goals"] or 0
+
+        # Vereinfachte xG-Berechnung: Basis-xG + Variation basierend auf Toren
+        home_xg = max(0.1, home_goals + (0.3 if home_goals > 0 else 0))
+        away_xg = max(0.1, away_goals + (0.3 if away_goals > 0 else 0))
+
+        # Füge etwas Realismus hinzu
+        if home_goals == 0:
+            home_xg = 0.8  # Hatten Chancen aber nicht getroffen
+        if away_goals == 0:
+            away_xg = 0.7
+
+        matches.append({
+            "match": {
+                "id": row["match_id"],
+                "home_team": {
+                    "id": row["home_team_id"],
+                    "name": row["home_team_name"],
+                    "short_name": row["home_team_short"] or row["home_team_name"],
+                    "logo_url": row["home_team_logo"]
+                },
+                "away_team": {
+                    "id": row["away_team_id"],
+                    "name": row["away_team_name"],
+                    "short_name": row["away_team_short"] or row["away_team_name"],
+                    "logo_url": row["away_team_logo"]
+                },
+                "date": row["date"],
+                "matchday": row["matchday"],
+                "season": row["season"]
+            },
+            "home_goals": home_goals,
+            "away_goals": away_goals,
+            "home_xg": home_xg,
+            "away_xg": away_xg
+        })
+
+    return matches
+
+@schema.plan("team_matches")
+def _team_matches_empty(cursor, team_id: int):
+    """Keine Daten verfügbar"""
+    return []
+
 @app.get("/api/team/{team_id}/matches")
-async def get_team_matches(team_id: int):
+async def get_team_matches(request: Request, team_id: int):
     """Letzte Spiele eines Teams mit xG-Daten - exakt wie lokale App"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Prüfe zuerst matches_real Tabelle
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='matches_real'")
-        matches_real_exists = cursor.fetchone() is not None
-        
-        if matches_real_exists:
-            # Hole die letzten Spiele des Teams aus matches_real
-            cursor.execute("""
-                SELECT 
-                    mr.id as match_id,
-                    mr.matchday,
-                    mr.season,
-                    mr.match_date as date,
-                    mr.is_finished,
-                    mr.home_goals,
-                    mr.away_goals,
-                    mr.home_team_id,
-                    mr.home_team_name,
-                    mr.away_team_id,
-                    mr.away_team_name,
-                    tr_home.short_name as home_team_short,
-                    tr_home.icon_url as home_team_logo,
-                    tr_away.short_name as away_team_short,
-                    tr_away.icon_url as away_team_logo
-                FROM matches_real mr
-                LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
-                LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
-                WHERE (mr.home_team_id = ? OR mr.away_team_id = ?)
-                    AND mr.is_finished = 1
-                    AND mr.season IN ('2024', '2025')
-                ORDER BY mr.match_date DESC
-                LIMIT 14
-            """, (team_id, team_id))
-            
-            matches = []
-            for row in cursor.fetchall():
-                # Berechne xG-Werte (vereinfacht basierend auf Toren, da keine echten xG-Daten)
-                home_goals = row["home_goals"] or 0
-                away_goals = row["away_goals"] or 0
-                
-                # Vereinfachte xG-Berechnung: Basis-xG + Variation basierend auf Toren
-                home_xg = max(0.1, home_goals + (0.3 if home_goals > 0 else 0))
-                away_xg = max(0.1, away_goals + (0.3 if away_goals > 0 else 0))
-                
-                # Füge etwas Realismus hinzu
-                if home_goals == 0:
-                    home_xg = 0.8  # Hatten Chancen aber nicht getroffen
-                if away_goals == 0:
-                    away_xg = 0.7
-                    
-                matches.append({
-                    "match": {
-                        "id": row["match_id"],
-                        "home_team": {
-                            "id": row["home_team_id"],
-                            "name": row["home_team_name"],
-                            "short_name": row["home_team_short"] or row["home_team_name"],
-                            "logo_url": row["home_team_logo"]
-                        },
-                        "away_team": {
-                            "id": row["away_team_id"],
-                            "name": row["away_team_name"],
-                            "short_name": row["away_team_short"] or row["away_team_name"],
-                            "logo_url": row["away_team_logo"]
-                        },
-                        "date": row["date"],
-                        "matchday": row["matchday"],
-                        "season": row["season"]
-                    },
-                    "home_goals": home_goals,
-                    "away_goals": away_goals,
-                    "home_xg": home_xg,
-                    "away_xg": away_xg
-                })
-            
-            conn.close()
-            return matches
-        
-        # Fallback: keine Daten verfügbar
-        conn.close()
-        return []
+        return await cached_plan(request, "team_matches", team_id, tags={f"team:{team_id}"})
         
     except Exception as e:
         print(f"Error in get_team_matches: {str(e)}")
@@ -1036,8 +1250,7 @@ async def get_team_matches(team_id: int):
 @app.get("/api/predictions")
 async def get_predictions():
     """Vorhersage-Qualität (Legacy Endpoint)"""
-    try:
-        conn = get_db_connection()
+    def query(conn):
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -1064,147 +1277,62 @@ async def get_predictions():
                 "exact_score_correct": bool(row["exact_score_correct"])
             })
         
-        conn.close()
         return predictions
         
+    try:
+        return await read_json(query)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Vorhersagen: {str(e)}")
 
 @app.get("/api/prediction-quality")
-async def get_prediction_quality():
+async def get_prediction_quality(request: Request, model: Literal["linear", "poisson"] = "linear"):
     """Vorhersage-Qualitäts-Statistiken basierend auf echten matches_real Daten"""
-    try:
-        conn = get_db_connection()
+    def query(conn):
         cursor = conn.cursor()
         
-        # Hole die letzten 100 beendeten Spiele chronologisch
-        cursor.execute("""
-            SELECT 
-                m.id,
-                m.match_id,
-                m.season,
-                m.matchday,
-                m.home_team_name,
-                m.away_team_name,
-                m.home_goals,
-                m.away_goals,
-                m.home_team_id,
-                m.away_team_id,
-                m.match_date
-            FROM matches_real m
-            WHERE m.is_finished = 1
-            ORDER BY m.season DESC, m.matchday DESC, m.match_date DESC
-            LIMIT 100
-        """)
+        # Point-in-time Backtest: ein chronologischer Durchlauf über matches_real,
+        # jede Vorhersage nutzt die 14er-Fenster wie sie VOR dem Anstoß waren
+        backtest_result = backtest(cursor, FORM_SEASONS, model)
         
-        entries = []
-        exact_matches = 0
-        tendency_matches = 0
+        # Die letzten 100 beendeten Spiele
+        latest = sorted(
+            backtest_result["entries"],
+            key=lambda e: (e["season"], e["matchday"], e["match_date"]),
+            reverse=True
+        )[:100]
         
-        for row in cursor.fetchall():
-            # Verwende die echten Team-IDs aus matches_real
-            home_team_id = row[8]  # m.home_team_id
-            away_team_id = row[9]  # m.away_team_id
-            
-            # ✅ VERWENDE DAS EINHEITLICHE xG-VORHERSAGEMODELL ✅
-            try:
-                # Berechne Vorhersage mit einheitlichem xG-Modell
-                prediction_result = await predict_match_xg(cursor, home_team_id, away_team_id)
-                
-                # Extrahiere Werte aus xG-Modell
-                home_win_prob = prediction_result['home_win_prob']
-                draw_prob = prediction_result['draw_prob'] 
-                away_win_prob = prediction_result['away_win_prob']
-                predicted_score = prediction_result['predicted_score']
-                
-            except Exception as e:
-                print(f"xG Prediction error for match {row[0]}: {e}")
-                # Fallback wenn die Berechnung fehlschlägt
-                home_win_prob = 0.4
-                draw_prob = 0.3
-                away_win_prob = 0.3
-                predicted_score = "1:1"
-            
-            # Echtes Ergebnis
-            actual_home_goals = row[6]
-            actual_away_goals = row[7]
-            actual_score = f"{actual_home_goals}:{actual_away_goals}"
-            
-            # Bestimme Tendenz aus vorhergesagtem Score
-            predicted_parts = predicted_score.split(":")
-            predicted_home = int(predicted_parts[0])
-            predicted_away = int(predicted_parts[1])
-            
-            if predicted_home > predicted_away:
-                predicted_tendency = "home_win"
-            elif predicted_away > predicted_home:
-                predicted_tendency = "away_win"
-            else:
-                predicted_tendency = "draw"
-            
-            # Echte Tendenz
-            if actual_home_goals > actual_away_goals:
-                actual_tendency = "home_win"
-            elif actual_away_goals > actual_home_goals:
-                actual_tendency = "away_win"
-            else:
-                actual_tendency = "draw"
-            
-            # Bewertung
-            tendency_correct = predicted_tendency == actual_tendency
-            exact_score_correct = predicted_score == actual_score
-            
-            if tendency_correct:
-                tendency_matches += 1
-                if exact_score_correct:
-                    exact_matches += 1
-                    hit_type = "exact_score"
-                else:
-                    hit_type = "tendency_match"
-            else:
-                hit_type = "miss"
-            
+        entries = []
+        for entry in latest:
             entries.append({
                 "match": {
-                    "id": row[0],
+                    "id": entry["id"],
                     "home_team": {
-                        "id": home_team_id,
-                        "name": row[4],
-                        "short_name": row[4][:10]
+                        "id": entry["home_team_id"],
+                        "name": entry["home_team_name"],
+                        "short_name": entry["home_team_name"][:10]
                     },
                     "away_team": {
-                        "id": away_team_id,
-                        "name": row[5],
-                        "short_name": row[5][:10]
+                        "id": entry["away_team_id"],
+                        "name": entry["away_team_name"],
+                        "short_name": entry["away_team_name"][:10]
                     },
-                    "date": row[10],
-                    "matchday": row[3],
-                    "season": row[2]
+                    "date": entry["match_date"],
+                    "matchday": entry["matchday"],
+                    "season": entry["season"]
                 },
-                "predicted_score": predicted_score,
-                "actual_score": actual_score,
-                "predicted_home_win_prob": round(home_win_prob, 2),
-                "predicted_draw_prob": round(draw_prob, 2),
-                "predicted_away_win_prob": round(away_win_prob, 2),
-                "hit_type": hit_type,
-                "tendency_correct": tendency_correct,
-                "exact_score_correct": exact_score_correct
+                "predicted_score": entry["predicted_score"],
+                "actual_score": entry["actual_score"],
+                "predicted_home_win_prob": round(entry["home_win_prob"], 2),
+                "predicted_draw_prob": round(entry["draw_prob"], 2),
+                "predicted_away_win_prob": round(entry["away_win_prob"], 2),
+                "hit_type": entry["hit_type"],
+                "tendency_correct": entry["tendency_correct"],
+                "exact_score_correct": entry["exact_score_correct"]
             })
         
         # Berechne Statistiken
         total = len(entries)
-        misses = total - tendency_matches
-        
-        stats_data = {
-            "total_predictions": total,
-            "exact_matches": exact_matches,
-            "tendency_matches": tendency_matches,
-            "misses": misses,
-            "exact_match_rate": round((exact_matches / total), 3) if total > 0 else 0,
-            "tendency_match_rate": round((tendency_matches / total), 3) if total > 0 else 0,
-            "overall_accuracy": round((tendency_matches / total), 3) if total > 0 else 0,
-            "quality_score": round((exact_matches * 3 + tendency_matches * 1) / (total * 3), 3) if total > 0 else 0
-        }
+        stats_data = summarize(latest)
         
         result = {
             "entries": entries,
@@ -1213,9 +1341,10 @@ async def get_prediction_quality():
             "cached_at": datetime.now().isoformat()
         }
         
-        conn.close()
         return result
         
+    try:
+        return await cached_json(request, query)
     except Exception as e:
         print(f"Prediction quality error: {e}")
         return {
@@ -1236,10 +1365,9 @@ async def get_prediction_quality():
 
 # Daten-Management APIs für UpdatePage
 @app.get("/api/next-matchday-info")
-async def get_next_matchday_info():
+async def get_next_matchday_info(league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
     """Umfassende Spieltag-Informationen für UpdatePage"""
-    try:
-        conn = get_db_connection()
+    def query(conn):
         cursor = conn.cursor()
         
         # Aktuelle Saison und letzter kompletter Spieltag
@@ -1250,12 +1378,12 @@ async def get_next_matchday_info():
                 COUNT(CASE WHEN is_finished = 1 THEN 1 END) as finished_matches,
                 COUNT(*) as total_matches
             FROM matches_real 
-            WHERE season = '2025'
+            WHERE league = ? AND season = ?
             GROUP BY season
-        """)
+        """, (league, season))
         
         season_info = cursor.fetchone()
-        current_season = 2025
+        current_season = int(season)
         last_completed_matchday = 0
         
         if season_info:
@@ -1263,10 +1391,10 @@ async def get_next_matchday_info():
             cursor.execute("""
                 SELECT matchday, COUNT(*) as total, COUNT(CASE WHEN is_finished = 1 THEN 1 END) as finished
                 FROM matches_real 
-                WHERE season = '2025'
+                WHERE league = ? AND season = ?
                 GROUP BY matchday
                 ORDER BY matchday DESC
-            """)
+            """, (league, season))
             
             for row in cursor.fetchall():
                 if row[1] == row[2] and row[2] > 0:  # Alle Spiele des Spieltags beendet
@@ -1280,11 +1408,11 @@ async def get_next_matchday_info():
                 COUNT(*) as matches_count,
                 MIN(match_date) as next_match_date
             FROM matches_real 
-            WHERE season = '2025' AND is_finished = 0
+            WHERE league = ? AND season = ? AND is_finished = 0
             GROUP BY matchday
             ORDER BY matchday
             LIMIT 3
-        """)
+        """, (league, season))
         
         upcoming_matchdays = []
         for row in cursor.fetchall():
@@ -1298,7 +1426,7 @@ async def get_next_matchday_info():
         weekend_matches = 9  # Standard Bundesliga
         is_game_weekend = len(upcoming_matchdays) > 0
         
-        # Auto-Updater Status aus gameday_updater holen
+        # Auto-Updater Status aus gameday_updater holen (Job-Runner)
         try:
             from gameday_updater import get_updater_status
             auto_updater_status = get_updater_status()
@@ -1313,7 +1441,6 @@ async def get_next_matchday_info():
                 "next_scheduled_updates": []
             }
         
-        conn.close()
         return {
             "current_season": current_season,
             "last_completed_matchday": last_completed_matchday,
@@ -1327,6 +1454,8 @@ async def get_next_matchday_info():
             "auto_updater": auto_updater_status
         }
         
+    try:
+        return await read_json(query)
     except Exception as e:
         print(f"Next matchday info error: {e}")
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der Spieltag-Informationen: {str(e)}")
@@ -1337,147 +1466,189 @@ async def get_auto_updater_status():
     from gameday_updater import get_updater_status
     return get_updater_status()
 
+def _apply_openligadb_matches(conn, fetched, watermarks=None):
+    """
+    Schreibt die geladenen OpenLigaDB-Spieltage {(league, season, matchday): MatchRecords}
+    in matches_real und speichert ihre Änderungszeitpunkte (watermarks)
+    """
+    rows = [record.row() for records in fetched.values() for record in records]
+
+    # Ein gesammelter Upsert; bestehende Spiele übernehmen nur Anstoß und Ergebnis.
+    # Tabelle, Snapshots, Datenversion und Änderungslog folgen über den Feed.
+    result = ingest_matches(conn, rows, update_columns=RESULT_COLUMNS)
+
+    new_finished_matches = 0
+    for _, old, new in result["changes"]:
+        if new["is_finished"] and not (old and old["is_finished"]):
+            new_finished_matches += 1
+            if old:
+                print(f"✅ Neues Ergebnis: {new['home_team_name']} {new['home_goals']}:"
+                      f"{new['away_goals']} {new['away_team_name']}")
+
+    if watermarks and schema.has("sync_watermarks"):
+        save_watermarks(conn, watermarks)
+    schema.refresh(conn)
+    print(f"💾 {result['inserted']} Spiele neu, {result['updated']} aktualisiert, "
+          f"{result['unchanged']} unverändert, {new_finished_matches} neue Ergebnisse")
+    return result, new_finished_matches
+
+def _finished_matches_summary(conn, league: str = DEFAULT_LEAGUE, season: str = CURRENT_SEASON):
+    """Anzahl beendeter Spiele und letzter Spieltag mit Ergebnis einer Partition"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*), MAX(matchday) FROM matches_real
+        WHERE league = ? AND season = ? AND is_finished = 1
+    """, (league, season))
+    finished, last_matchday = cursor.fetchone()
+    return finished, last_matchday or 0
+
+async def _update_openligadb(full: bool = False) -> Dict[str, Any]:
+    """
+    Lädt geänderte Spieltage der konfigurierten Partitionen (KICK_LEAGUES x KICK_SEASONS)
+    und schreibt sie in matches_real. full=True ignoriert die Wasserzeichen.
+
+    Läuft als Job des Runners (openligadb_sync / weekly_full_sync, gemeinsamer Lock).
+    """
+    print("🔄 Starte OpenLigaDB Update...")
+    
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    new_finished_matches = 0
+    change_dates = {}
+    fetched = {}
+    bytes_before = openligadb.bytes_downloaded
+    selected = partitions()
+    
+    async def detect(league: str, season: str):
+        if full or not schema.has("sync_watermarks", "matches_real"):
+            return await detect_changes(openligadb, league, season, MATCHDAYS, {}, None)
+        watermarks = await database.read(load_watermarks, league, season)
+        sentinel = await database.read(sentinel_matchday, league, season)
+        return await detect_changes(openligadb, league, season, MATCHDAYS, watermarks, sentinel)
+
+    # Nur Spieltage laden, deren OpenLigaDB-Änderungszeitpunkt sich bewegt hat;
+    # pro Partition erst der Wächter-Spieltag, die übrigen nur bei Bewegung
+    try:
+        changed = []
+        for dates, keys in await asyncio.gather(*(detect(league, season) for league, season in selected)):
+            change_dates.update(dates)
+            changed += keys
+        # Streamend geparst zu kompakten MatchRecords (openligadb_stream.py)
+        fetched = await openligadb.fetch_records(changed)
+        
+        matches_count = sum(len(records) for records in fetched.values())
+        print(f"📥 {len(fetched)}/{len(change_dates)} Spieltage geändert, "
+              f"{matches_count} Spiele von OpenLigaDB erhalten")
+        if fetched:
+            result, new_finished_matches = await database.write(
+                _apply_openligadb_matches, fetched, {key: change_dates[key] for key in fetched}
+            )
+            counts = {key: result[key] for key in counts}
+            
+    except httpx.HTTPError as e:
+        print(f"❌ Netzwerk-Fehler: {e}")
+    
+    updated_matches = counts["inserted"] + counts["updated"]
+    
+    # Zähle Daten nach Update
+    finished_after, last_matchday_after = await database.read(_finished_matches_summary)
+    
+    return {
+        "finished_matches": finished_after,
+        "last_completed_matchday": last_matchday_after,
+        "total_matches_updated": updated_matches,
+        "new_finished_matches": new_finished_matches,
+        "matchdays_checked": len(change_dates),
+        "matchdays_changed": [key[2] for key in fetched],
+        "partitions": [str(partition) for partition in selected],
+        "rows_touched": updated_matches,
+        **counts,
+        "bytes_downloaded": openligadb.bytes_downloaded - bytes_before
+    }
+
+async def _kickoff_state(now: datetime):
+    if not schema.has("matches_real"):
+        return 0, None
+    return await database.read(kickoff_state, now, partitions())
+
+# Live-Modus: während laufender Spiele nur deren Spieltage, im adaptiven Takt
+# (openligadb und database werden erst beim Lauf gelesen, Tests tauschen sie aus)
+live_mode = LiveMode(lambda: openligadb, lambda: database)
+
+# Ein Runner für alle Sync-Jobs: Weckzeiten aus dem Spielplan, ein Lock für OpenLigaDB-Schreiber
+runner.add("openligadb_sync", _update_openligadb, fixture_planner(_kickoff_state, live_interval=None),
+           lock="openligadb")
+runner.add("live_scores", live_mode.poll, live_mode.planner, lock="openligadb")
+runner.add("weekly_full_sync", lambda: _update_openligadb(full=True), weekly(0, 3), lock="openligadb")
+
+async def _follow_data_version():
+    """Übernimmt die vom Leader geschriebene Datenversion (Antwort-Cache, Schema)"""
+    before = response_cache.version
+    version = await database.read(_advance_cache)
+    if version != before and not runner.is_leader:
+        await database.read(schema.refresh)
+        print(f"🔄 Datenversion {version} vom Leader übernommen")
+    return {"data_version": version}
+
+# Läuft auf jeder Instanz, auch ohne Lease (minütlich, daher nicht im Sync-Verlauf)
+runner.add("follow_data_version", _follow_data_version, every(timedelta(minutes=1)), leader_only=False,
+           record=False)
+
+async def _save_sync_run(report: Dict[str, Any]):
+    """Speichert jeden Lauf des Runners in sync_runs (sichtbar für alle Instanzen)"""
+    if schema.has("sync_runs"):
+        await database.write(save_sync_run, report)
+
+telemetry.sink = _save_sync_run
+
 @app.post("/api/update-data")
 async def manual_update_data():
     """Manuelles Daten-Update für UpdatePage - ECHTE OpenLigaDB Integration"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Zähle aktuelle Daten vor Update
-        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE is_finished = 1")
-        finished_before = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT MAX(matchday) FROM matches_real WHERE season = '2025' AND is_finished = 1")
-        last_matchday_before = cursor.fetchone()[0] or 0
-        
-        print("🔄 Starte OpenLigaDB Update...")
-        
-        # ECHTE OpenLigaDB API-Abfrage
-        import requests
-        import json
-        
-        updated_matches = 0
-        new_finished_matches = 0
-        
-        # Hole aktuelle Saison 2025 Daten
-        try:
-            # Alle Spiele der Saison 2025 von OpenLigaDB
-            api_url = "https://api.openligadb.de/getmatchdata/bl1/2025"
-            response = requests.get(api_url, timeout=10)
-            
-            if response.status_code == 200:
-                matches_data = response.json()
-                print(f"📥 {len(matches_data)} Spiele von OpenLigaDB erhalten")
-                
-                for match in matches_data:
-                    match_id = match.get('matchID')
-                    matchday = match.get('group', {}).get('groupOrderID', 0)
-                    
-                    # Team-Namen normalisieren
-                    home_team = match.get('team1', {}).get('teamName', '')
-                    away_team = match.get('team2', {}).get('teamName', '')
-                    
-                    # Tore extrahieren
-                    goals = match.get('matchResults', [])
-                    home_goals = None
-                    away_goals = None
-                    is_finished = match.get('matchIsFinished', False)
-                    
-                    if goals and is_finished:
-                        # Nehme das Endergebnis (letztes Result)
-                        final_result = goals[-1]
-                        home_goals = final_result.get('pointsTeam1')
-                        away_goals = final_result.get('pointsTeam2')
-                    
-                    # Match-Datum
-                    match_datetime = match.get('matchDateTime', '')
-                    
-                    # Prüfe ob Match bereits existiert
-                    cursor.execute("""
-                        SELECT id, is_finished, home_goals, away_goals 
-                        FROM matches_real 
-                        WHERE match_id = ? AND season = '2025'
-                    """, (match_id,))
-                    
-                    existing = cursor.fetchone()
-                    
-                    if existing:
-                        # Update existing match
-                        old_finished = existing[1]
-                        old_home_goals = existing[2]
-                        old_away_goals = existing[3]
-                        
-                        # Update wenn sich Status oder Ergebnis geändert hat
-                        if (is_finished != old_finished or 
-                            home_goals != old_home_goals or 
-                            away_goals != old_away_goals):
-                            
-                            cursor.execute("""
-                                UPDATE matches_real 
-                                SET is_finished = ?, home_goals = ?, away_goals = ?, match_date = ?
-                                WHERE match_id = ? AND season = '2025'
-                            """, (is_finished, home_goals, away_goals, match_datetime, match_id))
-                            
-                            updated_matches += 1
-                            
-                            if is_finished and not old_finished:
-                                new_finished_matches += 1
-                                print(f"✅ Neues Ergebnis: {home_team} {home_goals}:{away_goals} {away_team}")
-                    
-                    else:
-                        # Insert new match
-                        # Hole Team-IDs (vereinfacht - könnte über Team-Namen gemacht werden)
-                        home_team_id = hash(home_team) % 1000  # Vereinfachte ID-Generierung
-                        away_team_id = hash(away_team) % 1000
-                        
-                        cursor.execute("""
-                            INSERT INTO matches_real 
-                            (match_id, season, matchday, home_team_id, away_team_id, 
-                             home_team_name, away_team_name, home_goals, away_goals, 
-                             is_finished, match_date)
-                            VALUES (?, '2025', ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (match_id, matchday, home_team_id, away_team_id, 
-                              home_team, away_team, home_goals, away_goals, 
-                              is_finished, match_datetime))
-                        
-                        updated_matches += 1
-                        if is_finished:
-                            new_finished_matches += 1
-                
-                conn.commit()
-                print(f"💾 {updated_matches} Spiele aktualisiert, {new_finished_matches} neue Ergebnisse")
-                
-            else:
-                print(f"❌ OpenLigaDB API Fehler: {response.status_code}")
-                
-        except requests.RequestException as e:
-            print(f"❌ Netzwerk-Fehler: {e}")
-        
-        # Zähle Daten nach Update
-        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE is_finished = 1")
-        finished_after = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT MAX(matchday) FROM matches_real WHERE season = '2025' AND is_finished = 1")
-        last_matchday_after = cursor.fetchone()[0] or 0
-        
-        conn.close()
-        
+        # Über den Runner: wartet, falls gerade ein geplanter Sync läuft
+        stats = await runner.run_now("openligadb_sync")
         return {
-            "message": f"✅ OpenLigaDB Update abgeschlossen! {updated_matches} Spiele aktualisiert.",
-            "stats": {
-                "finished_matches": finished_after,
-                "last_completed_matchday": last_matchday_after,
-                "total_matches_updated": updated_matches,
-                "new_finished_matches": new_finished_matches
-            },
+            "message": f"✅ OpenLigaDB Update abgeschlossen! {stats['total_matches_updated']} Spiele aktualisiert.",
+            "stats": stats,
             "timestamp": datetime.now().isoformat()
         }
         
+    except NotLeaderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         print(f"Manual update error: {e}")
         raise HTTPException(status_code=500, detail=f"Fehler beim Daten-Update: {str(e)}")
 
+@app.get("/api/jobs")
+async def get_job_queue():
+    """Anstehende Läufe des Job-Runners (Termin, Begründung, letzter Lauf) und Live-Modus"""
+    return {**runner.status(), "live_mode": live_mode.status()}
+
+@schema.plan("sync_runs", requires=("sync_runs",))
+def _sync_runs_stored(cursor, limit: int, job: Optional[str]):
+    """Gespeicherte Läufe aller Instanzen aus sync_runs"""
+    return load_sync_runs(cursor.connection, limit, job)
+
+@schema.plan("sync_runs")
+def _sync_runs_memory(cursor, limit: int, job: Optional[str]):
+    """Ohne sync_runs: Läufe dieser Instanz seit dem Start"""
+    return telemetry.runs(limit, job)
+
+@app.get("/api/sync/runs")
+async def get_sync_runs(limit: int = 50, job: Optional[str] = None):
+    """
+    Verlauf der Sync-Läufe, neuester zuerst
+
+    Je Lauf Dauer, Status, Bytes, geschriebene Zeilen, Anfragen und
+    Wiederholungen sowie die Stufen fetch, parse, diff, write und publish mit
+    Dauer, Zeilen, Bytes und Durchsatz (siehe sync_telemetry.py)
+    """
+    return await run_plan("sync_runs", max(1, min(limit, RUN_RETENTION)), job)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Sync-Metriken dieser Instanz im Prometheus-Textformat (Histogramme je Job und Stufe)"""
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/api/auto-updater/start")
 async def start_auto_updater():
     """Start Auto-Updater"""
@@ -1487,7 +1658,7 @@ async def start_auto_updater():
         return {
             "status": "success",
             "message": "Auto-Updater erfolgreich gestartet",
-            "scheduled_times": "Täglich um 17:30, 20:30 und 22:30"
+            "scheduled_times": "Nach Anstoßzeiten (siehe /api/jobs)"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Starten: {str(e)}")
@@ -12,7 +12,11 @@ from datetime import datetime
 import json
 import asyncio
 from real_data_sync import RealDataSync
+from team_stats import has_snapshots, get_team_snapshot
+from xg_engine import WINDOW_SIZE
+from standings import StandingsCache
 from gameday_updater import auto_updater, start_auto_updater, stop_auto_updater, get_updater_status
+from job_runner import runner
 
 app = FastAPI(
     title="Kick Predictor API - Real Data Edition",
@@ -32,6 +36,12 @@ app.add_middleware(
 # Datenbank-Pfad
 DB_PATH = "/workspaces/kick-predictor/backend/kick_predictor_final.db"
 
+# Existenz von team_stats_snapshot einmal pro Prozess prüfen, nicht bei jedem Aufruf
+_snapshots_available: Optional[bool] = None
+
+# Gebuchte Tabelle im Speicher, fortgeschrieben über den Änderungs-Feed
+standings_cache = StandingsCache()
+
 def get_db_connection():
     """Erstelle Datenbankverbindung"""
     if not os.path.exists(DB_PATH):
@@ -43,6 +53,20 @@ def calculate_team_form(team_id: int, last_n_games: int = 14) -> Dict[str, Any]:
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    # Standardfenster: Werte aus team_stats_snapshot statt Neuberechnung
+    global _snapshots_available
+    if _snapshots_available is None:
+        _snapshots_available = has_snapshots(cursor)
+    if last_n_games == WINDOW_SIZE and _snapshots_available:
+        snapshot = get_team_snapshot(cursor, team_id)
+        if snapshot is not None and snapshot["scored_matches"] > 0:
+            conn.close()
+            return _form_metrics(
+                snapshot["scored_matches"], snapshot["points"],
+                snapshot["goals_for"], snapshot["goals_against"],
+                snapshot["xg_for"], snapshot["xg_against"]
+            )
+    
     # Hole die letzten N Spiele des Teams (neueste zuerst)
     cursor.execute("""
         SELECT season, matchday, home_team_id, away_team_id, home_goals, away_goals, match_date
@@ -107,7 +131,12 @@ def calculate_team_form(team_id: int, last_n_games: int = 14) -> Dict[str, Any]:
             total_points += 1  # Unentschieden
         # Niederlage = 0 Punkte
     
-    games_played = len(matches)
+    return _form_metrics(len(matches), total_points, total_goals_for, total_goals_against,
+                         total_expected_goals_for, total_expected_goals_against)
+
+def _form_metrics(games_played: int, total_points: int, total_goals_for: int, total_goals_against: int,
+                  total_expected_goals_for: float, total_expected_goals_against: float) -> Dict[str, Any]:
+    """Leitet die Form- und xG-Kennzahlen aus den Summen eines Spielfensters ab"""
     avg_points = total_points / games_played if games_played > 0 else 0
     max_possible_points = games_played * 3
     form_percentage = (total_points / max_possible_points * 100) if max_possible_points > 0 else 0
@@ -147,6 +176,36 @@ def calculate_current_table() -> List[Dict[str, Any]]:
     cursor.execute("SELECT team_id, name, short_name, icon_url FROM teams_real ORDER BY name")
     teams = cursor.fetchall()
     
+    # Gebuchte Tabelle aus standings_real, falls vorhanden
+    teams_by_id = {team[0]: team for team in teams}
+    try:
+        booked = standings_cache.table(conn, teams_by_id)
+    except sqlite3.OperationalError:
+        booked = None
+    if booked is not None:
+        table = []
+        for entry in booked:
+            team_id, team_name, short_name, icon_url = teams_by_id[entry["team_id"]]
+            table.append({
+                "team": {
+                    "id": team_id,
+                    "name": team_name,
+                    "short_name": short_name,
+                    "logo_url": icon_url or ""
+                },
+                "matches_played": entry["games"],
+                "wins": entry["wins"],
+                "draws": entry["draws"],
+                "losses": entry["losses"],
+                "goals_for": entry["goals_for"],
+                "goals_against": entry["goals_against"],
+                "goal_difference": entry["goal_difference"],
+                "points": entry["points"],
+                "position": entry["position"]
+            })
+        conn.close()
+        return table
+    
     table = []
     
     for team in teams:
@@ -770,7 +829,7 @@ async def update_data():
         sync = RealDataSync()
         
         # Inkrementelles Update der aktuellen Saison
-        current_matches = await sync.fetch_matches_from_season("2025")
+        current_matches = await sync.fetch_matches_from_season()
         if current_matches:
             sync.save_matches_to_db(current_matches)
             sync.update_season_info()
@@ -898,13 +957,18 @@ async def get_database_stats():
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the auto-updater when the server starts"""
+    """Register the auto-updater jobs once and start the job runner (disable with KICK_JOB_RUNNER=false)"""
+    if os.getenv("KICK_JOB_RUNNER", "true").lower() != "true":
+        return
+    if "gameday_sync" not in runner.jobs:
+        auto_updater.register(runner)
+    await runner.start()
     start_auto_updater()
     
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop the auto-updater when the server shuts down"""
-    stop_auto_updater()
+    """Stop the job runner when the server shuts down"""
+    await runner.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,284 @@
+"""
+Versionierte Schema-Migrationen für die SQLite-Datenbank
+
+Jede Migration hat eine fortlaufende Version und wird genau einmal ausgeführt.
+Angewendete Versionen stehen in schema_migrations. Neue Indizes oder
+Tabellen werden hier ergänzt, nie in bestehenden Migrationen geändert.
+
+Indizes für matches_real und die Abfragen, die sie nutzen:
+    idx_matches_real_home_team / idx_matches_real_away_team
+        Fenster der letzten Spiele eines Teams (xg_engine.load_team_windows,
+        team_stats, /api/team/{id}/matches). Die Abfragen teilen
+        "home_team_id = ? OR away_team_id = ?" in zwei UNION ALL-Zweige auf,
+        damit jeder Zweig seinen Index nutzt. Mit den Toren im Index muss
+        matches_real selbst nicht gelesen werden (covering).
+    idx_matches_real_partition (ab Migration 7, vorher idx_matches_real_season_matchday)
+        Spiele eines Spieltags einer Partition (/api/predictions/{n},
+        /api/next-matchday, /api/matchday-info)
+    idx_matches_real_partition_open (ab Migration 7, vorher idx_matches_real_open)
+        Partieller Index der offenen Spiele für die Suche nach dem nächsten Spieltag
+
+Tabelle standings_real (Migration 3, siehe standings.py):
+    Tabellen-Deltas pro Saison, Spieltag und Team. Die Migration füllt sie
+    einmalig aus matches_real, danach wird sie beim Einspielen fortgeschrieben.
+
+Tabelle data_version (Migration 4, siehe data_version.py):
+    Zähler, den jeder Sync beim Commit erhöht; Schlüssel des HTTP-Caches.
+
+Tabelle sync_watermarks (Migration 5, siehe watermarks.py):
+    Letzter eingespielter OpenLigaDB-Änderungszeitpunkt pro Spieltag.
+
+Tabellen change_batches und match_changes (Migration 6, siehe change_feed.py):
+    Log der Spieländerungen pro Datenversion für gezielte Cache-Invalidierung.
+
+Partitionen (Migration 7, siehe partitions.py):
+    matches_real und match_changes erhalten die Spalte league (bestehende
+    Zeilen: bl1), standings_real wird mit (league, season, matchday, team_id)
+    als Schlüssel neu angelegt. idx_matches_real_partition und
+    idx_matches_real_partition_open ersetzen die Spieltags-Indizes aus
+    Migration 2; alle Spieltags-Abfragen filtern auf league und season.
+
+Tabelle backfill_checkpoints (Migration 8, siehe backfill.py):
+    Vollständig nachgeladene Partitionen; ein abgebrochener Backfill lädt
+    sie beim nächsten Lauf nicht erneut.
+
+Tabellen predictions_real und prediction_runs (Migration 9, siehe prediction_store.py):
+    Vorberechnete Vorhersagen je Spiel und Modell (Schlüssel match_id, model)
+    mit Algorithmus- und Datenversion, dazu der letzte Lauf je Partition.
+
+Tabelle sync_runs (Migration 10, siehe sync_telemetry.py):
+    Verlauf der Sync-Läufe mit Dauer, Bytes, Zeilen, Anfragen,
+    Wiederholungen und den Stufen als JSON (/api/sync/runs).
+
+Die Tests in test_migrations.py prüfen per EXPLAIN QUERY PLAN, dass diese
+Abfragen die Indizes verwenden.
+"""
+import logging
+from typing import List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: Sequence[Tuple[int, str, Tuple[str, ...]]] = (
+    (1, "matches_real_team_indexes", (
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_home_team
+           ON matches_real (home_team_id, is_finished, season, match_date, home_goals, away_goals)""",
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_away_team
+           ON matches_real (away_team_id, is_finished, season, match_date, home_goals, away_goals)""",
+    )),
+    (2, "matches_real_matchday_indexes", (
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_season_matchday
+           ON matches_real (season, matchday, match_date)""",
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_open
+           ON matches_real (season, matchday) WHERE is_finished = 0""",
+    )),
+    (3, "standings_real", (
+        """CREATE TABLE IF NOT EXISTS standings_real (
+               season TEXT NOT NULL,
+               matchday INTEGER NOT NULL,
+               team_id INTEGER NOT NULL,
+               games INTEGER NOT NULL,
+               wins INTEGER NOT NULL,
+               draws INTEGER NOT NULL,
+               losses INTEGER NOT NULL,
+               goals_for INTEGER NOT NULL,
+               goals_against INTEGER NOT NULL,
+               points INTEGER NOT NULL,
+               PRIMARY KEY (season, matchday, team_id)
+           ) WITHOUT ROWID""",
+        """INSERT OR REPLACE INTO standings_real
+               (season, matchday, team_id, games, wins, draws, losses, goals_for, goals_against, points)
+           SELECT season, matchday, team_id, COUNT(*),
+                  SUM(goals_for > goals_against), SUM(goals_for = goals_against),
+                  SUM(goals_for < goals_against), SUM(goals_for), SUM(goals_against),
+                  SUM(CASE WHEN goals_for > goals_against THEN 3
+                           WHEN goals_for = goals_against THEN 1 ELSE 0 END)
+           FROM (
+               SELECT season, matchday, home_team_id AS team_id,
+                      home_goals AS goals_for, away_goals AS goals_against
+               FROM matches_real
+               WHERE is_finished = 1 AND home_goals IS NOT NULL AND away_goals IS NOT NULL
+               UNION ALL
+               SELECT season, matchday, away_team_id, away_goals, home_goals
+               FROM matches_real
+               WHERE is_finished = 1 AND home_goals IS NOT NULL AND away_goals IS NOT NULL
+           )
+           GROUP BY season, matchday, team_id""",
+    )),
+    (4, "data_version", (
+        """CREATE TABLE IF NOT EXISTS data_version (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )""",
+        "INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 1)",
+    )),
+    (5, "sync_watermarks", (
+        """CREATE TABLE IF NOT EXISTS sync_watermarks (
+               league TEXT NOT NULL,
+               season TEXT NOT NULL,
+               matchday INTEGER NOT NULL,
+               last_change TEXT NOT NULL,
+               synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (league, season, matchday)
+           ) WITHOUT ROWID""",
+    )),
+    (6, "change_log", (
+        """CREATE TABLE IF NOT EXISTS change_batches (
+               data_version INTEGER PRIMARY KEY,
+               changes INTEGER NOT NULL,
+               recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )""",
+        """CREATE TABLE IF NOT EXISTS match_changes (
+               seq INTEGER PRIMARY KEY AUTOINCREMENT,
+               data_version INTEGER NOT NULL,
+               match_id INTEGER NOT NULL,
+               season TEXT NOT NULL,
+               matchday INTEGER NOT NULL,
+               home_team_id INTEGER,
+               away_team_id INTEGER,
+               old_season TEXT,
+               old_matchday INTEGER,
+               old_home_team_id INTEGER,
+               old_away_team_id INTEGER,
+               old_is_finished BOOLEAN,
+               old_home_goals INTEGER,
+               old_away_goals INTEGER,
+               new_is_finished BOOLEAN,
+               new_home_goals INTEGER,
+               new_away_goals INTEGER
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_match_changes_version ON match_changes(data_version)",
+    )),
+    (7, "league_partitions", (
+        "ALTER TABLE matches_real ADD COLUMN league TEXT NOT NULL DEFAULT 'bl1'",
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_partition
+           ON matches_real (league, season, matchday, match_date)""",
+        """CREATE INDEX IF NOT EXISTS idx_matches_real_partition_open
+           ON matches_real (league, season, matchday) WHERE is_finished = 0""",
+        "DROP INDEX IF EXISTS idx_matches_real_season_matchday",
+        "DROP INDEX IF EXISTS idx_matches_real_open",
+        """CREATE TABLE standings_real_partitioned (
+               league TEXT NOT NULL,
+               season TEXT NOT NULL,
+               matchday INTEGER NOT NULL,
+               team_id INTEGER NOT NULL,
+               games INTEGER NOT NULL,
+               wins INTEGER NOT NULL,
+               draws INTEGER NOT NULL,
+               losses INTEGER NOT NULL,
+               goals_for INTEGER NOT NULL,
+               goals_against INTEGER NOT NULL,
+               points INTEGER NOT NULL,
+               PRIMARY KEY (league, season, matchday, team_id)
+           ) WITHOUT ROWID""",
+        """INSERT INTO standings_real_partitioned
+           SELECT 'bl1', season, matchday, team_id, games, wins, draws, losses,
+                  goals_for, goals_against, points
+           FROM standings_real""",
+        "DROP TABLE standings_real",
+        "ALTER TABLE standings_real_partitioned RENAME TO standings_real",
+        "ALTER TABLE match_changes ADD COLUMN league TEXT NOT NULL DEFAULT 'bl1'",
+    )),
+    (8, "backfill_checkpoints", (
+        """CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+               league TEXT NOT NULL,
+               season TEXT NOT NULL,
+               matches INTEGER NOT NULL,
+               finished INTEGER NOT NULL,
+               completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (league, season)
+           ) WITHOUT ROWID""",
+    )),
+    (9, "predictions_real", (
+        """CREATE TABLE IF NOT EXISTS predictions_real (
+               match_id INTEGER NOT NULL,
+               model TEXT NOT NULL,
+               league TEXT NOT NULL,
+               season TEXT NOT NULL,
+               matchday INTEGER NOT NULL,
+               home_win_prob REAL NOT NULL,
+               draw_prob REAL NOT NULL,
+               away_win_prob REAL NOT NULL,
+               predicted_score TEXT NOT NULL,
+               home_form REAL NOT NULL,
+               away_form REAL NOT NULL,
+               home_goals_last_14 INTEGER NOT NULL,
+               away_goals_last_14 INTEGER NOT NULL,
+               over_under_json TEXT,
+               algorithm_version INTEGER NOT NULL,
+               data_version INTEGER,
+               computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (match_id, model)
+           ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS prediction_runs (
+               league TEXT NOT NULL,
+               season TEXT NOT NULL,
+               algorithm_version INTEGER NOT NULL,
+               data_version INTEGER,
+               fixtures INTEGER NOT NULL,
+               computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               PRIMARY KEY (league, season)
+           ) WITHOUT ROWID""",
+    )),
+    (10, "sync_runs", (
+        """CREATE TABLE IF NOT EXISTS sync_runs (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               job TEXT NOT NULL,
+               status TEXT NOT NULL,
+               started_at TIMESTAMP NOT NULL,
+               duration_seconds REAL,
+               bytes INTEGER NOT NULL DEFAULT 0,
+               rows INTEGER NOT NULL DEFAULT 0,
+               requests INTEGER NOT NULL DEFAULT 0,
+               retries INTEGER NOT NULL DEFAULT 0,
+               error TEXT,
+               stages_json TEXT NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_sync_runs_job ON sync_runs (job, id)",
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _init_migration_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(conn) -> int:
+    """Höchste angewendete Migration (0, wenn noch keine)"""
+    _init_migration_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def apply_migrations(conn) -> List[int]:
+    """
+    Führt alle noch nicht angewendeten Migrationen aus. Commit macht der Aufrufer.
+
+    Returns:
+        Liste der neu angewendeten Versionen
+    """
+    has_matches = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'matches_real'"
+    ).fetchone()
+    if not has_matches:
+        return []
+
+    version = current_version(conn)
+    applied = []
+    for migration_version, name, statements in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        for statement in statements:
+            conn.execute(statement)
+        conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                     (migration_version, name))
+        applied.append(migration_version)
+        logger.info(f"Migration {migration_version} ({name}) angewendet")
+
+    return applied
@@ -0,0 +1,242 @@
+"""
+Paralleler, ratenbegrenzter Abruf von OpenLigaDB-Spieltagen
+
+MatchdayFetcher lädt beliebige (league, season, matchday)-Tupel gleichzeitig:
+    - höchstens `concurrency` Anfragen laufen parallel (Semaphore)
+    - ein Token-Bucket begrenzt die Anfragen pro Sekunde (`rate`, Burst `burst`)
+    - Timeouts, Verbindungsfehler, 429 und 5xx werden mit exponentiellem
+      Backoff und Jitter wiederholt (Retry-After wird beachtet)
+
+fetch_last_changes fragt auf dieselbe Weise getlastchangedate pro Spieltag ab
+(siehe watermarks.py). fetch_records und fetch_season_records (ganze Saison,
+getmatchdata/<liga>/<saison>, siehe backfill.py) parsen die Antworten
+streamend zu kompakten MatchRecords (openligadb_stream.py). bytes_downloaded zählt die empfangenen Bytes.
+Jede Anfrage meldet Abruf- und Parse-Zeit, Bytes und Wiederholungen an den
+laufenden Sync (sync_telemetry.py).
+
+Damit ersetzt er die feste Pause von 0,5 s zwischen sequentiellen Abrufen in
+RealDataSync. Gegen openligadb_stub.py lassen sich Durchsatz und Einhaltung
+der Rate messen (siehe test_openligadb_fetcher.py, benchmark_fetcher.py).
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from openligadb_stream import MatchRecord, MatchStreamParser
+from sync_telemetry import count, record
+
+logger = logging.getLogger(__name__)
+
+# Per Umgebungsvariable z.B. auf den lokalen Stub umlenkbar (openligadb_stub.py)
+OPENLIGADB_BASE_URL = os.getenv("OPENLIGADB_BASE_URL", "https://api.openligadb.de").rstrip("/")
+OPENLIGADB_URL = f"{OPENLIGADB_BASE_URL}/getmatchdata"
+CHANGE_DATE_ENDPOINT = "getlastchangedate"
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 5.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+MatchdayKey = Tuple[str, str, int]
+
+
+class TokenBucket:
+    """Token-Bucket: im Mittel `rate` Anfragen pro Sekunde, bis zu `capacity` auf einmal"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop = None
+
+    async def acquire(self):
+        # Lock pro Event-Loop, der Bucket kann über mehrere asyncio.run() hinweg leben
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class MatchdayFetcher:
+    """Lädt Spieltage von OpenLigaDB mit begrenzter Parallelität und Rate"""
+
+    def __init__(self, base_url: str = OPENLIGADB_URL, concurrency: int = DEFAULT_CONCURRENCY,
+                 rate: float = DEFAULT_RATE, burst: Optional[float] = None,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = 30.0, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url.rstrip("/")
+        # getlastchangedate liegt neben getmatchdata
+        self.change_base_url = f"{self.base_url.rsplit('/', 1)[0]}/{CHANGE_DATE_ENDPOINT}"
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.client = client
+        self.requests = 0
+        self.retried = 0
+        self.bytes_downloaded = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def url(self, league: str, season: str, matchday: int) -> str:
+        return f"{self.base_url}/{league}/{season}/{matchday}"
+
+    def change_url(self, league: str, season: str, matchday: int) -> str:
+        return f"{self.change_base_url}/{league}/{season}/{matchday}"
+
+    def season_url(self, league: str, season: str) -> str:
+        return f"{self.base_url}/{league}/{season}"
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Exponentieller Backoff mit vollem Jitter, mindestens Retry-After"""
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+        return delay
+
+    async def _get(self, client: httpx.AsyncClient, url: str,
+                   parser: Optional[Callable[[], MatchStreamParser]] = None):
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            count("requests")
+            response = None
+            # Abrufzeit ohne die Parse-Zeit, die beim Streamen dazwischen liegt (sync_telemetry.py)
+            transfer = {"bytes": 0, "parse": 0.0}
+            started = time.perf_counter()
+            try:
+                if parser is None:
+                    response = await client.get(url)
+                    transfer["bytes"] = len(response.content)
+                    self.bytes_downloaded += transfer["bytes"]
+                    if response.status_code not in RETRY_STATUS:
+                        response.raise_for_status()
+                        return self._decode(response, transfer)
+                else:
+                    # Streamend: Spiele werden schon während des Downloads zu MatchRecords
+                    async with client.stream("GET", url) as response:
+                        if response.status_code not in RETRY_STATUS:
+                            response.raise_for_status()
+                            return await self._parse_stream(response, parser(), transfer)
+                        transfer["bytes"] = len(await response.aread())
+                        self.bytes_downloaded += transfer["bytes"]
+                error: Exception = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = e
+            finally:
+                record("fetch", time.perf_counter() - started - transfer["parse"], nbytes=transfer["bytes"])
+            if attempt == self.retries:
+                raise error
+            self.retried += 1
+            count("retries")
+            delay = self._delay(attempt, response)
+            logger.warning(f"{url}: {error} - neuer Versuch in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _decode(response: httpx.Response, transfer: Dict) -> Any:
+        started = time.perf_counter()
+        data = response.json()
+        transfer["parse"] = time.perf_counter() - started
+        record("parse", transfer["parse"], rows=len(data) if isinstance(data, list) else None)
+        return data
+
+    async def _parse_stream(self, response: httpx.Response, parser: MatchStreamParser,
+                            transfer: Dict) -> List[MatchRecord]:
+        records = []
+        async for chunk in response.aiter_bytes():
+            self.bytes_downloaded += len(chunk)
+            transfer["bytes"] += len(chunk)
+            started = time.perf_counter()
+            records.extend(parser.feed(chunk))
+            transfer["parse"] += time.perf_counter() - started
+        started = time.perf_counter()
+        records.extend(parser.close())
+        transfer["parse"] += time.perf_counter() - started
+        record("parse", transfer["parse"], rows=len(records))
+        return records
+
+    async def fetch(self, league: str, season: str, matchday: int) -> List[Dict]:
+        """Einzelner Spieltag (mit Retries)"""
+        return (await self.fetch_many([(league, season, matchday)], raise_errors=True))[(league, season, matchday)]
+
+    async def fetch_many(self, keys: Iterable[MatchdayKey],
+                         raise_errors: bool = False) -> Dict[MatchdayKey, List[Dict]]:
+        """
+        Lädt alle Spieltage parallel
+
+        Returns:
+            Dict (league, season, matchday) -> OpenLigaDB-Spiele. Spieltage, die
+            auch nach allen Retries fehlschlagen, werden geloggt und fehlen im
+            Ergebnis (bei raise_errors=True wird der erste Fehler geworfen).
+        """
+        return await self._fetch_all(keys, self.url, raise_errors)
+
+    async def fetch_last_changes(self, keys: Iterable[MatchdayKey]) -> Dict[MatchdayKey, str]:
+        """
+        Letzte Änderung je Spieltag (getlastchangedate, ISO-Zeitstempel als Text)
+
+        Spieltage, deren Abfrage fehlschlägt, fehlen im Ergebnis.
+        """
+        return await self._fetch_all(keys, self.change_url, False)
+
+    async def fetch_records(self, keys: Iterable[MatchdayKey],
+                            raise_errors: bool = False) -> Dict[MatchdayKey, List[MatchRecord]]:
+        """Wie fetch_many, aber streamend geparst zu kompakten MatchRecords (openligadb_stream.py)"""
+        return await self._fetch_all(keys, self.url, raise_errors, MatchStreamParser)
+
+    async def fetch_season_records(self, league: str, season: str) -> List[MatchRecord]:
+        """Alle Spiele einer Saison in einer Anfrage als MatchRecords (Fehler werden geworfen)"""
+        key = (league, season)
+        return (await self._fetch_all([key], self.season_url, True, MatchStreamParser))[key]
+
+    async def _fetch_all(self, keys: Iterable[Tuple], url_for, raise_errors: bool,
+                         parser_for: Optional[Callable[..., MatchStreamParser]] = None) -> Dict:
+        keys = list(dict.fromkeys(keys))
+        # Gemeinsame Semaphore, damit auch parallele fetch_many-Aufrufe das Limit einhalten
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore, self._loop = asyncio.Semaphore(self.concurrency), loop
+        semaphore = self._semaphore
+        results: Dict[Tuple, List] = {}
+
+        async def load(client, key):
+            async with semaphore:
+                try:
+                    parser = (lambda: parser_for(*key)) if parser_for else None
+                    results[key] = await self._get(client, url_for(*key), parser)
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    logger.error(f"Fehler beim Abrufen von {'/'.join(map(str, key))}: {e}")
+
+        if self.client is not None:
+            await asyncio.gather(*(load(self.client, key) for key in keys))
+        else:
+            limits = httpx.Limits(max_connections=self.concurrency)
+            async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+                await asyncio.gather(*(load(client, key) for key in keys))
+
+        # Reihenfolge wie angefragt
+        return {key: results[key] for key in keys if key in results}
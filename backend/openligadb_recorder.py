@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Zeichnet echte OpenLigaDB-Antworten als Fixture-Dateien auf
+
+RecordingTransport hängt sich als httpx-Transport vor jeden Client und legt
+jede erfolgreiche JSON-Antwort unter ihrem URL-Pfad ab, z.B.
+    <out>/getmatchdata/bl1/2025/3.json
+    <out>/getmatchdata/bl1/2025.json
+    <out>/getlastchangedate/bl1/2025/3.json
+Dazu kommt manifest.json mit Quelle, Zeitpunkt und allen Pfaden.
+OpenLigaDBStub(fixtures=<out>) spielt die Aufnahme offline wieder ab.
+
+Aufruf:
+    python openligadb_recorder.py --out fixtures/openligadb --seasons 2024 2025 [--matchdays 1-34]
+"""
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import httpx
+
+from openligadb_fetcher import OPENLIGADB_BASE_URL, MatchdayFetcher
+
+MANIFEST = "manifest.json"
+
+
+def fixture_path(root: Path, url_path: str) -> Path:
+    """Fixture-Datei für einen URL-Pfad (/getmatchdata/bl1/2025/3 -> getmatchdata/bl1/2025/3.json)"""
+    parts = [part for part in url_path.split("/") if part]
+    if not parts or any(part in (".", "..") for part in parts):
+        raise ValueError(f"Ungültiger Pfad: {url_path}")
+    return root.joinpath(*parts[:-1], parts[-1] + ".json")
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Leitet Anfragen an `inner` weiter und speichert erfolgreiche Antworten als Fixtures"""
+
+    def __init__(self, out_dir, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.root = Path(out_dir)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.recorded: List[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        if response.status_code == 200:
+            target = fixture_path(self.root, request.url.path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Einmal parsen, damit nur gültiges JSON aufgezeichnet wird
+            target.write_text(json.dumps(json.loads(body), ensure_ascii=False, indent=1), encoding="utf-8")
+            self.recorded.append(request.url.path)
+        # body ist bereits dekodiert: Kodierungs- und Längen-Header nicht übernehmen
+        headers = [(key, value) for key, value in response.headers.items()
+                   if key.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+    def write_manifest(self, source: str):
+        manifest = {
+            "source": source,
+            "recorded_at": datetime.now().isoformat(),
+            "paths": sorted(set(self.recorded)),
+        }
+        (self.root / MANIFEST).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+
+
+async def record(out_dir, seasons: Iterable[str], matchdays: Iterable[int] = range(1, 35),
+                 league: str = "bl1", base_url: str = OPENLIGADB_BASE_URL,
+                 inner: Optional[httpx.AsyncBaseTransport] = None, rate: float = 5.0) -> List[str]:
+    """
+    Nimmt für jede Saison alle Spieltage, deren Änderungszeitpunkte und den
+    kompletten Saison-Payload auf
+
+    Returns:
+        Aufgezeichnete URL-Pfade
+    """
+    transport = RecordingTransport(out_dir, inner)
+    async with httpx.AsyncClient(transport=transport, timeout=30.0) as client:
+        fetcher = MatchdayFetcher(base_url=f"{base_url}/getmatchdata", client=client, rate=rate)
+        keys = [(league, str(season), matchday) for season in seasons for matchday in matchdays]
+        await fetcher.fetch_many(keys)
+        await fetcher.fetch_last_changes(keys)
+        for season in seasons:
+            response = await client.get(f"{base_url}/getmatchdata/{league}/{season}")
+            if response.status_code != 200:
+                print(f"⚠️ Saison {season}: HTTP {response.status_code}")
+    transport.write_manifest(base_url)
+    return transport.recorded
+
+
+def _matchdays(value: str) -> range:
+    start, _, end = value.partition("-")
+    return range(int(start), int(end or start) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenLigaDB-Antworten als Fixtures aufzeichnen")
+    parser.add_argument("--out", default=os.path.join("fixtures", "openligadb"))
+    parser.add_argument("--seasons", nargs="+", default=["2024", "2025"])
+    parser.add_argument("--matchdays", type=_matchdays, default=range(1, 35), help="z.B. 1-34 oder 5")
+    parser.add_argument("--league", default="bl1")
+    parser.add_argument("--base-url", default=OPENLIGADB_BASE_URL)
+    args = parser.parse_args()
+
+    recorded = asyncio.run(record(args.out, args.seasons, args.matchdays, args.league, args.base_url))
+    print(f"📼 {len(recorded)} Antworten von {args.base_url} nach {args.out} aufgezeichnet")
+
+
+if __name__ == "__main__":
+    main()
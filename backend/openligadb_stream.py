@@ -0,0 +1,173 @@
+"""
+Streamender Parser für OpenLigaDB-Spiel-Payloads
+
+response.json() baut für jeden Payload den kompletten Baum aus dicts und
+Listen (inklusive goals, location, group, Team-Icons ...), aus dem danach nur
+wenige Felder übernommen werden. Bei mehreren Saisons liegen so tausende
+Spiel-Bäume gleichzeitig im Speicher.
+
+MatchStreamParser liest den Payload stückweise (feed() pro Chunk aus
+response.aiter_bytes()) und dekodiert jeweils nur ein Spiel-Objekt des
+JSON-Arrays. Daraus entsteht sofort ein MatchRecord mit __slots__, der nur
+die gespeicherten Felder hält (Spalten von matches_real plus Kurzname und
+Icon für teams_real); das Spiel-dict wird danach freigegeben. Im Speicher
+liegen also höchstens ein Chunk, ein halbes Spiel und die kompakten Records.
+
+MatchdayFetcher.fetch_records / fetch_season_records nutzen den Parser
+(siehe openligadb_fetcher.py); benchmark_parsing.py vergleicht Spitzen-RSS und
+Durchsatz mit response.json() + convert_match.
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Spalten von matches_real in der Reihenfolge von ingest.MATCH_COLUMNS
+ROW_FIELDS = (
+    "match_id", "league", "season", "matchday", "home_team_id", "away_team_id",
+    "home_team_name", "away_team_name", "match_date", "is_finished",
+    "home_goals", "away_goals", "home_goals_ht", "away_goals_ht", "goals_json",
+)
+TEAM_FIELDS = ("home_short_name", "away_short_name", "home_icon_url", "away_icon_url")
+
+# Trennzeichen zwischen den Spielen des Arrays
+_SEPARATORS = re.compile(r"[\s,]*")
+
+FINAL_RESULT = 2
+HALFTIME_RESULT = 1
+
+
+class MatchRecord:
+    """Kompakter Datensatz eines OpenLigaDB-Spiels (nur gespeicherte Felder)"""
+
+    __slots__ = ROW_FIELDS + TEAM_FIELDS
+
+    def __init__(self, **values: Any):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_api(cls, match: Mapping[str, Any], league: str, season: str,
+                 matchday: Optional[int] = None) -> "MatchRecord":
+        """
+        Übernimmt die Felder aus einem OpenLigaDB-Spiel (wie RealDataSync.convert_match)
+
+        Ohne matchday gilt group.groupOrderID (Saison-Payloads).
+        """
+        record = cls.__new__(cls)
+        team1 = match.get("team1") or {}
+        team2 = match.get("team2") or {}
+        record.match_id = match.get("matchID")
+        record.league = league
+        record.season = str(season)
+        record.matchday = matchday or (match.get("group") or {}).get("groupOrderID")
+        record.home_team_id = team1.get("teamId")
+        record.away_team_id = team2.get("teamId")
+        record.home_team_name = team1.get("teamName")
+        record.away_team_name = team2.get("teamName")
+        record.home_short_name = team1.get("shortName")
+        record.away_short_name = team2.get("shortName")
+        record.home_icon_url = team1.get("teamIconUrl", "")
+        record.away_icon_url = team2.get("teamIconUrl", "")
+        # Ortszeit Europe/Berlin ohne Offset, verglichen mit job_runner.match_clock
+        record.match_date = match.get("matchDateTime")
+        record.is_finished = bool(match.get("matchIsFinished", False))
+        record.home_goals = record.away_goals = record.home_goals_ht = record.away_goals_ht = None
+        if record.is_finished:
+            for result in match.get("matchResults") or ():
+                if result.get("resultTypeID") == FINAL_RESULT:
+                    record.home_goals = result.get("pointsTeam1", 0)
+                    record.away_goals = result.get("pointsTeam2", 0)
+                elif result.get("resultTypeID") == HALFTIME_RESULT:
+                    record.home_goals_ht = result.get("pointsTeam1", 0)
+                    record.away_goals_ht = result.get("pointsTeam2", 0)
+        record.goals_json = json.dumps(match.get("goals", []))
+        return record
+
+    def row(self) -> Dict[str, Any]:
+        """Zeile für ingest_matches"""
+        return {field: getattr(self, field) for field in ROW_FIELDS}
+
+    def teams(self) -> List[Tuple]:
+        """Beide Teams als (team_id, name, short_name, icon_url) für teams_real"""
+        return [
+            (self.home_team_id, self.home_team_name, self.home_short_name or self.home_team_name, self.home_icon_url),
+            (self.away_team_id, self.away_team_name, self.away_short_name or self.away_team_name, self.away_icon_url),
+        ]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, MatchRecord) and all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"MatchRecord({self.league}/{self.season}/{self.matchday} #{self.match_id}: "
+                f"{self.home_team_name} {self.home_goals}:{self.away_goals} {self.away_team_name})")
+
+
+class MatchStreamParser:
+    """
+    Inkrementeller Parser für ein JSON-Array von OpenLigaDB-Spielen
+
+        parser = MatchStreamParser("bl1", "2025")
+        async for chunk in response.aiter_bytes():
+            records.extend(parser.feed(chunk))
+        records.extend(parser.close())
+    """
+
+    def __init__(self, league: str, season: str, matchday: Optional[int] = None):
+        self.league = league
+        self.season = str(season)
+        self.matchday = matchday
+        self.matches = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._done = False
+
+    def feed(self, chunk: bytes) -> List[MatchRecord]:
+        """Verarbeitet einen Chunk und liefert die darin abgeschlossenen Spiele"""
+        self._buffer += self._text.decode(chunk)
+        return self._drain()
+
+    def close(self) -> List[MatchRecord]:
+        """Letzte Spiele; ValueError, wenn der Payload unvollständig oder kein Array ist"""
+        self._buffer += self._text.decode(b"", final=True)
+        records = self._drain()
+        if not self._done or self._buffer.strip():
+            raise ValueError(f"Unvollständiger OpenLigaDB-Payload ({self.matches} Spiele gelesen)")
+        return records
+
+    def _drain(self) -> List[MatchRecord]:
+        records = []
+        buffer, pos = self._buffer, 0
+        while not self._done:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"OpenLigaDB-Payload ist kein Array: {buffer[pos:pos + 20]!r}")
+                self._started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                self._done = True
+                pos += 1
+                break
+            try:
+                match, pos_end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Spiel noch nicht vollständig, auf den nächsten Chunk warten
+                break
+            records.append(MatchRecord.from_api(match, self.league, self.season, self.matchday))
+            self.matches += 1
+            pos = pos_end
+        self._buffer = buffer[pos:]
+        return records
+
+
+def parse_matches(body: bytes, league: str, season: str, matchday: Optional[int] = None) -> List[MatchRecord]:
+    """Kompletter Payload auf einmal (z.B. Fixtures)"""
+    parser = MatchStreamParser(league, season, matchday)
+    return parser.feed(body) + parser.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Lokaler OpenLigaDB-Stub für Tests und Benchmarks
+
+Liefert unter /getmatchdata/{league}/{season}/{matchday} deterministische
+Spiele im OpenLigaDB-Format (ohne Spieltag: die ganze Saison), unter
+/getlastchangedate/... den Zeitstempel der letzten Änderung des Spieltags und
+protokolliert jede Anfrage mit Start- und Endzeit. finish() beendet einen
+Spieltag nachträglich und setzt dessen Änderungszeitpunkt neu.
+
+Mit fixtures=<Verzeichnis> werden statt der synthetischen Spiele die mit
+openligadb_recorder.py aufgezeichneten Antworten ausgeliefert. Mit clock
+(advance()) läuft die Saison ab: Spiele, die zur Uhrzeit noch nicht
+abgepfiffen sind, erscheinen ohne Ergebnis, und der Änderungszeitpunkt eines
+Spieltags ist das Ende seines letzten beendeten Spiels.
+
+Damit lassen sich Durchsatz, Parallelität und Anfragen pro Sekunde eines
+Clients messen. Optional mit künstlicher Latenz und Fehlern (fail_status für
+die ersten n Anfragen je Pfad oder zufällig mit error_rate).
+
+Als ASGI-App direkt mit httpx.ASGITransport nutzbar oder als Server (dann
+OPENLIGADB_BASE_URL=http://localhost:8765 für die Sync-Pfade setzen):
+    python openligadb_stub.py [--port 8765] [--latency 0.1] [--fixtures DIR] [--clock 2025-09-20T18:00]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+TEAMS_PER_LEAGUE = 18
+MATCHDAYS = 34
+# Anstoß bis Abpfiff inklusive Pause und Nachspielzeit
+MATCH_DURATION = timedelta(hours=2)
+
+
+def _kickoff(match: Dict) -> datetime:
+    return datetime.fromisoformat(match["matchDateTime"].replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+class OpenLigaDBStub:
+    """ASGI-App mit Anfrageprotokoll (requests) und gleichzeitig offenen Anfragen"""
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, fail_status: int = 503,
+                 finished_until: int = MATCHDAYS, fixtures: Optional[str] = None,
+                 clock: Optional[datetime] = None, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.finished_until = finished_until
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.clock = clock
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._fixture_cache: Dict[str, object] = {}
+        self.requests: List[Dict] = []
+        self.finished: set = set()
+        self.change_dates: Dict[tuple, str] = {}
+        self.active = 0
+        self.max_active = 0
+        self._attempts: Dict[str, int] = {}
+        self.app = Starlette(routes=[
+            Route("/getmatchdata/{league}/{season}/{matchday:int}", self.matchdata),
+            Route("/getmatchdata/{league}/{season}", self.matchdata),
+            Route("/getlastchangedate/{league}/{season}/{matchday:int}", self.lastchangedate),
+        ])
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+    def finish(self, season: str, matchday: int, changed_at: str):
+        """Beendet einen Spieltag (Ergebnisse werden geliefert) und setzt die letzte Änderung"""
+        self.finished.add((str(season), matchday))
+        self.change_dates[(str(season), matchday)] = changed_at
+
+    def advance(self, clock: datetime):
+        """Stellt die Uhr des Stubs vor: bis dahin abgepfiffene Spiele erhalten ihr Ergebnis"""
+        self.clock = clock
+
+    def _fixture(self, *parts):
+        """Aufgezeichnete Antwort für einen Pfad (None, wenn nicht aufgezeichnet)"""
+        key = "/".join(str(part) for part in parts)
+        if key not in self._fixture_cache:
+            path = self.fixtures.joinpath(*map(str, parts[:-1]), f"{parts[-1]}.json")
+            self._fixture_cache[key] = (json.loads(path.read_text(encoding="utf-8"))
+                                        if path.exists() else None)
+        return self._fixture_cache[key]
+
+    def last_change(self, season: str, matchday: int, league: str = "bl1") -> str:
+        if (str(season), matchday) in self.change_dates:
+            return self.change_dates[(str(season), matchday)]
+        if self.clock is not None:
+            # Ende des letzten bis zur Uhrzeit beendeten Spiels, sonst Saisonbeginn
+            ends = [_kickoff(match) + MATCH_DURATION for match in self.matches(league, season, matchday)
+                    if match["matchIsFinished"]]
+            return (max(ends) if ends else datetime(int(season), 7, 1)).isoformat()
+        if self.fixtures is not None:
+            recorded = self._fixture("getlastchangedate", league, season, matchday)
+            if recorded is not None:
+                return recorded
+        default = datetime(int(season), 8, 1) + timedelta(days=7 * (matchday - 1))
+        return default.isoformat()
+
+    async def lastchangedate(self, request):
+        p = request.path_params
+        self.requests.append({"path": request.url.path, "start": time.monotonic(),
+                              "end": time.monotonic(), "status": 200})
+        return JSONResponse(self.last_change(p["season"], p["matchday"], p["league"]))
+
+    async def matchdata(self, request):
+        path = request.url.path
+        entry = {"path": path, "start": time.monotonic()}
+        self.requests.append(entry)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            attempt = self._attempts.get(path, 0)
+            self._attempts[path] = attempt + 1
+            if attempt < self.fail_first or (self.error_rate and self._random.random() < self.error_rate):
+                entry["status"] = self.fail_status
+                return JSONResponse({"error": "stub"}, status_code=self.fail_status)
+            p = request.path_params
+            entry["status"] = 200
+            if "matchday" not in p:
+                return JSONResponse(self.season_matches(p["league"], p["season"]))
+            return JSONResponse(self.matches(p["league"], p["season"], p["matchday"]))
+        finally:
+            self.active -= 1
+            entry["end"] = time.monotonic()
+
+    def season_matches(self, league: str, season: str) -> List[Dict]:
+        """Alle Spiele einer Saison in Spieltagsreihenfolge"""
+        recorded = self._fixture("getmatchdata", league, season) if self.fixtures is not None else None
+        if recorded is not None:
+            if self.clock is None:
+                return recorded
+            return [self._at_clock(match, str(season), match.get("group", {}).get("groupOrderID", 0))
+                    for match in recorded]
+        return [match for matchday in range(1, MATCHDAYS + 1)
+                for match in self.matches(league, season, matchday)]
+
+    def matches(self, league: str, season: str, matchday: int) -> List[Dict]:
+        """Spiele eines Spieltags (aufgezeichnet oder synthetisch), zur Uhrzeit des Stubs"""
+        if self.fixtures is not None:
+            matches = self._fixture("getmatchdata", league, season, matchday) or []
+        else:
+            matches = self.synthetic_matches(league, season, matchday)
+        if self.clock is None:
+            return matches
+        return [self._at_clock(match, str(season), matchday) for match in matches]
+
+    def _at_clock(self, match: Dict, season: str, matchday: int) -> Dict:
+        """Blendet das Ergebnis von Spielen aus, die zur Uhrzeit noch nicht beendet sind"""
+        if (season, matchday) in self.finished or _kickoff(match) + MATCH_DURATION <= self.clock:
+            return match
+        return dict(match, matchIsFinished=False, matchResults=[], goals=[])
+
+    def synthetic_matches(self, league: str, season: str, matchday: int) -> List[Dict]:
+        """Deterministische Spiele eines Spieltags (Rundenturnier, Ergebnisse aus den IDs)"""
+        if not 1 <= matchday <= MATCHDAYS:
+            return []
+        teams = list(range(1, TEAMS_PER_LEAGUE + 1))
+        rotation = (matchday - 1) % (TEAMS_PER_LEAGUE - 1)
+        ring = teams[1:]
+        ring = ring[rotation:] + ring[:rotation]
+        order = [teams[0]] + ring
+        kickoff = datetime(int(season), 8, 22, 15, 30) + timedelta(days=7 * (matchday - 1))
+        # Mit Uhr entscheidet _at_clock, sonst finished_until/finish()
+        finished = (self.clock is not None or matchday <= self.finished_until
+                    or (str(season), matchday) in self.finished)
+
+        matches = []
+        for i in range(TEAMS_PER_LEAGUE // 2):
+            home, away = order[i], order[-1 - i]
+            if matchday % 2:
+                home, away = away, home
+            match_id = int(season) * 1000 + matchday * 10 + i
+            home_goals, away_goals = match_id % 4, (match_id // 4) % 3
+            results = []
+            if finished:
+                results = [
+                    {"resultTypeID": 1, "pointsTeam1": home_goals // 2, "pointsTeam2": away_goals // 2},
+                    {"resultTypeID": 2, "pointsTeam1": home_goals, "pointsTeam2": away_goals},
+                ]
+            matches.append({
+                "matchID": match_id,
+                "matchDateTime": (kickoff + timedelta(hours=i % 3)).isoformat(),
+                "leagueShortcut": league,
+                "leagueSeason": int(season),
+                "group": {"groupOrderID": matchday, "groupName": f"{matchday}. Spieltag"},
+                "team1": self._team(home),
+                "team2": self._team(away),
+                "matchIsFinished": finished,
+                "matchResults": results,
+                "goals": [],
+            })
+        return matches
+
+    @staticmethod
+    def _team(team_id: int) -> Dict:
+        return {"teamId": team_id, "teamName": f"Team {team_id}", "shortName": f"T{team_id}",
+                "teamIconUrl": f"https://example.invalid/{team_id}.png"}
+
+    def max_requests_per_window(self, window: float = 1.0) -> int:
+        """Höchste Anzahl begonnener Anfragen in einem beliebigen Zeitfenster"""
+        starts = sorted(entry["start"] for entry in self.requests)
+        best, left = 0, 0
+        for right, start in enumerate(starts):
+            while start - starts[left] >= window:
+                left += 1
+            best = max(best, right - left + 1)
+        return best
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Lokaler OpenLigaDB-Stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="Verzeichnis mit Aufnahmen von openligadb_recorder.py")
+    parser.add_argument("--clock", type=datetime.fromisoformat, help="Simulierte Uhrzeit, z.B. 2025-09-20T18:00")
+    args = parser.parse_args()
+    stub = OpenLigaDBStub(args.latency, args.fail_first, fixtures=args.fixtures,
+                          clock=args.clock, error_rate=args.error_rate)
+    uvicorn.run(stub, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
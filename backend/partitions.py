@@ -0,0 +1,64 @@
+"""
+Liga/Saison-Partitionen für Ingestion und Abfragen
+
+Jedes Spiel gehört zu genau einer Partition (league, season). matches_real,
+standings_real und sync_watermarks führen beide Spalten als führenden
+Schlüssel (Migration 7), die Indizes beginnen mit (league, season). Abfragen
+einer Partition lesen damit nur deren Einträge - unabhängig davon, wie viele
+Ligen und Saisons in der Datenbank liegen.
+
+Konfiguration über Umgebungsvariablen:
+    KICK_LEAGUES          einzuspielende Ligen, z.B. "bl1,bl2" (Standard: bl1)
+    KICK_SEASONS          einzuspielende Saisons, z.B. "2023,2024,2025"
+                          (Standard: KICK_CURRENT_SEASON)
+    KICK_DEFAULT_LEAGUE   Liga der Endpoints ohne ?league= (Standard: erste aus KICK_LEAGUES)
+    KICK_CURRENT_SEASON   Saison der Endpoints ohne ?season= (Standard: 2025); mit der
+                          Vorsaison auch Fenster für Form, xG und Snapshots (form_seasons)
+"""
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Partition(NamedTuple):
+    """Schlüssel einer Partition, z.B. Partition("bl1", "2025")"""
+    league: str
+    season: str
+
+    def __str__(self) -> str:
+        return f"{self.league}/{self.season}"
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+LEAGUES = _split(os.getenv("KICK_LEAGUES", "bl1")) or ["bl1"]
+DEFAULT_LEAGUE = os.getenv("KICK_DEFAULT_LEAGUE", LEAGUES[0])
+CURRENT_SEASON = os.getenv("KICK_CURRENT_SEASON", "2025")
+SEASONS = _split(os.getenv("KICK_SEASONS", CURRENT_SEASON)) or [CURRENT_SEASON]
+
+
+def partitions(leagues: Optional[Iterable[str]] = None,
+               seasons: Optional[Iterable[str]] = None) -> List[Partition]:
+    """Alle Kombinationen aus Ligen und Saisons (Standard: Konfiguration), neueste Saison zuerst"""
+    leagues = list(leagues) if leagues is not None else LEAGUES
+    seasons = sorted((str(season) for season in (seasons if seasons is not None else SEASONS)), reverse=True)
+    return [Partition(league, season) for season in seasons for league in leagues]
+
+
+def previous_season(season: str) -> str:
+    """Vorsaison (z.B. 2024 zu 2025)"""
+    return str(int(season) - 1)
+
+
+def form_seasons(season: str = CURRENT_SEASON) -> Tuple[str, str]:
+    """Saisons der Form- und xG-Fenster: Vorsaison und Saison (Standard: KICK_CURRENT_SEASON)"""
+    return previous_season(season), str(season)
+
+
+def parse_partition(value: str) -> Partition:
+    """"bl2/2024" -> Partition("bl2", "2024"); ohne Liga gilt DEFAULT_LEAGUE"""
+    league, _, season = value.rpartition("/")
+    if not season:
+        raise ValueError(f"Ungültige Partition: {value}")
+    return Partition(league or DEFAULT_LEAGUE, season)
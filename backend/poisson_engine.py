@@ -0,0 +1,93 @@
+"""
+Vektorisierte Poisson-Ergebnismatrix für beliebig viele Spiele
+
+Aus den Expected Goals beider Teams wird für jedes Spiel die Wahrscheinlichkeit
+jedes Ergebnisses 0:0 bis 10:10 berechnet (Tore als unabhängige
+Poisson-Verteilungen) - für N Spiele als ein N×11×11 Tensor in einem Schritt.
+Daraus folgen 1X2-Wahrscheinlichkeiten, das wahrscheinlichste Ergebnis und
+Over/Under-Wahrscheinlichkeiten.
+
+Die Masse jenseits von MAX_GOALS Toren wird abgeschnitten und die Matrix auf
+1 normiert (bei xG um 1-3 liegt der abgeschnittene Rest unter 1e-6).
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+
+MAX_GOALS = 10
+OVER_UNDER_LINES = (1.5, 2.5, 3.5)
+
+
+def line_key(line: float) -> str:
+    """Schlüssel für eine Over/Under-Linie, z.B. 2.5 -> "over_2_5" """
+    return "over_" + f"{line:g}".replace(".", "_")
+
+
+def goal_distribution(xg: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Poisson-Wahrscheinlichkeiten für 0..max_goals Tore
+
+    Returns:
+        Array N×(max_goals+1), rekursiv über P(k) = P(k-1) * xg / k berechnet
+    """
+    xg = np.asarray(xg, dtype=np.float64)
+    pmf = np.empty((xg.shape[0], max_goals + 1))
+    pmf[:, 0] = 1.0
+    np.cumprod(xg[:, None] / np.arange(1, max_goals + 1), axis=1, out=pmf[:, 1:])
+    pmf *= np.exp(-xg)[:, None]
+    return pmf
+
+
+def scoreline_matrix(home_xg: np.ndarray, away_xg: np.ndarray,
+                     max_goals: int = MAX_GOALS) -> np.ndarray:
+    """Ergebnis-Wahrscheinlichkeiten N×(max_goals+1)×(max_goals+1), [n, Heimtore, Auswärtstore]"""
+    matrix = goal_distribution(home_xg, max_goals)[:, :, None] * goal_distribution(away_xg, max_goals)[:, None, :]
+    matrix /= matrix.sum(axis=(1, 2), keepdims=True)
+    return matrix
+
+
+def outcome_probabilities(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """1X2-Wahrscheinlichkeiten aus der Ergebnismatrix"""
+    size = matrix.shape[1]
+    home_goals, away_goals = np.indices((size, size))
+    return {
+        "home_win_prob": np.einsum("nij,ij->n", matrix, (home_goals > away_goals).astype(matrix.dtype)),
+        "draw_prob": np.einsum("nii->n", matrix),
+        "away_win_prob": np.einsum("nij,ij->n", matrix, (home_goals < away_goals).astype(matrix.dtype)),
+    }
+
+
+def most_likely_score(matrix: np.ndarray):
+    """Wahrscheinlichstes Ergebnis pro Spiel als (Heimtore, Auswärtstore)-Arrays"""
+    size = matrix.shape[2]
+    flat = matrix.reshape(matrix.shape[0], -1).argmax(axis=1)
+    return flat // size, flat % size
+
+
+def over_under(matrix: np.ndarray, lines: Sequence[float] = OVER_UNDER_LINES) -> Dict[str, np.ndarray]:
+    """Wahrscheinlichkeit für mehr Tore als line (Under = 1 - Over)"""
+    size = matrix.shape[1]
+    home_goals, away_goals = np.indices((size, size))
+    total_goals = home_goals + away_goals
+    return {
+        line_key(line): np.einsum("nij,ij->n", matrix, (total_goals > line).astype(matrix.dtype))
+        for line in lines
+    }
+
+
+def score_fixtures(home_xg: np.ndarray, away_xg: np.ndarray, max_goals: int = MAX_GOALS,
+                   lines: Sequence[float] = OVER_UNDER_LINES) -> Dict[str, np.ndarray]:
+    """
+    Bewertet N Spiele auf einmal
+
+    Returns:
+        Dict mit home_win_prob, draw_prob, away_win_prob, predicted_home_goals,
+        predicted_away_goals (wahrscheinlichstes Ergebnis), je einem Eintrag pro
+        Over/Under-Linie (siehe line_key) und der Ergebnismatrix unter "matrix"
+    """
+    matrix = scoreline_matrix(home_xg, away_xg, max_goals)
+    result = outcome_probabilities(matrix)
+    result["predicted_home_goals"], result["predicted_away_goals"] = most_likely_score(matrix)
+    result.update(over_under(matrix, lines))
+    result["matrix"] = matrix
+    return result
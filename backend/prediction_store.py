@@ -0,0 +1,209 @@
+"""
+Vorberechnete Vorhersagen in predictions_real (Migration 9)
+
+/api/predictions/{n} hat bisher bei jedem Aufruf (bzw. jeder neuen
+Datenversion) Fenster geladen und predict_fixtures gerechnet. Stattdessen
+berechnet materialize_predictions() nach jedem Einspielen alle offenen
+Spiele einer Partition in einem gebündelten Durchlauf je Modell
+(predict_fixtures über alle Paarungen der Saison) und schreibt sie mit
+ALGORITHM_VERSION und der Datenversion der Eingaben nach predictions_real.
+
+    - Abonnent des Ingest-Feeds (ingest.py, nach record_batch): neu
+      berechnet werden nur offene Spiele, an denen ein geändertes Team
+      beteiligt ist (die Vorhersage hängt nur von den Statistiken der beiden
+      Teams ab); noch nie materialisierte Partitionen komplett
+    - beendete Spiele behalten ihre letzte Vorhersage von vor dem Abpfiff
+    - prediction_runs hält je Partition Algorithmus-Version und die
+      Datenversion, bis zu der die Partition geprüft ist
+
+is_current() prüft je Partition: passt ALGORITHM_VERSION und gibt es seit dem
+Lauf keine Änderung in match_changes an der Partition oder ihren Teams,
+gelten die gespeicherten Vorhersagen (Änderungen anderer Partitionen oder an
+Teamnamen zählen nicht). load_stored_predictions() liefert dann die
+gespeicherten Zeilen eines Spieltags und rechnet nur fehlende Spiele nach,
+mit den Team-Statistiken vor dem jeweiligen Anstoß (wie die gespeicherten);
+ist die Partition nicht aktuell, None (der Endpoint rechnet dann live).
+"""
+import functools
+import json
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from change_feed import ChangeBatch
+from data_version import current_data_version
+from partitions import Partition
+from team_stats import load_team_stats
+from xg_engine import MODELS, predict_fixtures
+
+# Erhöhen, wenn sich xg_engine/poisson_engine ändern: gespeicherte Vorhersagen gelten dann nicht mehr
+ALGORITHM_VERSION = 1
+
+PREDICTION_FIELDS = (
+    "home_win_prob", "draw_prob", "away_win_prob", "predicted_score",
+    "home_form", "away_form", "home_goals_last_14", "away_goals_last_14",
+)
+
+
+def materialize_predictions(conn, selected: Iterable[Partition],
+                            team_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Berechnet die Vorhersagen aller offenen Spiele der Partitionen für alle Modelle
+
+    Args:
+        team_ids: nur offene Spiele mit einem dieser Teams neu berechnen
+            (None: alle offenen Spiele der Partitionen ersetzen)
+
+    Returns:
+        Anzahl geschriebener Vorhersagen (Spiele x Modelle)
+    """
+    version = current_data_version(conn)
+    teams = None if team_ids is None else set(team_ids)
+    written = 0
+    cursor = conn.cursor()
+    for league, season in selected:
+        open_fixtures = cursor.execute("""
+            SELECT match_id, matchday, home_team_id, away_team_id
+            FROM matches_real
+            WHERE league = ? AND season = ? AND COALESCE(is_finished, 0) = 0
+        """, (league, season)).fetchall()
+        fixtures = [fixture for fixture in open_fixtures
+                    if teams is None or fixture[2] in teams or fixture[3] in teams]
+        rows = []
+        for model in MODELS:
+            predictions = predict_fixtures(cursor, [(home, away) for _, _, home, away in fixtures],
+                                           stats_loader=load_team_stats, model=model)
+            for (match_id, matchday, _, _), prediction in zip(fixtures, predictions):
+                over_under = prediction.get("over_under")
+                rows.append((league, season, matchday, match_id, model,
+                             *(prediction[field] for field in PREDICTION_FIELDS),
+                             json.dumps(over_under) if over_under is not None else None,
+                             ALGORITHM_VERSION, version))
+        # Offene Spiele komplett ersetzen (auch verlegte Spieltage), beendete bleiben
+        if teams is None:
+            cursor.execute("""
+                DELETE FROM predictions_real
+                WHERE match_id IN (
+                    SELECT match_id FROM matches_real WHERE league = ? AND season = ? AND COALESCE(is_finished, 0) = 0
+                )
+            """, (league, season))
+        cursor.executemany(f"""
+            INSERT OR REPLACE INTO predictions_real (
+                league, season, matchday, match_id, model, {', '.join(PREDICTION_FIELDS)},
+                over_under_json, algorithm_version, data_version
+            ) VALUES ({', '.join('?' * (len(PREDICTION_FIELDS) + 8))})
+        """, rows)
+        cursor.execute("""
+            INSERT OR REPLACE INTO prediction_runs (league, season, algorithm_version, data_version, fixtures)
+            VALUES (?, ?, ?, ?, ?)
+        """, (league, season, ALGORITHM_VERSION, version, len(open_fixtures)))
+        written += len(rows)
+    return written
+
+
+def materialized_partitions(conn) -> List[Partition]:
+    return [Partition(league, season)
+            for league, season in conn.execute("SELECT league, season FROM prediction_runs")]
+
+
+def refresh_predictions(conn, batch: ChangeBatch) -> int:
+    """
+    Abonnent: rechnet in den gespeicherten Partitionen die offenen Spiele der
+    geänderten Teams neu, neu betroffene Partitionen komplett
+    """
+    materialized = set(materialized_partitions(conn))
+    touched = {Partition(league, season) for league, season, _ in batch.matchdays}
+    return (materialize_predictions(conn, sorted(touched - materialized))
+            + materialize_predictions(conn, sorted(materialized), team_ids=batch.team_ids))
+
+
+def is_current(conn, league: str, season: str) -> bool:
+    """
+    True, wenn der letzte Lauf der Partition zum Algorithmus passt und seit
+    seiner Datenversion kein Spiel der Partition oder ihrer Teams geändert wurde
+    """
+    run = conn.execute("""
+        SELECT algorithm_version, data_version FROM prediction_runs WHERE league = ? AND season = ?
+    """, (league, season)).fetchone()
+    if run is None or run[0] != ALGORITHM_VERSION:
+        return False
+    # match_changes über idx_match_changes_version: nur die Änderungen nach dem Lauf
+    changed = conn.execute("""
+        WITH teams AS (
+            SELECT home_team_id FROM matches_real WHERE league = ? AND season = ? AND COALESCE(is_finished, 0) = 0
+            UNION SELECT away_team_id FROM matches_real WHERE league = ? AND season = ? AND COALESCE(is_finished, 0) = 0
+        )
+        SELECT 1 FROM match_changes
+        WHERE data_version > COALESCE(?, 0) AND (
+            (league = ? AND season = ?)
+            OR home_team_id IN teams OR away_team_id IN teams
+            OR old_home_team_id IN teams OR old_away_team_id IN teams
+        )
+        LIMIT 1
+    """, (league, season, league, season, run[1], league, season)).fetchone()
+    return changed is None
+
+
+def predict_as_of_kickoff(cursor, rows: List[Any], model: str) -> List[Dict[str, Any]]:
+    """Vorhersagen mit den Team-Statistiken vor dem Anstoß des jeweiligen Spiels"""
+    predictions = []
+    for kickoff, group in groupby(rows, key=lambda row: row["date"]):
+        group = list(group)
+        predictions += predict_fixtures(cursor, [(row["home_team_id"], row["away_team_id"]) for row in group],
+                                        stats_loader=functools.partial(load_team_stats, before=kickoff),
+                                        model=model)
+    return predictions
+
+
+def load_stored_predictions(cursor, league: str, season: str, matchday: int,
+                            model: str) -> Optional[List[Tuple[Any, Optional[Dict[str, Any]]]]]:
+    """
+    Spiele eines Spieltags mit gespeicherter Vorhersage (Format von predict_fixtures)
+
+    Spiele ohne gespeicherte Vorhersage (seit dem letzten Lauf hinzugekommen
+    oder nie materialisiert) werden mit dem Stand vor ihrem Anstoß nachgerechnet.
+
+    Returns:
+        Liste von (Spielzeile, Vorhersage) in Anstoß-Reihenfolge oder None,
+        wenn die Partition nicht aktuell ist (is_current) oder keine Spiele hat
+    """
+    if not is_current(cursor.connection, league, season):
+        return None
+    cursor.execute(f"""
+        SELECT
+            mr.id as match_id,
+            mr.matchday,
+            mr.season,
+            mr.match_date as date,
+            mr.home_team_id,
+            mr.home_team_name,
+            mr.away_team_id,
+            mr.away_team_name,
+            tr_home.short_name as home_team_short,
+            tr_home.icon_url as home_team_logo,
+            tr_away.short_name as away_team_short,
+            tr_away.icon_url as away_team_logo,
+            p.model,
+            {', '.join('p.' + field for field in PREDICTION_FIELDS)},
+            p.over_under_json
+        FROM matches_real mr
+        LEFT JOIN predictions_real p ON p.match_id = mr.match_id AND p.model = ?
+        LEFT JOIN teams_real tr_home ON mr.home_team_id = tr_home.team_id
+        LEFT JOIN teams_real tr_away ON mr.away_team_id = tr_away.team_id
+        WHERE mr.league = ? AND mr.season = ? AND mr.matchday = ?
+        ORDER BY mr.match_date
+    """, (model, league, season, matchday))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    missing = [row for row in rows if row["model"] is None]
+    computed = dict(zip((row["match_id"] for row in missing), predict_as_of_kickoff(cursor, missing, model)))
+    stored = []
+    for row in rows:
+        if row["model"] is None:
+            stored.append((row, computed[row["match_id"]]))
+            continue
+        prediction = {field: row[field] for field in PREDICTION_FIELDS}
+        if row["over_under_json"] is not None:
+            prediction["over_under"] = json.loads(row["over_under_json"])
+        stored.append((row, prediction))
+    return stored
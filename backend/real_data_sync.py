@@ -1,23 +1,39 @@
 """
 Vollständige Synchronisation mit echten Bundesliga-Daten
-Saison 2024/25 (Parameter "2025") - aktuelle Saison mit 3 gespielten Spieltagen
-Saison 2023/24 (Parameter "2024") - vorherige Saison für historische Daten
+Aktuelle Saison (KICK_CURRENT_SEASON, z.B. "2025") mit den bisher gespielten Spieltagen
+Vorsaison (z.B. "2024") für historische Daten
 """
 import sqlite3
 import asyncio
-import httpx
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import logging
 
+from migrations import apply_migrations
+from team_stats import init_snapshot_table
+from ingest import ingest_matches
+from data_version import bump_data_version
+from openligadb_fetcher import OPENLIGADB_URL, MatchdayFetcher
+from openligadb_stream import MatchRecord
+from partitions import CURRENT_SEASON, DEFAULT_LEAGUE, Partition, partitions, previous_season
+from watermarks import MATCHDAYS, detect_changes, load_watermarks, save_watermarks, sentinel_matchday
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RealDataSync:
-    def __init__(self, db_path: str = "/workspaces/kick-predictor/backend/kick_predictor_final.db"):
+    def __init__(self, db_path: str = "/workspaces/kick-predictor/backend/kick_predictor_final.db",
+                 fetcher: Optional[MatchdayFetcher] = None, league: str = DEFAULT_LEAGUE,
+                 season: str = CURRENT_SEASON):
         self.db_path = db_path
-        self.api_base = "https://api.openligadb.de/getmatchdata"
+        self.api_base = OPENLIGADB_URL
+        self.league = league
+        # Aktuelle Saison (KICK_CURRENT_SEASON), die Vorsaison liefert die Formdaten
+        self.season = season
+        self.previous_season = previous_season(season)
+        # Paralleler, ratenbegrenzter Abruf der Spieltage (statt fester Pausen)
+        self.fetcher = fetcher or MatchdayFetcher(self.api_base)
         
     def get_db_connection(self):
         return sqlite3.connect(self.db_path)
@@ -71,109 +87,117 @@ class RealDataSync:
             )
         """)
         
+        # Indizes für matches_real
+        apply_migrations(conn)
+        
+        # Materialisierte Form/xG-Werte pro Team
+        init_snapshot_table(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Datenbank-Struktur initialisiert")
 
-    async def fetch_teams_from_season(self, season: str = "2025") -> List[Dict]:
-        """Hole Teams aus einer Saison"""
-        url = f"{self.api_base}/bl1/{season}/1"
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
-                matches_data = response.json()
-                
-                teams = {}
-                for match in matches_data:
-                    # Team 1
-                    team1 = match.get('team1', {})
-                    if team1.get('teamId'):
-                        teams[team1['teamId']] = {
-                            'teamId': team1['teamId'],
-                            'name': team1['teamName'],
-                            'shortName': team1['shortName'],
-                            'iconUrl': team1.get('teamIconUrl', '')
-                        }
-                    
-                    # Team 2
-                    team2 = match.get('team2', {})
-                    if team2.get('teamId'):
-                        teams[team2['teamId']] = {
-                            'teamId': team2['teamId'],
-                            'name': team2['teamName'],
-                            'shortName': team2['shortName'],
-                            'iconUrl': team2.get('teamIconUrl', '')
-                        }
-                
-                return list(teams.values())
+    async def fetch_teams_from_season(self, season: Optional[str] = None) -> List[Dict]:
+        """Hole Teams aus einer Saison (Standard: self.season)"""
+        try:
+            matches_data = await self.fetcher.fetch(self.league, season or self.season, 1)
+            
+            teams = {}
+            for match in matches_data:
+                # Team 1
+                team1 = match.get('team1', {})
+                if team1.get('teamId'):
+                    teams[team1['teamId']] = {
+                        'teamId': team1['teamId'],
+                        'name': team1['teamName'],
+                        'shortName': team1['shortName'],
+                        'iconUrl': team1.get('teamIconUrl', '')
+                    }
                 
-            except Exception as e:
-                logger.error(f"Fehler beim Abrufen der Teams für Saison {season}: {e}")
-                return []
+                # Team 2
+                team2 = match.get('team2', {})
+                if team2.get('teamId'):
+                    teams[team2['teamId']] = {
+                        'teamId': team2['teamId'],
+                        'name': team2['teamName'],
+                        'shortName': team2['shortName'],
+                        'iconUrl': team2.get('teamIconUrl', '')
+                    }
+            
+            return list(teams.values())
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen der Teams für Saison {season}: {e}")
+            return []
 
-    async def fetch_matches_from_season(self, season: str = "2025", max_matchday: Optional[int] = None) -> List[Dict]:
-        """Hole alle Matches einer Saison bis zu einem bestimmten Spieltag"""
+    @staticmethod
+    def convert_match(match: Dict, season: str, matchday: int, league: str = DEFAULT_LEAGUE) -> Dict:
+        """Wandelt ein OpenLigaDB-Spiel in das Format von save_matches_to_db"""
+        match_data = {
+            'matchId': match.get('matchID'),
+            'league': league,
+            'season': season,
+            'matchday': matchday,
+            'homeTeamId': match.get('team1', {}).get('teamId'),
+            'awayTeamId': match.get('team2', {}).get('teamId'),
+            'homeTeamName': match.get('team1', {}).get('teamName'),
+            'awayTeamName': match.get('team2', {}).get('teamName'),
+            'matchDate': match.get('matchDateTime'),
+            'isFinished': match.get('matchIsFinished', False),
+            'goals': match.get('goals', [])
+        }
+        
+        # Extrahiere Tore falls Spiel beendet
+        if match_data['isFinished'] and match.get('matchResults'):
+            final_result = None
+            ht_result = None
+            
+            for result in match.get('matchResults', []):
+                if result.get('resultTypeID') == 2:  # Endergebnis
+                    final_result = result
+                elif result.get('resultTypeID') == 1:  # Halbzeitergebnis
+                    ht_result = result
+            
+            if final_result:
+                match_data['homeGoals'] = final_result.get('pointsTeam1', 0)
+                match_data['awayGoals'] = final_result.get('pointsTeam2', 0)
+            
+            if ht_result:
+                match_data['homeGoalsHT'] = ht_result.get('pointsTeam1', 0)
+                match_data['awayGoalsHT'] = ht_result.get('pointsTeam2', 0)
+        
+        return match_data
+
+    async def fetch_matchdays(self, keys: Iterable[Tuple[str, int]]) -> List[Dict]:
+        """
+        Hole beliebige Spieltage als (season, matchday) parallel über den MatchdayFetcher
+
+        Spieltage, die auch nach allen Retries fehlschlagen, werden übersprungen.
+        """
+        fetched = await self.fetcher.fetch_many(
+            (self.league, season, matchday) for season, matchday in keys
+        )
         all_matches = []
+        for (league, season, matchday), matches in fetched.items():
+            all_matches.extend(self.convert_match(match, season, matchday, league) for match in matches)
+        return all_matches
+
+    async def fetch_matches_from_season(self, season: Optional[str] = None, max_matchday: Optional[int] = None,
+                                        matchdays: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Hole alle Matches einer Saison bis zu einem bestimmten Spieltag"""
+        season = season or self.season
+        if matchdays is None:
+            if max_matchday is not None:
+                matchdays = range(1, max_matchday + 1)
+            # Für aktuelle Saison: Spieltage 1-4 (3 gespielt + 1 kommend)
+            elif season == self.season:
+                matchdays = range(1, 5)  # Spieltage 1, 2, 3, 4
+            else:
+                # Für vorherige Saison: nur die letzten 11 Spieltage (24-34)
+                matchdays = range(24, 35)  # Spieltage 24-34 (11 Spieltage)
         
-        # Für aktuelle Saison: Spieltage 1-4 (3 gespielt + 1 kommend)
-        if season == "2025":
-            matchdays = range(1, 5)  # Spieltage 1, 2, 3, 4
-        else:
-            # Für vorherige Saison: nur die letzten 11 Spieltage (24-34)
-            matchdays = range(24, 35)  # Spieltage 24-34 (11 Spieltage)
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for matchday in matchdays:
-                url = f"{self.api_base}/bl1/{season}/{matchday}"
-                try:
-                    logger.info(f"Lade Spieltag {matchday} der Saison {season}...")
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    matches = response.json()
-                    
-                    for match in matches:
-                        match_data = {
-                            'matchId': match.get('matchID'),
-                            'season': season,
-                            'matchday': matchday,
-                            'homeTeamId': match.get('team1', {}).get('teamId'),
-                            'awayTeamId': match.get('team2', {}).get('teamId'),
-                            'homeTeamName': match.get('team1', {}).get('teamName'),
-                            'awayTeamName': match.get('team2', {}).get('teamName'),
-                            'matchDate': match.get('matchDateTime'),
-                            'isFinished': match.get('matchIsFinished', False),
-                            'goals': match.get('goals', [])
-                        }
-                        
-                        # Extrahiere Tore falls Spiel beendet
-                        if match_data['isFinished'] and match.get('matchResults'):
-                            final_result = None
-                            ht_result = None
-                            
-                            for result in match.get('matchResults', []):
-                                if result.get('resultTypeID') == 2:  # Endergebnis
-                                    final_result = result
-                                elif result.get('resultTypeID') == 1:  # Halbzeitergebnis
-                                    ht_result = result
-                            
-                            if final_result:
-                                match_data['homeGoals'] = final_result.get('pointsTeam1', 0)
-                                match_data['awayGoals'] = final_result.get('pointsTeam2', 0)
-                            
-                            if ht_result:
-                                match_data['homeGoalsHT'] = ht_result.get('pointsTeam1', 0)
-                                match_data['awayGoalsHT'] = ht_result.get('pointsTeam2', 0)
-                        
-                        all_matches.append(match_data)
-                    
-                    # Kleine Pause zwischen Requests
-                    await asyncio.sleep(0.5)
-                    
-                except Exception as e:
-                    logger.error(f"Fehler beim Abrufen von Spieltag {matchday}, Saison {season}: {e}")
-                    continue
+        logger.info(f"Lade Spieltage {list(matchdays)} der Saison {season}...")
+        all_matches = await self.fetch_matchdays((season, matchday) for matchday in matchdays)
         
         logger.info(f"Insgesamt {len(all_matches)} Matches aus Saison {season} geladen")
         return all_matches
@@ -195,47 +219,144 @@ class RealDataSync:
                 team.get('iconUrl', '')
             ))
         
+        bump_data_version(conn)
         conn.commit()
         conn.close()
         logger.info(f"{len(teams)} Teams in Datenbank gespeichert")
 
-    def save_matches_to_db(self, matches: List[Dict]):
-        """Speichere Matches in Datenbank"""
+    async def sync_changed_matchdays(self, season: Optional[str] = None,
+                                     matchdays: Iterable[int] = MATCHDAYS,
+                                     league: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Inkrementeller Sync: fragt den OpenLigaDB-Änderungszeitpunkt des
+        Wächter-Spieltags ab (alle Spieltage erst, wenn er sich bewegt hat,
+        siehe watermarks.detect_changes) und lädt/speichert nur Spieltage,
+        deren Zeitpunkt sich seit dem letzten Sync bewegt hat (Wasserzeichen
+        in sync_watermarks)
+        
+        Args:
+            season: Saison der Partition (Standard: self.season)
+            league: Liga der Partition (Standard: self.league)
+        
+        Returns:
+            Bericht mit geprüften/geänderten Spieltagen, geschriebenen Zeilen,
+            Anfragen und heruntergeladenen Bytes
+        """
+        bytes_before = self.fetcher.bytes_downloaded
+        requests_before = self.fetcher.requests
+        
+        league = league or self.league
+        season = season or self.season
         conn = self.get_db_connection()
-        cursor = conn.cursor()
+        try:
+            watermarks = load_watermarks(conn, league, season)
+            sentinel = sentinel_matchday(conn, league, season)
+        finally:
+            conn.close()
+        # Erst der Wächter-Spieltag, die übrigen nur, wenn er sich bewegt hat
+        change_dates, changed = await detect_changes(self.fetcher, league, season, matchdays,
+                                                     watermarks, sentinel)
+        
+        # Streamend geparst: kompakte MatchRecords statt kompletter JSON-Bäume
+        fetched = await self.fetcher.fetch_records(changed)
+        matches = [record for records in fetched.values() for record in records]
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        if fetched:
+            counts = self.save_matches_to_db(
+                matches, watermarks={key: change_dates[key] for key in fetched}
+            )
+        rows_touched = counts["inserted"] + counts["updated"]
         
-        saved_count = 0
+        report = {
+            "league": league,
+            "season": season,
+            "matchdays_checked": len(change_dates),
+            "matchdays_changed": [key[2] for key in fetched],
+            "matches_fetched": len(matches),
+            "finished_matches": sum(1 for m in matches if m.is_finished),
+            "rows_touched": rows_touched,
+            **counts,
+            "requests": self.fetcher.requests - requests_before,
+            "bytes_downloaded": self.fetcher.bytes_downloaded - bytes_before,
+        }
+        logger.info(f"Inkrementeller Sync {league}/{season}: {len(fetched)}/{len(change_dates)} Spieltage geändert, "
+                    f"{rows_touched} Zeilen, {report['bytes_downloaded']} Bytes")
+        return report
+
+    async def sync_partitions(self, selected: Optional[Iterable[Partition]] = None) -> List[Dict[str, Any]]:
+        """
+        Inkrementeller Sync mehrerer Partitionen (Standard: KICK_LEAGUES x KICK_SEASONS)
+
+        Die Partitionen laufen gleichzeitig über denselben ratenbegrenzten
+        Fetcher; jede schreibt ihre Spiele in einer eigenen Transaktion.
+
+        Returns:
+            Bericht von sync_changed_matchdays pro Partition
+        """
+        selected = list(selected) if selected is not None else partitions()
+        return list(await asyncio.gather(*(
+            self.sync_changed_matchdays(partition.season, league=partition.league)
+            for partition in selected
+        )))
+
+    @staticmethod
+    def match_row(match: Dict) -> Dict[str, Any]:
+        """Wandelt ein Spiel aus convert_match in eine Zeile von matches_real"""
+        return {
+            'match_id': match['matchId'],
+            'league': match.get('league', DEFAULT_LEAGUE),
+            'season': match['season'],
+            'matchday': match['matchday'],
+            'home_team_id': match['homeTeamId'],
+            'away_team_id': match['awayTeamId'],
+            'home_team_name': match['homeTeamName'],
+            'away_team_name': match['awayTeamName'],
+            'match_date': match['matchDate'],
+            'is_finished': match['isFinished'],
+            'home_goals': match.get('homeGoals'),
+            'away_goals': match.get('awayGoals'),
+            'home_goals_ht': match.get('homeGoalsHT'),
+            'away_goals_ht': match.get('awayGoalsHT'),
+            'goals_json': json.dumps(match.get('goals', [])),
+        }
+
+    def save_matches_to_db(self, matches: List[Union[Dict, MatchRecord]],
+                           watermarks: Optional[Dict] = None) -> Dict[str, int]:
+        """
+        Speichere Matches in Datenbank (gesammelter Upsert, siehe ingest.py)
+        
+        Args:
+            matches: Spiele aus convert_match oder MatchRecords (openligadb_stream.py)
+            watermarks: Optionale OpenLigaDB-Änderungszeitpunkte
+                {(league, season, matchday): last_change}, die in derselben
+                Transaktion gespeichert werden
+        
+        Returns:
+            Anzahl neuer, geänderter und unveränderter Zeilen
+            (inserted, updated, unchanged)
+        """
+        rows = []
         for match in matches:
+            if isinstance(match, MatchRecord):
+                rows.append(match.row())
+                continue
             try:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO matches_real 
-                    (match_id, season, matchday, home_team_id, away_team_id, 
-                     home_team_name, away_team_name, match_date, is_finished,
-                     home_goals, away_goals, home_goals_ht, away_goals_ht, goals_json, synced_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
-                    match['matchId'],
-                    match['season'],
-                    match['matchday'],
-                    match['homeTeamId'],
-                    match['awayTeamId'],
-                    match['homeTeamName'],
-                    match['awayTeamName'],
-                    match['matchDate'],
-                    match['isFinished'],
-                    match.get('homeGoals'),
-                    match.get('awayGoals'),
-                    match.get('homeGoalsHT'),
-                    match.get('awayGoalsHT'),
-                    json.dumps(match.get('goals', []))
-                ))
-                saved_count += 1
+                rows.append(self.match_row(match))
             except Exception as e:
                 logger.error(f"Fehler beim Speichern von Match {match.get('matchId')}: {e}")
         
+        conn = self.get_db_connection()
+        # Ein gesammelter Upsert statt INSERT OR REPLACE pro Spiel; der
+        # Änderungs-Feed aktualisiert Tabelle, Snapshots und Datenversion
+        result = ingest_matches(conn, rows)
+        if watermarks:
+            save_watermarks(conn, watermarks)
         conn.commit()
         conn.close()
-        logger.info(f"{saved_count} Matches in Datenbank gespeichert")
+        counts = {key: result[key] for key in ("inserted", "updated", "unchanged")}
+        logger.info(f"{len(rows)} Matches verarbeitet: {counts['inserted']} neu, "
+                    f"{counts['updated']} geändert, {counts['unchanged']} unverändert")
+        return counts
 
     def update_season_info(self):
         """Aktualisiere Saison-Informationen"""
@@ -246,8 +367,8 @@ class RealDataSync:
         cursor.execute("""
             SELECT MAX(matchday) 
             FROM matches_real 
-            WHERE season = '2025' AND is_finished = 1
-        """)
+            WHERE season = ? AND is_finished = 1
+        """, (self.season,))
         result = cursor.fetchone()
         current_matchday = result[0] if result and result[0] else 3
         
@@ -257,8 +378,8 @@ class RealDataSync:
         cursor.execute("""
             INSERT OR REPLACE INTO season_info 
             (id, season, current_matchday, last_updated)
-            VALUES (1, '2025', ?, CURRENT_TIMESTAMP)
-        """, (next_matchday,))
+            VALUES (1, ?, ?, CURRENT_TIMESTAMP)
+        """, (self.season, next_matchday))
         
         conn.commit()
         conn.close()
@@ -272,20 +393,21 @@ class RealDataSync:
         self.init_database()
         
         # 2. Teams aus aktueller Saison holen
-        logger.info("📋 Lade Teams der Saison 2024/25...")
-        teams = await self.fetch_teams_from_season("2025")
+        logger.info(f"📋 Lade Teams der Saison {self.season}...")
+        teams = await self.fetch_teams_from_season(self.season)
         if teams:
             self.save_teams_to_db(teams)
         
-        # 3. Matches aus aktueller Saison (Spieltage 1-4: 3 gespielt + 1 kommend)
-        logger.info("⚽ Lade Matches der aktuellen Saison 2024/25 (Spieltage 1-4)...")
-        current_matches = await self.fetch_matches_from_season("2025")
+        # 3./4. Matches aus aktueller Saison (Spieltage 1-4: 3 gespielt + 1 kommend) und
+        # die letzten 11 Spieltage der vorherigen Saison (24-34) - parallel abgerufen
+        logger.info(f"⚽ Lade Matches der Saison {self.season} (Spieltage 1-4) "
+                    f"und {self.previous_season} (Spieltage 24-34)...")
+        current_matches, previous_matches = await asyncio.gather(
+            self.fetch_matches_from_season(self.season),
+            self.fetch_matches_from_season(self.previous_season)
+        )
         if current_matches:
             self.save_matches_to_db(current_matches)
-        
-        # 4. Matches aus vorheriger Saison (nur die letzten 11 Spieltage für Form-Berechnung)
-        logger.info("📅 Lade die letzten 11 Spieltage der Saison 2023/24 (Spieltage 24-34)...")
-        previous_matches = await self.fetch_matches_from_season("2024")
         if previous_matches:
             self.save_matches_to_db(previous_matches)
         
@@ -299,13 +421,14 @@ class RealDataSync:
         cursor.execute("SELECT COUNT(*) FROM teams_real")
         teams_count = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = '2025'")
+        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = ?", (self.season,))
         current_matches_count = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = '2024'")
+        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = ?", (self.previous_season,))
         previous_matches_count = cursor.fetchone()[0]
         
-        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = '2025' AND is_finished = 1")
+        cursor.execute("SELECT COUNT(*) FROM matches_real WHERE season = ? AND is_finished = 1",
+                       (self.season,))
         finished_matches_count = cursor.fetchone()[0]
         
         conn.close()
@@ -313,9 +436,9 @@ class RealDataSync:
         logger.info("✅ Synchronisation abgeschlossen!")
         logger.info(f"📊 Statistiken:")
         logger.info(f"   - Teams: {teams_count}")
-        logger.info(f"   - Matches 2024/25: {current_matches_count}")
-        logger.info(f"   - Matches 2023/24: {previous_matches_count}")
-        logger.info(f"   - Beendete Matches 2024/25: {finished_matches_count}")
+        logger.info(f"   - Matches {self.season}: {current_matches_count}")
+        logger.info(f"   - Matches {self.previous_season}: {previous_matches_count}")
+        logger.info(f"   - Beendete Matches {self.season}: {finished_matches_count}")
         
         return {
             'teams': teams_count,
@@ -334,8 +457,8 @@ class RealDataSync:
             cursor.execute("""
                 SELECT MAX(matchday) as last_matchday
                 FROM matches_real 
-                WHERE season = 2025 AND is_finished = 1
-            """)
+                WHERE season = ? AND is_finished = 1
+            """, (self.season,))
             result = cursor.fetchone()
             last_completed_matchday = result[0] if result[0] else 0
             
@@ -344,11 +467,11 @@ class RealDataSync:
                 SELECT matchday, COUNT(*) as matches_count,
                        MIN(match_date) as next_match_date
                 FROM matches_real 
-                WHERE season = 2025 AND is_finished = 0
+                WHERE season = ? AND is_finished = 0
                 GROUP BY matchday
                 ORDER BY matchday
                 LIMIT 3
-            """)
+            """, (self.season,))
             upcoming_matchdays = cursor.fetchall()
             
             # Check if there are matches today or this weekend
@@ -365,14 +488,14 @@ class RealDataSync:
             cursor.execute("""
                 SELECT COUNT(*) as weekend_matches
                 FROM matches_real 
-                WHERE season = 2025 AND is_finished = 0
+                WHERE season = ? AND is_finished = 0
                 AND match_date BETWEEN ? AND ?
-            """, (weekend_start.isoformat(), weekend_end.isoformat()))
+            """, (self.season, weekend_start.isoformat(), weekend_end.isoformat()))
             
             weekend_matches = cursor.fetchone()[0]
             
             return {
-                "current_season": 2025,
+                "current_season": int(self.season),
                 "last_completed_matchday": last_completed_matchday,
                 "upcoming_matchdays": [
                     {
@@ -393,7 +516,7 @@ class RealDataSync:
             logger.error(f"Error getting next matchday info: {e}")
             return {
                 "error": str(e),
-                "current_season": 2025,
+                "current_season": int(self.season),
                 "last_completed_matchday": 0,
                 "upcoming_matchdays": [],
                 "weekend_matches": 0,
@@ -0,0 +1,119 @@
+"""
+HTTP-Antwort-Cache für lesende Endpoints, geschlüsselt nach Datenversion
+
+Die fertig serialisierten JSON-Bytes einer Antwort werden pro Pfad+Query und
+Datenversion (data_version.py) gespeichert und mit einem starken ETag
+ausgeliefert. Schickt der Browser den ETag als If-None-Match zurück, genügt
+ein 304 ohne Body. Sobald ein Sync die Datenversion erhöht, passen die
+gespeicherten Einträge nicht mehr und werden beim nächsten Aufruf neu
+berechnet.
+
+Einträge können Tags tragen (z.B. team:<id>, matchday:<season>:<n>, siehe
+change_feed.ChangeBatch.tags). advance() übernimmt Einträge, deren Tags
+nicht geändert wurden, unverändert in die neue Version; nur die übrigen
+werden verworfen. Einträge ohne Tags hängen von allem ab. Der ETag hängt nur
+am Inhalt, übernommene Einträge bleiben für den Browser also gültig.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import AbstractSet, Hashable, Optional
+
+from fastapi.responses import Response
+
+MAX_ENTRIES = 256
+
+# Browser sollen vor jeder Verwendung per If-None-Match nachfragen
+CACHE_CONTROL = "no-cache"
+
+
+class CachedResponse:
+    """Serialisierte Antwort mit starkem ETag und optionalen Tags (None = hängt von allem ab)"""
+
+    __slots__ = ("version", "body", "etag", "tags")
+
+    def __init__(self, version: int, body: bytes, tags: Optional[AbstractSet[str]] = None):
+        self.version = version
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        self.tags = frozenset(tags) if tags is not None else None
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True, wenn der If-None-Match Header diesen ETag enthält"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """LRU-Cache für CachedResponse, threadsicher (wird aus dem Datenbank-Pool befüllt)"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.retained = 0
+        # Datenversion, auf der die Einträge zuletzt abgeglichen wurden
+        self.version: Optional[int] = None
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, version: int, body: bytes,
+            tags: Optional[AbstractSet[str]] = None) -> CachedResponse:
+        entry = CachedResponse(version, body, tags)
+        with self._lock:
+            current = self._entries.get(key)
+            # Ein langsamer Request mit älterer Version überschreibt keinen neueren Eintrag
+            if current is not None and current.version > version:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def advance(self, since_version: Optional[int], version: int,
+                changed_tags: Optional[AbstractSet[str]]):
+        """
+        Hebt den Cache von since_version auf version
+
+        Einträge von since_version, deren Tags changed_tags nicht berühren,
+        gelten in version weiter; alle anderen werden verworfen. Mit
+        changed_tags=None (Änderungen unbekannt) wird alles verworfen.
+        """
+        with self._lock:
+            if self.version is not None and version <= self.version:
+                return
+            # Ein anderer Thread hat inzwischen abgeglichen: Tags passen nicht mehr
+            if since_version is None or since_version != self.version:
+                changed_tags = None
+            for key, entry in list(self._entries.items()):
+                if (changed_tags is not None and entry.version == since_version
+                        and entry.tags is not None and entry.tags.isdisjoint(changed_tags)):
+                    entry.version = version
+                    self.retained += 1
+                elif entry.version < version:
+                    del self._entries[key]
+            self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.version = None
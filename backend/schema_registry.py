@@ -0,0 +1,73 @@
+"""
+Schema-Registry: welche Tabellen gibt es, welcher Abfrageplan gilt
+
+Die Endpoints in main_cloud.py mussten je nach Datenbank zwischen
+matches_real, der alten matches-Tabelle und Dummy-Daten wählen und haben
+dafür bei jedem Request sqlite_master abgefragt. Stattdessen registriert jedes
+Endpoint seine Varianten beim Import mit den benötigten Tabellen:
+
+    schema = SchemaRegistry()
+
+    @schema.plan("table", requires=("matches_real",))
+    def _table_from_matches_real(cursor): ...
+
+    @schema.plan("table")
+    def _table_empty(cursor): ...
+
+refresh() liest sqlite_master einmal (beim Start und nach Migrationen oder
+Syncs) und legt pro Name die erste Variante fest, deren Tabellen vorhanden
+sind. Im Request wird nur noch schema.resolve("table", conn) aufgerufen.
+"""
+import threading
+from typing import Callable, Dict, FrozenSet, List, Sequence, Tuple
+
+
+class SchemaRegistry:
+    """Tabellen-Fähigkeiten der Datenbank und die daraus aufgelösten Abfragepläne"""
+
+    def __init__(self):
+        self.tables: FrozenSet[str] = frozenset()
+        self.inspected = False
+        self._candidates: Dict[str, List[Tuple[Tuple[str, ...], Callable]]] = {}
+        self._plans: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, name: str, requires: Sequence[str] = ()):
+        """Decorator: registriert eine Variante; frühere Registrierungen haben Vorrang"""
+        def register(fn: Callable) -> Callable:
+            self._candidates.setdefault(name, []).append((tuple(requires), fn))
+            return fn
+        return register
+
+    def has(self, *tables: str) -> bool:
+        return all(table in self.tables for table in tables)
+
+    def _resolve_all(self) -> Dict[str, Callable]:
+        plans = {}
+        for name, candidates in self._candidates.items():
+            for requires, fn in candidates:
+                if self.has(*requires):
+                    plans[name] = fn
+                    break
+        return plans
+
+    def refresh(self, conn) -> FrozenSet[str]:
+        """Liest die vorhandenen Tabellen neu ein und löst alle Pläne neu auf"""
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        with self._lock:
+            self.tables = frozenset(row[0] for row in rows)
+            self._plans = self._resolve_all()
+            self.inspected = True
+        return self.tables
+
+    def resolve(self, name: str, conn=None) -> Callable:
+        """
+        Liefert den festgelegten Plan. Wurde die Datenbank noch nicht untersucht
+        (z.B. ohne Startup-Event), geschieht das einmalig mit conn.
+        """
+        if not self.inspected and conn is not None:
+            self.refresh(conn)
+        try:
+            return self._plans[name]
+        except KeyError:
+            raise LookupError(f"Kein Abfrageplan '{name}' für Tabellen {sorted(self.tables)}") from None
@@ -0,0 +1,268 @@
+"""
+Inkrementell gepflegte Bundesliga-Tabelle (standings_real)
+
+Statt bei jedem Aufruf alle beendeten Spiele aufzusummieren, wird jedes
+Ergebnis beim Einspielen als Delta auf die Tabelle gebucht. Wird ein Ergebnis
+korrigiert, wird der alte Beitrag zurückgebucht und der neue gebucht.
+
+standings_real speichert die Deltas pro Partition (Liga und Saison, siehe
+partitions.py), Spieltag und Team. Die aktuelle
+Tabelle ist die Summe über alle Spieltage, die Tabelle zu einem früheren
+Spieltag die Summe bis zu diesem Spieltag - matches_real wird dafür nicht
+gelesen. Standings hält dieselbe Struktur im Speicher.
+
+StandingsCache hält eine Standings pro Partition im Prozess. Sie wird einmal
+aus standings_real geladen und danach mit denselben Deltas fortgeschrieben,
+die beim Einspielen gebucht wurden (Änderungs-Feed, change_feed.load_changes).
+
+Gezählt werden wie bisher nur beendete Spiele mit beiden Toren.
+"""
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from change_feed import MatchChange, load_changes
+from data_version import current_data_version
+from partitions import CURRENT_SEASON, DEFAULT_LEAGUE
+
+STANDINGS_FIELDS = ("games", "wins", "draws", "losses", "goals_for", "goals_against", "points")
+
+# Spalten aus matches_real, die apply_result_change für ein Spiel braucht
+MATCH_KEYS = ("league", "season", "matchday", "home_team_id", "away_team_id",
+              "is_finished", "home_goals", "away_goals")
+
+
+def _contribution(goals_for: int, goals_against: int) -> List[int]:
+    """Beitrag eines Spiels zur Tabellenzeile eines Teams (Reihenfolge wie STANDINGS_FIELDS)"""
+    win = int(goals_for > goals_against)
+    draw = int(goals_for == goals_against)
+    loss = int(goals_for < goals_against)
+    return [1, win, draw, loss, goals_for, goals_against, 3 * win + draw]
+
+
+def counts(match: Optional[Mapping]) -> bool:
+    """True, wenn das Spiel in die Tabelle eingeht"""
+    return (match is not None and bool(match["is_finished"])
+            and match["home_goals"] is not None and match["away_goals"] is not None)
+
+
+def sort_table(rows: List[Dict]) -> List[Dict]:
+    """Sortiert nach Punkten, Tordifferenz, Toren und setzt die Positionen (stabil)"""
+    rows.sort(key=lambda x: (-x["points"], -x["goal_difference"], -x["goals_for"]))
+    for i, entry in enumerate(rows):
+        entry["position"] = i + 1
+    return rows
+
+
+class Standings:
+    """Tabellen-Deltas einer Partition im Speicher, pro Spieltag und Team"""
+
+    def __init__(self):
+        self.matchdays: Dict[int, Dict[int, List[int]]] = {}
+        self.totals: Dict[int, List[int]] = {}
+
+    def _book(self, matchday: int, team_id: int, delta: List[int], sign: int):
+        row = self.matchdays.setdefault(matchday, {}).setdefault(team_id, [0] * len(STANDINGS_FIELDS))
+        total = self.totals.setdefault(team_id, [0] * len(STANDINGS_FIELDS))
+        for i, value in enumerate(delta):
+            row[i] += sign * value
+            total[i] += sign * value
+
+    def apply(self, matchday: int, home_team_id: int, away_team_id: int,
+              home_goals: int, away_goals: int, sign: int = 1):
+        """Bucht ein Ergebnis (sign=-1 bucht es zurück)"""
+        self._book(matchday, home_team_id, _contribution(home_goals, away_goals), sign)
+        self._book(matchday, away_team_id, _contribution(away_goals, home_goals), sign)
+
+    def revert(self, matchday: int, home_team_id: int, away_team_id: int,
+               home_goals: int, away_goals: int):
+        self.apply(matchday, home_team_id, away_team_id, home_goals, away_goals, sign=-1)
+
+    def add_row(self, matchday: int, team_id: int, values: Sequence[int]):
+        """Übernimmt eine gespeicherte Delta-Zeile aus standings_real"""
+        self._book(matchday, team_id, list(values), 1)
+
+    def as_of(self, matchday: Optional[int] = None) -> Dict[int, List[int]]:
+        """Summen pro Team bis einschließlich matchday (None = aktueller Stand)"""
+        if matchday is None:
+            return self.totals
+        result: Dict[int, List[int]] = {}
+        for day, rows in self.matchdays.items():
+            if day > matchday:
+                continue
+            for team_id, values in rows.items():
+                total = result.setdefault(team_id, [0] * len(STANDINGS_FIELDS))
+                for i, value in enumerate(values):
+                    total[i] += value
+        return result
+
+    def table(self, team_ids: Iterable[int], matchday: Optional[int] = None) -> List[Dict]:
+        """
+        Sortierte Tabelle für team_ids. Teams ohne Spiele stehen mit 0 in der
+        Tabelle; bei Gleichstand bleibt die Reihenfolge von team_ids erhalten.
+        """
+        totals = self.as_of(matchday)
+        empty = [0] * len(STANDINGS_FIELDS)
+        rows = []
+        for team_id in team_ids:
+            entry = {"team_id": team_id}
+            entry.update(zip(STANDINGS_FIELDS, totals.get(team_id, empty)))
+            entry["goal_difference"] = entry["goals_for"] - entry["goals_against"]
+            rows.append(entry)
+        return sort_table(rows)
+
+
+def _book_rows(cursor, league: str, season: str, matchday: int, home_team_id: int, away_team_id: int,
+               home_goals: int, away_goals: int, sign: int):
+    assignments = ", ".join(f"{field} = {field} + excluded.{field}" for field in STANDINGS_FIELDS)
+    for team_id, delta in ((home_team_id, _contribution(home_goals, away_goals)),
+                           (away_team_id, _contribution(away_goals, home_goals))):
+        cursor.execute(f"""
+            INSERT INTO standings_real (league, season, matchday, team_id, {", ".join(STANDINGS_FIELDS)})
+            VALUES (?, ?, ?, ?, {", ".join("?" * len(STANDINGS_FIELDS))})
+            ON CONFLICT (league, season, matchday, team_id) DO UPDATE SET {assignments}
+        """, (league, season, matchday, team_id, *(sign * value for value in delta)))
+        cursor.execute("""
+            DELETE FROM standings_real
+            WHERE league = ? AND season = ? AND matchday = ? AND team_id = ? AND games = 0
+        """, (league, season, matchday, team_id))
+
+
+def apply_result_change(conn, old: Optional[Mapping], new: Optional[Mapping]) -> bool:
+    """
+    Bucht die Änderung eines Spiels auf standings_real. Commit macht der Aufrufer.
+
+    Args:
+        old: Zeile vor der Änderung (None bei neuen Spielen)
+        new: Zeile nach der Änderung (None, wenn das Spiel entfernt wurde)
+        Beide brauchen die Schlüssel aus MATCH_KEYS.
+
+    Returns:
+        True, wenn sich die Tabelle geändert hat
+    """
+    if counts(old) and counts(new) and all(old[k] == new[k] for k in MATCH_KEYS if k != "is_finished"):
+        return False
+
+    cursor = conn.cursor()
+    changed = False
+    for match, sign in ((old, -1), (new, 1)):
+        if counts(match):
+            _book_rows(cursor, match["league"], str(match["season"]), match["matchday"], match["home_team_id"],
+                       match["away_team_id"], match["home_goals"], match["away_goals"], sign)
+            changed = True
+    return changed
+
+
+def rebuild_standings(conn, seasons: Optional[Sequence[str]] = None,
+                      leagues: Optional[Sequence[str]] = None) -> int:
+    """Baut standings_real aus matches_real neu auf (optional nur einzelne Saisons/Ligen). Commit macht der Aufrufer."""
+    conditions, params = [], []
+    for column, values in (("league", leagues), ("season", seasons)):
+        if values:
+            conditions.append(f"{column} IN ({','.join('?' * len(values))})")
+            params.extend(str(value) for value in values)
+    where = " AND ".join(conditions)
+    conn.execute(f"DELETE FROM standings_real {'WHERE ' + where if where else ''}", params)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT league, season, matchday, home_team_id, away_team_id, home_goals, away_goals
+        FROM matches_real
+        WHERE is_finished = 1 AND home_goals IS NOT NULL AND away_goals IS NOT NULL
+            {'AND ' + where if where else ''}
+    """, params)
+    standings: Dict[Tuple[str, str], Standings] = {}
+    for league, season, matchday, home_id, away_id, home_goals, away_goals in cursor.fetchall():
+        standings.setdefault((league, str(season)), Standings()).apply(
+            matchday, home_id, away_id, home_goals, away_goals)
+
+    rows = [
+        (league, season, matchday, team_id, *values)
+        for (league, season), table in standings.items()
+        for matchday, teams in table.matchdays.items()
+        for team_id, values in teams.items()
+    ]
+    conn.executemany(f"""
+        INSERT INTO standings_real (league, season, matchday, team_id, {", ".join(STANDINGS_FIELDS)})
+        VALUES (?, ?, ?, ?, {", ".join("?" * len(STANDINGS_FIELDS))})
+    """, rows)
+    return len(rows)
+
+
+def load_standings(cursor, season: str = CURRENT_SEASON, league: str = DEFAULT_LEAGUE) -> Standings:
+    """Lädt die Deltas einer Partition aus standings_real"""
+    cursor.execute(f"""
+        SELECT matchday, team_id, {", ".join(STANDINGS_FIELDS)}
+        FROM standings_real
+        WHERE league = ? AND season = ?
+    """, (league, str(season)))
+    standings = Standings()
+    for row in cursor.fetchall():
+        standings.add_row(row[0], row[1], tuple(row[2:]))
+    return standings
+
+
+class StandingsCache:
+    """
+    Eine Standings pro Partition im Prozess, threadsicher (Zugriffe aus dem Datenbank-Pool)
+
+    Vor jedem Zugriff werden die Änderungen seit der zuletzt gesehenen
+    Datenversion auf die geladenen Tabellen gebucht. Fehlt eine Version im
+    Log (z.B. nach einem Backfill mit rebuild_standings), werden die Tabellen
+    verworfen und beim nächsten Zugriff neu geladen.
+    """
+
+    def __init__(self):
+        self._tables: Dict[Tuple[str, str], Standings] = {}
+        self._lock = threading.Lock()
+        # Datenversion, auf der die Tabellen zuletzt abgeglichen wurden
+        self.version: Optional[int] = None
+
+    def _book(self, change: MatchChange):
+        """Bucht eine Spieländerung wie apply_result_change auf die geladene Partition"""
+        for match, sign in ((change.old, -1), (change.new, 1)):
+            if not counts(match):
+                continue
+            standings = self._tables.get((match["league"], str(match["season"])))
+            if standings is not None:
+                standings.apply(match["matchday"], match["home_team_id"], match["away_team_id"],
+                                match["home_goals"], match["away_goals"], sign)
+
+    def _advance(self, conn) -> Optional[int]:
+        version = current_data_version(conn)
+        if version is None or version != self.version:
+            batch = None
+            if version is not None and self.version is not None:
+                batch = load_changes(conn, self.version, version)
+            if batch is None:
+                self._tables.clear()
+            else:
+                for change in batch.changes:
+                    self._book(change)
+            self.version = version
+        return version
+
+    def load(self, conn, selected: Iterable[Tuple[str, str]]):
+        """Lädt die Tabellen der Partitionen (league, season), z.B. beim Start"""
+        with self._lock:
+            self._advance(conn)
+            for league, season in selected:
+                self._tables[(league, str(season))] = load_standings(conn.cursor(), season, league)
+
+    def table(self, conn, team_ids: Iterable[int], matchday: Optional[int] = None,
+              season: str = CURRENT_SEASON, league: str = DEFAULT_LEAGUE) -> List[Dict]:
+        """Standings.table der Partition auf dem aktuellen Stand der Datenbank"""
+        with self._lock:
+            version = self._advance(conn)
+            key = (league, str(season))
+            standings = self._tables.get(key)
+            if standings is None:
+                standings = load_standings(conn.cursor(), season, league)
+                # Nur behalten, wenn beim Laden kein Schreibvorgang dazwischenkam
+                if version is not None and current_data_version(conn) == version:
+                    self._tables[key] = standings
+            return standings.table(team_ids, matchday)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self.version = None
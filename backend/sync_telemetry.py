@@ -0,0 +1,308 @@
+"""
+Telemetrie der Sync-Jobs: Dauer je Stufe, Durchsatz und Payload
+
+Von einem Sync blieben bisher nur Logzeilen (bzw. SyncStatus in app/); wie
+sich die Zeit auf Abruf, Parsen, Abgleich und Schreiben verteilt, war nicht
+zu sehen. Die Sync-Pipeline meldet deshalb Spannen pro Stufe:
+
+    fetch    HTTP-Abruf bei OpenLigaDB (openligadb_fetcher.py), mit Bytes
+    parse    JSON bzw. streamendes Parsen zu MatchRecords, mit Zeilen
+    diff     Staging und Abgleich gegen matches_real (ingest.py), mit Zeilen
+    write    Upsert der neuen und geänderten Spiele, mit Zeilen
+    publish  Abonnenten des Änderungs-Feeds (Tabelle, Snapshots, Vorhersagen)
+
+dazu Zähler für HTTP-Anfragen und Wiederholungen. Der JobRunner
+(job_runner.py) klammert jeden Lauf mit SyncTelemetry.run(); der laufende
+SyncRun steckt in einer ContextVar und erreicht so auch gather()-Tasks und
+die Threads von AsyncDatabase, ohne durch alle Aufrufe gereicht zu werden.
+Spannen außerhalb eines Laufs (z.B. Backfill auf der Kommandozeile) landen
+nur in den Histogrammen (job="").
+
+    - render() liefert alle Metriken im Prometheus-Textformat (/metrics)
+    - runs() liefert die letzten Läufe mit Stufen, Bytes, Zeilen und
+      Durchsatz; main_cloud speichert sie zusätzlich in sync_runs
+      (Migration 10, /api/sync/runs)
+
+Gleichzeitige Abrufe summieren ihre Dauer: seconds einer Stufe ist die
+Arbeitszeit aller Spannen, nicht die Wanduhrzeit des Laufs.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "parse", "diff", "write", "publish")
+COUNTERS = {
+    "requests": "HTTP-Anfragen an OpenLigaDB",
+    "retries": "Wiederholte HTTP-Anfragen (Timeout, Verbindungsfehler, 429, 5xx)",
+}
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB bis 64 MiB
+ROWS_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# Läufe im Speicher (runs()) und in sync_runs
+HISTORY = 200
+RUN_RETENTION = 1000
+
+_current_run: ContextVar[Optional["SyncRun"]] = ContextVar("sync_run", default=None)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Histogram:
+    """Prometheus-Histogramm (kumulative Buckets, _sum, _count) je Label-Kombination"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (repr(float(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Prometheus-Zähler je Label-Kombination"""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.series: Dict[Tuple[str, ...], int] = {}
+
+    def inc(self, amount: int, *labels: str):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {value}"
+                  for labels, value in sorted(self.series.items())]
+        return lines
+
+
+class SyncRun:
+    """Ein Lauf eines Sync-Jobs mit aufsummierten Stufen und Zählern"""
+
+    def __init__(self, job: str, telemetry: "SyncTelemetry"):
+        self.job = job
+        self.telemetry = telemetry
+        self.started_at = datetime.now()
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters = {name: 0 for name in COUNTERS}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, nbytes: Optional[int] = None, rows: Optional[int] = None):
+        with self._lock:
+            totals = self.stages.setdefault(stage, {"seconds": 0.0, "spans": 0, "bytes": 0, "rows": 0})
+            totals["seconds"] += seconds
+            totals["spans"] += 1
+            totals["bytes"] += nbytes or 0
+            totals["rows"] += rows or 0
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self) -> float:
+        self.duration = time.perf_counter() - self._started
+        return self.duration
+
+    def report(self) -> Dict[str, Any]:
+        """Lauf als dict für /api/sync/runs (Durchsatz je Stufe in Zeilen bzw. Bytes pro Sekunde)"""
+        with self._lock:
+            order = [stage for stage in STAGES if stage in self.stages]
+            order += sorted(stage for stage in self.stages if stage not in STAGES)
+            stages = {}
+            for stage in order:
+                totals = self.stages[stage]
+                entry = dict(totals, seconds=round(totals["seconds"], 4))
+                if totals["seconds"] > 0:
+                    entry["rows_per_second"] = round(totals["rows"] / totals["seconds"], 1)
+                    entry["bytes_per_second"] = round(totals["bytes"] / totals["seconds"], 1)
+                stages[stage] = entry
+            return {
+                "job": self.job,
+                "status": self.status,
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": round(self.duration, 4) if self.duration is not None else None,
+                "bytes": self.stages.get("fetch", {}).get("bytes", 0),
+                "rows": self.stages.get("write", {}).get("rows", 0),
+                **self.counters,
+                "error": self.error,
+                "stages": stages,
+            }
+
+
+class SyncTelemetry:
+    """Metriken und Verlauf der Sync-Läufe (gemeinsame Instanz: telemetry)"""
+
+    def __init__(self, history: int = HISTORY):
+        self.sink: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+        self._history: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.run_duration = Histogram("kick_sync_run_duration_seconds", "Dauer der Sync-Läufe",
+                                      ("job", "status"), DURATION_BUCKETS)
+        self.stage_duration = Histogram("kick_sync_stage_duration_seconds",
+                                        "Dauer je Spanne einer Stufe (fetch, parse, diff, write, publish)",
+                                        ("job", "stage"), DURATION_BUCKETS)
+        self.stage_bytes = Histogram("kick_sync_stage_bytes", "Payload je Spanne in Bytes",
+                                     ("job", "stage"), BYTES_BUCKETS)
+        self.stage_rows = Histogram("kick_sync_stage_rows", "Zeilen je Spanne", ("job", "stage"), ROWS_BUCKETS)
+        self.counters = {name: Counter(f"kick_sync_{name}_total", help, ("job",))
+                         for name, help in COUNTERS.items()}
+
+    def observe(self, run: Optional[SyncRun], stage: str, seconds: float,
+                nbytes: Optional[int] = None, rows: Optional[int] = None):
+        job = run.job if run is not None else ""
+        with self._lock:
+            self.stage_duration.observe(seconds, job, stage)
+            if nbytes is not None:
+                self.stage_bytes.observe(nbytes, job, stage)
+            if rows is not None:
+                self.stage_rows.observe(rows, job, stage)
+        if run is not None:
+            run.add(stage, seconds, nbytes, rows)
+
+    def count(self, run: Optional[SyncRun], name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name].inc(amount, run.job if run is not None else "")
+        if run is not None:
+            run.count(name, amount)
+
+    @asynccontextmanager
+    async def run(self, job: str):
+        """Klammert einen Lauf; Spannen im Block (auch in Tasks und DB-Threads) zählen zu ihm"""
+        run = SyncRun(job, self)
+        token = _current_run.set(run)
+        try:
+            yield run
+            run.status = "ok"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception as e:
+            run.status = "error"
+            run.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current_run.reset(token)
+            run.finish()
+            report = run.report()
+            with self._lock:
+                self.run_duration.observe(run.duration, job, run.status)
+                self._history.appendleft(report)
+            # Abgebrochene Läufe (Herunterfahren) nicht mehr speichern
+            if self.sink is not None and run.status != "cancelled":
+                try:
+                    await self.sink(report)
+                except Exception as e:
+                    logger.error(f"Sync-Lauf {job} nicht gespeichert: {e}")
+
+    def runs(self, limit: int = 50, job: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Letzte Läufe dieser Instanz, neuester zuerst"""
+        with self._lock:
+            history = list(self._history)
+        return [report for report in history if job is None or report["job"] == job][:limit]
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat"""
+        with self._lock:
+            metrics = [self.run_duration, self.stage_duration, self.stage_bytes, self.stage_rows,
+                       *self.counters.values()]
+            return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+# Gemeinsame Telemetrie der App (JobRunner, Fetcher, Ingest)
+telemetry = SyncTelemetry()
+
+
+def record(stage: str, seconds: float, nbytes: Optional[int] = None, rows: Optional[int] = None):
+    """Meldet eine gemessene Spanne an den laufenden Sync (sonst nur an die Histogramme)"""
+    run = _current_run.get()
+    (run.telemetry if run is not None else telemetry).observe(run, stage, seconds, nbytes, rows)
+
+
+def count(name: str, amount: int = 1):
+    """Erhöht einen Zähler aus COUNTERS (requests, retries)"""
+    run = _current_run.get()
+    (run.telemetry if run is not None else telemetry).count(run, name, amount)
+
+
+@contextmanager
+def span(stage: str, nbytes: Optional[int] = None, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Misst den Block als Spanne einer Stufe
+
+    Bytes und Zeilen, die erst im Block feststehen, werden im gelieferten
+    dict nachgetragen: with span("diff") as measured: ... measured["rows"] = n
+    """
+    measured = {"bytes": nbytes, "rows": rows}
+    started = time.perf_counter()
+    try:
+        yield measured
+    finally:
+        record(stage, time.perf_counter() - started, measured["bytes"], measured["rows"])
+
+
+def save_sync_run(conn, report: Dict[str, Any]) -> int:
+    """Speichert einen Lauf in sync_runs (Migration 10) und kürzt auf RUN_RETENTION Läufe"""
+    cursor = conn.execute("""
+        INSERT INTO sync_runs (job, status, started_at, duration_seconds, bytes, rows,
+                               requests, retries, error, stages_json)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (report["job"], report["status"], report["started_at"], report["duration_seconds"],
+          report["bytes"], report["rows"], report["requests"], report["retries"], report["error"],
+          json.dumps(report["stages"])))
+    conn.execute("DELETE FROM sync_runs WHERE id <= ?", (cursor.lastrowid - RUN_RETENTION,))
+    return cursor.lastrowid
+
+
+def load_sync_runs(conn, limit: int = 50, job: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Letzte gespeicherte Läufe aller Instanzen, neuester zuerst (Format von SyncRun.report)"""
+    rows = conn.execute("""
+        SELECT id, job, status, started_at, duration_seconds, bytes, rows, requests, retries, error, stages_json
+        FROM sync_runs WHERE ? IS NULL OR job = ?
+        ORDER BY id DESC LIMIT ?
+    """, (job, job, limit)).fetchall()
+    return [{
+        "id": run_id, "job": run_job, "status": status, "started_at": started_at,
+        "duration_seconds": duration, "bytes": nbytes, "rows": written,
+        "requests": requests, "retries": retries, "error": error, "stages": json.loads(stages),
+    } for run_id, run_job, status, started_at, duration, nbytes, written, requests, retries, error, stages in rows]
@@ -0,0 +1,297 @@
+"""
+Materialisierte Team-Statistiken (team_stats_snapshot)
+
+Form, xG und Tore der letzten 14 Spiele werden beim Einspielen neuer Ergebnisse
+pro Team und Stichtag (as_of_date = Anstoß des letzten Spiels im Fenster)
+gespeichert. Lesende Endpoints holen die Werte mit einem Index-Lookup statt
+matches_real über beide Saisons zu sortieren.
+
+Spalten:
+    matches_counted / form / expected_goals: Fenster von Form und xG wie in
+        get_team_form_from_db und get_team_expected_goals (NULL-Tore = 0)
+    scored_matches / points / goals_for / goals_against / xg_for / xg_against:
+        Fenster der Spiele mit Ergebnis wie in get_team_goals_last_n_matches
+        und calculate_team_form (main_real_data.py)
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import sqlite3
+
+import numpy as np
+
+from backtest_engine import RollingWindow
+from xg_engine import WINDOW_SIZE, FORM_SEASONS, NEUTRAL_FORM, NEUTRAL_XG
+
+SNAPSHOT_FIELDS = (
+    "matches_counted", "form", "expected_goals",
+    "scored_matches", "points", "goals_for", "goals_against", "xg_for", "xg_against",
+)
+
+
+def init_snapshot_table(conn):
+    """Erstellt die Snapshot-Tabelle falls sie nicht existiert"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS team_stats_snapshot (
+            team_id INTEGER NOT NULL,
+            as_of_date TEXT NOT NULL,
+            matches_counted INTEGER NOT NULL,
+            form REAL NOT NULL,
+            expected_goals REAL NOT NULL,
+            scored_matches INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            goals_for INTEGER NOT NULL,
+            goals_against INTEGER NOT NULL,
+            xg_for REAL NOT NULL,
+            xg_against REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (team_id, as_of_date)
+        ) WITHOUT ROWID
+    """)
+
+
+def _heuristic_xg(goals_for: int, goals_against: int, is_home: bool):
+    """xG-Schätzung aus calculate_team_form (main_real_data.py)"""
+    if is_home:
+        return 1.6 + (goals_for - 1.6) * 0.7, 1.2 + (goals_against - 1.2) * 0.7
+    return 1.3 + (goals_for - 1.3) * 0.7, 1.5 + (goals_against - 1.5) * 0.7
+
+
+class TeamWindow(RollingWindow):
+    """RollingWindow mit zusätzlichen Kennzahlen für das Fenster mit Ergebnissen"""
+
+    def __init__(self, n: int = WINDOW_SIZE):
+        super().__init__(n)
+        self.scored_details = deque(maxlen=n)
+
+    def add(self, goals_for: Optional[int], goals_against: Optional[int], is_home: bool = True):
+        super().add(goals_for, goals_against)
+        if goals_for is not None and goals_against is not None:
+            xg_for, xg_against = _heuristic_xg(goals_for, goals_against, is_home)
+            self.scored_details.append(
+                (self._points(goals_for, goals_against), goals_against, xg_for, xg_against)
+            )
+
+    def snapshot(self) -> Dict:
+        # Neueste zuerst summieren, wie die ORDER BY ... DESC Abfragen
+        details = list(reversed(self.scored_details))
+        return {
+            "matches_counted": len(self.all),
+            "form": self.form,
+            "expected_goals": self.xg,
+            "scored_matches": len(details),
+            "points": sum(d[0] for d in details),
+            "goals_for": self.scored_goals,
+            "goals_against": sum(d[1] for d in details),
+            "xg_for": sum(d[2] for d in details),
+            "xg_against": sum(d[3] for d in details),
+        }
+
+
+def _replay_snapshot_rows(cursor, team_ids: Optional[Sequence[int]],
+                          seasons: Sequence[str]) -> List[tuple]:
+    """Spielt die Historie ab und liefert eine Snapshot-Zeile pro Team und Spiel"""
+    season_marks = ",".join("?" * len(seasons))
+    home_filter = away_filter = ""
+    team_params: List[int] = []
+    if team_ids is not None:
+        team_marks = ",".join("?" * len(team_ids))
+        home_filter = f"AND home_team_id IN ({team_marks})"
+        away_filter = f"AND away_team_id IN ({team_marks})"
+        team_params = list(team_ids)
+
+    # Heim- und Auswärtssicht als UNION ALL, damit beide Team-Indizes greifen
+    cursor.execute(f"""
+        SELECT home_team_id, home_goals, away_goals, 1 AS is_home, match_date, id
+        FROM matches_real
+        WHERE is_finished = 1 AND season IN ({season_marks}) {home_filter}
+        UNION ALL
+        SELECT away_team_id, away_goals, home_goals, 0 AS is_home, match_date, id
+        FROM matches_real
+        WHERE is_finished = 1 AND season IN ({season_marks}) {away_filter}
+        ORDER BY match_date, id, is_home DESC
+    """, (*seasons, *team_params, *seasons, *team_params))
+
+    windows: Dict[int, TeamWindow] = {}
+    rows = []
+
+    for team_id, gf, ga, is_home, match_date, _ in cursor.fetchall():
+        window = windows.setdefault(team_id, TeamWindow())
+        window.add(gf, ga, bool(is_home))
+        stats = window.snapshot()
+        rows.append((team_id, match_date, *(stats[f] for f in SNAPSHOT_FIELDS)))
+
+    return rows
+
+
+def _write_rows(conn, rows: List[tuple]):
+    columns = ", ".join(SNAPSHOT_FIELDS)
+    marks = ", ".join("?" * (len(SNAPSHOT_FIELDS) + 2))
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO team_stats_snapshot (team_id, as_of_date, {columns})
+        VALUES ({marks})
+    """, rows)
+
+
+def rebuild_snapshots(conn, seasons: Sequence[str] = FORM_SEASONS) -> int:
+    """Baut alle Snapshots neu auf (z.B. beim ersten Start). Commit macht der Aufrufer."""
+    init_snapshot_table(conn)
+    rows = _replay_snapshot_rows(conn.cursor(), None, seasons)
+    conn.execute("DELETE FROM team_stats_snapshot")
+    _write_rows(conn, rows)
+    return len(rows)
+
+
+def _replay_team_from(cursor, team_id: int, seasons: Sequence[str], resume: str) -> List[tuple]:
+    """
+    Snapshot-Zeilen eines Teams für alle Spiele ab `resume`; das Fenster wird
+    mit den letzten Spielen davor vorgeladen, statt die Historie abzuspielen
+    """
+    season_marks = ",".join("?" * len(seasons))
+    query = f"""
+        SELECT home_goals, away_goals, 1 AS is_home, match_date, id
+        FROM matches_real
+        WHERE is_finished = 1 AND season IN ({season_marks}) AND home_team_id = ? AND match_date {{op}} ?
+        UNION ALL
+        SELECT away_goals, home_goals, 0 AS is_home, match_date, id
+        FROM matches_real
+        WHERE is_finished = 1 AND season IN ({season_marks}) AND away_team_id = ? AND match_date {{op}} ?
+        ORDER BY match_date {{order}}, id {{order}}
+    """
+    params = (*seasons, team_id, resume, *seasons, team_id, resume)
+
+    # Neueste zuerst, bis beide Fenster (alle Spiele, Spiele mit Ergebnis) voll sind
+    window = TeamWindow()
+    history = []
+    scored = 0
+    for row in cursor.execute(query.format(op="<", order="DESC"), params):
+        history.append(row)
+        scored += row[0] is not None and row[1] is not None
+        if len(history) >= window.n and scored >= window.n:
+            break
+    for gf, ga, is_home, _, _ in reversed(history):
+        window.add(gf, ga, bool(is_home))
+
+    rows = []
+    for gf, ga, is_home, match_date, _ in cursor.execute(query.format(op=">=", order="ASC"), params).fetchall():
+        window.add(gf, ga, bool(is_home))
+        stats = window.snapshot()
+        rows.append((team_id, match_date, *(stats[f] for f in SNAPSHOT_FIELDS)))
+    return rows
+
+
+def refresh_team_snapshots(conn, team_ids: Iterable[int], seasons: Sequence[str] = FORM_SEASONS,
+                           since: Optional[Mapping[int, Optional[str]]] = None) -> int:
+    """
+    Aktualisiert die Snapshots der betroffenen Teams nach neuen oder korrigierten
+    Ergebnissen. Commit macht der Aufrufer.
+
+    Jedes Team wird ab seinem letzten Snapshot fortgeschrieben (bzw. ab dem
+    früheren Anstoß aus `since`); nur Snapshots ab diesem Zeitpunkt werden ersetzt.
+
+    Args:
+        since: frühester geänderter Anstoß pro Team (None: ganze Historie,
+            z.B. nach korrigierten Ergebnissen)
+    """
+    team_ids = sorted({int(t) for t in team_ids if t is not None})
+    if not team_ids:
+        return 0
+
+    init_snapshot_table(conn)
+    cursor = conn.cursor()
+    team_marks = ",".join("?" * len(team_ids))
+    last = dict(cursor.execute(f"""
+        SELECT team_id, MAX(as_of_date) FROM team_stats_snapshot
+        WHERE team_id IN ({team_marks}) GROUP BY team_id
+    """, team_ids).fetchall())
+
+    since = since or {}
+    written = 0
+    for team_id in team_ids:
+        resume = last.get(team_id)
+        changed = since.get(team_id, resume)
+        # Leerer String liegt vor jedem Anstoß: ganze Historie abspielen
+        resume = "" if resume is None or changed is None else min(resume, changed)
+        rows = _replay_team_from(cursor, team_id, seasons, resume)
+        conn.execute("DELETE FROM team_stats_snapshot WHERE team_id = ? AND as_of_date >= ?", (team_id, resume))
+        _write_rows(conn, rows)
+        written += len(rows)
+    return written
+
+
+def has_snapshots(cursor) -> bool:
+    """Prüft ob die Snapshot-Tabelle existiert"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='team_stats_snapshot'")
+    return cursor.fetchone() is not None
+
+
+def get_team_snapshot(cursor, team_id: int, before: Optional[str] = None) -> Optional[Dict]:
+    """
+    Holt den aktuellen Snapshot eines Teams (oder den Stand vor einem Zeitpunkt)
+
+    Returns:
+        Dict mit as_of_date und allen SNAPSHOT_FIELDS oder None
+    """
+    columns = ", ".join(SNAPSHOT_FIELDS)
+    if before is None:
+        cursor.execute(f"""
+            SELECT as_of_date, {columns} FROM team_stats_snapshot
+            WHERE team_id = ?
+            ORDER BY as_of_date DESC LIMIT 1
+        """, (team_id,))
+    else:
+        cursor.execute(f"""
+            SELECT as_of_date, {columns} FROM team_stats_snapshot
+            WHERE team_id = ? AND as_of_date < ?
+            ORDER BY as_of_date DESC LIMIT 1
+        """, (team_id, before))
+
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(("as_of_date",) + SNAPSHOT_FIELDS, tuple(row)))
+
+
+def load_team_stats(cursor, team_ids: Sequence[int],
+                    before: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Liefert Form, xG und Tore der letzten 14 Spiele im Format von
+    xg_engine.compute_team_stats aus den Snapshots (oder den Stand vor
+    einem Zeitpunkt, z.B. dem Anstoß eines beendeten Spiels)
+
+    Returns:
+        None, wenn (noch) keine Snapshot-Tabelle existiert
+    """
+    form = np.full(len(team_ids), NEUTRAL_FORM)
+    xg = np.full(len(team_ids), NEUTRAL_XG)
+    goals_last_n = np.zeros(len(team_ids), dtype=np.int64)
+    if not team_ids:
+        return {"form": form, "xg": xg, "goals_last_n": goals_last_n}
+
+    team_marks = ",".join("?" * len(team_ids))
+    params = list(team_ids)
+    cutoff = ""
+    if before is not None:
+        cutoff, params = "AND as_of_date < ?", params + [before]
+    try:
+        cursor.execute(f"""
+            SELECT s.team_id, s.form, s.expected_goals, s.goals_for
+            FROM team_stats_snapshot s
+            WHERE s.team_id IN ({team_marks})
+                AND s.as_of_date = (
+                    SELECT MAX(as_of_date) FROM team_stats_snapshot
+                    WHERE team_id = s.team_id {cutoff}
+                )
+        """, params)
+    except sqlite3.OperationalError:
+        # Tabelle existiert (noch) nicht
+        return None
+
+    position = {team_id: i for i, team_id in enumerate(team_ids)}
+    for team_id, team_form, team_xg, goals in cursor.fetchall():
+        i = position[team_id]
+        form[i] = team_form
+        xg[i] = team_xg
+        goals_last_n[i] = goals
+
+    return {"form": form, "xg": xg, "goals_last_n": goals_last_n}
@@ -0,0 +1,85 @@
+"""
+Test des historischen Backfills (aufgezeichnete Saisons, Checkpoints, Wiederaufnahme)
+"""
+import asyncio
+import sqlite3
+
+import httpx
+
+from backfill import backfill, load_checkpoints
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_recorder import record
+from openligadb_stub import OpenLigaDBStub
+from partitions import Partition
+from standings import rebuild_standings
+
+SEASONS = ["2023", "2024", "2025"]
+SELECTED = [Partition("bl1", season) for season in SEASONS]
+
+
+class FailingTransport(httpx.AsyncBaseTransport):
+    """Lässt Anfragen auf `broken` mit 503 scheitern (Abbruch mitten im Backfill)"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, broken: str):
+        self.inner = inner
+        self.broken = broken
+
+    async def handle_async_request(self, request):
+        if request.url.path == self.broken:
+            return httpx.Response(503, request=request)
+        return await self.inner.handle_async_request(request)
+
+
+def _fetcher(transport):
+    client = httpx.AsyncClient(transport=transport, base_url="http://stub")
+    return MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000, retries=0)
+
+
+def _replay_stub(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    asyncio.run(record(fixtures, SEASONS, range(1, 2), base_url="http://stub",
+                       inner=httpx.ASGITransport(app=OpenLigaDBStub(finished_until=20)), rate=1000))
+    return OpenLigaDBStub(fixtures=str(fixtures))
+
+
+def test_backfill_imports_recorded_seasons_in_batches(tmp_path):
+    stub = _replay_stub(tmp_path)
+    db_path = str(tmp_path / "backfill.db")
+    report = asyncio.run(backfill(db_path, SELECTED, _fetcher(httpx.ASGITransport(app=stub)), batch_matches=600))
+
+    assert sorted(report["completed"]) == ["bl1/2023", "bl1/2024", "bl1/2025"]
+    assert (report["matches"], report["inserted"], report["batches"]) == (918, 918, 2)
+    assert report["requests"] == 3 and report["matches_per_sec"] > 0
+    assert [request["path"] for request in stub.requests if request["path"].count("/") == 4] == []
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(DISTINCT matchday), COUNT(*) FROM matches_real").fetchone() == (34, 918)
+    assert conn.execute("SELECT COUNT(*) FROM teams_real").fetchone() == (18,)
+    assert load_checkpoints(conn)[Partition("bl1", "2025")]["finished"] == 20 * 9
+    # Die neu aufgebaute Tabelle entspricht einem vollständigen Neuaufbau
+    booked = conn.execute("SELECT * FROM standings_real ORDER BY 1, 2, 3, 4").fetchall()
+    rebuild_standings(conn)
+    assert conn.execute("SELECT * FROM standings_real ORDER BY 1, 2, 3, 4").fetchall() == booked
+    conn.close()
+
+
+def test_interrupted_backfill_resumes_without_refetching(tmp_path):
+    stub = _replay_stub(tmp_path)
+    db_path = str(tmp_path / "backfill.db")
+    transport = httpx.ASGITransport(app=stub)
+    first = asyncio.run(backfill(db_path, SELECTED, _fetcher(FailingTransport(transport, "/getmatchdata/bl1/2024")),
+                                 batch_matches=1))
+    assert first["failed"] == ["bl1/2024"] and sorted(first["completed"]) == ["bl1/2023", "bl1/2025"]
+
+    stub.requests.clear()
+    second = asyncio.run(backfill(db_path, SELECTED, _fetcher(transport)))
+    assert second["completed"] == ["bl1/2024"] and sorted(second["skipped"]) == ["bl1/2023", "bl1/2025"]
+    assert [request["path"] for request in stub.requests] == ["/getmatchdata/bl1/2024"]
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT season, COUNT(*) FROM matches_real GROUP BY season").fetchall() == [
+        ("2023", 306), ("2024", 306), ("2025", 306)]
+    conn.close()
+    # Mit force wird alles neu geladen, aber nichts geändert
+    forced = asyncio.run(backfill(db_path, SELECTED, _fetcher(transport), force=True))
+    assert (forced["matches"], forced["unchanged"]) == (918, 918)
@@ -0,0 +1,54 @@
+"""
+Test des Point-in-time Backtests gegen die gebündelte xG-Engine
+"""
+import sqlite3
+
+from backtest_engine import replay_matches, backtest
+from test_xg_engine import _create_synthetic_db
+from xg_engine import predict_fixtures
+
+
+def _as_of_prediction(conn, kickoff, home_team_id, away_team_id):
+    """Vorhersage mit predict_fixtures auf einer Datenbank, die nur Spiele vor dem Anstoß kennt"""
+    snapshot = sqlite3.connect(":memory:")
+    conn.backup(snapshot)
+    snapshot.execute("DELETE FROM matches_real WHERE match_date >= ?", (kickoff,))
+    result = predict_fixtures(snapshot.cursor(), [(home_team_id, away_team_id)])[0]
+    snapshot.close()
+    return result
+
+
+def test_replay_uses_window_before_kickoff(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+
+    entries = replay_matches(conn.cursor(), ("2024", "2025"))
+    assert [e["match_date"] for e in entries] == sorted(e["match_date"] for e in entries)
+
+    # Stichprobe über beide Saisons: jedes 7. Spiel
+    for entry in entries[::7]:
+        expected = _as_of_prediction(conn, entry["match_date"],
+                                     entry["home_team_id"], entry["away_team_id"])
+        for key, value in expected.items():
+            assert entry[key] == value, f"{key} weicht ab für Spiel {entry['match_id']}"
+
+    conn.close()
+
+
+def test_backtest_scores_and_summarizes(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+
+    result = backtest(conn.cursor())
+    entries = result["entries"]
+    stats = result["stats"]
+
+    assert all(e["home_goals"] is not None and e["away_goals"] is not None for e in entries)
+    assert stats["total_predictions"] == len(entries)
+    assert stats["tendency_matches"] == sum(e["tendency_correct"] for e in entries)
+    assert stats["exact_matches"] == sum(e["exact_score_correct"] for e in entries)
+    assert stats["misses"] == stats["total_predictions"] - stats["tendency_matches"]
+
+    conn.close()
@@ -0,0 +1,106 @@
+"""
+Test des Änderungs-Feeds (Protokoll je Datenversion, gezielte Cache-Invalidierung)
+"""
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+import main_cloud
+from change_feed import load_changes
+from data_version import bump_data_version, current_data_version
+from db_connection import ConnectionManager, AsyncDatabase
+from ingest import MATCH_COLUMNS, ingest_matches
+from migrations import apply_migrations
+from real_data_sync import RealDataSync
+from response_cache import ResponseCache
+from standings import StandingsCache, rebuild_standings
+from test_xg_engine import _create_synthetic_db
+
+
+def _open_match(conn, exclude_team=0):
+    return conn.execute("""
+        SELECT match_id, matchday, home_team_id, away_team_id, match_date
+        FROM matches_real WHERE season = '2025' AND is_finished = 0
+            AND ? NOT IN (home_team_id, away_team_id)
+        ORDER BY match_date LIMIT 1
+    """, (exclude_team,)).fetchone()
+
+
+def test_batches_are_logged_per_version(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    apply_migrations(conn)
+    rebuild_standings(conn)
+    since = current_data_version(conn)
+
+    match = _open_match(conn)
+    row = dict(conn.execute(f"SELECT {', '.join(MATCH_COLUMNS)} FROM matches_real WHERE match_id = ?",
+                            (match["match_id"],)).fetchone())
+    result = ingest_matches(conn, [dict(row, is_finished=True, home_goals=2, away_goals=1)])
+    assert set(result["published"]) == {"book_standings", "refresh_snapshots", "bump_version", "record_batch",
+                                        "refresh_predictions"}
+    assert current_data_version(conn) == since + 1
+
+    batch = load_changes(conn, since, since + 1)
+    assert [change.match_id for change in batch.changes] == [match["match_id"]]
+    assert batch.changes[0].old["is_finished"] == 0 and batch.changes[0].new["home_goals"] == 2
+    assert batch.tags() == {f"team:{match['home_team_id']}", f"team:{match['away_team_id']}",
+                            "season:bl1:2025", f"matchday:bl1:2025:{match['matchday']}"}
+
+    # Unverändertes Spiel: kein Batch, keine neue Version
+    assert ingest_matches(conn, [dict(row, is_finished=True, home_goals=2, away_goals=1)])["published"] == {}
+    # Version ohne Protokoll (z.B. Team-Import): Änderungen unbekannt
+    bump_data_version(conn)
+    assert load_changes(conn, since, since + 2) is None
+    conn.close()
+
+
+def test_unrelated_result_keeps_team_responses_cached(tmp_path, monkeypatch):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany("INSERT INTO teams_real (team_id, name, short_name) VALUES (?, ?, ?)",
+                     [(team_id, f"Team {team_id:02d}", f"T{team_id}") for team_id in range(1, 11)])
+    rebuild_standings(conn)
+    conn.commit()
+    watched_team = 1
+    match = _open_match(conn, exclude_team=watched_team)
+    conn.close()
+
+    database = AsyncDatabase(ConnectionManager(str(db_path)))
+    monkeypatch.setenv("KICK_JOB_RUNNER", "false")
+    monkeypatch.setattr(main_cloud, "DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(main_cloud, "database", database)
+    monkeypatch.setattr(main_cloud, "response_cache", ResponseCache())
+    monkeypatch.setattr(main_cloud, "standings_cache", StandingsCache())
+    with TestClient(main_cloud.app) as client:
+        team_url = f"/api/team/{watched_team}/matches"
+        team_etag = client.get(team_url).headers["etag"]
+        table = client.get("/api/table")
+
+        RealDataSync(db_path=str(db_path)).save_matches_to_db([{
+            "matchId": match[0], "season": "2025", "matchday": match[1],
+            "homeTeamId": match[2], "awayTeamId": match[3],
+            "homeTeamName": f"Team {match[2]}", "awayTeamName": f"Team {match[3]}",
+            "matchDate": match[4], "isFinished": True, "homeGoals": 4, "awayGoals": 0,
+        }])
+
+        # Das Team ist nicht betroffen: Eintrag übernommen, 304 ohne Neuberechnung
+        misses = main_cloud.response_cache.misses
+        assert client.get(team_url, headers={"If-None-Match": team_etag}).status_code == 304
+        assert main_cloud.response_cache.misses == misses
+        assert main_cloud.response_cache.retained >= 1
+        fresh = client.get("/api/table", headers={"If-None-Match": table.headers["etag"]})
+        assert fresh.status_code == 200 and fresh.json() != table.json()
+        assert client.get(f"/api/team/{match[2]}/matches").json()[0]["home_goals"] == 4
+
+        # Version ohne Protokoll: alles wird neu berechnet, der ETag bleibt am Inhalt
+        conn = sqlite3.connect(str(db_path))
+        bump_data_version(conn)
+        conn.commit()
+        conn.close()
+        misses = main_cloud.response_cache.misses
+        assert client.get(team_url, headers={"If-None-Match": team_etag}).status_code == 304
+        assert main_cloud.response_cache.misses == misses + 1
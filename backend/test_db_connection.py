@@ -0,0 +1,84 @@
+"""
+Test der Verbindungsverwaltung und des async Thread-Pool-Zugriffs
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from db_connection import ConnectionManager, AsyncDatabase
+
+
+def _manager(tmp_path):
+    db_path = tmp_path / "test.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+    return ConnectionManager(str(db_path))
+
+
+def test_writer_commits_and_rolls_back(tmp_path):
+    db = _manager(tmp_path)
+    with db.writer() as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+    with pytest.raises(RuntimeError):
+        with db.writer() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('b')")
+            raise RuntimeError("abbrechen")
+
+    with db.reader() as conn:
+        assert [row["name"] for row in conn.execute("SELECT name FROM items")] == ["a"]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close_all()
+
+
+def test_reader_is_reused_and_read_only(tmp_path):
+    db = _manager(tmp_path)
+    with db.reader() as first:
+        pass
+    with db.reader() as second:
+        assert first is second
+        with pytest.raises(sqlite3.OperationalError):
+            second.execute("INSERT INTO items (name) VALUES ('x')")
+    db.close_all()
+
+
+def test_missing_database_raises(tmp_path):
+    db = ConnectionManager(str(tmp_path / "fehlt.db"))
+    with pytest.raises(FileNotFoundError):
+        with db.reader():
+            pass
+    assert not (tmp_path / "fehlt.db").exists()
+
+
+def test_async_reads_run_outside_event_loop(tmp_path):
+    database = AsyncDatabase(_manager(tmp_path), read_threads=2)
+
+    def thread_name(conn):
+        conn.execute("SELECT 1")
+        return threading.current_thread().name
+
+    async def run():
+        await database.write(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('c')"))
+        names = await asyncio.gather(*(database.read(thread_name) for _ in range(4)))
+        count = await database.read(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+        return names, count
+
+    names, count = asyncio.run(run())
+    assert count == 1
+    assert all(name.startswith("sqlite-read") for name in names)
+    database.shutdown()
+
+    # Nach dem Shutdown (z.B. erneuter App-Start im Test) werden die Pools neu erstellt
+    assert asyncio.run(database.read(thread_name)).startswith("sqlite-read")
+    database.shutdown()
+
+
+def test_async_without_threads_runs_inline(tmp_path):
+    database = AsyncDatabase(_manager(tmp_path), read_threads=0)
+    name = asyncio.run(database.read(lambda conn: threading.current_thread().name))
+    assert name == threading.current_thread().name
+    database.shutdown()
@@ -0,0 +1,75 @@
+"""
+Test des gesammelten Upserts nach matches_real (ingest.py)
+"""
+import sqlite3
+
+from ingest import MATCH_COLUMNS, RESULT_COLUMNS, ingest_matches
+from standings import rebuild_standings
+from test_xg_engine import _create_synthetic_db
+
+
+def _db(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    rebuild_standings(conn)
+    return conn
+
+
+def _rows(conn, where=""):
+    return [dict(row) for row in conn.execute(
+        f"SELECT id, {', '.join(MATCH_COLUMNS)} FROM matches_real {where} ORDER BY match_id")]
+
+
+def _standings(conn):
+    return [tuple(row) for row in conn.execute("SELECT * FROM standings_real ORDER BY season, matchday, team_id")]
+
+
+def test_counts_and_row_identity(tmp_path):
+    conn = _db(tmp_path)
+    before = _rows(conn)
+    payload = [{key: row[key] for key in MATCH_COLUMNS} for row in before[:20]]
+
+    # Unveränderter Payload: nichts wird geschrieben
+    changes_before = conn.total_changes
+    result = ingest_matches(conn, payload)
+    assert (result["inserted"], result["updated"], result["unchanged"]) == (0, 0, 20)
+    # Nur Einfügen und Leeren der TEMP-Staging-Tabelle, kein Schreibzugriff auf matches_real
+    assert conn.total_changes - changes_before == 2 * len(payload)
+    assert _rows(conn) == before
+
+    # Ein korrigiertes Ergebnis, ein neues Spiel, ein Duplikat (letzte Zeile gewinnt)
+    payload[3] = dict(payload[3], home_goals=9, away_goals=0, is_finished=1)
+    new_match = dict(payload[0], match_id=999999, matchday=30)
+    result = ingest_matches(conn, payload + [new_match, dict(new_match, home_goals=1)])
+    assert (result["inserted"], result["updated"], result["unchanged"]) == (1, 1, 19)
+    assert result["affected_team_ids"] == {payload[3]["home_team_id"], payload[3]["away_team_id"],
+                                           new_match["home_team_id"], new_match["away_team_id"]}
+
+    after = {row["match_id"]: row for row in _rows(conn)}
+    assert after[payload[3]["match_id"]]["id"] == before[3]["id"]
+    assert after[payload[3]["match_id"]]["home_goals"] == 9
+    assert after[999999]["home_goals"] == 1
+
+    # Inkrementell gebuchte Tabelle entspricht der Neuberechnung
+    booked = _standings(conn)
+    rebuild_standings(conn)
+    assert booked == _standings(conn)
+    conn.close()
+
+
+def test_result_columns_keep_teams(tmp_path):
+    conn = _db(tmp_path)
+    row = _rows(conn)[0]
+    payload = dict(row, home_team_id=77, away_team_id=78, home_team_name="X")
+    result = ingest_matches(conn, [payload], update_columns=RESULT_COLUMNS)
+    assert result["unchanged"] == 1
+
+    result = ingest_matches(conn, [dict(payload, away_goals=(row["away_goals"] or 0) + 3)],
+                            update_columns=RESULT_COLUMNS)
+    assert result["updated"] == 1
+    stored = _rows(conn, f"WHERE match_id = {row['match_id']}")[0]
+    assert (stored["home_team_id"], stored["home_team_name"]) == (row["home_team_id"], row["home_team_name"])
+    assert result["changes"][0].new["home_team_id"] == row["home_team_id"]
+    conn.close()
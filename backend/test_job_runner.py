@@ -0,0 +1,161 @@
+"""
+Test des Job-Runners: Weckzeiten aus dem Spielplan, Locks, manuelle Läufe
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_runner import (IDLE_INTERVAL, LIVE_INTERVAL, MATCH_TIMEZONE, JobRunner, Plan, daily, every,
+                        fixture_planner, kickoff_state, match_clock, weekly)
+from sync_telemetry import SyncTelemetry
+
+NOW = datetime(2025, 9, 13, 14, 0)  # Samstag
+
+
+def plan(planner, now=NOW, last_run=None) -> Plan:
+    return asyncio.run(planner(now, last_run))
+
+
+def test_fixture_planner_wakes_at_kickoffs():
+    def planner(live, next_kickoff):
+        async def load_state(now):
+            return live, next_kickoff
+        return fixture_planner(load_state)
+
+    # Spiele laufen: alle LIVE_INTERVAL
+    live = plan(planner(3, None), last_run=NOW - timedelta(minutes=5))
+    assert live.live and live.when == NOW + LIVE_INTERVAL - timedelta(minutes=5)
+    assert plan(planner(1, None)).when == NOW
+
+    # Nächster Anstoß um 15:30: kurz danach aufwachen, nicht vorher
+    kickoff = NOW + timedelta(hours=1, minutes=30)
+    upcoming = plan(planner(0, kickoff), last_run=NOW)
+    assert not upcoming.live and upcoming.when == kickoff + LIVE_INTERVAL
+
+    # Kein Anstoß innerhalb von IDLE_INTERVAL
+    idle = plan(planner(0, NOW + timedelta(days=6)), last_run=NOW)
+    assert idle.when == NOW + IDLE_INTERVAL and plan(planner(0, None)).when == NOW + IDLE_INTERVAL
+
+
+def test_fixed_planners():
+    assert plan(daily(3)).when == datetime(2025, 9, 14, 3, 0)
+    assert plan(daily(18, 30)).when == datetime(2025, 9, 13, 18, 30)
+    assert plan(weekly(0, 1)).when == datetime(2025, 9, 15, 1, 0)
+    # Nach einem Lauf zur geplanten Zeit: eine Woche später
+    assert plan(weekly(0, 1), datetime(2025, 9, 15, 1, 0), datetime(2025, 9, 15, 1, 0)).when == datetime(2025, 9, 22, 1, 0)
+    assert plan(every(timedelta(hours=4)), last_run=NOW).when == NOW + timedelta(hours=4)
+
+
+def test_kickoff_state_reads_open_matches():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE matches_real (match_id INTEGER, league TEXT, season TEXT,
+                    match_date TEXT, is_finished INTEGER)""")
+    conn.executemany("INSERT INTO matches_real VALUES (?, ?, ?, ?, ?)", [
+        (1, "bl1", "2025", "2025-09-13T13:30:00", 0),  # läuft
+        (2, "bl1", "2025", "2025-09-13T13:30:00", 1),  # beendet
+        (3, "bl1", "2025", "2025-09-13T10:00:00", 0),  # außerhalb des Spielfensters
+        (4, "bl1", "2025", "2025-09-13T18:30:00", 0),
+        (5, "bl2", "2025", "2025-09-13T16:00:00", 0),
+    ])
+    assert kickoff_state(conn, NOW, [("bl1", "2025")]) == (1, datetime(2025, 9, 13, 18, 30))
+    assert kickoff_state(conn, NOW, [("bl1", "2025"), ("bl2", "2025")]) == (1, datetime(2025, 9, 13, 16, 0))
+    assert kickoff_state(conn, NOW, [("bl1", "2024")]) == (0, None)
+
+
+def test_runner_runs_due_jobs_under_shared_lock():
+    clock = {"now": NOW}
+    runner = JobRunner(clock=lambda: clock["now"], max_sleep=0.01, telemetry=SyncTelemetry())
+    log = []
+
+    async def job(name):
+        log.append(f"{name} start")
+        await asyncio.sleep(0.02)
+        log.append(f"{name} end")
+        return name
+
+    async def due(now, last_run):
+        return Plan(now if last_run is None else now + timedelta(days=1), "fällig")
+
+    runner.add("a", lambda: job("a"), due, lock="openligadb")
+    runner.add("b", lambda: job("b"), due, lock="openligadb")
+    runner.add("later", lambda: job("later"), every(timedelta(hours=1)))
+
+    async def scenario():
+        await runner.start()
+        await asyncio.sleep(0.2)
+        # Manueller Lauf nimmt denselben Lock und liefert das Ergebnis
+        result = await runner.run_now("a")
+        await runner.stop()
+        return result
+
+    assert asyncio.run(scenario()) == "a"
+    # Nie zwei Jobs mit demselben Lock gleichzeitig, jeder fällige Job genau einmal geplant
+    assert log[:4] in (["a start", "a end", "b start", "b end"], ["b start", "b end", "a start", "a end"])
+    assert log[4:] == ["a start", "a end"]
+    assert runner.jobs["a"].runs == 2 and runner.jobs["b"].runs == 1 and runner.jobs["later"].runs == 0
+
+    queue = runner.queue()
+    assert [job["job"] for job in queue][0] == "later"
+    assert queue[0]["next_run"] == (NOW + timedelta(hours=1)).isoformat()
+
+
+def test_run_now_records_errors():
+    runner = JobRunner(telemetry=SyncTelemetry())
+
+    async def broken():
+        raise RuntimeError("OpenLigaDB nicht erreichbar")
+
+    runner.add("broken", broken, every(timedelta(hours=1)))
+    with pytest.raises(RuntimeError):
+        asyncio.run(runner.run_now("broken"))
+    status = runner.status()["queue"][0]
+    assert status["last_error"] == "OpenLigaDB nicht erreichbar" and status["runs"] == 1
+
+
+def test_main_real_data_startup_queues_updater_jobs(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import gameday_updater
+    import main_real_data
+    from gameday_updater import auto_updater
+
+    db_path = str(tmp_path / "updater.db")
+    monkeypatch.setattr(auto_updater.sync, "db_path", db_path)
+    auto_updater.sync.init_database()
+    runner = JobRunner(telemetry=SyncTelemetry())
+    monkeypatch.setattr(main_real_data, "runner", runner)
+    monkeypatch.setattr(gameday_updater, "runner", runner)
+
+    with TestClient(main_real_data.app) as client:
+        assert runner.is_running and not runner.paused
+        assert {job["job"] for job in runner.queue()} == {"gameday_sync", "live_scores", "weekly_cleanup"}
+        # Der Runner plant im Hintergrund: warten, bis jeder Job einen Termin hat
+        for _ in range(100):
+            queue = client.get("/api/auto-updater/status").json()["next_scheduled_updates"]
+            if len(queue) == 3:
+                break
+            time.sleep(0.02)
+        assert [job["reason"] for job in queue].count("kein Anstoß in Sicht") == 2
+    assert not runner.is_running
+
+
+def test_match_clock_follows_kickoff_timezone_on_utc_host():
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    try:
+        # match_date ist Ortszeit Europe/Berlin: auf einem UTC-Host 1-2 Stunden vor datetime.now()
+        offset = datetime.now(MATCH_TIMEZONE).utcoffset()
+        assert offset in (timedelta(hours=1), timedelta(hours=2))
+        assert abs(match_clock() - datetime.now() - offset) < timedelta(seconds=5)
+        assert JobRunner().clock is match_clock
+    finally:
+        if previous is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = previous
+        time.tzset()
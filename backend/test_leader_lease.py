@@ -0,0 +1,100 @@
+"""
+Test der Leader-Lease: Übernahme nach Ablauf, Freigabe, mehrere lokale Prozesse
+"""
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+
+from leader_lease import SqlAlchemyLease, SqliteLease
+
+BACKEND = Path(__file__).parent
+
+# Job-Runner mit Lease, der jeden Lauf mit Halter und Zeitraum protokolliert
+WORKER = """
+import asyncio, sqlite3, sys, time
+from datetime import timedelta
+from job_runner import JobRunner, every
+from leader_lease import SqliteLease
+
+db_path, seconds = sys.argv[1], float(sys.argv[2])
+lease = SqliteLease(db_path, ttl=0.6)
+
+async def job():
+    start = time.time()
+    await asyncio.sleep(0.02)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("INSERT INTO runs VALUES (?, ?, ?)", (lease.holder, start, time.time()))
+    conn.commit()
+    conn.close()
+
+async def main():
+    runner = JobRunner(max_sleep=0.05, lease=lease)
+    runner.add("sync", job, every(timedelta(milliseconds=100)))
+    await runner.start()
+    await asyncio.sleep(seconds)
+    await runner.stop()
+
+asyncio.run(main())
+"""
+
+
+@pytest.mark.parametrize("factory", ["sqlite", "sqlalchemy"])
+def test_lease_expires_and_is_released(tmp_path, factory):
+    db_path = str(tmp_path / "lease.db")
+    if factory == "sqlite":
+        make = lambda holder: SqliteLease(db_path, holder=holder, ttl=0.2)
+    else:
+        engine = create_engine(f"sqlite:///{db_path}")
+        make = lambda holder: SqlAlchemyLease(engine, holder=holder, ttl=0.2)
+    a, b = make("a"), make("b")
+
+    assert a.acquire() and not b.acquire()
+    assert b.status()["holder"] == "a" and b.status()["role"] == "follower"
+    # Verlängern hält die Lease, ohne Verlängerung übernimmt b nach Ablauf
+    time.sleep(0.1)
+    assert a.acquire() and not b.acquire()
+    time.sleep(0.25)
+    assert b.acquire() and not a.acquire()
+
+    b.release()
+    assert a.acquire() and a.status()["role"] == "leader"
+
+
+def test_only_one_process_runs_jobs_and_follower_takes_over(tmp_path):
+    db_path = str(tmp_path / "lease.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE runs (holder TEXT, start REAL, end REAL)")
+    conn.commit()
+
+    env = dict(os.environ, PYTHONPATH=str(BACKEND))
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, db_path, "4"], cwd=BACKEND, env=env)
+               for _ in range(3)]
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and not conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]:
+            time.sleep(0.05)
+        time.sleep(0.5)
+        # Leader hart beenden (ohne Freigabe): ein Follower übernimmt nach Ablauf der Lease
+        leader = conn.execute("SELECT holder FROM sync_leases").fetchone()[0]
+        os.kill(int(leader.split(":")[-2]), signal.SIGKILL)
+        for worker in workers:
+            worker.wait(timeout=30)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+
+    runs = conn.execute("SELECT holder, start, end FROM runs ORDER BY start").fetchall()
+    holders = list(dict.fromkeys(holder for holder, _, _ in runs))
+    assert len(holders) == 2 and holders[0] == leader
+    # Nie zwei Instanzen gleichzeitig, Übernahme erst nach dem letzten Lauf des alten Leaders
+    assert all(end <= next_start for (_, _, end), (_, next_start, _) in zip(runs, runs[1:]))
+    takeover = next(start for holder, start, _ in runs if holder == holders[1])
+    assert takeover - max(end for holder, _, end in runs if holder == leader) >= 0.3
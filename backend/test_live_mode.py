@@ -0,0 +1,89 @@
+"""
+Test des Live-Modus: nur laufende Spieltage, adaptiver Takt, Abschalten nach dem letzten Abpfiff
+"""
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import httpx
+
+from data_version import current_data_version
+from db_connection import AsyncDatabase, ConnectionManager
+from ingest import ingest_matches
+from job_runner import IDLE_INTERVAL, fixture_planner
+from live_mode import BACKOFF, START_INTERVAL, LiveMode
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+KICKOFF = datetime(2025, 8, 22, 15, 30)  # Spieltag 1: Anstöße 15:30, 16:30, 17:30
+
+
+def test_live_mode_polls_active_matchday_until_last_final_whistle(tmp_path):
+    db_path = str(tmp_path / "live.db")
+    RealDataSync(db_path=db_path).init_database()
+    stub = OpenLigaDBStub(clock=KICKOFF - timedelta(hours=1))
+    conn = sqlite3.connect(db_path)
+    ingest_matches(conn, [RealDataSync.match_row(RealDataSync.convert_match(match, "2025", matchday, "bl1"))
+                          for matchday in (1, 2) for match in stub.matches("bl1", "2025", matchday)])
+    conn.commit()
+    conn.close()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    fetcher = MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000)
+    clock = {"now": stub.clock}
+    database = AsyncDatabase(ConnectionManager(db_path))
+    live = LiveMode(lambda: fetcher, lambda: database, selected=lambda: [("bl1", "2025")], clock=lambda: clock["now"])
+
+    async def step(now):
+        clock["now"] = now
+        stub.advance(now)
+        return await live.planner(now, now - timedelta(seconds=1))
+
+    async def scenario():
+        # Vor dem Anstoß: schlafen bis 15:30
+        plan = await step(KICKOFF - timedelta(hours=1))
+        assert not plan.live and plan.when == KICKOFF and not live.active
+
+        # Anpfiff: sofort abfragen, ohne Änderungen länger warten
+        plan = await step(KICKOFF + timedelta(minutes=15))
+        assert plan.live and plan.when == clock["now"] and live.active
+        report = await live.poll()
+        assert report["matchdays"] == [["bl1", "2025", 1]] and report["updated"] == 0
+        assert live.interval == START_INTERVAL * BACKOFF
+        version = await database.read(current_data_version)
+
+        # Erste Abpfiffe: Ergebnisse über den Feed, Takt wird kürzer
+        await step(KICKOFF + timedelta(hours=2, minutes=5))
+        report = await live.poll()
+        assert (report["updated"], report["finished"], report["active"]) == (3, 3, True)
+        assert live.interval == START_INTERVAL * BACKOFF / 2
+        assert await database.read(current_data_version) > version
+        plan = await live.planner(clock["now"], clock["now"])
+        assert plan.live and plan.when == clock["now"] + live.interval
+
+        # Letzter Abpfiff: Modus schaltet sich ab, Spieltag 2 ist eine Woche entfernt
+        await step(KICKOFF + timedelta(hours=4, minutes=5))
+        report = await live.poll()
+        assert (report["finished"], report["active"], live.status()["polls"]) == (6, False, 3)
+        plan = await live.planner(clock["now"], clock["now"])
+        assert not plan.live and plan.when == clock["now"] + IDLE_INTERVAL
+        plan = await live.planner(KICKOFF + timedelta(days=7, hours=-1), None)
+        assert plan.when == KICKOFF + timedelta(days=7)
+
+    asyncio.run(scenario())
+    database.shutdown()
+
+    # Nur der laufende Spieltag wurde abgefragt
+    assert {request["path"] for request in stub.requests} == {"/getmatchdata/bl1/2025/1"}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM matches_real WHERE matchday = 1 AND is_finished = 1").fetchone() == (9,)
+    assert conn.execute("SELECT SUM(games) FROM standings_real WHERE season = '2025'").fetchone() == (18,)
+
+
+def test_regular_sync_pauses_while_live():
+    async def live_state(now):
+        return 2, None
+
+    plan = asyncio.run(fixture_planner(live_state, live_interval=None)(KICKOFF, KICKOFF))
+    assert plan.live and plan.when > KICKOFF + timedelta(hours=2)
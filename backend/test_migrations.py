@@ -0,0 +1,99 @@
+"""
+Test der Migrationen und Query-Plan-Regressionstests für matches_real
+
+Die Abfragen werden über den sqlite3 Trace-Callback so mitgeschnitten, wie der
+Code sie ausführt, und dann mit EXPLAIN QUERY PLAN geprüft. Ändert jemand eine
+Abfrage so, dass sie wieder die ganze Tabelle scannt, schlägt der Test fehl.
+"""
+import re
+import sqlite3
+
+import main_cloud
+from migrations import LATEST_VERSION, apply_migrations, current_version
+from team_stats import _replay_snapshot_rows, _replay_team_from
+from test_xg_engine import _create_synthetic_db
+from xg_engine import FORM_SEASONS, load_team_windows
+
+FULL_SCAN = re.compile(r"^SCAN (matches_real|mr)$")
+
+
+def _query_plans(conn, run):
+    """Führt run(cursor) aus und liefert die Plan-Details aller Abfragen auf matches_real"""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    run(conn.cursor())
+    conn.set_trace_callback(None)
+
+    plans = []
+    for statement in statements:
+        if "matches_real" not in statement:
+            continue
+        details = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement)]
+        assert not any(FULL_SCAN.match(d) for d in details), f"Full Scan:\n{statement}\n{details}"
+        plans.append("\n".join(details))
+    assert plans, "keine Abfrage auf matches_real mitgeschnitten"
+    return "\n".join(plans)
+
+
+def _migrated_db(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_migrations_are_versioned_and_idempotent(tmp_path):
+    conn = _migrated_db(tmp_path)
+    assert current_version(conn) == LATEST_VERSION
+    assert apply_migrations(conn) == []
+
+    indexes = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'matches_real'")}
+    assert {"idx_matches_real_home_team", "idx_matches_real_away_team",
+            "idx_matches_real_partition", "idx_matches_real_partition_open"} <= indexes
+    # Ersetzt durch die Partitions-Indizes (Migration 7)
+    assert not {"idx_matches_real_season_matchday", "idx_matches_real_open"} & indexes
+    conn.close()
+
+
+def test_migrations_wait_for_matches_real():
+    conn = sqlite3.connect(":memory:")
+    assert apply_migrations(conn) == []
+    assert current_version(conn) == 0
+    conn.close()
+
+
+def test_team_window_query_uses_covering_team_indexes(tmp_path):
+    conn = _migrated_db(tmp_path)
+    plan = _query_plans(conn, lambda cursor: load_team_windows(cursor, [1, 2, 3]))
+    assert "USING COVERING INDEX idx_matches_real_home_team" in plan
+    assert "USING COVERING INDEX idx_matches_real_away_team" in plan
+    conn.close()
+
+
+def test_team_matches_and_snapshot_replay_use_team_indexes(tmp_path):
+    conn = _migrated_db(tmp_path)
+    for run in (lambda cursor: main_cloud._team_matches_from_matches_real(cursor, 1),
+                lambda cursor: _replay_snapshot_rows(cursor, [1, 2], FORM_SEASONS),
+                lambda cursor: _replay_team_from(cursor, 1, FORM_SEASONS, "2025-01-01")):
+        plan = _query_plans(conn, run)
+        assert "idx_matches_real_home_team" in plan
+        assert "idx_matches_real_away_team" in plan
+    conn.close()
+
+
+def test_matchday_queries_use_matchday_indexes(tmp_path):
+    conn = _migrated_db(tmp_path)
+    partition_search = "idx_matches_real_partition (league=? AND season=? AND matchday=?)"
+    plan = _query_plans(conn, lambda cursor: main_cloud._matchday_predictions_from_matches_real(cursor, 9))
+    assert partition_search in plan
+
+    plan = _query_plans(conn, main_cloud._next_matchday_from_matches_real)
+    assert "idx_matches_real_partition_open (league=? AND season=?)" in plan
+    assert partition_search in plan
+
+    for run in (main_cloud._matchday_info_from_matches_real,
+                lambda cursor: main_cloud._table_from_matches_real(cursor, 9)):
+        assert "idx_matches_real_partition (league=? AND season=?" in _query_plans(conn, run)
+    conn.close()
@@ -0,0 +1,58 @@
+"""
+Test des gemeinsamen OpenLigaDB-Clients: Payload-Cache und Single-Flight (gegen den Stub)
+"""
+import asyncio
+
+import httpx
+
+from app.services.openliga_client import OpenLigaDBClient
+from app.services.openliga_pool import PayloadCache
+from openligadb_stub import OpenLigaDBStub
+
+
+def _client(stub):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+
+
+def _season_requests(stub, season):
+    return sum(1 for entry in stub.requests if entry["path"] == f"/getmatchdata/bl1/{season}")
+
+
+def test_concurrent_callers_share_one_season_fetch():
+    stub = OpenLigaDBStub(latency=0.05)
+    cache = PayloadCache(ttl=60)
+
+    async def run():
+        async with _client(stub) as http:
+            clients = [OpenLigaDBClient(client=http, cache=cache) for _ in range(10)]
+            # Wie PredictionService.calculate_form_factors: viele Teams gleichzeitig über zwei Saisons
+            results = await asyncio.gather(*(
+                client.get_matches_across_seasons(team_id, n=14) for team_id, client in enumerate(clients, 1)
+            ))
+            again = await clients[0].get_team_matches(1)
+            return results, again
+
+    results, again = asyncio.run(run())
+    assert _season_requests(stub, "2025") == 1 and _season_requests(stub, "2024") == 1
+    assert all(len(matches) == 14 for matches in results)
+    assert len(again) == 34
+    # Je Saison ein Abruf für Payload und Index, alle weiteren Aufrufer warten darauf
+    assert cache.misses == 4 and cache.coalesced == 18 and cache.hits == 1
+
+
+def test_errors_are_not_cached_and_ttl_expires():
+    stub = OpenLigaDBStub(fail_first=1)
+    cache = PayloadCache(ttl=0)
+
+    async def run():
+        async with _client(stub) as http:
+            client = OpenLigaDBClient(client=http, cache=cache)
+            first = await client.get_matches_by_matchday("bl1", "2025", 1)
+            second = await client.get_matches_by_matchday("bl1", "2025", 1)
+            third = await client.get_matches_by_matchday("bl1", "2025", 1)
+            return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == [] and len(second) == 9 and second == third
+    # Fehler + zwei Abrufe, weil ttl=0 nichts im Cache hält
+    assert len(stub.requests) == 3
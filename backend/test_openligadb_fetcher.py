@@ -0,0 +1,61 @@
+"""
+Test des parallelen OpenLigaDB-Abrufs gegen den lokalen Stub
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+
+def _fetcher(stub, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    return MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, **kwargs)
+
+
+def test_concurrency_and_rate_are_bounded():
+    stub = OpenLigaDBStub(latency=0.05)
+    fetcher = _fetcher(stub, concurrency=3, rate=40, burst=4)
+    keys = [("bl1", season, matchday) for season in ("2024", "2025") for matchday in range(1, 13)]
+
+    start = time.monotonic()
+    results = asyncio.run(fetcher.fetch_many(keys))
+    duration = time.monotonic() - start
+
+    assert list(results) == keys
+    assert all(len(matches) == 9 for matches in results.values())
+    assert len(stub.requests) == len(keys)
+    assert stub.max_active <= 3
+    # Burst von 4, danach höchstens 40 Anfragen pro Sekunde
+    assert stub.max_requests_per_window(0.25) <= 4 + 40 * 0.25
+    assert duration >= (len(keys) - 4) / 40
+
+
+def test_retries_with_backoff_then_gives_up():
+    stub = OpenLigaDBStub(fail_first=2)
+    fetcher = _fetcher(stub, retries=3, backoff=0.01, rate=1000)
+    assert len(asyncio.run(fetcher.fetch("bl1", "2025", 1))) == 9
+    assert fetcher.requests == 3 and fetcher.retried == 2
+
+    stub = OpenLigaDBStub(fail_first=5)
+    fetcher = _fetcher(stub, retries=2, backoff=0.01, rate=1000)
+    assert asyncio.run(fetcher.fetch_many([("bl1", "2025", 1), ("bl1", "2025", 2)])) == {}
+    assert len(stub.requests) == 6
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(fetcher.fetch("bl1", "2025", 3))
+
+
+def test_real_data_sync_fetches_arbitrary_matchdays(tmp_path):
+    stub = OpenLigaDBStub(finished_until=3)
+    sync = RealDataSync(db_path=str(tmp_path / "sync.db"), fetcher=_fetcher(stub, rate=1000))
+
+    matches = asyncio.run(sync.fetch_matches_from_season("2025", matchdays=[2, 3, 4]))
+    assert [m["matchday"] for m in matches] == [2] * 9 + [3] * 9 + [4] * 9
+    finished = [m for m in matches if m["isFinished"]]
+    assert len(finished) == 18 and all("homeGoals" in m and "homeGoalsHT" in m for m in finished)
+    assert not any("homeGoals" in m for m in matches if not m["isFinished"])
+    assert len(asyncio.run(sync.fetch_teams_from_season("2025"))) == 18
@@ -0,0 +1,53 @@
+"""
+Test Aufnahme und Wiedergabe von OpenLigaDB-Antworten (Recorder + Stub mit Fixtures)
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_recorder import MANIFEST, record
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+
+def _fetcher(stub):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    return MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000)
+
+
+def test_recorded_fixtures_replay_identically(tmp_path):
+    source = OpenLigaDBStub(finished_until=2)
+    recorded = asyncio.run(record(tmp_path, ["2025"], range(1, 4), base_url="http://stub",
+                                  inner=httpx.ASGITransport(app=source), rate=1000))
+    assert len(recorded) == 3 + 3 + 1
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+    assert "/getmatchdata/bl1/2025/2" in manifest["paths"]
+
+    replay = OpenLigaDBStub(fixtures=str(tmp_path))
+    for matchday in range(1, 4):
+        assert replay.matches("bl1", "2025", matchday) == source.matches("bl1", "2025", matchday)
+        assert replay.last_change("2025", matchday) == source.last_change("2025", matchday)
+    assert replay.season_matches("bl1", "2025") == source.season_matches("bl1", "2025")
+    assert replay.matches("bl1", "2025", 4) == []
+
+
+def test_replay_clock_drives_incremental_sync(tmp_path):
+    asyncio.run(record(tmp_path, ["2025"], range(1, 5), base_url="http://stub",
+                       inner=httpx.ASGITransport(app=OpenLigaDBStub()), rate=1000))
+    # Nach Spieltag 2 (Spieltag 3 beginnt am 2025-09-05)
+    stub = OpenLigaDBStub(fixtures=str(tmp_path), clock=datetime(2025, 9, 1))
+    assert [m["matchIsFinished"] for m in stub.matches("bl1", "2025", 3)] == [False] * 9
+    assert stub.matches("bl1", "2025", 3)[0]["matchResults"] == []
+
+    sync = RealDataSync(db_path=str(tmp_path / "sync.db"), fetcher=_fetcher(stub))
+    sync.init_database()
+    first = asyncio.run(sync.sync_changed_matchdays("2025", range(1, 5)))
+    assert first["matchdays_changed"] == [1, 2, 3, 4] and first["finished_matches"] == 18
+
+    stub.advance(datetime(2025, 9, 8))
+    second = asyncio.run(sync.sync_changed_matchdays("2025", range(1, 5)))
+    assert second["matchdays_changed"] == [3]
+    assert (second["updated"], second["finished_matches"]) == (9, 9)
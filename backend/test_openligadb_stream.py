@@ -0,0 +1,57 @@
+"""
+Test des streamenden OpenLigaDB-Parsers (Chunk-Grenzen, gleiche Zeilen wie convert_match)
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ingest import MATCH_COLUMNS
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stream import ROW_FIELDS, MatchStreamParser, parse_matches
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+
+
+def test_records_match_convert_match_at_any_chunk_size():
+    stub = OpenLigaDBStub(finished_until=1)
+    matches = stub.season_matches("bl1", "2025")[:12]
+    matches[0]["goals"] = [{"goalID": 1, "goalGetterName": "Müller", "matchMinute": 12}]
+    body = json.dumps(matches, ensure_ascii=False, indent=1).encode("utf-8")
+    expected = [RealDataSync.match_row(RealDataSync.convert_match(m, "2025", m["group"]["groupOrderID"], "bl1"))
+                for m in matches]
+    assert ROW_FIELDS == MATCH_COLUMNS
+
+    # Chunk-Grenzen mitten in Objekten, Strings und UTF-8-Zeichen
+    for size in (1, 7, 64, len(body)):
+        parser = MatchStreamParser("bl1", "2025")
+        records = []
+        for start in range(0, len(body), size):
+            records.extend(parser.feed(body[start:start + size]))
+        records.extend(parser.close())
+        assert [record.row() for record in records] == expected
+    assert records[1].teams()[0][2].startswith("T")
+
+    assert parse_matches(b" [ ] ", "bl1", "2025") == []
+    with pytest.raises(ValueError):
+        parse_matches(body[:-40], "bl1", "2025")
+    with pytest.raises(ValueError):
+        parse_matches(b'{"error": "stub"}', "bl1", "2025")
+
+
+def test_fetcher_streams_records():
+    stub = OpenLigaDBStub(finished_until=2, fail_first=1)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    fetcher = MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000, backoff=0.001)
+
+    keys = [("bl1", "2025", 2), ("bl1", "2025", 3)]
+    records = asyncio.run(fetcher.fetch_records(keys))
+    assert list(records) == keys and fetcher.retried == 2
+    assert [r.row() for r in records[keys[0]]] == [
+        RealDataSync.match_row(RealDataSync.convert_match(m, "2025", 2, "bl1")) for m in stub.matches("bl1", "2025", 2)]
+    assert [r.is_finished for r in records[keys[1]]] == [False] * 9
+
+    season = asyncio.run(fetcher.fetch_season_records("bl1", "2024"))
+    assert len(season) == 306 and {r.matchday for r in season} == set(range(1, 35))
+    assert fetcher.bytes_downloaded > 0
@@ -0,0 +1,70 @@
+"""
+Test der Liga/Saison-Partitionen (Sync mehrerer Partitionen, partitionierte Abfragen)
+"""
+import asyncio
+import sqlite3
+
+import httpx
+
+import main_cloud
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+from partitions import Partition, parse_partition, partitions
+from real_data_sync import RealDataSync
+from standings import StandingsCache
+
+SELECTED = [Partition("bl1", "2025"), Partition("bl2", "2024")]
+
+
+def _synced_db(tmp_path):
+    stub = OpenLigaDBStub(finished_until=5)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    sync = RealDataSync(db_path=str(tmp_path / "sync.db"),
+                        fetcher=MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000))
+    sync.init_database()
+    reports = asyncio.run(sync.sync_partitions(SELECTED))
+    return sync, reports
+
+
+def test_partitions_from_config_values():
+    assert partitions(["bl1", "bl2"], ["2024", "2025"]) == [
+        ("bl1", "2025"), ("bl2", "2025"), ("bl1", "2024"), ("bl2", "2024")]
+    assert parse_partition("bl2/2024") == Partition("bl2", "2024")
+    assert str(parse_partition("2023")) == "bl1/2023"
+
+
+def test_sync_and_queries_stay_in_their_partition(tmp_path, monkeypatch):
+    sync, reports = _synced_db(tmp_path)
+    assert [(r["league"], r["season"], r["rows_touched"]) for r in reports] == [
+        ("bl1", "2025", 306), ("bl2", "2024", 306)]
+    # Zweiter Lauf: Wasserzeichen je Partition, nichts zu laden
+    assert [r["rows_touched"] for r in asyncio.run(sync.sync_partitions(SELECTED))] == [0, 0]
+
+    conn = sqlite3.connect(sync.db_path)
+    assert conn.execute("""
+        SELECT league, season, COUNT(*) FROM matches_real GROUP BY league, season ORDER BY league
+    """).fetchall() == [("bl1", "2025", 306), ("bl2", "2024", 306)]
+    assert conn.execute("SELECT DISTINCT league FROM sync_watermarks ORDER BY league").fetchall() == [
+        ("bl1",), ("bl2",)]
+    conn.executemany("INSERT OR IGNORE INTO teams_real (team_id, name, short_name) VALUES (?, ?, ?)",
+                     [(team_id, f"Team {team_id:02d}", f"T{team_id}") for team_id in range(1, 19)])
+
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    main_cloud.schema.refresh(conn)
+    monkeypatch.setattr(main_cloud, "standings_cache", StandingsCache())
+    for league, season in SELECTED:
+        table = main_cloud._table_from_standings(cursor, None, league, season)
+        assert table == main_cloud._table_from_matches_real(cursor, None, league, season)
+        assert sum(entry["games"] for entry in table) == 5 * 18
+        next_matchday = main_cloud._next_matchday_from_matches_real(cursor, league, season)
+        assert (next_matchday["season"], next_matchday["matchday"]) == (season, 6)
+        info = main_cloud._matchday_info_from_matches_real(cursor, league, season)
+        assert info["season"] == season and {m["season"] for m in info["matchdays"]} == {season}
+    # Spiele ohne is_finished (NULL, ältere Tabellen ohne NOT NULL) gelten als offen
+    conn.execute("CREATE TEMP TABLE matches_real AS SELECT * FROM main.matches_real")
+    conn.execute("UPDATE temp.matches_real SET is_finished = NULL WHERE league = 'bl1' AND matchday = 6")
+    assert main_cloud._next_matchday_from_matches_real(cursor, "bl1", "2025")["matchday"] == 6
+    # Eine Partition ohne Spiele bleibt leer
+    assert main_cloud._table_from_standings(cursor, None, "bl3", "2025") == []
+    conn.close()
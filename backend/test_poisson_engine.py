@@ -0,0 +1,67 @@
+"""
+Test der vektorisierten Poisson-Ergebnismatrix gegen die Einzelberechnung
+"""
+import math
+import sqlite3
+
+import numpy as np
+
+from backtest_engine import backtest
+from poisson_engine import MAX_GOALS, score_fixtures, scoreline_matrix
+from test_xg_engine import _create_synthetic_db
+from xg_engine import predict_fixtures
+
+
+def _scalar_matrix(home_xg, away_xg):
+    """Ergebnismatrix eines Spiels mit math.exp/math.factorial"""
+    def pmf(xg, k):
+        return math.exp(-xg) * xg ** k / math.factorial(k)
+    matrix = [[pmf(home_xg, h) * pmf(away_xg, a) for a in range(MAX_GOALS + 1)]
+              for h in range(MAX_GOALS + 1)]
+    total = sum(map(sum, matrix))
+    return [[p / total for p in row] for row in matrix]
+
+
+def test_matrix_matches_scalar_poisson():
+    home_xg = np.array([0.5, 1.0, 1.76, 3.2, 0.0])
+    away_xg = np.array([2.4, 1.0, 0.9, 0.5, 1.3])
+    matrix = scoreline_matrix(home_xg, away_xg)
+    assert matrix.shape == (5, MAX_GOALS + 1, MAX_GOALS + 1)
+
+    result = score_fixtures(home_xg, away_xg)
+    for n in range(len(home_xg)):
+        expected = _scalar_matrix(home_xg[n], away_xg[n])
+        np.testing.assert_allclose(matrix[n], expected, rtol=1e-12, atol=1e-15)
+
+        home = sum(expected[h][a] for h in range(MAX_GOALS + 1) for a in range(MAX_GOALS + 1) if h > a)
+        draw = sum(expected[h][h] for h in range(MAX_GOALS + 1))
+        over = sum(expected[h][a] for h in range(MAX_GOALS + 1) for a in range(MAX_GOALS + 1) if h + a > 2.5)
+        assert math.isclose(result["home_win_prob"][n], home, rel_tol=1e-12)
+        assert math.isclose(result["draw_prob"][n], draw, rel_tol=1e-12)
+        assert math.isclose(result["over_2_5"][n], over, rel_tol=1e-12)
+
+        best = max(((h, a) for h in range(MAX_GOALS + 1) for a in range(MAX_GOALS + 1)),
+                   key=lambda score: expected[score[0]][score[1]])
+        assert (result["predicted_home_goals"][n], result["predicted_away_goals"][n]) == best
+
+    np.testing.assert_allclose(result["home_win_prob"] + result["draw_prob"] + result["away_win_prob"], 1.0)
+
+
+def test_poisson_model_in_predictions_and_backtest(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+
+    fixtures = [(1, 2), (3, 4), (5, 99)]
+    linear = predict_fixtures(cursor, fixtures)
+    poisson = predict_fixtures(cursor, fixtures, model="poisson")
+    for lin, poi in zip(linear, poisson):
+        assert poi["home_xg"] == lin["home_xg"] and poi["away_xg"] == lin["away_xg"]
+        assert math.isclose(poi["home_win_prob"] + poi["draw_prob"] + poi["away_win_prob"], 1.0)
+        assert set(poi["over_under"]) == {"over_1_5", "over_2_5", "over_3_5"}
+        assert "over_under" not in lin
+
+    result = backtest(cursor, ("2024", "2025"), model="poisson")
+    assert result["stats"]["total_predictions"] == len(backtest(cursor, ("2024", "2025"))["entries"])
+    conn.close()
@@ -0,0 +1,178 @@
+"""
+Test der vorberechneten Vorhersagen: gleiche Antwort wie live, Rückfall bei Versionswechsel,
+Nachrechnen fehlender Spiele, Feed nur für geänderte Teams und Partitionen
+"""
+import sqlite3
+
+import main_cloud
+import prediction_store
+from data_version import bump_data_version, current_data_version
+from ingest import MATCH_COLUMNS, ingest_matches
+from migrations import apply_migrations
+from partitions import Partition
+from prediction_store import is_current, load_stored_predictions, materialize_predictions
+from standings import rebuild_standings
+from team_stats import init_snapshot_table, rebuild_snapshots
+from test_xg_engine import _create_synthetic_db
+from xg_engine import MODELS
+
+PARTITION = Partition("bl1", "2025")
+
+
+def _prepared_db(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    apply_migrations(conn)
+    rebuild_standings(conn)
+    init_snapshot_table(conn)
+    rebuild_snapshots(conn)
+    main_cloud.schema.refresh(conn)
+    return conn
+
+
+def _both(cursor, matchday, model):
+    args = (matchday, model, *PARTITION)
+    return (main_cloud._matchday_predictions_stored(cursor, *args),
+            main_cloud._matchday_predictions_from_matches_real(cursor, *args))
+
+
+def test_stored_predictions_equal_live_computation(tmp_path):
+    conn = _prepared_db(tmp_path)
+    cursor = conn.cursor()
+    assert load_stored_predictions(cursor, *PARTITION, 9, "linear") is None
+
+    written = materialize_predictions(conn, [PARTITION])
+    assert written == 4 * 5 * len(MODELS)
+    assert is_current(conn, *PARTITION)
+    for model in MODELS:
+        assert load_stored_predictions(cursor, *PARTITION, 9, model) is not None
+        stored, live = _both(cursor, 9, model)
+        assert stored == live and len(stored) == 5
+    assert any("over_under" in entry for entry in _both(cursor, 10, "poisson")[0])
+    conn.close()
+
+
+def test_stale_or_missing_predictions_fall_back_to_live(tmp_path, monkeypatch):
+    conn = _prepared_db(tmp_path)
+    cursor = conn.cursor()
+    materialize_predictions(conn, [PARTITION])
+
+    # Neuer Algorithmus: gespeicherte Werte gelten nicht mehr
+    monkeypatch.setattr(prediction_store, "ALGORITHM_VERSION", prediction_store.ALGORITHM_VERSION + 1)
+    assert not is_current(conn, *PARTITION)
+    assert load_stored_predictions(cursor, *PARTITION, 9, "linear") is None
+    monkeypatch.undo()
+
+    # Fehlt eine Zeile, wird nur dieses Spiel nachgerechnet, die übrigen kommen aus predictions_real
+    conn.execute("DELETE FROM predictions_real WHERE match_id = (SELECT MIN(match_id) FROM predictions_real)")
+    missing = conn.execute("SELECT matchday FROM matches_real WHERE season = '2025' AND is_finished = 0 "
+                           "ORDER BY match_id LIMIT 1").fetchone()[0]
+    monkeypatch.setattr(prediction_store, "predict_fixtures", _counting(prediction_store.predict_fixtures))
+    assert len(load_stored_predictions(cursor, *PARTITION, missing, "linear")) == 5
+    assert prediction_store.predict_fixtures.fixtures == 1
+    stored, live = _both(cursor, missing, "linear")
+    assert stored == live
+    conn.close()
+
+
+def _counting(predict):
+    def counted(cursor, fixtures, **kwargs):
+        counted.fixtures += len(fixtures)
+        return predict(cursor, fixtures, **kwargs)
+    counted.fixtures = 0
+    return counted
+
+
+def _finish(conn, matchday, home_goals=5, away_goals=0):
+    match = conn.execute(f"""
+        SELECT {', '.join(MATCH_COLUMNS)} FROM matches_real
+        WHERE season = '2025' AND matchday = ? ORDER BY match_id LIMIT 1
+    """, (matchday,)).fetchone()
+    result = ingest_matches(conn, [dict(dict(match), is_finished=True, home_goals=home_goals,
+                                        away_goals=away_goals)])
+    return match, result
+
+
+def test_ingest_refreshes_materialized_predictions(tmp_path):
+    conn = _prepared_db(tmp_path)
+    materialize_predictions(conn, [PARTITION])
+    first = conn.execute("SELECT match_id FROM matches_real WHERE season = '2025' AND matchday = 9 "
+                         "ORDER BY match_id LIMIT 1").fetchone()[0]
+    before = conn.execute("SELECT home_win_prob, data_version FROM predictions_real WHERE match_id = ? "
+                          "AND model = 'linear'", (first,)).fetchone()
+
+    match, result = _finish(conn, 9)
+    # Nur offene Spiele der beiden Teams werden neu gerechnet
+    affected = conn.execute("""
+        SELECT COUNT(*) FROM matches_real
+        WHERE season = '2025' AND is_finished = 0
+          AND (home_team_id IN (?, ?) OR away_team_id IN (?, ?))
+    """, (match["home_team_id"], match["away_team_id"]) * 2).fetchone()[0]
+    assert 0 < affected < 4 * 5 - 1
+    assert result["published"]["refresh_predictions"] == affected * len(MODELS)
+
+    # Partition auf neuem Stand, das beendete Spiel behält seine Vorhersage
+    assert is_current(conn, *PARTITION)
+    assert conn.execute("SELECT MIN(data_version) FROM prediction_runs").fetchone()[0] == current_data_version(conn)
+    assert tuple(conn.execute("SELECT home_win_prob, data_version FROM predictions_real WHERE match_id = ? "
+                              "AND model = 'linear'", (first,)).fetchone()) == tuple(before)
+    for matchday in (10, 11, 12):
+        stored, live = _both(conn.cursor(), matchday, "linear")
+        assert stored == live
+
+    # Fehlt die Vorhersage des beendeten Spiels, wird sie mit dem Stand vor dem Anstoß nachgerechnet
+    conn.execute("DELETE FROM predictions_real WHERE match_id = ?", (first,))
+    row, prediction = load_stored_predictions(conn.cursor(), *PARTITION, 9, "linear")[0]
+    assert row["match_id"] == first
+    assert prediction["home_win_prob"] == before["home_win_prob"]
+    conn.close()
+
+
+def test_freshness_is_tracked_per_partition(tmp_path):
+    conn = _prepared_db(tmp_path)
+    materialize_predictions(conn, [PARTITION])
+    stored = conn.execute("SELECT match_id, model, computed_at, data_version FROM predictions_real").fetchall()
+
+    # Andere Partition mit fremden Teams: bl1/2025 bleibt aktuell und wird nicht neu gerechnet
+    other = dict(match_id=9001, league="bl2", season="2025", matchday=1, home_team_id=51, away_team_id=52,
+                 home_team_name="Team 51", away_team_name="Team 52", match_date="2025-09-20T13:00:00",
+                 is_finished=False, home_goals=None, away_goals=None)
+    result = ingest_matches(conn, [{column: other.get(column) for column in MATCH_COLUMNS}])
+    assert result["published"]["refresh_predictions"] == len(MODELS)
+    assert is_current(conn, *PARTITION) and is_current(conn, "bl2", "2025")
+    assert conn.execute("SELECT match_id, model, computed_at, data_version FROM predictions_real "
+                        "WHERE league = 'bl1'").fetchall() == stored
+
+    # Neue Datenversion ohne Spieländerung (z.B. Teamnamen) macht nichts ungültig
+    bump_data_version(conn)
+    assert is_current(conn, *PARTITION)
+
+    # Geändertes Spiel ohne Feed-Lauf (z.B. fehlgeschlagener Abonnent): nur die Partition mit dem Team
+    conn.execute("""
+        INSERT INTO match_changes (data_version, match_id, league, season, matchday, home_team_id, away_team_id)
+        VALUES (?, 1, 'bl1', '2024', 1, 1, 2)
+    """, (current_data_version(conn) + 1,))
+    assert not is_current(conn, *PARTITION) and is_current(conn, "bl2", "2025")
+    conn.close()
+
+
+def test_live_fallback_uses_stats_as_of_kickoff(tmp_path):
+    conn = _prepared_db(tmp_path)
+    cursor = conn.cursor()
+    materialize_predictions(conn, [PARTITION])
+    finished = conn.execute("SELECT MIN(matchday) FROM matches_real WHERE season = '2025' AND is_finished = 1"
+                            ).fetchone()[0]
+
+    # Beendeter Spieltag: gespeicherter Weg rechnet alle Spiele vor dem Anstoß nach, der Rückfall ebenso
+    stored, live = _both(cursor, finished, "linear")
+    assert stored == live
+    rows = conn.execute("SELECT home_team_id, away_team_id FROM matches_real WHERE season = '2025' "
+                        "AND matchday = ? ORDER BY match_date", (finished,)).fetchall()
+    current = prediction_store.predict_fixtures(cursor, [tuple(row) for row in rows],
+                                                stats_loader=prediction_store.load_team_stats)
+    assert ([entry["form_factors"]["home_goals_last_14"] for entry in live]
+            != [prediction["home_goals_last_14"] for prediction in current])
+    conn.close()
+
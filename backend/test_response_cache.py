@@ -0,0 +1,83 @@
+"""
+Test des HTTP-Antwort-Caches (ETag/304, Invalidierung über die Datenversion)
+"""
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main_cloud
+from db_connection import ConnectionManager, AsyncDatabase
+from real_data_sync import RealDataSync
+from response_cache import ResponseCache
+from standings import StandingsCache, rebuild_standings
+from test_xg_engine import _create_synthetic_db
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany("INSERT INTO teams_real (team_id, name, short_name) VALUES (?, ?, ?)",
+                     [(team_id, f"Team {team_id:02d}", f"T{team_id}") for team_id in range(1, 11)])
+    rebuild_standings(conn)
+    conn.commit()
+    conn.close()
+
+    database = AsyncDatabase(ConnectionManager(str(db_path)))
+    monkeypatch.setenv("KICK_JOB_RUNNER", "false")
+    monkeypatch.setattr(main_cloud, "DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(main_cloud, "database", database)
+    monkeypatch.setattr(main_cloud, "response_cache", ResponseCache())
+    monkeypatch.setattr(main_cloud, "standings_cache", StandingsCache())
+    with TestClient(main_cloud.app) as test_client:
+        yield test_client, db_path
+
+
+def test_etag_304_and_invalidation_on_sync(client):
+    test_client, db_path = client
+    first = test_client.get("/api/table")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('"')
+
+    cached = test_client.get("/api/table", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert test_client.get("/api/table?matchday=3", headers={"If-None-Match": etag}).status_code == 200
+    assert main_cloud.response_cache.hits == 1
+
+    # Ein Sync mit neuem Ergebnis erhöht die Datenversion
+    conn = sqlite3.connect(str(db_path))
+    match = conn.execute("""
+        SELECT match_id, matchday, home_team_id, away_team_id, match_date
+        FROM matches_real WHERE season = '2025' AND is_finished = 0 LIMIT 1
+    """).fetchone()
+    conn.close()
+    RealDataSync(db_path=str(db_path)).save_matches_to_db([{
+        "matchId": match[0], "season": "2025", "matchday": match[1],
+        "homeTeamId": match[2], "awayTeamId": match[3],
+        "homeTeamName": f"Team {match[2]}", "awayTeamName": f"Team {match[3]}",
+        "matchDate": match[4], "isFinished": True, "homeGoals": 5, "awayGoals": 0,
+    }])
+
+    fresh = test_client.get("/api/table", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json() != first.json()
+    home_row = next(row for row in fresh.json() if row["team_id"] == match[2])
+    old_row = next(row for row in first.json() if row["team_id"] == match[2])
+    assert home_row["points"] == old_row["points"] + 3
+
+
+def test_cache_keeps_newer_versions_and_evicts_oldest():
+    cache = ResponseCache(max_entries=2)
+    newer = cache.put("a", 2, b"[2]")
+    cache.put("a", 1, b"[1]")
+    assert cache.get("a", 2) is newer
+    assert cache.get("a", 1) is None
+
+    cache.put("b", 2, b"[]")
+    cache.put("c", 2, b"[]")
+    assert cache.get("a", 2) is None
+    assert newer.matches(f"W/{newer.etag}, \"x\"") and newer.matches("*")
+    assert not newer.matches('"x"')
@@ -0,0 +1,65 @@
+"""
+Test der Schema-Registry: Planauswahl nach vorhandenen Tabellen ohne sqlite_master im Request
+"""
+import sqlite3
+
+import pytest
+
+from schema_registry import SchemaRegistry
+
+
+def _registry():
+    schema = SchemaRegistry()
+
+    @schema.plan("next_matchday", requires=("matches_real",))
+    def from_matches_real(cursor):
+        return "matches_real"
+
+    @schema.plan("next_matchday", requires=("matches",))
+    def from_matches(cursor):
+        return "matches"
+
+    @schema.plan("next_matchday")
+    def dummy(cursor):
+        return "dummy"
+
+    @schema.plan("team_matches", requires=("matches_real",))
+    def team_matches(cursor, team_id):
+        return team_id
+
+    return schema
+
+
+def test_first_matching_plan_wins_and_refresh_rebinds():
+    conn = sqlite3.connect(":memory:")
+    schema = _registry()
+
+    assert schema.resolve("next_matchday", conn)(None) == "dummy"
+    with pytest.raises(LookupError):
+        schema.resolve("team_matches")
+
+    conn.execute("CREATE TABLE matches (id INTEGER)")
+    assert schema.resolve("next_matchday", conn)(None) == "dummy"  # noch nicht neu eingelesen
+    schema.refresh(conn)
+    assert schema.resolve("next_matchday")(None) == "matches"
+
+    conn.execute("CREATE TABLE matches_real (id INTEGER)")
+    schema.refresh(conn)
+    assert schema.resolve("next_matchday")(None) == "matches_real"
+    assert schema.resolve("team_matches")(None, 7) == 7
+    assert schema.has("matches", "matches_real")
+    conn.close()
+
+
+def test_resolve_does_not_query_schema_after_refresh():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE matches_real (id INTEGER)")
+    schema = _registry()
+    schema.refresh(conn)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    for _ in range(10):
+        schema.resolve("next_matchday", conn)
+    assert statements == []
+    conn.close()
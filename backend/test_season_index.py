@@ -0,0 +1,72 @@
+"""
+Test des Saison-Index gegen das bisherige Filtern/Parsen/Sortieren der Rohliste
+"""
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app.services.openliga_client import OpenLigaDBClient
+from app.services.openliga_pool import PayloadCache
+from app.services.season_index import SeasonIndex
+from openligadb_stub import OpenLigaDBStub
+
+
+def _kickoff(match):
+    return datetime.fromisoformat(match['matchDateTime'].replace('Z', '+00:00'))
+
+
+def _scan(payload, team_id, before=None):
+    """Bisherige Implementierung: lineare Suche, Parsen, Sortieren"""
+    matches = [m for m in payload if team_id in (m['team1']['teamId'], m['team2']['teamId'])]
+    if before is not None:
+        matches = [m for m in matches if _kickoff(m) < before]
+    return sorted(matches, key=_kickoff)
+
+
+def test_index_matches_linear_scan():
+    stub = OpenLigaDBStub(finished_until=20)
+    payload = [m for matchday in range(1, 35) for m in stub.matches("bl1", "2025", matchday)]
+    payload.reverse()  # Reihenfolge der API darf keine Rolle spielen
+    index = SeasonIndex(payload)
+    before = datetime(2025, 12, 1)
+
+    assert len(index) == 306
+    assert list(index.finished_matches()) == [m for m in sorted(payload, key=_kickoff) if m['matchIsFinished']]
+    for team_id in range(1, 19):
+        assert index.team_matches(team_id) == _scan(payload, team_id)
+        assert index.team_matches(team_id, before) == _scan(payload, team_id, before)
+        for n in (1, 6, 14, 40):
+            expected = _scan(payload, team_id, before)[::-1][:n]
+            assert [r.data for r in index.last_team_records(team_id, before, n)] == expected
+    assert index.team_matches(99) == [] and index.last_team_records(99, before, 5) == []
+
+
+def test_client_methods_use_one_download_per_season():
+    stub = OpenLigaDBStub()
+
+    async def run():
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+        async with http:
+            client = OpenLigaDBClient(client=http, cache=PayloadCache(ttl=60))
+            season_2025 = await client.get_matches_by_league_season("bl1", "2025")
+            season_2024 = await client.get_matches_by_league_season("bl1", "2024")
+            results = []
+            for team_id in (1, 7, 18):
+                results.append((
+                    await client.get_team_matches(team_id),
+                    await client.get_past_matches(team_id),
+                    await client.get_last_n_matches(team_id, 6),
+                    await client.get_matches_across_seasons(team_id, 14),
+                ))
+            return season_2025, season_2024, results
+
+    season_2025, season_2024, results = asyncio.run(run())
+    now = datetime.now()
+    for team_id, (team, past, last, across) in zip((1, 7, 18), results):
+        assert team == _scan(season_2025, team_id)
+        assert past == _scan(season_2025, team_id, now)
+        assert last == _scan(season_2025, team_id, now)[::-1][:6]
+        both = _scan(season_2025, team_id, now) + _scan(season_2024, team_id, now)
+        assert across == sorted(both, key=_kickoff, reverse=True)[:14]
+    assert len(stub.requests) == 2
@@ -0,0 +1,129 @@
+"""
+Test der inkrementell gebuchten Tabelle gegen die Neuberechnung aus matches_real
+"""
+import sqlite3
+
+import main_cloud
+import standings
+from data_version import bump_data_version
+from ingest import MATCH_COLUMNS, ingest_matches
+from migrations import MIGRATIONS
+from standings import MATCH_KEYS, StandingsCache, apply_result_change, rebuild_standings, load_standings
+from test_xg_engine import _create_synthetic_db
+
+TEAMS = list(range(1, 11))
+
+
+def _db(tmp_path, monkeypatch):
+    # Jede Datenbank mit eigenem Tabellen-Cache (main_cloud hält einen pro Prozess)
+    monkeypatch.setattr(main_cloud, "standings_cache", StandingsCache())
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.executemany("INSERT INTO teams_real (team_id, name, short_name) VALUES (?, ?, ?)",
+                     [(team_id, f"Team {team_id:02d}", f"T{team_id}") for team_id in TEAMS])
+    return conn
+
+
+def _stored(conn):
+    return [tuple(row) for row in conn.execute(
+        "SELECT * FROM standings_real ORDER BY league, season, matchday, team_id")]
+
+
+def _match(conn, match_id):
+    row = conn.execute(f"SELECT {', '.join(MATCH_KEYS)} FROM matches_real WHERE match_id = ?",
+                       (match_id,)).fetchone()
+    return dict(row)
+
+
+def test_incremental_bookings_equal_rebuild(tmp_path, monkeypatch):
+    conn = _db(tmp_path, monkeypatch)
+    conn.execute("DELETE FROM standings_real")
+    for row in conn.execute(f"SELECT {', '.join(MATCH_KEYS)} FROM matches_real ORDER BY id").fetchall():
+        apply_result_change(conn, None, dict(row))
+    incremental = _stored(conn)
+
+    rebuild_standings(conn)
+    assert incremental == _stored(conn)
+
+    # Migration 3 füllt die Tabelle, Migration 7 übernimmt sie partitioniert: dasselbe Ergebnis
+    migrations = {version: statements for version, _, statements in MIGRATIONS}
+    conn.execute("DROP TABLE standings_real")
+    for statement in migrations[3]:
+        conn.execute(statement)
+    for statement in migrations[7]:
+        if "standings_real" in statement:
+            conn.execute(statement)
+    assert incremental == _stored(conn)
+    conn.close()
+
+
+def test_corrected_result_is_reverted(tmp_path, monkeypatch):
+    conn = _db(tmp_path, monkeypatch)
+    rebuild_standings(conn)
+    cursor = conn.cursor()
+
+    # Korrektur eines Ergebnisses, nachträglich beendetes Spiel, neues Spiel
+    corrections = []
+    for match_id, changes in ((5, {"home_goals": 7, "away_goals": 0}),
+                              (100, {"is_finished": 1, "home_goals": 2, "away_goals": 2}),
+                              (3, {"is_finished": 0, "home_goals": None, "away_goals": None})):
+        old = _match(conn, match_id)
+        new = dict(old, **changes)
+        conn.execute("UPDATE matches_real SET is_finished = ?, home_goals = ?, away_goals = ? WHERE match_id = ?",
+                     (new["is_finished"], new["home_goals"], new["away_goals"], match_id))
+        corrections.append(apply_result_change(conn, old, new))
+    assert corrections == [True, True, True]
+    assert apply_result_change(conn, _match(conn, 5), _match(conn, 5)) is False
+
+    incremental = _stored(conn)
+    rebuild_standings(conn)
+    assert incremental == _stored(conn)
+
+    # Gleiche Tabelle wie die bisherige Berechnung aus matches_real
+    assert main_cloud._table_from_standings(cursor) == main_cloud._table_from_matches_real(cursor)
+    conn.close()
+
+
+def test_table_as_of_matchday(tmp_path, monkeypatch):
+    conn = _db(tmp_path, monkeypatch)
+    rebuild_standings(conn)
+    cursor = conn.cursor()
+
+    standings = load_standings(cursor)
+    for matchday in (0, 1, 4, 8, 12):
+        assert (main_cloud._table_from_standings(cursor, matchday)
+                == main_cloud._table_from_matches_real(cursor, matchday))
+    assert standings.table(TEAMS, 12) == standings.table(TEAMS)
+    assert all(entry["games"] == 0 for entry in standings.table(TEAMS, 0))
+    conn.close()
+
+
+def test_cache_books_ingested_changes_without_reloading(tmp_path, monkeypatch):
+    conn = _db(tmp_path, monkeypatch)
+    rebuild_standings(conn)
+    cursor = conn.cursor()
+    loads = []
+    monkeypatch.setattr(standings, "load_standings", lambda *args: loads.append(args) or load_standings(*args))
+    cache = StandingsCache()
+    cache.load(conn, [("bl1", "2025")])
+    assert cache.table(conn, TEAMS) == load_standings(cursor).table(TEAMS)
+
+    # Korrektur, nachträglich beendetes und zurückgesetztes Spiel über den Feed
+    changes = {125: {"home_goals": 7, "away_goals": 0},
+               170: {"is_finished": True, "home_goals": 2, "away_goals": 2},
+               123: {"is_finished": False, "home_goals": None, "away_goals": None}}
+    rows = {row["match_id"]: dict(row) for row in conn.execute(
+        f"SELECT {', '.join(MATCH_COLUMNS)} FROM matches_real WHERE match_id IN (123, 125, 170) AND season = '2025'")}
+    result = ingest_matches(conn, [dict(row, **changes[match_id]) for match_id, row in rows.items()])
+    assert result["published"]["book_standings"] == 3
+    for matchday in (None, 4):
+        assert cache.table(conn, TEAMS, matchday) == load_standings(cursor).table(TEAMS, matchday)
+    assert len(loads) == 1
+
+    # Version ohne Protokoll (z.B. Backfill): neu laden
+    bump_data_version(conn)
+    assert cache.table(conn, TEAMS) == load_standings(cursor).table(TEAMS)
+    assert len(loads) == 2
+    conn.close()
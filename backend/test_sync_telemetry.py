@@ -0,0 +1,115 @@
+"""
+Test der Sync-Telemetrie: Stufen je Lauf, Zähler, Prometheus-Format, Verlauf in sync_runs
+"""
+import asyncio
+import sqlite3
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main_cloud
+from db_connection import AsyncDatabase, ConnectionManager
+from ingest import ingest_matches
+from job_runner import JobRunner, every
+from migrations import apply_migrations
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+from response_cache import ResponseCache
+from sync_telemetry import SyncTelemetry, load_sync_runs, save_sync_run, span, telemetry
+
+
+def _database(tmp_path):
+    db_path = str(tmp_path / "telemetry.db")
+    RealDataSync(db_path=db_path).init_database()
+    conn = sqlite3.connect(db_path)
+    apply_migrations(conn)
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_runner_records_stages_bytes_rows_and_retries(tmp_path):
+    db_path = _database(tmp_path)
+    database = AsyncDatabase(ConnectionManager(db_path))
+    stub = OpenLigaDBStub(fail_first=1)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    fetcher = MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000, backoff=0.01)
+    metrics = SyncTelemetry()
+    metrics.sink = lambda report: database.write(save_sync_run, report)
+
+    async def sync():
+        fetched = await fetcher.fetch_records([("bl1", "2025", 1), ("bl1", "2025", 2)])
+        rows = [record.row() for records in fetched.values() for record in records]
+        # Schreiben im Thread von AsyncDatabase: die Spannen zählen trotzdem zum Lauf
+        return await database.write(lambda conn: ingest_matches(conn, rows)["inserted"])
+
+    async def broken():
+        with span("fetch", nbytes=10):
+            raise RuntimeError("kaputt")
+
+    runner = JobRunner(telemetry=metrics)
+    runner.add("sync", sync, every(timedelta(hours=1)))
+    runner.add("broken", broken, every(timedelta(hours=1)))
+    runner.add("quiet", lambda: asyncio.sleep(0), every(timedelta(hours=1)), record=False)
+
+    async def scenario():
+        assert await runner.run_now("sync") == 18
+        with pytest.raises(RuntimeError):
+            await runner.run_now("broken")
+        await runner.run_now("quiet")
+
+    asyncio.run(scenario())
+    database.shutdown()
+
+    failed, report = metrics.runs()
+    assert (failed["job"], failed["status"], failed["error"]) == ("broken", "error", "kaputt")
+    assert report["status"] == "ok" and report["error"] is None
+    assert list(report["stages"]) == ["fetch", "parse", "diff", "write", "publish"]
+    assert (report["requests"], report["retries"]) == (4, 2)
+    assert report["bytes"] == fetcher.bytes_downloaded and report["rows"] == 18
+    stages = report["stages"]
+    assert stages["fetch"]["spans"] == 4 and stages["parse"]["rows"] == 18
+    assert stages["diff"]["rows"] == stages["write"]["rows"] == 18
+    assert stages["parse"]["rows_per_second"] > 0 and stages["fetch"]["bytes_per_second"] > 0
+
+    # Prometheus: kumulative Buckets, Zähler je Job
+    text = metrics.render()
+    assert 'kick_sync_retries_total{job="sync"} 2' in text
+    assert 'kick_sync_stage_rows_bucket{job="sync",stage="write",le="10.0"} 0' in text
+    assert 'kick_sync_stage_rows_bucket{job="sync",stage="write",le="50.0"} 1' in text
+    assert 'kick_sync_stage_rows_bucket{job="sync",stage="write",le="+Inf"} 1' in text
+    assert 'kick_sync_run_duration_seconds_count{job="broken",status="error"} 1' in text
+    assert 'job="quiet"' not in text
+
+    # Verlauf in sync_runs wie im Speicher
+    conn = sqlite3.connect(db_path)
+    stored = load_sync_runs(conn)
+    assert [{key: value for key, value in run.items() if key != "id"} for run in stored] == [failed, report]
+    assert load_sync_runs(conn, job="sync")[0]["stages"] == report["stages"]
+    conn.close()
+
+
+def test_metrics_and_sync_runs_endpoints(tmp_path, monkeypatch):
+    db_path = _database(tmp_path)
+    monkeypatch.setenv("KICK_JOB_RUNNER", "false")
+    monkeypatch.setattr(main_cloud, "DATABASE_PATH", db_path)
+    monkeypatch.setattr(main_cloud, "database", AsyncDatabase(ConnectionManager(db_path)))
+    monkeypatch.setattr(main_cloud, "response_cache", ResponseCache())
+
+    async def sync():
+        async with telemetry.run("endpoint_sync"):
+            with span("fetch", nbytes=2048):
+                pass
+
+    with TestClient(main_cloud.app) as client:
+        client.portal.call(sync)
+        runs = client.get("/api/sync/runs", params={"job": "endpoint_sync"}).json()
+        assert len(runs) == 1 and runs[0]["bytes"] == 2048 and runs[0]["stages"]["fetch"]["spans"] == 1
+
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'kick_sync_stage_bytes_bucket{job="endpoint_sync",stage="fetch",le="1024.0"} 0' in response.text
+        assert 'kick_sync_stage_bytes_bucket{job="endpoint_sync",stage="fetch",le="4096.0"} 1' in response.text
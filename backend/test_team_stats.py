@@ -0,0 +1,98 @@
+"""
+Test der materialisierten Team-Statistiken gegen die Live-Berechnung der xG-Engine
+"""
+import sqlite3
+
+from ingest import MATCH_COLUMNS, ingest_matches
+from team_stats import (rebuild_snapshots, refresh_team_snapshots,
+                        get_team_snapshot, load_team_stats)
+from test_xg_engine import _create_synthetic_db
+from xg_engine import load_team_windows, compute_team_stats, predict_fixtures
+
+TEAMS = list(range(1, 11))
+
+
+def _snapshot_rows(conn):
+    return conn.execute("SELECT * FROM team_stats_snapshot ORDER BY team_id, as_of_date").fetchall()
+
+
+def test_snapshots_match_live_window(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+    rebuild_snapshots(conn)
+    conn.commit()
+
+    team_ids = TEAMS + [99]
+    live = compute_team_stats(load_team_windows(cursor, team_ids), team_ids)
+    stored = load_team_stats(cursor, team_ids)
+    for key in ("form", "xg", "goals_last_n"):
+        assert stored[key].tolist() == live[key].tolist(), f"{key} weicht ab"
+
+    fixtures = [(h, a) for h in TEAMS for a in TEAMS if h != a] + [(99, 1)]
+    assert predict_fixtures(cursor, fixtures, stats_loader=load_team_stats) == predict_fixtures(cursor, fixtures)
+    conn.close()
+
+
+def test_refresh_after_new_result_equals_rebuild(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    rebuild_snapshots(conn)
+
+    # Nachgetragenes Ergebnis eines offenen Spiels
+    home_id, away_id = conn.execute("""
+        SELECT home_team_id, away_team_id FROM matches_real
+        WHERE is_finished = 0 ORDER BY match_date LIMIT 1
+    """).fetchone()
+    conn.execute("""
+        UPDATE matches_real SET is_finished = 1, home_goals = 3, away_goals = 1
+        WHERE is_finished = 0 AND home_team_id = ? AND away_team_id = ?
+    """, (home_id, away_id))
+    # Nur ab dem letzten Snapshot: je Team dessen Spiel erneut und das neue
+    assert refresh_team_snapshots(conn, [home_id, away_id]) == 4
+    refreshed = _snapshot_rows(conn)
+
+    rebuild_snapshots(conn)
+    assert [row[:-1] for row in refreshed] == [row[:-1] for row in _snapshot_rows(conn)]
+    conn.close()
+
+
+def test_snapshot_before_date(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+    rebuild_snapshots(conn)
+
+    latest = get_team_snapshot(cursor, 1)
+    previous = get_team_snapshot(cursor, 1, before=latest["as_of_date"])
+    assert previous["as_of_date"] < latest["as_of_date"]
+    assert get_team_snapshot(cursor, 1, before="2000-01-01") is None
+    assert get_team_snapshot(cursor, 99) is None
+    conn.close()
+
+
+def test_ingest_appends_new_results_and_replays_corrections(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    rebuild_snapshots(conn)
+
+    def results(where, goals):
+        matches = conn.execute(f"SELECT {', '.join(MATCH_COLUMNS)} FROM matches_real WHERE {where}").fetchall()
+        return [dict(dict(match), is_finished=True, home_goals=goals, away_goals=0) for match in matches]
+
+    # Neuer Spieltag, davon ein Spiel mit älterem Anstoß als der letzte Snapshot der Teams
+    new_results = results("season = '2025' AND matchday = 9", 2)
+    new_results[0]["match_date"] = "2025-01-01T15:30:00"
+    ingest_matches(conn, new_results)
+    # Korrektur eines alten Ergebnisses
+    ingest_matches(conn, results("season = '2024' AND matchday = 3", 7))
+    refreshed = _snapshot_rows(conn)
+
+    rebuild_snapshots(conn)
+    assert [tuple(row)[:-1] for row in refreshed] == [tuple(row)[:-1] for row in _snapshot_rows(conn)]
+    conn.close()
@@ -0,0 +1,74 @@
+"""
+Test des inkrementellen Syncs über OpenLigaDB-Änderungszeitpunkte (gegen den Stub)
+"""
+import asyncio
+import sqlite3
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main_cloud
+from db_connection import ConnectionManager, AsyncDatabase
+from openligadb_fetcher import MatchdayFetcher
+from openligadb_stub import OpenLigaDBStub
+from real_data_sync import RealDataSync
+from response_cache import ResponseCache
+from test_xg_engine import _create_synthetic_db
+
+
+def _fetcher(stub):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub")
+    return MatchdayFetcher(base_url="http://stub/getmatchdata", client=client, rate=1000)
+
+
+def test_only_changed_matchdays_are_fetched(tmp_path):
+    stub = OpenLigaDBStub(finished_until=3)
+    sync = RealDataSync(db_path=str(tmp_path / "sync.db"), fetcher=_fetcher(stub))
+    sync.init_database()
+
+    first = asyncio.run(sync.sync_changed_matchdays("2025", range(1, 7)))
+    assert first["matchdays_changed"] == [1, 2, 3, 4, 5, 6]
+    assert first["rows_touched"] == 54 and first["finished_matches"] == 27
+
+    second = asyncio.run(sync.sync_changed_matchdays("2025", range(1, 7)))
+    # Ohne Änderung: nur der Wächter (Spieltag 4, frühestes offenes Spiel) wird abgefragt
+    assert second["matchdays_changed"] == [] and second["rows_touched"] == 0
+    assert second["requests"] == 1 and second["matchdays_checked"] == 1
+    assert second["bytes_downloaded"] < first["bytes_downloaded"] / 10
+
+    # Wächter bewegt: alle Spieltage werden geprüft, nur der geänderte geladen
+    stub.finish("2025", 4, "2025-09-30T18:00:00")
+    third = asyncio.run(sync.sync_changed_matchdays("2025", range(1, 7)))
+    assert third["matchdays_changed"] == [4] and third["matchdays_checked"] == 6
+    assert third["requests"] == 6 + 1
+    assert third["rows_touched"] == 9 and third["finished_matches"] == 9
+
+    conn = sqlite3.connect(str(tmp_path / "sync.db"))
+    assert conn.execute("SELECT COUNT(*) FROM matches_real WHERE is_finished = 1").fetchone()[0] == 36
+    assert conn.execute("SELECT last_change FROM sync_watermarks WHERE matchday = 4").fetchone()[0] \
+        == "2025-09-30T18:00:00"
+    conn.close()
+
+
+def test_update_data_endpoint_skips_unchanged_matchdays(tmp_path, monkeypatch):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+    stub = OpenLigaDBStub(finished_until=3)
+    monkeypatch.setenv("KICK_JOB_RUNNER", "false")
+    monkeypatch.setattr(main_cloud, "DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(main_cloud, "database", AsyncDatabase(ConnectionManager(str(db_path))))
+    monkeypatch.setattr(main_cloud, "response_cache", ResponseCache())
+    monkeypatch.setattr(main_cloud, "openligadb", _fetcher(stub))
+    # Der Live-Modus liest die ausgetauschten Instanzen erst beim Lauf
+    assert main_cloud.live_mode.fetcher() is main_cloud.openligadb
+    assert main_cloud.live_mode.database() is main_cloud.database
+
+    with TestClient(main_cloud.app) as client:
+        first = client.post("/api/update-data").json()["stats"]
+        second = client.post("/api/update-data").json()["stats"]
+
+    assert first["matchdays_checked"] == 34 and len(first["matchdays_changed"]) == 34
+    assert first["rows_touched"] == 306
+    assert second["matchdays_changed"] == [] and second["rows_touched"] == 0
+    assert second["matchdays_checked"] == 1
+    assert 0 < second["bytes_downloaded"] < first["bytes_downloaded"] / 10
@@ -0,0 +1,111 @@
+"""
+Test der gebündelten xG-Engine gegen das Einzelspiel-Modell aus main_cloud
+"""
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from real_data_sync import RealDataSync
+from main_cloud import predict_match_xg, get_team_goals_last_n_matches
+from xg_engine import predict_fixtures
+
+MASTER_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kick_predictor_final.db")
+
+
+def _legacy_prediction(cursor, home_team_id, away_team_id):
+    """Alter Pfad: predict_match_xg + 2x get_team_goals_last_n_matches"""
+    async def run():
+        result = await predict_match_xg(cursor, home_team_id, away_team_id)
+        result['home_goals_last_14'] = await get_team_goals_last_n_matches(cursor, home_team_id, 14)
+        result['away_goals_last_14'] = await get_team_goals_last_n_matches(cursor, away_team_id, 14)
+        return result
+    return asyncio.run(run())
+
+
+def _create_synthetic_db(path):
+    """Erzeugt eine Datenbank mit Zufallsergebnissen, NULL-Toren und Fremdsaisons"""
+    RealDataSync(db_path=str(path)).init_database()
+    conn = sqlite3.connect(str(path))
+    rng = random.Random(42)
+    teams = list(range(1, 11))
+    kickoff = datetime(2023, 8, 1, 15, 30)
+    match_id = 1
+
+    for season in ("2023", "2024", "2025"):
+        for matchday in range(1, 13):
+            rng.shuffle(teams)
+            for i in range(0, len(teams), 2):
+                finished = season != "2025" or matchday <= 8
+                home_goals = rng.randint(0, 4) if finished else None
+                away_goals = rng.randint(0, 4) if finished else None
+                # Vereinzelt beendete Spiele ohne Ergebnis wie in echten Altdaten
+                if finished and rng.random() < 0.05:
+                    home_goals = None
+                conn.execute("""
+                    INSERT INTO matches_real
+                    (match_id, season, matchday, home_team_id, away_team_id,
+                     home_team_name, away_team_name, match_date, is_finished,
+                     home_goals, away_goals)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (match_id, season, matchday, teams[i], teams[i + 1],
+                      f"Team {teams[i]}", f"Team {teams[i + 1]}",
+                      (kickoff + timedelta(days=7 * match_id // 5, minutes=i)).isoformat(),
+                      finished, home_goals, away_goals))
+                match_id += 1
+
+    conn.commit()
+    conn.close()
+
+
+def _assert_same_predictions(cursor, fixtures):
+    batched = predict_fixtures(cursor, fixtures)
+    assert len(batched) == len(fixtures)
+    for (home_id, away_id), result in zip(fixtures, batched):
+        legacy = _legacy_prediction(cursor, home_id, away_id)
+        for key, value in legacy.items():
+            assert result[key] == value, f"{key} weicht ab für {home_id} vs {away_id}"
+
+
+def test_batched_engine_matches_legacy_model(tmp_path):
+    db_path = tmp_path / "synthetic.db"
+    _create_synthetic_db(db_path)
+
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    # Alle Paarungen inklusive eines Teams ohne Spiele (99)
+    fixtures = [(h, a) for h in range(1, 11) for a in range(1, 11) if h != a]
+    fixtures.append((99, 1))
+    _assert_same_predictions(cursor, fixtures)
+    conn.close()
+
+
+def test_batched_engine_matches_legacy_model_on_master_db(tmp_path):
+    if not os.path.exists(MASTER_DB):
+        pytest.skip("Master-Datenbank nicht vorhanden")
+
+    db_copy = tmp_path / "master.db"
+    shutil.copy(MASTER_DB, db_copy)
+    conn = sqlite3.connect(str(db_copy))
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT home_team_id, away_team_id FROM matches_real
+        WHERE season = '2025' ORDER BY matchday, match_date
+    """)
+    fixtures = [(row[0], row[1]) for row in cursor.fetchall()]
+    _assert_same_predictions(cursor, fixtures)
+    conn.close()
+
+
+def test_empty_fixture_list():
+    conn = sqlite3.connect(":memory:")
+    assert predict_fixtures(conn.cursor(), []) == []
+    conn.close()
@@ -0,0 +1,93 @@
+"""
+Änderungserkennung für den Sync über OpenLigaDB getlastchangedate
+
+Pro (league, season, matchday) wird in sync_watermarks der letzte
+Änderungszeitpunkt gespeichert, mit dem der Spieltag zuletzt eingespielt
+wurde. Ein Sync fragt zuerst nur die (wenige Bytes großen) Änderungszeitpunkte
+ab und lädt und schreibt ausschließlich Spieltage, deren Zeitpunkt sich
+bewegt hat. Die Wasserzeichen werden in derselben Transaktion wie die Spiele
+gespeichert, damit ein abgebrochener Sync den Spieltag beim nächsten Mal
+erneut lädt.
+
+Auch ohne Änderungen kosten 34 Abfragen pro Partition bei 5 Anfragen/s fast
+7 s. detect_changes() prüft deshalb zweistufig:
+    1. nur den Wächter-Spieltag (der mit dem frühesten offenen Spiel, siehe
+       sentinel_matchday) und Spieltage ohne Wasserzeichen
+    2. alle übrigen Spieltage erst, wenn sich der Wächter bewegt hat
+Änderungen an späteren Spieltagen ohne Bewegung am Wächter (z.B. verlegte
+Anstoßzeiten) holt der wöchentliche volle Sync ab (full=True).
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+MATCHDAYS = range(1, 35)
+
+MatchdayKey = Tuple[str, str, int]
+
+
+def load_watermarks(conn, league: str, season: str) -> Dict[int, str]:
+    """Gespeicherte Änderungszeitpunkte pro Spieltag"""
+    rows = conn.execute("""
+        SELECT matchday, last_change FROM sync_watermarks
+        WHERE league = ? AND season = ?
+    """, (league, str(season))).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def save_watermarks(conn, watermarks: Mapping[MatchdayKey, str]) -> None:
+    """Speichert neue Änderungszeitpunkte. Commit macht der Aufrufer."""
+    conn.executemany("""
+        INSERT INTO sync_watermarks (league, season, matchday, last_change, synced_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (league, season, matchday)
+        DO UPDATE SET last_change = excluded.last_change, synced_at = excluded.synced_at
+    """, [(league, str(season), matchday, last_change)
+          for (league, season, matchday), last_change in watermarks.items()])
+
+
+def changed_matchdays(change_dates: Mapping[MatchdayKey, str],
+                      watermarks: Mapping[int, str]) -> List[MatchdayKey]:
+    """Spieltage, deren Änderungszeitpunkt neu ist oder sich bewegt hat"""
+    return [key for key, last_change in change_dates.items()
+            if last_change and watermarks.get(key[2]) != last_change]
+
+
+
+def sentinel_matchday(conn, league: str, season: str) -> Optional[int]:
+    """
+    Spieltag, an dem sich eine Saison als Nächstes ändert: der mit dem
+    frühesten offenen Spiel, nach Saisonende der letzte (None ohne Spiele)
+    """
+    row = conn.execute("""
+        SELECT matchday FROM matches_real
+        WHERE league = ? AND season = ? AND is_finished = 0
+        ORDER BY match_date, matchday LIMIT 1
+    """, (league, str(season))).fetchone()
+    if row is None:
+        row = conn.execute("SELECT MAX(matchday) FROM matches_real WHERE league = ? AND season = ?",
+                           (league, str(season))).fetchone()
+    return row[0] if row is not None else None
+
+
+async def detect_changes(fetcher, league: str, season: str, matchdays: Iterable[int],
+                         watermarks: Mapping[int, str],
+                         sentinel: Optional[int]) -> Tuple[Dict[MatchdayKey, str], List[MatchdayKey]]:
+    """
+    Zweistufige Änderungserkennung einer Partition (siehe Moduldoku)
+
+    Returns:
+        (abgefragte Änderungszeitpunkte, geänderte Spieltage in Spieltags-Reihenfolge)
+    """
+    matchdays = list(matchdays)
+    first = matchdays
+    if sentinel is not None and sentinel in watermarks:
+        first = [matchday for matchday in matchdays if matchday == sentinel or matchday not in watermarks]
+    change_dates = await fetcher.fetch_last_changes([(league, season, matchday) for matchday in first])
+    sentinel_key = (league, season, sentinel)
+    rest = [matchday for matchday in matchdays if matchday not in first]
+    # Wächter bewegt oder nicht erreichbar: alle übrigen Spieltage prüfen
+    if rest and (sentinel_key not in change_dates
+                 or change_dates[sentinel_key] != watermarks.get(sentinel)):
+        change_dates.update(await fetcher.fetch_last_changes(
+            [(league, season, matchday) for matchday in rest]))
+    change_dates = dict(sorted(change_dates.items()))
+    return change_dates, changed_matchdays(change_dates, watermarks)
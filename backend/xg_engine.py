@@ -0,0 +1,268 @@
+"""
+Gebündelte xG-Vorhersage-Engine für komplette Spieltage
+
+Statt pro Spiel sechs Abfragen auf matches_real (Form, xG und Tore der
+letzten 14 Spiele für beide Teams) lädt die Engine die 14er-Fenster aller
+beteiligten Teams mit EINER Abfrage und berechnet Form, Expected Goals und
+Vorhersagen für alle Spiele gleichzeitig als NumPy-Arrays.
+
+Die Rechenschritte entsprechen exakt predict_match_xg, get_team_form_from_db,
+get_team_expected_goals und get_team_goals_last_n_matches in main_cloud.py.
+
+Mit model="poisson" kommen Wahrscheinlichkeiten und Tipp aus der
+Poisson-Ergebnismatrix (poisson_engine) statt aus dem linearen Modell.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from partitions import form_seasons
+from poisson_engine import OVER_UNDER_LINES, line_key, score_fixtures
+
+WINDOW_SIZE = 14
+# Vorsaison und aktuelle Saison (KICK_CURRENT_SEASON), auch für Snapshots und Backtest
+FORM_SEASONS: Tuple[str, ...] = form_seasons()
+HOME_ADVANTAGE = 0.1
+
+# Neutrale Werte, wenn ein Team (noch) keine beendeten Spiele hat
+NEUTRAL_FORM = 0.5
+NEUTRAL_XG = 1.0
+MIN_XG = 0.5
+
+# "linear": bisheriges Modell aus predict_match_xg, "poisson": poisson_engine
+MODELS = ("linear", "poisson")
+
+
+def load_team_windows(cursor, team_ids: Iterable[int], n: int = WINDOW_SIZE,
+                      seasons: Sequence[str] = FORM_SEASONS) -> Dict[int, Dict[str, List[Tuple]]]:
+    """
+    Lädt die letzten n beendeten Spiele aller Teams mit einer einzigen Abfrage
+
+    Returns:
+        Dict team_id -> {"all": [(goals_for, goals_against), ...],
+                         "scored": [(goals_for, goals_against), ...]}
+        "all" entspricht dem Fenster von Form/xG (Tore dürfen NULL sein),
+        "scored" dem Fenster der Tore-Summe (nur Spiele mit Ergebnis).
+        Beide Listen sind nach match_date absteigend sortiert.
+    """
+    team_ids = sorted({int(t) for t in team_ids if t is not None})
+    windows: Dict[int, Dict[str, List[Tuple]]] = {t: {"all": [], "scored": []} for t in team_ids}
+    if not team_ids:
+        return windows
+
+    team_marks = ",".join("?" * len(team_ids))
+    season_marks = ",".join("?" * len(seasons))
+
+    cursor.execute(f"""
+        WITH team_matches AS (
+            SELECT home_team_id AS team_id, home_goals AS goals_for,
+                   away_goals AS goals_against, match_date
+            FROM matches_real
+            WHERE home_team_id IN ({team_marks})
+                AND is_finished = 1
+                AND season IN ({season_marks})
+            UNION ALL
+            SELECT away_team_id AS team_id, away_goals AS goals_for,
+                   home_goals AS goals_against, match_date
+            FROM matches_real
+            WHERE away_team_id IN ({team_marks})
+                AND is_finished = 1
+                AND season IN ({season_marks})
+        ),
+        ranked AS (
+            SELECT
+                team_id,
+                goals_for,
+                goals_against,
+                (goals_for IS NOT NULL AND goals_against IS NOT NULL) AS has_score,
+                ROW_NUMBER() OVER (
+                    PARTITION BY team_id ORDER BY match_date DESC
+                ) AS rn_all,
+                ROW_NUMBER() OVER (
+                    PARTITION BY team_id, (goals_for IS NOT NULL AND goals_against IS NOT NULL)
+                    ORDER BY match_date DESC
+                ) AS rn_scored
+            FROM team_matches
+        )
+        SELECT team_id, goals_for, goals_against, has_score, rn_all, rn_scored
+        FROM ranked
+        WHERE rn_all <= ? OR (has_score AND rn_scored <= ?)
+        ORDER BY team_id, rn_all
+    """, (*team_ids, *seasons, *team_ids, *seasons, n, n))
+
+    for team_id, goals_for, goals_against, has_score, rn_all, rn_scored in cursor.fetchall():
+        window = windows[team_id]
+        if rn_all <= n:
+            window["all"].append((goals_for, goals_against))
+        if has_score and rn_scored <= n:
+            window["scored"].append((goals_for, goals_against))
+
+    return windows
+
+
+def _window_matrix(rows_per_team: List[List[Tuple]], n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Packt die Fenster aller Teams in (teams x n)-Matrizen für Tore und Maske"""
+    goals_for = np.zeros((len(rows_per_team), n), dtype=np.int64)
+    goals_against = np.zeros((len(rows_per_team), n), dtype=np.int64)
+    mask = np.zeros((len(rows_per_team), n), dtype=bool)
+
+    for i, rows in enumerate(rows_per_team):
+        for j, (gf, ga) in enumerate(rows[:n]):
+            goals_for[i, j] = gf or 0
+            goals_against[i, j] = ga or 0
+            mask[i, j] = True
+
+    return goals_for, goals_against, mask
+
+
+def compute_team_stats(windows: Dict[int, Dict[str, List[Tuple]]], team_ids: Sequence[int],
+                       n: int = WINDOW_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Berechnet Form, xG und Tore der letzten n Spiele für alle Teams als Arrays
+
+    Returns:
+        Dict mit den Arrays "form", "xg" und "goals_last_n" (Reihenfolge wie team_ids)
+    """
+    empty = {"all": [], "scored": []}
+
+    # Form und xG auf Basis des "all"-Fensters (NULL-Tore zählen als 0)
+    gf, ga, mask = _window_matrix([windows.get(t, empty)["all"] for t in team_ids], n)
+    played = mask.sum(axis=1)
+    points = np.where(gf > ga, 3, np.where(gf == ga, 1, 0)) * mask
+    total_points = points.sum(axis=1)
+    total_goals = (gf * mask).sum(axis=1)
+
+    has_games = played > 0
+    safe_played = np.where(has_games, played, 1)
+
+    form = np.where(has_games, total_points / (safe_played * 3), NEUTRAL_FORM)
+    form = np.clip(form, 0.0, 1.0)
+
+    xg = np.where(has_games, np.maximum(MIN_XG, total_goals / safe_played), NEUTRAL_XG)
+
+    # Tore-Summe auf Basis des "scored"-Fensters
+    sgf, _, smask = _window_matrix([windows.get(t, empty)["scored"] for t in team_ids], n)
+    goals_last_n = (sgf * smask).sum(axis=1)
+
+    return {"form": form, "xg": xg, "goals_last_n": goals_last_n}
+
+
+def predict_from_stats(home_form: np.ndarray, away_form: np.ndarray,
+                       home_xg: np.ndarray, away_xg: np.ndarray,
+                       model: str = "linear") -> Dict[str, np.ndarray]:
+    """
+    Vektorisierte Variante von predict_match_xg für N Spiele
+
+    Reihenfolge und Form der Rechenoperationen sind identisch zum Einzelmodell,
+    damit die Ergebnisse bitgenau übereinstimmen. Bei model="poisson" werden
+    Wahrscheinlichkeiten und Tipp aus den form-adjustierten xG mit
+    poisson_engine.score_fixtures berechnet, dazu die Over/Under-Linien.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unbekanntes Modell: {model}")
+
+    # Form-adjustierte Expected Goals (0.7-1.3 Multiplikator)
+    home_form_adjusted_xg = home_xg * (0.7 + home_form * 0.6)
+    away_form_adjusted_xg = away_xg * (0.7 + away_form * 0.6)
+
+    # Heimvorteil
+    home_final_xg = home_form_adjusted_xg * (1 + HOME_ADVANTAGE)
+    away_final_xg = away_form_adjusted_xg
+
+    if model == "poisson":
+        result = score_fixtures(home_final_xg, away_final_xg)
+        del result["matrix"]
+        result["home_xg"] = home_final_xg
+        result["away_xg"] = away_final_xg
+        return result
+
+    xg_diff = home_final_xg - away_final_xg
+
+    home_win_prob = 0.45 + (xg_diff / 4) + (home_form - away_form) / 4
+    away_win_prob = 0.35 - (xg_diff / 4) - (home_form - away_form) / 4
+    draw_prob = np.full_like(home_win_prob, 0.20)
+
+    home_win_prob = np.clip(home_win_prob, 0.05, 0.90)
+    away_win_prob = np.clip(away_win_prob, 0.05, 0.90)
+    draw_prob = np.clip(draw_prob, 0.05, 0.90)
+
+    total = home_win_prob + draw_prob + away_win_prob
+    home_win_prob = home_win_prob / total
+    draw_prob = draw_prob / total
+    away_win_prob = away_win_prob / total
+
+    predicted_home_goals = np.maximum(0, np.round(home_final_xg)).astype(np.int64)
+    predicted_away_goals = np.maximum(0, np.round(away_final_xg)).astype(np.int64)
+
+    return {
+        "home_win_prob": home_win_prob,
+        "draw_prob": draw_prob,
+        "away_win_prob": away_win_prob,
+        "home_xg": home_final_xg,
+        "away_xg": away_final_xg,
+        "predicted_home_goals": predicted_home_goals,
+        "predicted_away_goals": predicted_away_goals,
+    }
+
+
+def predict_fixtures(cursor, fixtures: Sequence[Tuple[int, int]],
+                     stats_loader: Optional[Callable] = None,
+                     model: str = "linear") -> List[Dict]:
+    """
+    Berechnet Vorhersagen für eine Liste von (home_team_id, away_team_id)
+
+    Args:
+        cursor: SQLite-Cursor
+        fixtures: Paarungen
+        stats_loader: Optionale Funktion (cursor, team_ids) -> Stats im Format von
+            compute_team_stats, z.B. team_stats.load_team_stats. Liefert sie None,
+            werden die Fenster aus matches_real berechnet.
+        model: "linear" oder "poisson" (siehe predict_from_stats)
+
+    Returns:
+        Liste von Dicts mit denselben Schlüsseln wie predict_match_xg, ergänzt um
+        home_goals_last_14 und away_goals_last_14, bei "poisson" zusätzlich
+        over_under mit der Over-Wahrscheinlichkeit je Linie
+    """
+    if not fixtures:
+        return []
+
+    team_ids = sorted({t for fixture in fixtures for t in fixture})
+    stats = stats_loader(cursor, team_ids) if stats_loader is not None else None
+    if stats is None:
+        windows = load_team_windows(cursor, team_ids)
+        stats = compute_team_stats(windows, team_ids)
+
+    position = {team_id: i for i, team_id in enumerate(team_ids)}
+    home_idx = np.array([position[h] for h, _ in fixtures])
+    away_idx = np.array([position[a] for _, a in fixtures])
+
+    result = predict_from_stats(
+        stats["form"][home_idx], stats["form"][away_idx],
+        stats["xg"][home_idx], stats["xg"][away_idx], model
+    )
+
+    predictions = []
+    for i in range(len(fixtures)):
+        home_goals = int(result["predicted_home_goals"][i])
+        away_goals = int(result["predicted_away_goals"][i])
+        predictions.append({
+            'predicted_home_goals': home_goals,
+            'predicted_away_goals': away_goals,
+            'predicted_score': f"{home_goals}:{away_goals}",
+            'home_win_prob': float(result["home_win_prob"][i]),
+            'draw_prob': float(result["draw_prob"][i]),
+            'away_win_prob': float(result["away_win_prob"][i]),
+            'home_xg': float(result["home_xg"][i]),
+            'away_xg': float(result["away_xg"][i]),
+            'home_form': float(stats["form"][home_idx[i]]),
+            'away_form': float(stats["form"][away_idx[i]]),
+            'home_goals_last_14': int(stats["goals_last_n"][home_idx[i]]),
+            'away_goals_last_14': int(stats["goals_last_n"][away_idx[i]]),
+        })
+        if model == "poisson":
+            predictions[-1]['over_under'] = {
+                line_key(line): float(result[line_key(line)][i]) for line in OVER_UNDER_LINES
+            }
+
+    return predictions
@@ -24,9 +24,9 @@ interface UpdateStatus {
   update_count: number;
   current_time: string;
   next_scheduled_updates: Array<{
-    date: string;
-    day: string;
-    times: string;
+    job: string;
+    time: string;
+    reason: string;
   }>;
 }
 
@@ -252,9 +252,11 @@ const UpdatePage: React.FC = () => {
                 <div className="text-sm text-gray-600 space-y-1">
                   {autoUpdaterStatus.next_scheduled_updates.map((schedule, idx) => (
                     <div key={idx}>
-                      <span className="font-medium">{schedule.day}</span> ({schedule.date})
+                      <span className="font-medium">
+                        {new Date(schedule.time).toLocaleDateString('de-DE', { weekday: 'long' })}
+                      </span> ({formatTime(schedule.time)}, {schedule.job})
                       <br />
-                      <span className="text-xs">{schedule.times}</span>
+                      <span className="text-xs">{schedule.reason}</span>
                     </div>
                   ))}
                 </div>